@@ -9,17 +9,53 @@
 #endif
 #define MAX_TOKENS 4
 #define MAX_TOKEN_LENGTH 10
-#define MAX_PINS 4
 
-#define INPUT_BYTE PINB
 #define LED_BYTE PIND
 
+/* Binary protocol (see software/protocol.py) */
+#define PROTO_VERSION 1
+#define FRAME_SYNC 0xA5
+#define FRAME_SIZE 8
+#define PAYLOAD_SIZE 5
+#define FRAME_LEDS 0x01
+#define FRAME_EFFECT 0x02
+#define FRAME_PING 0x03
+#define FRAME_ACK 0x81
+#define FRAME_PRESS 0x82
+#define FRAME_RELEASE 0x83
+#define FRAME_PONG 0x84
+#define FRAME_NAK 0x8F
+
+/* LED effects (see software/LedEffects.py, which must stay in step) */
+#define EFFECT_NONE 0
+#define EFFECT_CHASE 1
+#define EFFECT_BLINK 2
+#define EFFECT_SOLO 3
+#define EFFECT_ALL 4
+#define EFFECT_FADE 5
+#define MIN_EFFECT_PERIOD 20
+
 /* PIN Configuration */
 /* D4-D7 is Player 1,2,3,4 LED with external pullups */
-/* D9, D11, D12, D13 is Player 4,3,2,1 switches */
-const unsigned int led_pins[] = { 4, 5, 6, 7 }; // these are all PIND
-const unsigned int input_pins[] = { 13, 12, 11, 10 }; // these are on PINB
-const unsigned int input_masks[] = { PCINT2, PCINT3, PCINT4, PCINT5 };
+/* D13, D12, D11, D10 is Player 1,2,3,4 switches */
+/* One entry per player, up to 16. Any pins will do; for 8 players on a Nano:
+ *   led_pins[]   = { 2, 3, 4, 5, 6, 7, 8, 9 };
+ *   input_pins[] = { 13, 12, 11, 10, A0, A1, A2, A3 };
+ */
+const unsigned int led_pins[] = { 4, 5, 6, 7 };
+const unsigned int input_pins[] = { 13, 12, 11, 10 };
+#define MAX_PINS (sizeof(input_pins) / sizeof(input_pins[0]))
+#define ALL_LEDS ((unsigned int)((1UL << MAX_PINS) - 1))
+
+/* Input register and bit of each switch, looked up once in setup() */
+volatile uint8_t *inputPort[MAX_PINS];
+uint8_t inputBit[MAX_PINS];
+
+/* Press timestamps, captured in the ISR so that pin scan order does not matter */
+volatile unsigned long pressMicros[MAX_PINS];
+volatile unsigned long releaseMicros[MAX_PINS];
+/* Switch levels at the last interrupt, bit n = switch n+1 */
+volatile unsigned int lastInputs = 0xFFFF;
 
 /* Command Buffer */
 const byte numChars = 32;
@@ -27,33 +63,56 @@ char receivedChars[numChars];  // an array to store the received data
 boolean newSerialData = false;
 boolean buttonsNeedHandling = false;
 
+/* Set once the host has asked for PROTO_VERSION */
+boolean binaryMode = false;
+byte frameBuf[FRAME_SIZE];
+byte frameLen = 0;
+unsigned int ledMask = 0;
+
+/* Running LED effect, animated from loop() */
+byte effect = EFFECT_NONE;
+unsigned int effectTarget = ALL_LEDS;
+unsigned int effectPeriod = 1000;
+unsigned long effectStart = 0;
+
 void lamp_test() {
   // DFM: On boot we'll light all of the LEDs
-  for (unsigned int x = 0; x < 4; x++) {
+  for (unsigned int x = 0; x < MAX_PINS; x++) {
     digitalWrite(led_pins[x],1);
     delay(100);
   }
 
   delay(500);
-  for (unsigned int x = 0; x < 4; x++) {
+  for (unsigned int x = 0; x < MAX_PINS; x++) {
     digitalWrite(led_pins[x],0);
   }
 }
-void setup() {
-  // turn on interrupts on port B
- 
-  PCICR |= 0b00000001;
-
-  // Setup pin interrupt mask register
-  //             13              12             11              10
-  PCMSK0 |= (1 << PCINT5) | (1 << PCINT4) | (1 << PCINT3) | (1 << PCINT2);
+/* Bitmask of the current switch levels, bit n = switch n+1 */
+unsigned int readInputs() {
+  unsigned int levels = 0;
+  for (unsigned int i = 0; i < MAX_PINS; i++) {
+    if (*inputPort[i] & inputBit[i]) {
+      levels |= 1U << i;
+    }
+  }
+  return levels;
+}
 
+void setup() {
   // configure pins, using external pullups here.
-  for (unsigned int x = 0; x < 4; x++) {
+  for (unsigned int x = 0; x < MAX_PINS; x++) {
     pinMode(led_pins[x], OUTPUT);
     pinMode(input_pins[x], INPUT_PULLUP);
+
+    // turn on the pin change interrupt of whichever port the switch is on
+    inputPort[x] = portInputRegister(digitalPinToPort(input_pins[x]));
+    inputBit[x] = digitalPinToBitMask(input_pins[x]);
+    *digitalPinToPCMSK(input_pins[x]) |= bit(digitalPinToPCMSKbit(input_pins[x]));
+    PCICR |= bit(digitalPinToPCICRbit(input_pins[x]));
   }
 
+  lastInputs = readInputs();
+
   lamp_test();
   Serial.begin(115200);
   Serial.println("");
@@ -81,7 +140,7 @@ void dump_byte(unsigned char theByte) {
 
 void showPinStates() {
   // put your main code here, to run repeatedly:
-  for (int pin = 0; pin < 4; pin++) {
+  for (unsigned int pin = 0; pin < MAX_PINS; pin++) {
     int switchState = digitalRead(input_pins[pin]);
 
     Serial.print(pin);
@@ -96,6 +155,150 @@ void showPinStates() {
 }
 
 
+byte crc8(const byte *data, byte len) {
+  byte crc = 0;
+  for (byte i = 0; i < len; i++) {
+    crc ^= data[i];
+    for (byte b = 0; b < 8; b++) {
+      crc = (crc & 0x80) ? (crc << 1) ^ 0x07 : (crc << 1);
+    }
+  }
+  return crc;
+}
+
+void sendFrame(byte type, const byte *payload) {
+  byte frame[FRAME_SIZE];
+  frame[0] = FRAME_SYNC;
+  frame[1] = type;
+  for (byte i = 0; i < PAYLOAD_SIZE; i++) {
+    frame[2 + i] = payload[i];
+  }
+  frame[FRAME_SIZE - 1] = crc8(frame + 1, FRAME_SIZE - 2);
+  Serial.write(frame, FRAME_SIZE);
+}
+
+void sendEdge(byte type, byte channel, unsigned long stamp) {
+  byte payload[PAYLOAD_SIZE] = { channel, (byte)stamp, (byte)(stamp >> 8), (byte)(stamp >> 16), (byte)(stamp >> 24) };
+  sendFrame(type, payload);
+}
+
+void writeLeds(unsigned int mask) {
+  if (mask == ledMask) return;
+  ledMask = mask;
+  for (unsigned int p = 0; p < MAX_PINS; p++) {
+    digitalWrite(led_pins[p], (mask >> p) & 1);
+  }
+}
+
+/* LED commands from the host stop any running effect */
+void setLeds(unsigned int mask) {
+  effect = EFFECT_NONE;
+  writeLeds(mask);
+}
+
+/* Same arithmetic as EffectEngine.level() in software/LedEffects.py */
+byte fadeLevel(unsigned long elapsed) {
+  unsigned long phase = elapsed % effectPeriod;
+  unsigned long half = effectPeriod / 2;
+  unsigned long ramp = (phase < half) ? phase : effectPeriod - phase;
+  unsigned long level = ramp * 255 / half;
+  return (level > 255) ? 255 : level;
+}
+
+/* Same arithmetic as EffectEngine.mask() in software/LedEffects.py */
+void updateEffect() {
+  if (effect == EFFECT_NONE) return;
+
+  unsigned long elapsed = millis() - effectStart;
+  unsigned int mask = 0;
+
+  switch (effect) {
+    case EFFECT_CHASE:
+      mask = 1U << ((elapsed / effectPeriod) % MAX_PINS);
+      break;
+    case EFFECT_BLINK:
+      mask = ((elapsed / (effectPeriod / 2)) % 2 == 0) ? effectTarget : 0;
+      break;
+    case EFFECT_SOLO:
+      mask = effectTarget;
+      break;
+    case EFFECT_ALL:
+      mask = ALL_LEDS;
+      break;
+    case EFFECT_FADE:
+      // software PWM with a ~4mS cycle, fast enough not to flicker
+      mask = (((micros() >> 4) & 0xFF) < fadeLevel(elapsed)) ? ALL_LEDS : 0;
+      break;
+  }
+  writeLeds(mask);
+}
+
+/*
+ * Start an effect. channel is 1 based, 0 for all LEDs.
+ * Returns false if the effect or channel is not valid.
+ */
+boolean startEffect(byte id, byte channel, unsigned int period) {
+  if (id > EFFECT_FADE || channel > MAX_PINS) {
+    return false;
+  }
+  effect = id;
+  effectTarget = (channel == 0) ? ALL_LEDS : (1U << (channel - 1));
+  effectPeriod = (period < MIN_EFFECT_PERIOD) ? MIN_EFFECT_PERIOD : period;
+  effectStart = millis();
+  if (effect == EFFECT_NONE) {
+    writeLeds(0);
+  }
+  updateEffect();
+  return true;
+}
+
+void handleFrame() {
+  byte payload[PAYLOAD_SIZE] = { frameBuf[1], 0, 0, 0, 0 };
+
+  // the host aligns our micros() with its clock from these round trips
+  if (frameBuf[1] == FRAME_PING) {
+    sendEdge(FRAME_PONG, frameBuf[2], micros());
+    return;
+  }
+
+  if (frameBuf[1] == FRAME_LEDS) {
+    setLeds((frameBuf[2] | (frameBuf[3] << 8)) & ALL_LEDS);
+    payload[1] = (byte)ledMask;
+    payload[2] = (byte)(ledMask >> 8);
+    sendFrame(FRAME_ACK, payload);
+    return;
+  }
+
+  if (frameBuf[1] == FRAME_EFFECT &&
+      startEffect(frameBuf[2], frameBuf[3], frameBuf[4] | (frameBuf[5] << 8))) {
+    payload[1] = (byte)ledMask;
+    payload[2] = (byte)(ledMask >> 8);
+    sendFrame(FRAME_ACK, payload);
+    return;
+  }
+
+  sendFrame(FRAME_NAK, payload);
+}
+
+void recvFrame() {
+  while (Serial.available() > 0) {
+    byte rc = Serial.read();
+
+    // hunt for the start of a frame
+    if (frameLen == 0 && rc != FRAME_SYNC) {
+      continue;
+    }
+    frameBuf[frameLen++] = rc;
+
+    if (frameLen == FRAME_SIZE) {
+      frameLen = 0;
+      if (crc8(frameBuf + 1, FRAME_SIZE - 2) == frameBuf[FRAME_SIZE - 1]) {
+        handleFrame();
+      }
+    }
+  }
+}
+
 void recvLine() {
   static byte ndx = 0;
   char endMarker = '\n';
@@ -141,9 +344,59 @@ int parse_string(char* str, char** tokens) {
 }
 
 void handleCommand(char **tokens) {
- 
+
+  /* Protocol negotiation
+   *    Usage: PROTO <version>. Replies "PROTO <version> OK" and switches
+   *    both directions to binary frames.
+   */
+  if (strncmp(tokens[0], "PROTO", 6) == 0) {
+    if (atoi(tokens[1]) != PROTO_VERSION) {
+      Serial.println("INVALID VERSION");
+      return;
+    }
+    Serial.print("PROTO ");
+    Serial.print(PROTO_VERSION);
+    Serial.println(" OK");
+    Serial.flush();
+    binaryMode = true;
+    frameLen = 0;
+    return;
+  }
+
+  /* Effect Commands
+   *    Usage: CHASE <period>, FADE <period>, BLINK [A or 1-MAX_PINS] <period>,
+   *    SOLO [A or 1-MAX_PINS]. Replies "<command> OK". Any LED command stops them.
+   */
+  boolean chase = strncmp(tokens[0], "CHASE", 6) == 0;
+  boolean fade = strncmp(tokens[0], "FADE", 5) == 0;
+  boolean blink = strncmp(tokens[0], "BLINK", 6) == 0;
+  boolean solo = strncmp(tokens[0], "SOLO", 5) == 0;
+
+  if (chase || fade || blink || solo) {
+    byte channel = 0;
+    char *period = tokens[1];
+
+    if (blink || solo) {
+      if (tokens[1][0] != 'A') {
+        int pin = atoi(tokens[1]);
+        if (pin < 1 || pin > MAX_PINS) {
+          Serial.println("INVALID PIN");
+          return;
+        }
+        channel = pin;
+      }
+      period = tokens[2];
+    }
+
+    byte id = chase ? EFFECT_CHASE : fade ? EFFECT_FADE : blink ? EFFECT_BLINK : EFFECT_SOLO;
+    startEffect(id, channel, (*period) ? atoi(period) : 1000);
+    Serial.print(tokens[0]);
+    Serial.println(" OK");
+    return;
+  }
+
   /* LED Command
-   *    Usage: LED [1-4, or ALL] [0 or 1] to change LED state.
+   *    Usage: LED [1-MAX_PINS, or ALL] [0 or 1] to change LED state.
    */
   if (strncmp(tokens[0], "LED", 5) == 0) {
     int state = atoi(tokens[2]);
@@ -155,9 +408,7 @@ void handleCommand(char **tokens) {
 
     // handle all pin change
     if (tokens[1][0] == 'A') {
-      for (int p=0; p < MAX_PINS; p++) {
-        digitalWrite(led_pins[p], state);
-      }
+      setLeds(state ? ALL_LEDS : 0);
       Serial.print("LED ");
       dump_byte(LED_BYTE);
       Serial.println(" OK");
@@ -171,7 +422,7 @@ void handleCommand(char **tokens) {
       return;
     }
 
-    digitalWrite(led_pins[pin-1], state);
+    setLeds(state ? (ledMask | (1U << (pin-1))) : (ledMask & ~(1U << (pin-1))));
     Serial.print("LED ");
     dump_byte(LED_BYTE);
     Serial.println(" OK");
@@ -187,8 +438,11 @@ void handleLine() {
   //
   // LED 1 1   Turn on 1 LED  (does not change state of others)
   // LED 1 0   Turn off 1 LED (does not change state of others)
-  // BLINK [A,1,2,3,4] ON Blink selected LED. Cleared via LED x OFF / LED x ON
-  // SOLO [A,1,2,3,4] Turns off every light except the one requested (e.g. player keypress)
+  // PROTO 1   Switch to the binary protocol (see software/protocol.py)
+  // BLINK [A,1..MAX_PINS] <period> Blink selected LED. Cleared by any LED command
+  // SOLO [A,1..MAX_PINS] Turns off every light except the one requested (e.g. player keypress)
+  // CHASE <period> Walk one light across the LEDs, <period> mS per step
+  // FADE <period> Fade every LED up and down once per <period> mS
   //
   char* tokens[MAX_TOKENS];
 
@@ -219,15 +473,36 @@ void handleLine() {
 }
 
 void handleSwitches() {
-  static unsigned long pinTime[MAX_PINS] = {0, 0, 0, 0};
+  static unsigned long pinTime[MAX_PINS];
+  unsigned long stamp;
 
-  for (int i = 0; i < MAX_PINS; i++) {
+  for (unsigned int i = 0; i < MAX_PINS; i++) {
       if ((digitalRead(input_pins[i]) == 0) && (pinTime[i] == 0)) {
+        noInterrupts();
+        stamp = pressMicros[i];
+        interrupts();
+        pinTime[i] = millis();
+
+        if (binaryMode) {
+          sendEdge(FRAME_PRESS, i+1, stamp);
+          continue;
+        }
+
+        // SWITCH n PRESSED <micros at the edge>
         Serial.print("SWITCH ");
         Serial.print(i+1);
-        Serial.println(" PRESSED");
-        pinTime[i] = millis();
+        Serial.print(" PRESSED ");
+        Serial.println(stamp);
       } else if ((digitalRead(input_pins[i]) == 1) && (pinTime[i] > 0)) {
+          if (binaryMode) {
+            noInterrupts();
+            stamp = releaseMicros[i];
+            interrupts();
+            sendEdge(FRAME_RELEASE, i+1, stamp);
+            pinTime[i] = 0;
+            continue;
+          }
+
           Serial.print("SWITCH ");
           Serial.print(i+1);
           Serial.print(" RELEASED (down ");
@@ -238,11 +513,27 @@ void handleSwitches() {
     }
 }
 
-/** Port B Interrupt Handler**/
-ISR(PCINT0_vect) {
+/** Pin change handler, shared by every port that has a switch **/
+void stampEdges() {
   static unsigned long last_interrupt_time = 0;
 
   unsigned long interrupt_time = millis();
+  unsigned long now = micros();
+  unsigned int levels = readInputs();
+  unsigned int fell = lastInputs & ~levels;
+  unsigned int rose = ~lastInputs & levels;
+
+  // stamp every pin that changed on this edge. Pins that fell together get
+  // the same stamp, which the host treats as a tie.
+  for (unsigned int i = 0; i < MAX_PINS; i++) {
+    if (fell & (1U << i)) {
+      pressMicros[i] = now;
+    }
+    if (rose & (1U << i)) {
+      releaseMicros[i] = now;
+    }
+  }
+  lastInputs = levels;
 //  noInterrupts();
 
   // If interrupts come faster than 100ms, assume it's a bounce and ignore
@@ -256,11 +547,20 @@ ISR(PCINT0_vect) {
 //  interrupts();
 }
 
+ISR(PCINT0_vect) { stampEdges(); }  // D8 to D13
+ISR(PCINT1_vect) { stampEdges(); }  // A0 to A5
+ISR(PCINT2_vect) { stampEdges(); }  // D0 to D7
+
 void loop() {
-  recvLine();
-  handleLine();
+  if (binaryMode) {
+    recvFrame();
+  } else {
+    recvLine();
+    handleLine();
+  }
   if (buttonsNeedHandling) {
     buttonsNeedHandling = false;
     handleSwitches();
   }
+  updateEffect();
 };
@@ -0,0 +1,212 @@
+"""
+Main loop as cooperative asyncio tasks.
+
+event_loop() handles button input, the game clock, LEDs and drawing in turn
+once per frame, so anything slow in one of them (a frame that takes long to
+draw, a state file written to a slow SD card) holds up the rest. Under
+RUNTIME = "asyncio" each of these is its own task instead:
+
+- input: drains the backend and settles buzz-ins every INPUT_POLL_MS
+- timers: runs context.scheduler's timers as they fall due, and acts on the
+  countdown as each of its seconds ends
+- leds: animates LED effects and sends the changes every LED_UPDATE_MS
+- persist: writes the state file on a worker thread when asked to
+- frame: handles pygame events and draws, paced to FPS
+
+Serial, GPIO and network buzzers are already read on their own threads; the
+input task collects what they queued between frames.
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+import game_config as config
+
+from events import (
+    advance_buzz_in,
+    handle_arbitration,
+    handle_events,
+    handle_input,
+    render_frame,
+    start_timers,
+    update_clock,
+    update_leds,
+)
+from StateFormat import StateFormatError
+
+
+class AsyncRuntime:
+    """Runs the game as asyncio tasks until the window is closed."""
+
+    def __init__(self, context) -> None:
+        """
+        Args:
+            context (Context): Game context to run
+        """
+        self.context = context
+        self.save_wanted: asyncio.Event = asyncio.Event()
+        self.timers_changed: asyncio.Event = asyncio.Event()
+        self.writing: Optional[asyncio.Future] = None
+        self.stats: Dict[str, int] = {"frames": 0, "late_frames": 0, "timers": 0, "saves": 0, "save_errors": 0}
+
+    def request_save(self) -> None:
+        """
+        Ask for the state file to be written.
+
+        Called by Context.save(). Requests made while a write is under way
+        are combined into one more write.
+        """
+        self.save_wanted.set()
+
+    async def run(self) -> None:
+        """
+        Run every task until the frame task sees the window closed.
+
+        Note:
+            - An exception in any task stops the others and is raised here
+            - A save still pending at exit is written before returning
+        """
+        self.context.runtime = self
+        start_timers(self.context)
+        tasks = [
+            asyncio.create_task(self.poll_input(), name="input"),
+            asyncio.create_task(self.run_timers(), name="timers"),
+            asyncio.create_task(self.run_leds(), name="leds"),
+            asyncio.create_task(self.persist(), name="persist"),
+        ]
+        frames = asyncio.create_task(self.run_frames(), name="frame")
+
+        print("\nAll systems go! Game Running.\n")
+        try:
+            done, _ = await asyncio.wait([frames, *tasks], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            for task in [frames, *tasks]:
+                task.cancel()
+            await asyncio.gather(frames, *tasks, return_exceptions=True)
+            await self.finish_saving()
+            self.context.runtime = None
+
+    async def poll_input(self) -> None:
+        """Take presses from the backend and start any buzz-in that was won."""
+        while True:
+            handle_input(self.context)
+            handle_arbitration(self.context)
+            advance_buzz_in(self.context)
+            await asyncio.sleep(config.INPUT_POLL_MS / 1000)
+
+    async def run_timers(self) -> None:
+        """
+        Run scheduler timers as they fall due, and act on the countdown as
+        each of its seconds ends.
+
+        Sleeps until the sooner of the two, waking early if another task
+        adds a timer due before then.
+        """
+        scheduler = self.context.scheduler
+        scheduler.on_change = self.timers_changed.set
+        try:
+            while True:
+                self.timers_changed.clear()
+                waits = [
+                    ms for ms in (scheduler.next_due_ms(), self.context.game_clock.ms_to_next_second())
+                    if ms is not None
+                ]
+                try:
+                    await asyncio.wait_for(self.timers_changed.wait(), min(waits) / 1000 if waits else None)
+                except asyncio.TimeoutError:
+                    pass
+                self.stats["timers"] += scheduler.run_due()
+                update_clock(self.context)
+        finally:
+            scheduler.on_change = None
+
+    async def run_leds(self) -> None:
+        """Animate host-driven LED effects and send LED changes."""
+        while True:
+            update_leds(self.context)
+            await asyncio.sleep(config.LED_UPDATE_MS / 1000)
+
+    async def persist(self) -> None:
+        """Write the state file on a worker thread whenever a save is asked for."""
+        while True:
+            await self.save_wanted.wait()
+            self.save_wanted.clear()
+            # copy on the loop thread, so the game can change while it is written
+            snapshot = self.context.snapshot()
+            self.writing = asyncio.get_running_loop().run_in_executor(
+                None, self.context.write_state, snapshot
+            )
+            # a write cannot be stopped partway; if we are cancelled now,
+            # finish_saving() waits for it
+            try:
+                await asyncio.shield(self.writing)
+            except (OSError, StateFormatError) as e:
+                self.save_failed(e)
+            else:
+                self.stats["saves"] += 1
+            self.writing = None
+
+    def save_failed(self, error: Exception) -> None:
+        """Report a write that failed. The show goes on; the next save writes everything again."""
+        self.stats["save_errors"] += 1
+        print(f"Could not save game state: {error}")
+
+    async def finish_saving(self) -> None:
+        """Wait for a write in progress and make any save still wanted."""
+        if self.writing:
+            try:
+                await self.writing
+                self.stats["saves"] += 1
+            except (OSError, StateFormatError) as e:
+                self.save_failed(e)
+            self.writing = None
+        if self.save_wanted.is_set():
+            self.save_wanted.clear()
+            try:
+                self.context.write_state(self.context.snapshot())
+                self.stats["saves"] += 1
+            except (OSError, StateFormatError) as e:
+                self.save_failed(e)
+
+    async def run_frames(self) -> None:
+        """
+        Handle pygame events and draw, FPS times a second.
+
+        Returns once the window has been closed. A frame that overruns its
+        slot is followed straight away by the next, without trying to catch
+        up on the ones missed. FPS 0 runs uncapped, letting the other tasks
+        run between frames.
+        """
+        loop = asyncio.get_running_loop()
+        period_s = 1 / config.FPS if config.FPS else 0
+        next_frame = loop.time()
+        while True:
+            if self.context.watchdog:
+                self.context.watchdog.beat()
+            if not handle_events(self.context):
+                return
+            render_frame(self.context)
+            self.stats["frames"] += 1
+
+            if not period_s:
+                await asyncio.sleep(0)
+                continue
+            next_frame += period_s
+            now = loop.time()
+            if next_frame < now:
+                self.stats["late_frames"] += 1
+                next_frame = now
+            await asyncio.sleep(next_frame - now)
+
+
+def run_async(context) -> None:
+    """
+    Run the game under the asyncio runtime until the window is closed.
+
+    Args:
+        context (Context): Game context, with the backend open and the game
+            initialised
+    """
+    asyncio.run(AsyncRuntime(context).run())
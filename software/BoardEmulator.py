@@ -0,0 +1,291 @@
+"""
+Python emulator of the usb_gpio_v4 board firmware (firmware/gameshow_to_serial.ino).
+
+The emulator speaks the same text and binary protocols as the firmware and
+exposes the subset of the pyserial interface the game uses, so it can stand
+in for serial.Serial in tests. Button presses are injected with press() and
+release().
+LED effects are run with the same EffectEngine the host uses to mirror them.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+import protocol
+from LedEffects import Effect, EffectEngine
+
+
+class BoardEmulator:
+    """
+    In-memory stand-in for the buzzer board.
+
+    Bytes written by the host are processed immediately and any replies are
+    queued for read(). Unlike a real port opened with timeout=None, reads
+    never block; they return whatever is queued.
+    """
+
+    def __init__(
+        self,
+        channels: int = 4,
+        binary_capable: bool = True,
+        clock: Optional[Callable[[], int]] = None,
+        pings: bool = True,
+    ) -> None:
+        """
+        Args:
+            channels: Number of buttons and LEDs on the board
+            binary_capable: False emulates firmware without PROTO support
+            clock: Returns the board's micros(), defaults to host monotonic time
+            pings: False emulates binary firmware from before PING
+        """
+        self.channels = channels
+        self.binary_capable = binary_capable
+        self.pings = pings
+        self.clock = clock if clock else lambda: time.monotonic_ns() // 1000
+
+        self.binary: bool = False
+        self._led_mask: int = 0
+        self.effects = EffectEngine(channels)
+        self.is_open: bool = True
+        self.pressed_at: Dict[int, int] = {}
+
+        self._rx = bytearray()  # host -> board, partial line
+        self._tx = bytearray()  # board -> host
+        self._decoder = protocol.FrameDecoder()
+
+        self.boot()
+
+    # ------------------------------------------------------------------
+    # board side
+    # ------------------------------------------------------------------
+
+    def micros(self) -> int:
+        """The board's 32-bit microsecond counter."""
+        return self.clock() & 0xFFFFFFFF
+
+    def boot(self) -> None:
+        """Reset as the board does when the port is opened."""
+        self.binary = False
+        self.led_mask = 0
+        self.pressed_at = {}
+        self._rx.clear()
+        self._decoder.reset()
+        self._tx.extend(b"\r\nRESET OK\r\n")
+
+    def press(self, channel: int, timestamp_us: Optional[int] = None) -> None:
+        """
+        Press a button.
+
+        Args:
+            channel: Board channel, 1 based
+            timestamp_us: micros() at the edge, defaults to now
+        """
+        if channel in self.pressed_at:
+            return
+        stamp = self.micros() if timestamp_us is None else timestamp_us & 0xFFFFFFFF
+        self.pressed_at[channel] = stamp
+
+        if self.binary:
+            self._tx.extend(protocol.encode_press(channel, stamp))
+        else:
+            self._tx.extend(b"SWITCH %d PRESSED %d\r\n" % (channel, stamp))
+
+    def release(self, channel: int, timestamp_us: Optional[int] = None) -> None:
+        """
+        Release a button.
+
+        Args:
+            channel: Board channel, 1 based
+            timestamp_us: micros() at the edge, defaults to now
+        """
+        if channel not in self.pressed_at:
+            return
+        stamp = self.micros() if timestamp_us is None else timestamp_us & 0xFFFFFFFF
+        pressed = self.pressed_at.pop(channel)
+
+        if self.binary:
+            self._tx.extend(protocol.encode_release(channel, stamp))
+        else:
+            down_ms = ((stamp - pressed) & 0xFFFFFFFF) // 1000
+            self._tx.extend(b"SWITCH %d RELEASED (down %d mS)\r\n" % (channel, down_ms))
+
+    def millis(self) -> int:
+        """The board's millisecond counter."""
+        return self.clock() // 1000
+
+    @property
+    def led_mask(self) -> int:
+        """LEDs lit right now, including any running effect."""
+        if self.effects.active:
+            return self.effects.mask(self.millis())
+        return self._led_mask
+
+    @led_mask.setter
+    def led_mask(self, mask: int) -> None:
+        # like the firmware, any LED command stops a running effect
+        self.effects.stop()
+        self._led_mask = mask
+
+    def start_effect(self, effect: int, channel: int, period_ms: int) -> bool:
+        """
+        Start an effect as the firmware's startEffect() does.
+
+        Args:
+            effect: Effect id
+            channel: 1 based LED for BLINK and SOLO, 0 for all
+            period_ms: Effect period in milliseconds
+
+        Returns:
+            bool: False if the effect or channel is invalid
+        """
+        if effect not in [e.value for e in Effect] or channel > self.channels:
+            return False
+        self.effects.start(Effect(effect), channel - 1, period_ms, self.millis())
+        if not self.effects.active:
+            self._led_mask = 0
+        return True
+
+    def led_state(self, channel: int) -> bool:
+        """True if the LED for a 1 based channel is lit."""
+        return bool(self.led_mask & (1 << (channel - 1)))
+
+    def _led_byte(self) -> bytes:
+        # the firmware dumps bits 7..1 of PIND, with the LEDs on D4-D7
+        port = (self.led_mask << 4) & 0xFF
+        return b"".join(b"1" if port & (1 << i) else b"0" for i in range(7, 0, -1))
+
+    def _handle_line(self, line: bytes) -> None:
+        tokens = line.split()
+        if not tokens:
+            self._tx.extend(b"ERROR\r\n")
+            return
+
+        if tokens[0] == b"PROTO" and self.binary_capable:
+            if len(tokens) < 2 or tokens[1] != b"%d" % protocol.PROTOCOL_VERSION:
+                self._tx.extend(b"INVALID VERSION\r\n")
+                return
+            self._tx.extend(b"PROTO %d OK\r\n" % protocol.PROTOCOL_VERSION)
+            self.binary = True
+            return
+
+        if tokens[0] == b"LED" and len(tokens) >= 3:
+            state = int(tokens[2]) if tokens[2].isdigit() else -1
+            if state not in (0, 1):
+                self._tx.extend(b"INVALID STATE\r\n")
+                return
+            if tokens[1][:1] == b"A":
+                self.led_mask = (1 << self.channels) - 1 if state else 0
+            else:
+                pin = int(tokens[1]) if tokens[1].isdigit() else 0
+                if pin < 1 or pin > self.channels:
+                    self._tx.extend(b"INVALID PIN\r\n")
+                    return
+                if state:
+                    self.led_mask |= 1 << (pin - 1)
+                else:
+                    self.led_mask &= ~(1 << (pin - 1))
+            self._tx.extend(b"LED " + self._led_byte() + b" OK\r\n")
+            return
+
+        if tokens[0] in (b"CHASE", b"FADE", b"BLINK", b"SOLO"):
+            self._handle_effect(tokens)
+            return
+
+        self._tx.extend(b"ERROR\r\n")
+
+    def _handle_effect(self, tokens) -> None:
+        # CHASE <period>, FADE <period>, BLINK <A|n> <period>, SOLO <A|n>
+        args = tokens[1:]
+        channel = 0
+        if tokens[0] in (b"BLINK", b"SOLO"):
+            if not args:
+                self._tx.extend(b"INVALID PIN\r\n")
+                return
+            channel = 0 if args[0][:1] == b"A" else int(args[0]) if args[0].isdigit() else -1
+            if channel < 0 or channel > self.channels:
+                self._tx.extend(b"INVALID PIN\r\n")
+                return
+            args = args[1:]
+        period = int(args[0]) if args and args[0].isdigit() else 1000
+
+        self.start_effect(Effect[tokens[0].decode()].value, channel, period)
+        self._tx.extend(tokens[0] + b" OK\r\n")
+
+    def _handle_frame(self, frame: protocol.Frame) -> None:
+        if frame.type == protocol.FRAME_LEDS:
+            self.led_mask = frame.led_mask & ((1 << self.channels) - 1)
+            self._tx.extend(protocol.encode_ack(frame.type, self.led_mask))
+            return
+        if frame.type == protocol.FRAME_EFFECT and self.start_effect(*frame.effect):
+            self._tx.extend(protocol.encode_ack(frame.type, self.led_mask))
+            return
+        if frame.type == protocol.FRAME_PING and self.pings:
+            self._tx.extend(protocol.encode_pong(frame.channel, self.micros()))
+            return
+        self._tx.extend(protocol.encode_nak(frame.type))
+
+    # ------------------------------------------------------------------
+    # host side: the pyserial subset used by the game
+    # ------------------------------------------------------------------
+
+    def write(self, data: bytes) -> int:
+        """Receive bytes from the host."""
+        if self.binary:
+            for frame in self._decoder.feed(data):
+                self._handle_frame(frame)
+            return len(data)
+
+        self._rx.extend(data)
+        while b"\n" in self._rx:
+            line, _, rest = bytes(self._rx).partition(b"\n")
+            self._rx = bytearray(rest)
+            self._handle_line(line.rstrip(b"\r"))
+            if self.binary:
+                # anything after the PROTO line is already framed
+                self._rx.clear()
+                if rest:
+                    self.write(rest)
+                break
+        return len(data)
+
+    def read(self, size: int = 1) -> bytes:
+        """Return up to size queued bytes."""
+        data = bytes(self._tx[:size])
+        del self._tx[:size]
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        """Return the next queued line, including its newline."""
+        end = self._tx.find(b"\n")
+        end = len(self._tx) if end < 0 else end + 1
+        if size is not None and size >= 0:
+            end = min(end, size)
+        return self.read(end)
+
+    def inWaiting(self) -> int:  # pylint: disable=invalid-name
+        """Number of bytes queued for the host."""
+        return len(self._tx)
+
+    @property
+    def in_waiting(self) -> int:
+        """Number of bytes queued for the host."""
+        return len(self._tx)
+
+    def isOpen(self) -> bool:  # pylint: disable=invalid-name
+        """True until close() is called."""
+        return self.is_open
+
+    def flush(self) -> None:
+        """Writes are processed immediately, nothing to do."""
+
+    def reset_input_buffer(self) -> None:
+        """Discard bytes queued for the host."""
+        self._tx.clear()
+
+    def reset_output_buffer(self) -> None:
+        """Discard any partial command from the host."""
+        self._rx.clear()
+
+    def close(self) -> None:
+        """Close the emulated port."""
+        self.is_open = False
@@ -0,0 +1,163 @@
+"""
+Buzz-in arbitration for the game show application.
+
+Presses that arrive within a short window of each other are collected and the
+winner is picked by the time the press actually happened (as stamped by the
+hardware), not by the order in which the host happened to read them. The
+margin to the runner-up is kept so contested buzz-ins can be explained after
+the fact.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+
+@dataclass
+class Press:
+    """A single player press as seen by the arbiter."""
+    player: int
+    timestamp_us: int  # when the press happened, in the source's timeline
+    arrival_ns: int    # host monotonic time when we received it
+
+
+@dataclass
+class ArbitrationResult:
+    """The outcome of one arbitration window."""
+    winner: int
+    timestamp_us: int
+    runner_up: int = -1
+    margin_us: Optional[int] = None  # None when uncontested
+    presses: List[Press] = field(default_factory=list)
+
+    @property
+    def contested(self) -> bool:
+        """True if more than one player pressed inside the window."""
+        return self.runner_up >= 0
+
+    def describe(self) -> str:
+        """Human readable summary suitable for the console log."""
+        if not self.contested:
+            return f"Player {self.winner + 1} buzzed in (uncontested)"
+        return (
+            f"Player {self.winner + 1} buzzed in, beating player "
+            f"{self.runner_up + 1} by {self.margin_us / 1000:.3f} mS"
+        )
+
+
+class BuzzArbiter:
+    """
+    Collects presses for a short window and picks the earliest one.
+
+    The window opens on the first press and is measured in host time. Once it
+    has elapsed, poll() returns the result and the arbiter is ready for the
+    next window. Only the first press per player is considered; ties go to the
+    press that arrived first.
+    """
+
+    def __init__(self, window_ms: int, now_ns: Callable[[], int] = time.monotonic_ns) -> None:
+        """
+        Args:
+            window_ms: How long a window stays open after its first press
+            now_ns: Monotonic time source, for tests and replays
+        """
+        self.now_ns: Callable[[], int] = now_ns
+        self.window_ns: int = window_ms * 1_000_000
+        self.presses: List[Press] = []
+        self.opened_ns: int = 0
+
+    def submit(self, player: int, timestamp_us: int, arrival_ns: Optional[int] = None) -> None:
+        """
+        Add a press to the current window, opening one if needed.
+
+        Args:
+            player: Zero based player index
+            timestamp_us: Time of the press in microseconds
+            arrival_ns: Host monotonic arrival time, defaults to now
+        """
+        if arrival_ns is None:
+            arrival_ns = self.now_ns()
+
+        if any(p.player == player for p in self.presses):
+            return
+
+        if not self.presses:
+            self.opened_ns = arrival_ns
+
+        self.presses.append(Press(player, timestamp_us, arrival_ns))
+
+    def pending(self) -> bool:
+        """True if a window is open."""
+        return len(self.presses) > 0
+
+    def poll(self, now_ns: Optional[int] = None) -> Optional[ArbitrationResult]:
+        """
+        Close the window if it has elapsed and return the winner.
+
+        Args:
+            now_ns: Current host monotonic time, defaults to now
+
+        Returns:
+            ArbitrationResult, or None if no window is open or it is still open
+        """
+        if not self.presses:
+            return None
+
+        if now_ns is None:
+            now_ns = self.now_ns()
+
+        if now_ns - self.opened_ns < self.window_ns:
+            return None
+
+        return self.decide()
+
+    def decide(self) -> Optional[ArbitrationResult]:
+        """Close the current window immediately and return the winner."""
+        if not self.presses:
+            return None
+
+        # sorted() is stable, so equal timestamps keep arrival order
+        ranked = sorted(self.presses, key=lambda p: p.timestamp_us)
+        result = ArbitrationResult(
+            winner=ranked[0].player,
+            timestamp_us=ranked[0].timestamp_us,
+            presses=ranked,
+        )
+        if len(ranked) > 1:
+            result.runner_up = ranked[1].player
+            result.margin_us = ranked[1].timestamp_us - ranked[0].timestamp_us
+
+        self.reset()
+        return result
+
+    def reset(self) -> None:
+        """Discard any presses in the current window."""
+        self.presses = []
+        self.opened_ns = 0
+
+
+class MicrosUnwrapper:
+    """
+    Extends the board's 32-bit micros() counter into a monotonic value.
+
+    micros() on the Arduino wraps roughly every 71 minutes, which would make a
+    press just after the wrap look earlier than one just before it.
+    """
+
+    WRAP: int = 1 << 32
+
+    def __init__(self) -> None:
+        self.last_raw: Optional[int] = None
+        self.offset: int = 0
+
+    def unwrap(self, raw: int) -> int:
+        """Return raw extended by the number of wraps seen so far."""
+        if self.last_raw is not None and raw < self.last_raw and (self.last_raw - raw) > self.WRAP // 2:
+            self.offset += self.WRAP
+        self.last_raw = raw
+        return raw + self.offset
+
+    def reset(self) -> None:
+        """Start over, e.g. after the board reset and its counter restarted."""
+        self.last_raw = None
+        self.offset = 0
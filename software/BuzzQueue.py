@@ -0,0 +1,72 @@
+"""
+Hand-off of button presses from input threads to the main loop.
+
+GPIO callbacks run on RPi.GPIO's own thread. Rather than touching game state
+from there, they push a timestamped press onto this queue and wake the main
+loop, which drains the queue and feeds the arbiter on the main thread.
+
+The wake is a threading.Event the main loop's scheduler sleeps on (see
+Scheduler.run_until), so a press cuts the wait for the next frame short.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+
+@dataclass
+class Buzz:
+    """A press captured on an input thread."""
+    player: int
+    captured_ns: int  # host monotonic time when the callback ran
+
+
+class BuzzQueue:
+    """
+    Lock-free single consumer queue of presses.
+
+    deque.append() and deque.popleft() are atomic, so producers never block
+    and never wait for the main loop.
+    """
+
+    def __init__(self, wake: Optional[threading.Event] = None) -> None:
+        """
+        Args:
+            wake: Set when a press is queued and cleared when the queue is
+                drained, or None
+        """
+        self.wake: Optional[threading.Event] = wake
+        self.buzzes: Deque[Buzz] = deque()
+
+    def push(self, player: int, captured_ns: Optional[int] = None) -> None:
+        """
+        Queue a press. Safe to call from any thread.
+
+        Args:
+            player: Zero based player index
+            captured_ns: Host monotonic capture time, defaults to now
+        """
+        if captured_ns is None:
+            captured_ns = time.monotonic_ns()
+        self.buzzes.append(Buzz(player, captured_ns))
+        if self.wake:
+            self.wake.set()
+
+    def drain(self) -> List[Buzz]:
+        """
+        Remove and return every queued press, oldest first.
+
+        Call from the main thread only.
+        """
+        # cleared first: a press pushed while draining sets it again
+        if self.wake:
+            self.wake.clear()
+        drained = []
+        while self.buzzes:
+            drained.append(self.buzzes.popleft())
+        return drained
+
+    def __len__(self) -> int:
+        return len(self.buzzes)
@@ -0,0 +1,143 @@
+"""
+Board clock alignment.
+
+Each board stamps presses with its own micros(), which starts at a different
+moment and runs at a slightly different rate on every board (a Nano's
+ceramic resonator can be off by a few tenths of a percent). To compare
+presses from several boards they are moved onto the host's monotonic clock.
+
+The host sends PING frames and notes when each left and when the PONG came
+back. The board's time in the PONG belongs roughly halfway between the two,
+within half the round trip. Round trips that were held up somewhere tell us
+little, so only the quickest of the recent ones are used. A line through them
+gives the offset and the rate difference between the two clocks.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional
+
+
+class Sample(NamedTuple):
+    """One PING round trip."""
+    host_us: int   # host monotonic time halfway through the round trip
+    board_us: int  # the board's (unwrapped) micros() in the PONG
+    rtt_us: int    # how long the round trip took
+
+
+class ClockSync:
+    """
+    Maps a board's micros() onto host monotonic microseconds.
+    """
+
+    def __init__(self, window: int = 16, max_skew_ppm: int = 10000) -> None:
+        """
+        Args:
+            window: How many recent round trips to keep
+            max_skew_ppm: Largest believable rate difference; beyond it the
+                clocks are assumed to run at the same rate
+        """
+        self.samples: Deque[Sample] = deque(maxlen=window)
+        self.max_skew: float = max_skew_ppm / 1e6
+        self.sequence: int = 0
+
+        # fitted line: board_us = ref_board + (host_us - ref_host) * rate
+        self.ref_host: int = 0
+        self.ref_board: int = 0
+        self.rate: float = 1.0
+
+        self.stats: Dict[str, Optional[float]] = {
+            "pings": 0,        # PINGs sent
+            "pongs": 0,        # PONGs matched to their PING
+            "timeouts": 0,     # PINGs that got no PONG in time
+            "best_rtt_us": None,  # quickest round trip in the window
+        }
+
+    @property
+    def synced(self) -> bool:
+        """True once at least one round trip completed."""
+        return len(self.samples) > 0
+
+    def next_sequence(self) -> int:
+        """Sequence number for the next PING."""
+        self.sequence = (self.sequence + 1) & 0xFF
+        self.stats["pings"] += 1
+        return self.sequence
+
+    def add(self, sent_ns: int, board_us: int, received_ns: int) -> None:
+        """
+        Record a completed round trip and refit the clocks.
+
+        Args:
+            sent_ns: Host monotonic time the PING was written
+            board_us: The board's micros() from the PONG, unwrapped
+            received_ns: Host monotonic time the PONG was read
+        """
+        self.samples.append(Sample(
+            (sent_ns + received_ns) // 2000, board_us, (received_ns - sent_ns) // 1000
+        ))
+        self.stats["pongs"] += 1
+        self.fit()
+
+    def fit(self) -> None:
+        """Fit offset and rate to the quickest recent round trips."""
+        best = min(sample.rtt_us for sample in self.samples)
+        self.stats["best_rtt_us"] = best
+        usable = [s for s in self.samples if s.rtt_us <= best + max(best, 500)]
+
+        rate = 1.0
+        span = usable[-1].host_us - usable[0].host_us if len(usable) > 1 else 0
+        if span >= 1_000_000:
+            # least squares over at least a second of samples
+            mean_host = sum(s.host_us for s in usable) / len(usable)
+            mean_board = sum(s.board_us for s in usable) / len(usable)
+            num = sum((s.host_us - mean_host) * (s.board_us - mean_board) for s in usable)
+            den = sum((s.host_us - mean_host) ** 2 for s in usable)
+            rate = num / den
+            if abs(rate - 1.0) <= self.max_skew:
+                self.rate = rate
+                self.ref_host = round(mean_host)
+                self.ref_board = round(mean_board)
+                return
+
+        # too little to go on for the rate: trust the single quickest round trip
+        quickest = min(usable, key=lambda s: s.rtt_us)
+        self.rate = 1.0
+        self.ref_host = quickest.host_us
+        self.ref_board = quickest.board_us
+
+    def to_host_us(self, board_us: int) -> int:
+        """
+        Convert a board timestamp to host monotonic microseconds.
+
+        Args:
+            board_us: The board's unwrapped micros()
+
+        Returns:
+            int: The same moment on the host clock (time.monotonic_ns() // 1000)
+        """
+        return round(self.ref_host + (board_us - self.ref_board) / self.rate)
+
+    @property
+    def offset_us(self) -> int:
+        """Board time minus host time, now."""
+        now_us = time.monotonic_ns() // 1000
+        return round(self.ref_board + (now_us - self.ref_host) * self.rate) - now_us
+
+    @property
+    def skew_ppm(self) -> float:
+        """How much faster the board's clock runs, in parts per million."""
+        return (self.rate - 1.0) * 1e6
+
+    @property
+    def uncertainty_us(self) -> Optional[int]:
+        """How far off the alignment may be: half the quickest round trip."""
+        best = self.stats["best_rtt_us"]
+        return None if best is None else int(best) // 2
+
+    def reset(self) -> None:
+        """Forget all round trips, e.g. after the board reset its clock."""
+        self.samples.clear()
+        self.ref_host = self.ref_board = 0
+        self.rate = 1.0
+        self.stats["best_rtt_us"] = None
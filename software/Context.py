@@ -4,28 +4,65 @@ Context is a container for all the game's global variables.
 
 import os
 import json
-import pickle
-from typing import Optional, Dict, List, Any
+import time
+from concurrent.futures import Executor
+from typing import Callable, Optional, Dict, List, Any
 
 import pygame
 import game_config as config
 
 from Sound import Sound
 from GameState import GameState
+from BuzzArbiter import BuzzArbiter, ArbitrationResult, MicrosUnwrapper
+from BuzzQueue import BuzzQueue
+from protocol import Frame, FrameDecoder
+from LedEffects import EffectEngine
+from backends import Backend
+from Debounce import DebounceFilter
+from GameClock import GameClock
+from Scheduler import Scheduler, Timer
+from ScoreBoard import ScoreBoard
+from StateStore import StateStore
+from StateFormat import LEGACY_STATE_FILE, fit_players
+from Journal import Journal, rebuild, wall_ms
 
 class Context:
     """
     Context is a container for all the game's global variables.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, now_ns: Callable[[], int] = time.monotonic_ns,
+                 sleep: Optional[Callable[[float], Any]] = None,
+                 executor: Optional[Executor] = None) -> None:
+        """
+        Args:
+            now_ns: Monotonic time source for the game clock, timers and
+                arbitration; a replay runs the game on its own clock
+            sleep: Sleep function taking seconds, on the same clock;
+                defaults to one a queued button press cuts short
+            executor: Load sounds on this in the background, see Startup.py
+        """
+        self.now_ns: Callable[[], int] = now_ns
         # I/O pyserial device
         self.serial_port: Optional[Any] = None
+        self.serial_binary: bool = False
+        self.frame_decoder: FrameDecoder = FrameDecoder()
+        self.serial_backlog: List[Frame] = []
+        # LedService, when LED updates are sent from a background writer
+        self.led_service: Optional[Any] = None
+        # where presses come from and LED states go, set by open_backend()
+        self.backend: Backend = Backend()
 
         self.pyclock: pygame.time.Clock = pygame.time.Clock()
-        self.clock: int = config.MAX_CLOCK
+        # one-shot and repeating game timers, and when the next frame is due
+        self.scheduler: Scheduler = Scheduler(now_ns, sleep)
+        self.frame_due_ns: int = 0
+        # the countdown: runs while state is RUNNING, read it through clock
+        self.game_clock: GameClock = GameClock(config.MAX_CLOCK, now_ns)
         self.prev_sec: int = 0
         self.fonts: Dict[str, pygame.font.Font] = {}
+        # images drawn every frame, loaded once, see render.load_assets()
+        self.images: Dict[str, pygame.Surface] = {}
         self.colors: Dict[str, Any] = {}
         self.sound_library: Dict[str, Any] = {}
         self.screen: Optional[pygame.Surface] = None
@@ -34,54 +71,186 @@ class Context:
         self.led_state: List[bool] = [False for _ in range(config.PLAYERS)]
         self.player_names: List[str] = [f"Player {i+1}" for i in range(config.PLAYERS)]
         self.invert_display: bool = True
+        # score band, redrawn only where names or scores changed
+        self.scoreboard: ScoreBoard = ScoreBoard()
 
-        # Track which LED is lit during attract mode
-        self.led_attract_cycle: int = 0
+        # LED effect being shown, and whether the board is running it for us
+        self.effects: EffectEngine = EffectEngine(config.PLAYERS)
+        self.effects_on_board: bool = False
+
+        # the state file, written behind the game by a background thread,
+        # and the journal of changes since it was written
+        self.state_store: StateStore = StateStore(
+            config.STATE_FILE_NAME, config.STATE_GENERATIONS, config.SAVE_DELAY_MS,
+            os.path.join(os.path.dirname(config.STATE_FILE_NAME), LEGACY_STATE_FILE),
+        )
+        self.journal: Journal = Journal(config.STATE_FILE_NAME + ".journal", config.STATE_GENERATIONS + 1)
+        self.state_store.on_written = lambda snapshot: self.journal.compact(snapshot.get("journal_seq", 0))
+
+        # History while HISTORY_FILE is set, see History.py
+        self.history: Optional[Any] = None
 
         # game state
         self.player_buzzed_in: int = -1
-        self.state: GameState = GameState.IDLE if config.CLOCK_ENABLED else GameState.RUNNING
+        self.state = GameState.IDLE if config.CLOCK_ENABLED else GameState.RUNNING
         self.button_test: bool = False
+        # ANSWER_TIME_MS countdown for the player who buzzed in
+        self.answer_timer: Optional[Timer] = None
+        # help, splash or name editor in front of the game, see Modal.py
+        self.modal: Optional[Any] = None
+
+        # buzz-in arbitration between near-simultaneous presses
+        self.arbiter: BuzzArbiter = BuzzArbiter(config.ARBITRATION_WINDOW_MS, now_ns)
+        self.last_arbitration: Optional[ArbitrationResult] = None
+        self.board_clock: MicrosUnwrapper = MicrosUnwrapper()
+        # presses captured on input threads, drained by the main loop; a
+        # press wakes the loop from its wait for the next frame
+        self.buzz_queue: BuzzQueue = BuzzQueue(self.scheduler.woken)
+        # drops button bounce before presses reach the game
+        self.debounce: DebounceFilter = DebounceFilter(
+            config.PLAYERS, config.DEBOUNCE_MS, config.MIN_PRESS_MS
+        )
+        # GpiodInput reader when INPUT_BACKEND is "gpiod"
+        self.gpio_input: Optional[Any] = None
+        # LatencyTracker while buzz latency is being measured
+        self.latency: Optional[Any] = None
+        # AsyncRuntime while the game runs under asyncio
+        self.runtime: Optional[Any] = None
+        # Recorder while RECORD_FILE is set, see Recorder.py
+        self.recorder: Optional[Any] = None
+        # Watchdog while WATCHDOG_STALL_MS is set, see Watchdog.py
+        self.watchdog: Optional[Any] = None
 
         # load sound effects
-        self.sound: Sound = Sound()
+        self.sound: Sound = Sound(executor)
 
         # particles
         self.particle_group: pygame.sprite.Group = pygame.sprite.Group()
 
+    @property
+    def state(self) -> GameState:
+        return self._state
+
+    @state.setter
+    def state(self, state: GameState) -> None:
+        """Change state, starting the game clock on RUNNING and pausing it otherwise."""
+        changed = state != getattr(self, "_state", None)
+        self._state = state
+        self.game_clock.run(state == GameState.RUNNING and config.CLOCK_ENABLED)
+        if changed:
+            self.record("state", state.value, self.clock, self.player_buzzed_in)
+            if self.history:
+                self.history.state_changed(state)
+
+    @property
+    def clock(self) -> int:
+        """Milliseconds left on the game clock."""
+        return self.game_clock.remaining_ms
+
+    @clock.setter
+    def clock(self, remaining_ms: int) -> None:
+        self.game_clock.set(remaining_ms)
+        self.record("clock", self.clock)
+
     def reset_game(self) -> None:
         """Resets game context to initial state."""
+        if self.history:
+            self.history.end_game()
         self.scores = [0 for _ in range(config.PLAYERS)]
+        self.record("reset")
         self.clock = config.MAX_CLOCK
         self.prev_sec = 0
         self.state = GameState.IDLE
         self.player_buzzed_in = -1
+        self.arbiter.reset()
 
     def reset_clock(self) -> None:
         """Resets game clock."""
+        if self.history:
+            self.history.end_round()
         self.clock = config.MAX_CLOCK
         self.prev_sec = 0
         self.state = GameState.IDLE
         self.player_buzzed_in = -1
+        self.arbiter.reset()
 
     def restore(self) -> None:
-        """Restores game context from file."""
-        if os.path.exists(config.STATE_FILE_NAME):
-            with open(config.STATE_FILE_NAME, "rb") as file:
-                saved_object = pickle.load(file)
-            self.player_names = saved_object["player_names"]
-            self.scores = saved_object["scores"]
-            self.invert_display = saved_object["invert_display"]
+        """
+        Restores game context from the state file and the journal after it.
+
+        A damaged state file, e.g. from a power cut on an older version,
+        falls back to the newest previous generation that loads. The
+        journal then brings back every change made after it was written,
+        the clock to the millisecond; a game whose clock was running comes
+        back paused at the time left when it was last heard from.
+        """
+        saved_object = self.state_store.load()
+        base = saved_object or self.snapshot()
+        records = self.journal.read(base.get("journal_seq", 0))
+        if records and records[0].seq > base.get("journal_seq", 0) + 1:
+            print(f"Journal starts at change {records[0].seq}, after the saved state's "
+                  f"{base.get('journal_seq', 0)}; the changes between are lost")
+        if not saved_object and not records:
+            return
+        saved_object = rebuild(base, records)
+        if records:
+            print(f"Restored {len(records)} changes from {self.journal.path}")
+
+        # a save from a show with a different PLAYERS keeps what fits
+        saved_object, fitted = fit_players(saved_object, config.PLAYERS)
+        if fitted:
+            print(f"Saved game state is for a different number of players, fitted to PLAYERS = {config.PLAYERS}")
+        self.player_names = saved_object["player_names"]
+        self.scores = saved_object["scores"]
+        self.invert_display = saved_object["invert_display"]
+        self.game_clock.set(saved_object["clock_ms"])
+        if saved_object["state"] == GameState.TIMEUP.value:
+            self.state = GameState.TIMEUP
+
+    def record(self, kind: str, *args: Any) -> None:
+        """
+        Journal a change to the game, see Journal.KINDS.
+
+        Every JOURNAL_SNAPSHOT_EVERY changes a snapshot is saved too, after
+        which the journal is compacted.
+        """
+        if self.journal.append(kind, *args) is None:
+            return
+        if self.journal.since_snapshot >= config.JOURNAL_SNAPSHOT_EVERY:
+            self.save()
 
     def save(self) -> None:
-        """Saves game context to file."""
-        saved_object = {
-            "player_names": self.player_names,
-            "scores": self.scores,
+        """
+        Saves a snapshot of the game context to file.
+
+        The write happens behind the game, on the state store's thread or
+        under the asyncio runtime its persistence task, so the frame never
+        waits for the disk. Saves close together are written once.
+        """
+        self.journal.since_snapshot = 0
+        if self.runtime:
+            self.runtime.request_save()
+            return
+        self.state_store.save(self.snapshot())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """What save() writes, copied so another thread can write it."""
+        return {
+            "player_names": list(self.player_names),
+            "scores": list(self.scores),
             "invert_display": self.invert_display,
+            "state": self.state.value,
+            "clock_ms": self.clock,
+            "player_buzzed_in": self.player_buzzed_in,
+            # when clock_ms was read, for a clock that was running
+            "saved_ms": wall_ms(),
+            # the last journal record this includes
+            "journal_seq": self.journal.last_seq,
         }
-        with open(config.STATE_FILE_NAME, "wb") as file:
-            pickle.dump(saved_object, file)
+
+    def write_state(self, saved_object: Dict[str, Any]) -> None:
+        """Writes a snapshot() to the state file now, atomically, on the calling thread."""
+        self.state_store.write(saved_object)
 
     def load_font(self, shortname: str, filename: str, size: int) -> None:
         """Loads fonts into the context.
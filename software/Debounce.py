@@ -0,0 +1,141 @@
+"""
+Host-side debounce and glitch filter for button input.
+
+Arcade buttons bounce: one push can arrive as PRESSED, RELEASED, PRESSED
+within a few milliseconds. The filter sits between the backend and the game
+and decides per channel, from each event's capture timestamp, which edges
+are real. The first press after a quiet period always passes straight
+through, so the filter never delays a valid buzz; it only rejects edges
+that follow too closely.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+
+# counters kept per channel
+COUNTERS = ("presses", "releases", "bounced", "duplicate", "short", "unpaired")
+
+
+@dataclass
+class ChannelState:
+    """What the filter knows about one button."""
+    pressed: bool = False
+    pressed_us: Optional[int] = None   # when the accepted press happened
+    released_us: Optional[int] = None  # when the accepted release happened
+    last_us: Optional[int] = None      # newest timestamp seen, to spot clock resets
+    offset_us: int = 0                 # source time minus host arrival time
+    counts: Dict[str, int] = field(default_factory=lambda: {name: 0 for name in COUNTERS})
+
+
+class DebounceFilter:
+    """
+    Accepts or rejects press and release events per channel.
+
+    Rules, all measured on the events' own timestamps:
+
+    - a press is rejected if it comes within window_ms of the last accepted
+      release ("bounced") or while the button is still down ("duplicate")
+    - a release is rejected if the button was held less than min_press_ms
+      ("short"), so the press stays open for the real release, or if there
+      is no press to pair it with ("unpaired")
+    - a press more than window_ms after a press that never saw its release
+      is accepted, so a lost release cannot lock a player out
+    """
+
+    def __init__(
+        self,
+        players: int,
+        window_ms: Union[int, Sequence[int]] = 30,
+        min_press_ms: Union[int, Sequence[int]] = 10,
+    ) -> None:
+        """
+        Args:
+            players: Number of channels
+            window_ms: Quiet time after an edge, one value or one per player
+            min_press_ms: Shortest real press, one value or one per player
+        """
+        self.window_us: List[int] = [ms * 1000 for ms in self._per_player(window_ms, players)]
+        self.min_press_us: List[int] = [ms * 1000 for ms in self._per_player(min_press_ms, players)]
+        self.channels: List[ChannelState] = [ChannelState() for _ in range(players)]
+
+    @staticmethod
+    def _per_player(value: Union[int, Sequence[int]], players: int) -> List[int]:
+        if isinstance(value, (int, float)):
+            return [int(value)] * players
+        values = [int(v) for v in value]
+        # a short list repeats its last value for the remaining players
+        return (values + values[-1:] * players)[:players]
+
+    def accept(self, event) -> bool:
+        """
+        Decide whether an input event is a real edge.
+
+        Args:
+            event (InputEvent): Event from a backend
+
+        Returns:
+            bool: True to pass the event on to the game
+        """
+        if not 0 <= event.player < len(self.channels):
+            return True
+        state = self.channels[event.player]
+        arrival_us = event.arrival_ns // 1000
+        if event.timestamp_us is not None:
+            now_us = event.timestamp_us
+            state.offset_us = now_us - arrival_us
+        else:
+            # e.g. text protocol releases: place them on the press's timeline
+            now_us = arrival_us + state.offset_us
+
+        if state.last_us is not None and now_us < state.last_us:
+            # the source's clock restarted (board reset); start this channel over
+            state = self.channels[event.player] = ChannelState(
+                counts=state.counts, offset_us=state.offset_us
+            )
+        state.last_us = now_us
+
+        if event.pressed:
+            return self._press(event.player, state, now_us)
+        return self._release(event.player, state, now_us)
+
+    def _press(self, player: int, state: ChannelState, now_us: int) -> bool:
+        window = self.window_us[player]
+        if state.pressed:
+            if state.pressed_us is not None and now_us - state.pressed_us < window:
+                state.counts["duplicate"] += 1
+                return False
+            # the release got lost; treat this as a fresh press
+        elif state.released_us is not None and now_us - state.released_us < window:
+            state.counts["bounced"] += 1
+            return False
+
+        state.pressed = True
+        state.pressed_us = now_us
+        state.counts["presses"] += 1
+        return True
+
+    def _release(self, player: int, state: ChannelState, now_us: int) -> bool:
+        if not state.pressed:
+            state.counts["unpaired"] += 1
+            return False
+        if now_us - state.pressed_us < self.min_press_us[player]:
+            state.counts["short"] += 1
+            return False
+
+        state.pressed = False
+        state.released_us = now_us
+        state.counts["releases"] += 1
+        return True
+
+    def rejected(self, player: int) -> int:
+        """Total glitches rejected on a channel."""
+        counts = self.channels[player].counts
+        return sum(counts[name] for name in COUNTERS[2:])
+
+    def stats(self) -> List[Dict[str, int]]:
+        """Counters for every channel, in player order."""
+        return [dict(state.counts) for state in self.channels]
+
+    def reset(self) -> None:
+        """Forget every channel's state and counters."""
+        self.channels = [ChannelState() for _ in self.channels]
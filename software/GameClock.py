@@ -0,0 +1,113 @@
+"""
+Countdown clock measured on the monotonic clock.
+
+The clock used to lose CLOCK_STEP every time a pygame timer event was
+handled, so it ran slow whenever events queued up behind a busy frame, and
+pausing threw away the part of a second already used. GameClock instead
+remembers how much time was left when it last started and measures what
+has passed since with time.monotonic_ns(), so the time left is exact
+whenever it is read and survives any number of pauses.
+"""
+
+import math
+import time
+from typing import Callable, Optional
+
+# Last seconds of the countdown shown with tenths when CLOCK_TENTHS is on
+TENTHS_BELOW_MS = 10_000
+
+
+class GameClock:
+    """Time left on the game clock, running or paused."""
+
+    def __init__(self, remaining_ms: int, now_ns: Callable[[], int] = time.monotonic_ns) -> None:
+        """
+        Args:
+            remaining_ms: Time on the clock
+            now_ns: Monotonic time source, for tests
+        """
+        self.now_ns: Callable[[], int] = now_ns
+        # time left when started_ns was taken, or now while paused
+        self.left_ns: int = remaining_ms * 1_000_000
+        self.started_ns: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self.started_ns is not None
+
+    def remaining_ns(self) -> int:
+        """Time left in nanoseconds, never below zero."""
+        if self.started_ns is None:
+            return self.left_ns
+        return max(0, self.left_ns - (self.now_ns() - self.started_ns))
+
+    @property
+    def remaining_ms(self) -> int:
+        """
+        Time left in milliseconds, rounded up.
+
+        Rounding up means this only reaches 0 once the time is really up.
+        """
+        return -(-self.remaining_ns() // 1_000_000)
+
+    def start(self) -> None:
+        """Start counting down, if not already."""
+        if self.started_ns is None:
+            self.started_ns = self.now_ns()
+
+    def pause(self) -> None:
+        """Stop counting down, keeping exactly the time left."""
+        if self.started_ns is not None:
+            self.left_ns = self.remaining_ns()
+            self.started_ns = None
+
+    def run(self, running: bool) -> None:
+        """Start or pause the clock."""
+        if running:
+            self.start()
+        else:
+            self.pause()
+
+    def set(self, remaining_ms: int) -> None:
+        """Put remaining_ms on the clock, counting down from now if running."""
+        self.left_ns = max(0, remaining_ms) * 1_000_000
+        if self.started_ns is not None:
+            self.started_ns = self.now_ns()
+
+    def seconds_shown(self) -> int:
+        """
+        Whole seconds shown on a countdown: 0:01 until the time is up.
+        """
+        return -(-self.remaining_ns() // 1_000_000_000)
+
+    def ms_to_next_second(self) -> Optional[int]:
+        """
+        Time until seconds_shown() next changes.
+
+        Returns:
+            Optional[int]: Milliseconds, rounded up, or None while paused or
+            once the time is up
+        """
+        remaining_ns = self.remaining_ns()
+        if self.started_ns is None or remaining_ns == 0:
+            return None
+        return -(-(remaining_ns - (self.seconds_shown() - 1) * 1_000_000_000) // 1_000_000)
+
+
+def format_clock(remaining_ms: int, tenths: bool = False) -> str:
+    """
+    Format time left for the countdown display.
+
+    Args:
+        remaining_ms: Time left in milliseconds
+        tenths: Show tenths of a second (9.9) in the last ten seconds
+
+    Returns:
+        str: "m:ss", or "s.t" in the last ten seconds with tenths, rounded
+        up so the clock reads 0:00 only when time is up
+    """
+    shown = math.ceil(remaining_ms / 100)
+    if tenths and 0 < shown < TENTHS_BELOW_MS // 100:
+        return f"{shown // 10}.{shown % 10}"
+    shown = math.ceil(remaining_ms / 1000)
+    return f"{shown // 60:d}:{shown % 60:02d}"
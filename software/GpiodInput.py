@@ -0,0 +1,173 @@
+"""
+Button input through the Linux GPIO character device (libgpiod v2).
+
+All player lines are requested in one bulk request and a single thread reads
+edge events in batches. Each event carries a kernel timestamp taken in the
+interrupt handler on CLOCK_MONOTONIC, the same clock as time.monotonic_ns(),
+so presses are arbitrated by when they happened rather than when Python got
+round to them.
+
+GpiodOutput drives the LED lines the same way, so with INPUT_BACKEND
+"gpiod" the game does not need RPi.GPIO at all.
+
+The gpiod package is optional; it is only needed when INPUT_BACKEND is
+"gpiod".
+"""
+
+import threading
+from datetime import timedelta
+from typing import Dict, Optional, Sequence
+
+try:
+    import gpiod
+    from gpiod.line import Bias, Direction, Edge, Value
+    GPIOD_AVAILABLE = True
+except ImportError:
+    gpiod = None
+    GPIOD_AVAILABLE = False
+
+
+class GpiodInput:
+    """
+    Reads falling edges on the player lines and queues them as presses.
+    """
+
+    # how long each wait for events blocks, so stop() is noticed promptly
+    WAIT_TIMEOUT = timedelta(milliseconds=100)
+
+    def __init__(
+        self,
+        context,
+        chip_path: str,
+        line_map: Dict[int, int],
+        debounce_ms: int = 0,
+    ) -> None:
+        """
+        Args:
+            context: Game context with a buzz_queue
+            chip_path: GPIO chip device, e.g. "/dev/gpiochip0"
+            line_map: Line offset (BCM pin on the Pi) to zero based player
+            debounce_ms: Kernel debounce period, 0 to report every edge
+        """
+        self.context = context
+        self.chip_path: str = chip_path
+        self.line_map: Dict[int, int] = line_map
+        self.debounce_ms: int = debounce_ms
+
+        self.request = None
+        self.events: int = 0
+        self.running: bool = False
+        self.thread: Optional[threading.Thread] = None
+
+    def open(self) -> None:
+        """
+        Request every player line as a pulled-up input with falling edge events.
+
+        Raises:
+            RuntimeError: If the gpiod package is not installed
+        """
+        if not GPIOD_AVAILABLE:
+            raise RuntimeError("INPUT_BACKEND is gpiod but the gpiod package is not installed")
+
+        settings = gpiod.LineSettings(
+            direction=Direction.INPUT,
+            edge_detection=Edge.FALLING,
+            bias=Bias.PULL_UP,
+            debounce_period=timedelta(milliseconds=self.debounce_ms),
+        )
+        self.request = gpiod.request_lines(
+            self.chip_path,
+            consumer="gameshow",
+            config={tuple(self.line_map): settings},
+        )
+
+    def poll(self, timeout: Optional[timedelta] = None) -> int:
+        """
+        Wait for edge events and queue a press for each one.
+
+        Args:
+            timeout: How long to wait, defaults to WAIT_TIMEOUT
+
+        Returns:
+            int: Number of presses queued
+        """
+        if not self.request.wait_edge_events(timeout or self.WAIT_TIMEOUT):
+            return 0
+
+        queued = 0
+        for event in self.request.read_edge_events():
+            # only falling edges were requested
+            player = self.line_map.get(event.line_offset)
+            if player is None:
+                continue
+            self.context.buzz_queue.push(player, event.timestamp_ns)
+            queued += 1
+        self.events += queued
+        return queued
+
+    def start(self) -> None:
+        """Open the lines if needed and start the reader thread."""
+        if self.running:
+            return
+        if self.request is None:
+            self.open()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="gpiod-input", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the reader thread and release the lines."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+        if self.request is not None:
+            self.request.release()
+            self.request = None
+
+    def _run(self) -> None:
+        while self.running:
+            self.poll()
+
+
+class GpiodOutput:
+    """
+    The LED lines, requested as outputs in one bulk request.
+    """
+
+    def __init__(self, chip_path: str, lines: Sequence[int]) -> None:
+        """
+        Args:
+            chip_path: GPIO chip device, e.g. "/dev/gpiochip0"
+            lines: Line offsets (BCM pins on the Pi) of the LEDs
+        """
+        self.chip_path: str = chip_path
+        self.lines: Sequence[int] = lines
+        self.request = None
+
+    def open(self) -> None:
+        """
+        Request every LED line as an output, starting off.
+
+        Raises:
+            RuntimeError: If the gpiod package is not installed
+        """
+        if not GPIOD_AVAILABLE:
+            raise RuntimeError("INPUT_BACKEND is gpiod but the gpiod package is not installed")
+
+        settings = gpiod.LineSettings(direction=Direction.OUTPUT, output_value=Value.INACTIVE)
+        self.request = gpiod.request_lines(
+            self.chip_path,
+            consumer="gameshow",
+            config={tuple(self.lines): settings},
+        )
+
+    def set(self, line: int, state: bool) -> None:
+        """Turn the LED on line on or off."""
+        self.request.set_value(line, Value.ACTIVE if state else Value.INACTIVE)
+
+    def release(self) -> None:
+        """Release the lines."""
+        if self.request is not None:
+            self.request.release()
+            self.request = None
@@ -0,0 +1,420 @@
+"""
+Match history in an SQLite database.
+
+Scores only lived until SHIFT-A reset them, so nothing was left of past
+shows. While HISTORY_FILE is set, every round and game is written to an
+SQLite database in WAL mode:
+
+- games: when each started and ended, and its rounds
+- rounds: each run of the clock, from when it first starts until time's
+  up, SHIFT-Z or SHIFT-A, with the time left and the scores at its end
+- game_players: each player's final score in each game
+- buzzes: every buzz-in, with the time left on the clock and the reaction
+  time, from the clock (re)starting to the winning press
+- player_stats: games, wins, points and reaction times per player, kept
+  up to date as games end, so a leaderboard is one indexed read
+
+Players are told apart by name. A game ends at SHIFT-A; one still going
+when the game quits keeps its rounds and buzz-ins but is not counted in
+the player statistics.
+
+The main loop only queues statements. A writer thread runs whatever is
+queued in one transaction, so a round ending is one commit, and reads from
+another connection (showstats.py) never wait for it.
+"""
+
+import atexit
+import csv
+import queue
+import sqlite3
+import threading
+from typing import Any, Dict, IO, Iterator, List, Optional, Sequence, Tuple
+
+import game_config as config
+from GameState import GameState
+from Journal import wall_ms
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    started_ms INTEGER NOT NULL,
+    ended_ms INTEGER,
+    rounds INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    game_id INTEGER NOT NULL REFERENCES games(id),
+    number INTEGER NOT NULL,
+    started_ms INTEGER NOT NULL,
+    ended_ms INTEGER,
+    clock_ms INTEGER
+);
+CREATE TABLE IF NOT EXISTS round_scores (
+    round_id INTEGER NOT NULL REFERENCES rounds(id),
+    seat INTEGER NOT NULL,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    score INTEGER NOT NULL,
+    PRIMARY KEY (round_id, seat)
+);
+CREATE TABLE IF NOT EXISTS game_players (
+    game_id INTEGER NOT NULL REFERENCES games(id),
+    seat INTEGER NOT NULL,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    score INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    PRIMARY KEY (game_id, seat)
+);
+CREATE TABLE IF NOT EXISTS buzzes (
+    id INTEGER PRIMARY KEY,
+    game_id INTEGER NOT NULL REFERENCES games(id),
+    round_id INTEGER NOT NULL REFERENCES rounds(id),
+    seat INTEGER NOT NULL,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    at_ms INTEGER NOT NULL,
+    clock_ms INTEGER NOT NULL,
+    reaction_ms INTEGER
+);
+CREATE TABLE IF NOT EXISTS player_stats (
+    player_id INTEGER PRIMARY KEY REFERENCES players(id),
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    points INTEGER NOT NULL DEFAULT 0,
+    best INTEGER,
+    buzzes INTEGER NOT NULL DEFAULT 0,
+    reactions INTEGER NOT NULL DEFAULT 0,
+    reaction_total_ms INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS rounds_game ON rounds(game_id);
+CREATE INDEX IF NOT EXISTS game_players_player ON game_players(player_id, game_id, score);
+CREATE INDEX IF NOT EXISTS buzzes_player ON buzzes(player_id, reaction_ms);
+CREATE INDEX IF NOT EXISTS buzzes_game ON buzzes(game_id);
+CREATE INDEX IF NOT EXISTS player_stats_rank ON player_stats(wins DESC, points DESC);
+"""
+
+PLAYER_ID = "(SELECT id FROM players WHERE name = ?)"
+
+# what showstats.py can export, one row at a time
+EXPORTS: Dict[str, str] = {
+    "games": """
+        SELECT g.id AS game, g.started_ms, g.ended_ms, g.rounds, gp.seat + 1 AS seat,
+               p.name, gp.score, gp.won
+        FROM games g JOIN game_players gp ON gp.game_id = g.id JOIN players p ON p.id = gp.player_id
+        ORDER BY g.id, gp.seat""",
+    "rounds": """
+        SELECT r.game_id AS game, r.number AS round, r.started_ms, r.ended_ms, r.clock_ms,
+               rs.seat + 1 AS seat, p.name, rs.score
+        FROM rounds r JOIN round_scores rs ON rs.round_id = r.id JOIN players p ON p.id = rs.player_id
+        ORDER BY r.id, rs.seat""",
+    "buzzes": """
+        SELECT b.game_id AS game, r.number AS round, b.at_ms, b.seat + 1 AS seat, p.name,
+               b.clock_ms, b.reaction_ms
+        FROM buzzes b JOIN rounds r ON r.id = b.round_id JOIN players p ON p.id = b.player_id
+        ORDER BY b.id""",
+    "players": """
+        SELECT p.name, s.games, s.wins, s.points, s.best, s.buzzes,
+               s.reaction_total_ms / NULLIF(s.reactions, 0) AS mean_reaction_ms
+        FROM player_stats s JOIN players p ON p.id = s.player_id
+        ORDER BY p.name""",
+}
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open the history database in WAL mode, creating its tables if need be."""
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    db.execute("PRAGMA journal_mode = WAL")
+    # WAL is safe against corruption at NORMAL; a power cut can lose the last commits
+    db.execute("PRAGMA synchronous = NORMAL")
+    db.execute("PRAGMA foreign_keys = ON")
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(f"{path} is from a newer version (schema {version})")
+    db.executescript(SCHEMA)
+    db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return db
+
+
+class History:
+    """Records rounds, games and buzz-ins, written by a background thread."""
+
+    def __init__(self, path: str, context) -> None:
+        """
+        Args:
+            path: Database file
+            context (Context): Game context, read for names, scores and the clock
+        """
+        self.path: str = path
+        self.context = context
+        db = connect(path)
+        # ids are handed out here, so the main loop need not wait for the writer
+        self.next_game: int = db.execute("SELECT IFNULL(MAX(id), 0) + 1 FROM games").fetchone()[0]
+        self.next_round: int = db.execute("SELECT IFNULL(MAX(id), 0) + 1 FROM rounds").fetchone()[0]
+        db.close()
+
+        self.game_id: Optional[int] = None
+        self.round_id: Optional[int] = None
+        self.rounds: int = 0
+        # when the clock last started, for reaction times
+        self.running_ns: Optional[int] = None
+
+        self.queue: "queue.Queue[Optional[Tuple[str, Sequence[Any]]]]" = queue.Queue()
+        self.stats: Dict[str, int] = {"statements": 0, "commits": 0, "failed": 0}
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> "History":
+        """Start the writer thread."""
+        self.thread = threading.Thread(target=self.run, name="history", daemon=True)
+        self.thread.start()
+        # quitting from the keyboard ends the game with sys.exit()
+        atexit.register(self.close)
+        return self
+
+    def close(self) -> None:
+        """Write everything queued and stop the writer thread."""
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        atexit.unregister(self.close)
+
+    def flush(self) -> None:
+        """Wait until everything queued so far is written."""
+        self.queue.join()
+
+    def state_changed(self, state: GameState) -> None:
+        """
+        Start a round when the clock first runs, and end it at time's up.
+
+        Called by Context whenever the state changes.
+        """
+        if state == GameState.RUNNING:
+            self.running_ns = self.context.now_ns()
+            self._start_round()
+        elif state == GameState.TIMEUP:
+            self.end_round()
+
+    def buzz(self, player: int) -> None:
+        """
+        Record a buzz-in.
+
+        Args:
+            player: Player who buzzed in, counted from 0
+
+        Note:
+            - The reaction time runs to when the winning press arrived if
+              it was arbitrated, so it does not include the window;
+              otherwise to now, within a frame of the press
+        """
+        self._start_round()
+        pressed_ns = self.context.now_ns()
+        result = self.context.last_arbitration
+        if result is not None and result.winner == player:
+            pressed_ns = min(press.arrival_ns for press in result.presses if press.player == player)
+        reaction_ms = None
+        if self.running_ns is not None and pressed_ns >= self.running_ns:
+            reaction_ms = (pressed_ns - self.running_ns) // 1_000_000
+        name = self.context.player_names[player]
+        self._queue(
+            "INSERT OR IGNORE INTO players (name) VALUES (?)", (name,))
+        self._queue(
+            f"INSERT INTO buzzes (game_id, round_id, seat, player_id, at_ms, clock_ms, reaction_ms) "
+            f"VALUES (?, ?, ?, {PLAYER_ID}, ?, ?, ?)",
+            (self.game_id, self.round_id, player, name, wall_ms(), self.context.clock, reaction_ms))
+        self._queue(
+            f"INSERT INTO player_stats (player_id, buzzes, reactions, reaction_total_ms) "
+            f"VALUES ({PLAYER_ID}, 1, ?, ?) "
+            f"ON CONFLICT (player_id) DO UPDATE SET buzzes = buzzes + 1, "
+            f"reactions = reactions + excluded.reactions, "
+            f"reaction_total_ms = reaction_total_ms + excluded.reaction_total_ms",
+            (name, int(reaction_ms is not None), reaction_ms or 0))
+
+    def end_round(self) -> None:
+        """End the round being played, with the scores as they stand."""
+        if self.round_id is None:
+            return
+        self._queue("UPDATE rounds SET ended_ms = ?, clock_ms = ? WHERE id = ?",
+                    (wall_ms(), self.context.clock, self.round_id))
+        for seat, (name, score) in enumerate(zip(self.context.player_names, self.context.scores)):
+            self._queue("INSERT OR IGNORE INTO players (name) VALUES (?)", (name,))
+            self._queue(f"INSERT INTO round_scores (round_id, seat, player_id, score) VALUES (?, ?, {PLAYER_ID}, ?)",
+                        (self.round_id, seat, name, score))
+        self.round_id = None
+        self.running_ns = None
+
+    def end_game(self) -> None:
+        """
+        End the game with its final scores, before SHIFT-A clears them.
+
+        A game with no rounds and no points is not recorded.
+        """
+        scores = list(self.context.scores)
+        if self.game_id is None and not any(scores):
+            return
+        self.end_round()
+        self._start_game()
+        top = max(scores) if scores else 0
+        self._queue("UPDATE games SET ended_ms = ?, rounds = ? WHERE id = ?",
+                    (wall_ms(), self.rounds, self.game_id))
+        for seat, (name, score) in enumerate(zip(self.context.player_names, scores)):
+            won = int(score == top and top > 0)
+            self._queue("INSERT OR IGNORE INTO players (name) VALUES (?)", (name,))
+            self._queue(f"INSERT INTO game_players (game_id, seat, player_id, score, won) "
+                        f"VALUES (?, ?, {PLAYER_ID}, ?, ?)",
+                        (self.game_id, seat, name, score, won))
+            self._queue(
+                f"INSERT INTO player_stats (player_id, games, wins, points, best) "
+                f"VALUES ({PLAYER_ID}, 1, ?, ?, ?) "
+                f"ON CONFLICT (player_id) DO UPDATE SET games = games + 1, wins = wins + excluded.wins, "
+                f"points = points + excluded.points, best = MAX(IFNULL(best, excluded.best), excluded.best)",
+                (name, won, score, score))
+        self.game_id = None
+        self.rounds = 0
+
+    def run(self) -> None:
+        """Write what is queued, a batch per transaction, until closed."""
+        db = connect(self.path)
+        try:
+            while True:
+                batch = [self.queue.get()]
+                while True:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                statements = [item for item in batch if item is not None]
+                if statements:
+                    self._write(db, statements)
+                for _ in batch:
+                    self.queue.task_done()
+                if len(statements) < len(batch):
+                    return
+        finally:
+            db.close()
+
+    def _write(self, db: sqlite3.Connection, statements: List[Tuple[str, Sequence[Any]]]) -> None:
+        try:
+            db.execute("BEGIN")
+            for sql, params in statements:
+                db.execute(sql, params)
+            db.execute("COMMIT")
+            self.stats["statements"] += len(statements)
+            self.stats["commits"] += 1
+        except sqlite3.Error as e:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            self.stats["failed"] += len(statements)
+            print(f"Could not write match history: {e}")
+
+    def _queue(self, sql: str, params: Sequence[Any]) -> None:
+        self.queue.put((sql, params))
+
+    def _start_game(self) -> None:
+        if self.game_id is not None:
+            return
+        self.game_id = self.next_game
+        self.next_game += 1
+        self.rounds = 0
+        self._queue("INSERT INTO games (id, started_ms) VALUES (?, ?)", (self.game_id, wall_ms()))
+
+    def _start_round(self) -> None:
+        if self.round_id is not None:
+            return
+        self._start_game()
+        self.round_id = self.next_round
+        self.next_round += 1
+        self.rounds += 1
+        self._queue("INSERT INTO rounds (id, game_id, number, started_ms) VALUES (?, ?, ?, ?)",
+                    (self.round_id, self.game_id, self.rounds, wall_ms()))
+
+
+def leaderboard(db: sqlite3.Connection, limit: int = 10) -> List[Tuple[Any, ...]]:
+    """
+    Players with the most wins, then points.
+
+    Returns:
+        List[Tuple[Any, ...]]: name, games, wins, points, best
+    """
+    return db.execute(
+        "SELECT p.name, s.games, s.wins, s.points, s.best FROM player_stats s "
+        "JOIN players p ON p.id = s.player_id WHERE s.games > 0 "
+        "ORDER BY s.wins DESC, s.points DESC LIMIT ?", (limit,)
+    ).fetchall()
+
+
+def reaction_times(db: sqlite3.Connection, limit: int = 10) -> List[Tuple[Any, ...]]:
+    """
+    Players with the fastest mean reaction time.
+
+    Returns:
+        List[Tuple[Any, ...]]: name, buzz-ins timed, mean reaction ms
+    """
+    return db.execute(
+        "SELECT p.name, s.reactions, s.reaction_total_ms / s.reactions AS mean FROM player_stats s "
+        "JOIN players p ON p.id = s.player_id WHERE s.reactions > 0 "
+        "ORDER BY mean LIMIT ?", (limit,)
+    ).fetchall()
+
+
+def head_to_head(db: sqlite3.Connection, name: str, other: str) -> Tuple[int, int, int]:
+    """
+    How two players did in the games they both played.
+
+    Returns:
+        Tuple[int, int, int]: Games the first scored more in, fewer, and tied
+    """
+    row = db.execute(
+        f"SELECT IFNULL(SUM(a.score > b.score), 0), IFNULL(SUM(a.score < b.score), 0), "
+        f"IFNULL(SUM(a.score = b.score), 0) "
+        f"FROM game_players a JOIN game_players b ON b.game_id = a.game_id "
+        f"WHERE a.player_id = {PLAYER_ID} AND b.player_id = {PLAYER_ID}",
+        (name, other),
+    ).fetchone()
+    return tuple(row)
+
+
+def export_csv(db: sqlite3.Connection, what: str, out: IO[str]) -> int:
+    """
+    Write one of EXPORTS as CSV, a row at a time however large it is.
+
+    Returns:
+        int: Rows written
+    """
+    cursor = db.execute(EXPORTS[what])
+    writer = csv.writer(out)
+    writer.writerow([column[0] for column in cursor.description])
+    rows = 0
+    for row in iter_rows(cursor):
+        writer.writerow(row)
+        rows += 1
+    return rows
+
+
+def iter_rows(cursor: sqlite3.Cursor, size: int = 500) -> Iterator[Tuple[Any, ...]]:
+    """Rows from a cursor, fetched size at a time."""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def start_history(context) -> Optional[History]:
+    """
+    Start recording match history to HISTORY_FILE, if it is set.
+
+    Returns:
+        Optional[History]: The history, also set as context.history
+    """
+    if not config.HISTORY_FILE:
+        return None
+    try:
+        context.history = History(config.HISTORY_FILE, context).start()
+    except sqlite3.Error as e:
+        print(f"Match history is off: could not open {config.HISTORY_FILE}: {e}")
+        return None
+    return context.history
@@ -0,0 +1,344 @@
+"""
+Append-only journal of game events, between snapshots of the state file.
+
+The state file only held player_names, scores and invert_display, and was
+rewritten whole on every change; the clock, the state and the order things
+happened in were lost on a restart. Now each change is appended to
+STATE_FILE_NAME.journal as one small record:
+
+    u16 length, u32 crc32 of the payload, then the payload:
+    u32 seq, i64 wall clock ms, u8 kind, then the kind's fields (KINDS)
+
+Every JOURNAL_SNAPSHOT_EVERY records Context saves a snapshot to the state
+file with the seq of the last record in it. Once the snapshot is written
+the journal is compacted to the records after the oldest snapshot still
+kept, so a fall back to a previous generation can still be replayed
+forward. On startup Context.restore() loads the snapshot and rebuild()
+applies every later record to it.
+
+Records are written straight to the file but not synced, so a crash of the
+game loses nothing and a power cut loses at most what the OS had not
+written yet. A record cut short or damaged ends the journal there: it and
+anything after it are dropped, and the journal carries on from the last
+good record.
+"""
+
+import atexit
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from GameState import GameState
+
+# start of every journal file, changed if the record layout ever changes
+MAGIC = b"GSJ\x01"
+
+HEADER = struct.Struct("<HI")       # payload length, crc32
+PREFIX = struct.Struct("<IqB")      # seq, wall clock ms, kind
+
+# kind: (code, fields after the prefix, ends with a UTF-8 string)
+KINDS: Dict[str, Tuple[int, str, bool]] = {
+    "score": (1, "<Bh", False),     # player, points added (negative to take away)
+    "name": (2, "<B", True),        # player, new name
+    "invert": (3, "<?", False),     # score band at the top
+    "state": (4, "<Bib", False),    # GameState value, clock ms, player buzzed in
+    "clock": (5, "<i", False),      # clock ms, when set or as a second passes
+    "buzz": (6, "<Bi", False),      # player, clock ms
+    "reset": (7, "<", False),       # scores back to zero
+}
+CODES: Dict[int, str] = {code: kind for kind, (code, _, _) in KINDS.items()}
+
+
+class Record(NamedTuple):
+    """One journal entry."""
+    seq: int
+    wall_ms: int
+    kind: str
+    args: Tuple[Any, ...]
+
+
+def wall_ms() -> int:
+    """Wall clock time in milliseconds, which survives a restart unlike the monotonic clock."""
+    return time.time_ns() // 1_000_000
+
+
+def encode(seq: int, at_ms: int, kind: str, args: Tuple[Any, ...]) -> bytes:
+    """A record as written to the journal, header included."""
+    code, fields, text = KINDS[kind]
+    if text:
+        *args, string = args
+        body = struct.pack(fields, *args) + string.encode("utf-8")
+    else:
+        body = struct.pack(fields, *args)
+    payload = PREFIX.pack(seq, at_ms, code) + body
+    return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode(payload: bytes) -> Record:
+    """
+    A record from its payload.
+
+    Raises:
+        ValueError: If the kind is unknown or the fields do not fit it
+    """
+    seq, at_ms, code = PREFIX.unpack_from(payload)
+    if code not in CODES:
+        raise ValueError(f"unknown record kind {code}")
+    kind = CODES[code]
+    _, fields, text = KINDS[kind]
+    body = payload[PREFIX.size:]
+    size = struct.calcsize(fields)
+    try:
+        args = struct.unpack(fields, body[:size]) if text else struct.unpack(fields, body)
+        if text:
+            args += (body[size:].decode("utf-8"),)
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"bad {kind} record: {e}") from e
+    return Record(seq, at_ms, kind, args)
+
+
+def parse(data: bytes) -> Tuple[List[Tuple[Record, bytes]], int]:
+    """
+    Read records until the data ends or one is damaged.
+
+    Args:
+        data: Journal file contents, after MAGIC
+
+    Returns:
+        Tuple[List[Tuple[Record, bytes]], int]: Each record with its bytes
+        as written, and how many bytes of data they take up
+    """
+    records = []
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        length, crc = HEADER.unpack_from(data, offset)
+        end = offset + HEADER.size + length
+        payload = data[offset + HEADER.size:end]
+        if len(payload) < length or length < PREFIX.size or zlib.crc32(payload) != crc:
+            break
+        try:
+            record = decode(payload)
+        except ValueError:
+            break
+        records.append((record, data[offset:end]))
+        offset = end
+    return records, offset
+
+
+def rebuild(snapshot: Dict[str, Any], records: List[Record]) -> Dict[str, Any]:
+    """
+    Apply journal records to a snapshot.
+
+    Args:
+        snapshot: What Context.snapshot() saved, from the state file
+        records: Records after the snapshot, in order
+
+    Returns:
+        Dict[str, Any]: The snapshot as it stood after the last record. If
+        the clock was running, clock_ms is what was left at the last
+        record, the last moment the game is known to have been running.
+    """
+    state = dict(snapshot)
+    state["scores"] = list(snapshot["scores"])
+    state["player_names"] = list(snapshot["player_names"])
+    # when clock_ms was last known exactly
+    clock_at = snapshot.get("saved_ms")
+    for record in records:
+        kind, args = record.kind, record.args
+        if kind == "score":
+            player, points = args
+            if player < len(state["scores"]):
+                state["scores"][player] += points
+        elif kind == "name":
+            player, name = args
+            if player < len(state["player_names"]):
+                state["player_names"][player] = name
+        elif kind == "invert":
+            state["invert_display"] = args[0]
+        elif kind == "state":
+            state["state"], state["clock_ms"], state["player_buzzed_in"] = args
+            clock_at = record.wall_ms
+        elif kind == "clock":
+            state["clock_ms"] = args[0]
+            clock_at = record.wall_ms
+        elif kind == "buzz":
+            state["player_buzzed_in"], state["clock_ms"] = args
+            clock_at = record.wall_ms
+        elif kind == "reset":
+            state["scores"] = [0] * len(state["scores"])
+        state["journal_seq"] = record.seq
+
+    running = state.get("state") == GameState.RUNNING.value and "clock_ms" in state
+    if running and records and clock_at is not None:
+        # the wall clock can be set back, e.g. by NTP at boot
+        state["clock_ms"] = max(0, state["clock_ms"] - max(0, records[-1].wall_ms - clock_at))
+    return state
+
+
+class Journal:
+    """The journal file, appended to from the main thread and compacted from the state writer."""
+
+    def __init__(self, path: str, keep: int = 4, now_ms: Callable[[], int] = wall_ms) -> None:
+        """
+        Args:
+            path: Journal file
+            keep: Snapshots the journal can still be replayed from, the
+                state file and its previous generations
+            now_ms: Wall clock in milliseconds, for tests
+        """
+        self.path: str = path
+        self.now_ms: Callable[[], int] = now_ms
+        self.next_seq: int = 1
+        # nothing is appended until read() has found where the journal ends
+        self.ready: bool = False
+        # records appended since the last snapshot was taken
+        self.since_snapshot: int = 0
+        # seqs of the snapshots written, oldest first
+        self.snapshots: Deque[int] = deque(maxlen=keep)
+        self.stats: Dict[str, int] = {"appended": 0, "bytes": 0, "compactions": 0, "dropped_bytes": 0}
+
+        self.lock = threading.Lock()
+        # one compaction at a time; held while it writes, without the lock
+        self.compacting = threading.Lock()
+        self.fd: Optional[int] = None
+
+    @property
+    def last_seq(self) -> int:
+        """Seq of the newest record, 0 before the first."""
+        return self.next_seq - 1
+
+    def read(self, after: int = 0) -> List[Record]:
+        """
+        Read the journal and get ready to append to it.
+
+        Drops a damaged or cut short end so appends carry on from the last
+        good record. A file that is not a journal is moved aside to
+        path.damaged.
+
+        Args:
+            after: Seq of the snapshot being restored; older records are skipped
+
+        Returns:
+            List[Record]: Records after it, in order
+        """
+        with self.lock:
+            self.snapshots.append(after)
+            try:
+                with open(self.path, "rb") as file:
+                    data = file.read()
+            except FileNotFoundError:
+                data = b""
+
+            records: List[Tuple[Record, bytes]] = []
+            if data and not data.startswith(MAGIC):
+                print(f"{self.path} is not a game journal, moving it to {self.path}.damaged")
+                os.replace(self.path, self.path + ".damaged")
+            elif data:
+                records, used = parse(data[len(MAGIC):])
+                dropped = len(data) - len(MAGIC) - used
+                if dropped:
+                    print(f"Journal: dropped {dropped} damaged bytes at the end of {self.path}")
+                    self.stats["dropped_bytes"] += dropped
+                    with open(self.path, "r+b") as file:
+                        file.truncate(len(MAGIC) + used)
+
+            last = records[-1][0].seq if records else 0
+            self.next_seq = max(last, after) + 1
+            self.ready = True
+            # quitting from the keyboard ends the game with sys.exit()
+            atexit.register(self.close)
+            return [record for record, _ in records if record.seq > after]
+
+    def append(self, kind: str, *args: Any) -> Optional[int]:
+        """
+        Append a record.
+
+        Args:
+            kind: A name from KINDS
+            args: Its fields
+
+        Returns:
+            Optional[int]: The record's seq, or None before read()
+        """
+        if not self.ready:
+            return None
+        with self.lock:
+            seq = self.next_seq
+            data = encode(seq, self.now_ms(), kind, args)
+            if self.fd is None:
+                self.fd = self._open()
+            os.write(self.fd, data)
+            self.next_seq += 1
+            self.since_snapshot += 1
+            self.stats["appended"] += 1
+            self.stats["bytes"] += len(data)
+            return seq
+
+    def compact(self, seq: int) -> None:
+        """
+        A snapshot including records up to seq is on disk: drop the records
+        no snapshot that is kept needs.
+
+        Called from whichever thread wrote the snapshot. The compacted file
+        is written and synced without holding the lock, so append() on the
+        main thread never waits for the disk; the lock is only taken to
+        copy over what was appended meanwhile and swap the files.
+        """
+        with self.compacting:
+            with self.lock:
+                if self.snapshots and seq <= self.snapshots[-1]:
+                    return
+                self.snapshots.append(seq)
+                oldest = self.snapshots[0]
+            try:
+                with open(self.path, "rb") as file:
+                    data = file.read()
+            except OSError:
+                return
+            if not data.startswith(MAGIC):
+                return
+            # a record being appended as we read ends the parse, and is
+            # copied over with the rest of the tail below
+            records, used = parse(data[len(MAGIC):])
+            if not any(record.seq <= oldest for record, _ in records):
+                return
+            kept = b"".join(raw for record, raw in records if record.seq > oldest)
+            done = len(MAGIC) + used
+
+            temp = self.path + ".tmp"
+            try:
+                with open(temp, "wb") as file:
+                    file.write(MAGIC + kept)
+                    file.flush()
+                    os.fsync(file.fileno())
+                with self.lock:
+                    with open(self.path, "rb") as old, open(temp, "ab") as file:
+                        old.seek(done)
+                        file.write(old.read())
+                    if self.fd is not None:
+                        os.close(self.fd)
+                        self.fd = None
+                    os.replace(temp, self.path)
+            except OSError as e:
+                # the journal is only longer than it needs to be; the next snapshot tries again
+                print(f"Could not compact {self.path}: {e}")
+                return
+            self.stats["compactions"] += 1
+
+    def close(self) -> None:
+        """Sync and close the journal file."""
+        with self.lock:
+            if self.fd is not None:
+                os.fsync(self.fd)
+                os.close(self.fd)
+                self.fd = None
+
+    def _open(self) -> int:
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(fd).st_size == 0:
+            os.write(fd, MAGIC)
+        return fd
@@ -0,0 +1,181 @@
+"""
+Keyboard bindings for the MC controls.
+
+Each binding maps a key, with any of SHIFT, CTRL and ALT held, to the name
+of an action in events.ACTIONS and an optional argument:
+
+    "SPACE" = "start_stop"
+    "SHIFT+1" = "score_subtract 1"
+    "P" = "clock_add 5"
+
+Keys are a single character ("1", "-", "/") or the name of a pygame K_
+constant without the K_ ("SPACE", "ESCAPE", "F1", "KP_ENTER", "PLUS"). The
+defaults below can be changed, added to, or unbound with "none" from the
+KEYMAP table in settings.toml. The bindings are looked up in one dict
+per key press, and the help screen is built from the same table.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import pygame
+
+import game_config as config
+
+# modifiers a binding can ask for; others (caps lock, num lock) are ignored
+MODIFIERS: Dict[str, int] = {
+    "SHIFT": pygame.KMOD_SHIFT,
+    "CTRL": pygame.KMOD_CTRL,
+    "ALT": pygame.KMOD_ALT,
+}
+
+# shorter names on the help screen
+KEY_LABELS: Dict[str, str] = {"ESCAPE": "ESC"}
+
+# In help screen order
+DEFAULT_KEYMAP: Dict[str, str] = {
+    "SPACE": "start_stop",
+    "SHIFT+ESCAPE": "quit",
+    "H": "help",
+    "SHIFT+/": "help",
+    **{key: f"score_add {i + 1}" for i, key in enumerate("1234567890-=")},
+    **{f"SHIFT+{key}": f"score_subtract {i + 1}" for i, key in enumerate("1234567890-=")},
+    **{key: f"score_subtract {i + 1}" for i, key in enumerate("QWER")},
+    "P": "clock_add 5",
+    "L": "clock_add -5",
+    "T": "sound TIMESUP",
+    "B": "sound BUZZ",
+    "N": "name_players",
+    "I": "invert_display",
+    "S": "splash",
+    "SHIFT+A": "reset_game",
+    "SHIFT+D": "button_test",
+    "SHIFT+Z": "reset_clock",
+    "F12": "stall_report",
+}
+
+
+class Binding(NamedTuple):
+    """What a key does."""
+    spec: str
+    action: str
+    arg: Optional[str] = None
+
+
+def modifier_mask(mods: int) -> int:
+    """
+    Reduce pygame modifier state to the modifiers bindings use.
+
+    Either shift key counts as SHIFT, and so on.
+    """
+    mask = 0
+    for bits in MODIFIERS.values():
+        if mods & bits:
+            mask |= bits
+    return mask
+
+
+def parse_key(spec: str) -> Tuple[int, int]:
+    """
+    Parse a key spec like "SHIFT+A" or "KP_ENTER".
+
+    Returns:
+        Tuple[int, int]: pygame key code and modifier mask
+
+    Raises:
+        ValueError: If a part of the spec is not a key or modifier
+    """
+    *mods, name = spec.split("+")
+    mask = 0
+    for mod in mods:
+        if mod.upper() not in MODIFIERS:
+            raise ValueError(f"unknown modifier {mod!r} in key {spec!r}")
+        mask |= MODIFIERS[mod.upper()]
+
+    if len(name) == 1:
+        # printable keys have their ASCII code; letters are lower case
+        return ord(name.lower()), mask
+    for constant in (f"K_{name.upper()}", f"K_{name.lower()}"):
+        if hasattr(pygame, constant):
+            return getattr(pygame, constant), mask
+    raise ValueError(f"unknown key {name!r} in key {spec!r}")
+
+
+def key_label(spec: str) -> str:
+    """How a key spec is shown on the help screen, e.g. "SHIFT-ESC"."""
+    parts = spec.upper().split("+")
+    return "-".join(KEY_LABELS.get(part, part) for part in parts)
+
+
+class KeyMap:
+    """Bindings looked up by key and modifiers."""
+
+    def __init__(self, keymap: Dict[str, str]) -> None:
+        """
+        Args:
+            keymap: Key spec to "action" or "action argument", in help
+                screen order. "none" leaves a key unbound.
+
+        Raises:
+            ValueError: If a key spec cannot be parsed
+        """
+        self.bindings: Dict[Tuple[int, int], Binding] = {}
+        for spec, command in keymap.items():
+            key = parse_key(spec)
+            if not command or command.lower() == "none":
+                self.bindings.pop(key, None)
+                continue
+            action, _, arg = command.partition(" ")
+            self.bindings[key] = Binding(spec, action, arg.strip() or None)
+
+    @classmethod
+    def from_settings(cls, overrides: Optional[Dict[str, str]] = None) -> "KeyMap":
+        """
+        The default bindings with the KEYMAP table from settings.toml on top.
+
+        A settings key that names a default key another way ("shift+a" for
+        "SHIFT+A") replaces it rather than adding a second binding. A key
+        that cannot be parsed is warned about and left out, as a binding to
+        an unknown action is.
+        """
+        keymap = dict(DEFAULT_KEYMAP)
+        specs = {parse_key(spec): spec for spec in keymap}
+        for spec, command in (overrides or {}).items():
+            try:
+                key = parse_key(spec)
+            except ValueError as e:
+                print(f"KEYMAP: {e}, ignoring it")
+                continue
+            keymap[specs.get(key, spec)] = command
+        return cls(keymap)
+
+    def lookup(self, key: int, mods: int = 0) -> Optional[Binding]:
+        """
+        Find what a key press does.
+
+        A key bound without modifiers also answers when modifiers it has no
+        binding of its own for are held, so SHIFT+P still adds time.
+
+        Args:
+            key: pygame key code
+            mods: pygame modifier state
+
+        Returns:
+            Optional[Binding]: The binding, or None for an unbound key
+        """
+        binding = self.bindings.get((key, modifier_mask(mods)))
+        if binding is None:
+            binding = self.bindings.get((key, 0))
+        return binding
+
+    def unknown_actions(self, actions: Iterable[str]) -> List[str]:
+        """Key specs bound to actions not in actions, to warn about."""
+        known = set(actions)
+        return [binding.spec for binding in self.bindings.values() if binding.action not in known]
+
+    def __iter__(self):
+        """Bindings in the order they were given."""
+        return iter(self.bindings.values())
+
+
+# the game's bindings, built once
+KEYMAP: KeyMap = KeyMap.from_settings(config.KEYMAP)
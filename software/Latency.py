@@ -0,0 +1,179 @@
+"""
+Buzz latency measurement.
+
+A buzz is followed through the whole path: the raw input (serial bytes
+noticed, GPIO edge or simulated press), the parse into an InputEvent, the
+state change in handle_buzz_in(), the call to context.sound.play() and the
+first display.flip() showing the "Buzzed in!" banner. Each stage is recorded
+as the time since the raw input, per player and overall.
+
+The "input" time is the backend's InputEvent.arrival_ns. For a serial board
+that is when the main loop polled the port and found the bytes, so time they
+spent in the tty buffer waiting for the next frame, up to 1/FPS, is not
+counted. benchmark.py starts each trace when the emulated board sent the
+press instead, so its figures include that wait.
+
+Tracking is off unless context.latency holds a LatencyTracker, so the hooks
+cost one attribute check in normal play.
+"""
+
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# stages in the order a buzz passes through them; each is measured from "input"
+STAGES: Tuple[str, ...] = ("input", "parse", "state", "sound", "screen")
+
+ALL_PLAYERS = -1
+
+
+class Histogram:
+    """
+    Latency samples in nanoseconds, with percentiles and power-of-two buckets.
+    """
+
+    def __init__(self) -> None:
+        self.samples: List[int] = []
+
+    def add(self, value_ns: int) -> None:
+        """Record one sample."""
+        self.samples.append(value_ns)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def percentile(self, p: float) -> Optional[int]:
+        """
+        Nearest-rank percentile.
+
+        Args:
+            p: Percentile, 0 to 100
+
+        Returns:
+            int: Sample in nanoseconds, or None without samples
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = math.ceil(p / 100 * len(ordered))
+        return ordered[max(0, min(len(ordered), rank) - 1)]
+
+    def buckets(self) -> Dict[int, int]:
+        """
+        Count samples per power-of-two bucket.
+
+        Returns:
+            Dict[int, int]: Upper bound in microseconds to sample count
+        """
+        counts: Dict[int, int] = {}
+        for value in self.samples:
+            bound = 1
+            while bound * 1000 < value:
+                bound <<= 1
+            counts[bound] = counts.get(bound, 0) + 1
+        return dict(sorted(counts.items()))
+
+
+class LatencyTracker:
+    """
+    Collects per-stage buzz latencies.
+
+    begin() starts a trace when a press is accepted, mark() records the later
+    stages and screen_shown() completes it. Presses that lose arbitration are
+    simply never completed and are dropped by the next begin().
+    """
+
+    def __init__(self) -> None:
+        # player -> stage -> monotonic ns
+        self.pending: Dict[int, Dict[str, int]] = {}
+        # (stage, player) -> latency since input, ALL_PLAYERS for every player
+        self.histograms: Dict[Tuple[str, int], Histogram] = {}
+        self.completed: int = 0
+
+    def begin(self, player: int, input_ns: int, parse_ns: Optional[int] = None) -> None:
+        """
+        Start following a press.
+
+        Args:
+            player: Zero based player
+            input_ns: Host monotonic time of the raw input
+            parse_ns: When the input was parsed, defaults to now
+        """
+        self.pending[player] = {
+            "input": input_ns,
+            "parse": time.monotonic_ns() if parse_ns is None else parse_ns,
+        }
+
+    def mark(self, player: int, stage: str, now_ns: Optional[int] = None) -> None:
+        """
+        Record that a player's buzz reached a stage. Ignored without a trace.
+
+        Args:
+            player: Zero based player
+            stage: One of STAGES
+            now_ns: Time of the stage, defaults to now
+        """
+        trace = self.pending.get(player)
+        if trace is None or stage in trace:
+            return
+        trace[stage] = time.monotonic_ns() if now_ns is None else now_ns
+
+    def screen_shown(self, player: int, now_ns: Optional[int] = None) -> None:
+        """
+        Complete a trace once the frame showing the buzz is on screen.
+
+        Args:
+            player: Zero based player shown as buzzed in
+            now_ns: Time of the flip, defaults to now
+        """
+        if player not in self.pending or "state" not in self.pending[player]:
+            return
+        self.mark(player, "screen", now_ns)
+        trace = self.pending.pop(player)
+        for stage, at_ns in trace.items():
+            if stage == "input":
+                continue
+            for who in (player, ALL_PLAYERS):
+                self.histograms.setdefault((stage, who), Histogram()).add(at_ns - trace["input"])
+        self.completed += 1
+
+    def reset(self) -> None:
+        """Drop all traces and samples."""
+        self.pending.clear()
+        self.histograms.clear()
+        self.completed = 0
+
+    def histogram(self, stage: str, player: int = ALL_PLAYERS) -> Histogram:
+        """Return the histogram for a stage, empty if nothing was recorded."""
+        return self.histograms.get((stage, player), Histogram())
+
+    def summary(self, percentiles: Sequence[float] = (50, 90, 99)) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Percentiles of every stage in milliseconds, for reports and baselines.
+
+        Returns:
+            dict: "<stage>" and "<stage>/p<player>" to {"p50": ms, ..., "n": count}
+        """
+        result: Dict[str, Dict[str, Optional[float]]] = {}
+        for (stage, player), hist in sorted(
+            self.histograms.items(), key=lambda item: (STAGES.index(item[0][0]), item[0][1])
+        ):
+            key = stage if player == ALL_PLAYERS else "%s/p%d" % (stage, player + 1)
+            row: Dict[str, Optional[float]] = {"n": len(hist)}
+            for p in percentiles:
+                value = hist.percentile(p)
+                row["p%g" % p] = None if value is None else value / 1e6
+            result[key] = row
+        return result
+
+    def report(self, percentiles: Sequence[float] = (50, 90, 99)) -> str:
+        """Format the overall and per-player percentiles as a table."""
+        header = "%-18s %6s" % ("stage", "n") + "".join(" %9s" % ("p%g ms" % p) for p in percentiles)
+        lines = [header]
+        for key, row in self.summary(percentiles).items():
+            values = "".join(
+                " %9s" % ("-" if row["p%g" % p] is None else "%.2f" % row["p%g" % p])
+                for p in percentiles
+            )
+            lines.append("%-18s %6d%s" % ("input->" + key, row["n"], values))
+        return "\n".join(lines)
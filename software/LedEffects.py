@@ -0,0 +1,137 @@
+"""
+LED effects engine.
+
+This is the same integer arithmetic the firmware uses to animate the LEDs
+on its own (see updateEffect() in firmware/gameshow_to_serial.ino). The host
+runs it to mirror what the board is showing for draw_leds(), to drive the
+LEDs itself when there is no board that can animate them (GPIO, keyboard, old
+firmware), and the board emulator runs it in place of the firmware.
+"""
+
+import time
+from enum import Enum
+from typing import List, Optional
+
+
+class Effect(Enum):
+    """
+    Effects the board can run by itself.
+
+    The values are the effect ids used on the wire.
+    """
+    NONE = 0    # no effect, LEDs follow LED commands
+    CHASE = 1   # one LED at a time walks across all LEDs every period
+    BLINK = 2   # one LED (or all) on for half the period, off for half
+    SOLO = 3    # one LED on, the rest off
+    ALL = 4     # every LED on
+    FADE = 5    # every LED fades up and down once per period
+
+
+def now_ms() -> int:
+    """Host monotonic time in milliseconds."""
+    return time.monotonic_ns() // 1_000_000
+
+
+class EffectEngine:
+    """
+    Computes which LEDs an effect has lit at a given time.
+
+    Effects are pure functions of the time since they started, so the host
+    and the board stay in step without any further traffic.
+    """
+
+    # lowest period we accept, to keep BLINK's half period non-zero
+    MIN_PERIOD_MS: int = 20
+
+    def __init__(self, channels: int) -> None:
+        """
+        Args:
+            channels: Number of LEDs
+        """
+        self.channels: int = channels
+        self.effect: Effect = Effect.NONE
+        self.player: int = -1
+        self.period_ms: int = 1000
+        self.started_ms: int = 0
+
+    @property
+    def active(self) -> bool:
+        """True while an effect is running."""
+        return self.effect != Effect.NONE
+
+    def start(self, effect: Effect, player: int = -1, period_ms: int = 1000,
+              started_ms: Optional[int] = None) -> None:
+        """
+        Start an effect, replacing any running one.
+
+        Args:
+            effect: Effect to run
+            player: Zero based LED for BLINK and SOLO, -1 for all
+            period_ms: Length of one cycle for CHASE (per step), BLINK and FADE
+            started_ms: Start time, defaults to now
+        """
+        self.effect = effect
+        self.player = player
+        self.period_ms = max(period_ms, self.MIN_PERIOD_MS)
+        self.started_ms = now_ms() if started_ms is None else started_ms
+
+    def stop(self) -> None:
+        """Stop the running effect."""
+        self.effect = Effect.NONE
+
+    def _all(self) -> int:
+        return (1 << self.channels) - 1
+
+    def _target(self) -> int:
+        return self._all() if self.player < 0 else 1 << self.player
+
+    def level(self, at_ms: Optional[int] = None) -> int:
+        """
+        Brightness of a FADE at a given time.
+
+        Returns:
+            int: 0 to 255, or 255 for effects that do not fade
+        """
+        if self.effect != Effect.FADE:
+            return 255
+        elapsed = (now_ms() if at_ms is None else at_ms) - self.started_ms
+        phase = elapsed % self.period_ms
+        half = self.period_ms // 2
+        ramp = phase if phase < half else self.period_ms - phase
+        return min(255, ramp * 255 // max(half, 1))
+
+    def mask(self, at_ms: Optional[int] = None) -> int:
+        """
+        LED bitmask for a given time.
+
+        Args:
+            at_ms: Host monotonic time in milliseconds, defaults to now
+
+        Returns:
+            int: Bitmask of lit LEDs, bit 0 is player 1
+        """
+        elapsed = (now_ms() if at_ms is None else at_ms) - self.started_ms
+
+        if self.effect == Effect.CHASE:
+            if not self.channels:
+                return 0
+            return 1 << ((elapsed // self.period_ms) % self.channels)
+
+        if self.effect == Effect.BLINK:
+            return self._target() if (elapsed // (self.period_ms // 2)) % 2 == 0 else 0
+
+        if self.effect == Effect.SOLO:
+            return self._target()
+
+        if self.effect == Effect.ALL:
+            return self._all()
+
+        if self.effect == Effect.FADE:
+            return self._all() if self.level(at_ms) >= 128 else 0
+
+        return 0
+
+    def leds(self, at_ms: Optional[int] = None) -> List[bool]:
+        """LED states for a given time, as a list like context.led_state."""
+        mask = self.mask(at_ms)
+        return [bool(mask & (1 << k)) for k in range(self.channels)]
@@ -0,0 +1,232 @@
+"""
+Asynchronous LED output for serial boards.
+
+The game changes context.led_state freely during a frame; at the end of the
+frame flush() diffs it against what was last sent and queues at most one
+update. A background writer sends updates without waiting for each ack, so a
+slow or wedged board can never stall the main loop. Acks are read by the main
+loop along with button events and handed back through acked().
+
+While the board runs an LED effect by itself, context.led_state only mirrors
+what it shows, so flush() sends nothing until the effect is stopped.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import serial
+
+import protocol
+
+
+class LedService:
+    """
+    Background LED writer with coalescing and pipelined acks.
+
+    Only the newest requested state matters, so if the writer falls behind,
+    older pending updates are replaced rather than queued.
+    """
+
+    def __init__(self, context, ack_timeout_ms: int = 250, max_in_flight: int = 4) -> None:
+        """
+        Args:
+            context: Game context holding serial_port, serial_binary and led_state
+            ack_timeout_ms: How long to wait for an ack before counting a failure
+            max_in_flight: How many commands may be awaiting an ack at once
+        """
+        self.context = context
+        self.ack_timeout_ns: int = ack_timeout_ms * 1_000_000
+        self.max_in_flight: int = max_in_flight
+
+        self.pending: Optional[int] = None   # mask waiting for the writer
+        self.requested: Optional[int] = None  # last mask handed to the writer
+        self.last_sent: Optional[int] = None  # last mask written to the port
+        self.in_flight: Deque[int] = deque()  # send times awaiting an ack
+        self.effect: Optional[bytes] = None   # effect frame waiting for the writer
+        self.animating: bool = False          # the board is running an effect
+
+        self.stats: Dict[str, int] = {
+            "requested": 0,   # updates queued by flush()
+            "sent": 0,        # commands written to the port
+            "acked": 0,       # commands the board confirmed
+            "coalesced": 0,   # updates replaced before the writer got to them
+            "failed": 0,      # rejected, timed out or failed to write
+        }
+
+        self.running: bool = False
+        self.cond = threading.Condition()
+        # held for every write to the port, so others (clock sync PINGs) can
+        # share it without frames interleaving
+        self.write_lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="led-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread, dropping anything not yet sent."""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def invalidate(self) -> None:
+        """Forget what the board shows, e.g. after it reset. The next flush resends."""
+        with self.cond:
+            self.requested = None
+            self.last_sent = None
+            self.in_flight.clear()
+
+    def start_effect(self, frame: bytes) -> None:
+        """
+        Queue a command starting an effect the board runs by itself.
+
+        Args:
+            frame: Encoded EFFECT frame
+        """
+        with self.cond:
+            self.pending = None
+            self.effect = frame
+            self.animating = True
+            self.stats["requested"] += 1
+            self.cond.notify()
+
+    def stop_effect(self) -> None:
+        """Resume sending context.led_state. The next flush resends every LED."""
+        with self.cond:
+            self.animating = False
+            self.effect = None
+            self.requested = None
+            self.last_sent = None
+
+    def flush(self) -> None:
+        """
+        Queue the current context.led_state if it differs from the last update.
+
+        Call once per frame, after all game logic has run.
+        """
+        mask = protocol.leds_to_mask(self.context.led_state)
+        with self.cond:
+            self._expire(time.monotonic_ns())
+            if self.animating or mask == self.requested or not self.context.serial_port:
+                # nothing to do, or no board to send to until it reconnects
+                return
+            if self.pending is not None:
+                self.stats["coalesced"] += 1
+            self.pending = mask
+            self.requested = mask
+            self.stats["requested"] += 1
+            self.cond.notify()
+
+    def acked(self, ok: bool = True) -> None:
+        """
+        Record an ack (or rejection) read from the board.
+
+        Args:
+            ok: False if the board rejected the command
+        """
+        with self.cond:
+            if not self.in_flight:
+                # late ack for a command we already gave up on
+                return
+            self.in_flight.popleft()
+            self.stats["acked" if ok else "failed"] += 1
+            self.cond.notify()
+
+    def commands(self, mask: int, previous: Optional[int]) -> List[bytes]:
+        """
+        Encode the commands needed to move the board from previous to mask.
+
+        Args:
+            mask: LED bitmask to show
+            previous: LED bitmask the board shows, or None if unknown
+
+        Returns:
+            List[bytes]: One binary frame, or the fewest text commands
+        """
+        if self.context.serial_binary:
+            return [protocol.encode_leds(mask)]
+
+        channels = len(self.context.led_state)
+        everyone = (1 << channels) - 1
+        cmds = []
+
+        if previous is None:
+            # unknown starting point: clear (or fill) everything in one go
+            cmds.append(b"LED A %d\n" % (1 if mask == everyone else 0))
+            previous = everyone if mask == everyone else 0
+
+        changed = (mask ^ previous) & everyone
+        if mask in (0, everyone) and bin(changed).count("1") > 1:
+            return [b"LED A %d\n" % (1 if mask else 0)]
+
+        cmds.extend(
+            b"LED %d %d\n" % (k + 1, (mask >> k) & 1)
+            for k in range(channels)
+            if changed & (1 << k)
+        )
+        return cmds
+
+    def _expire(self, now_ns: int) -> None:
+        # caller holds self.cond
+        while self.in_flight and now_ns - self.in_flight[0] >= self.ack_timeout_ns:
+            self.in_flight.popleft()
+            self.stats["failed"] += 1
+
+    def _run(self) -> None:
+        while True:
+            with self.cond:
+                while self.running and (
+                    (self.pending is None and self.effect is None)
+                    or len(self.in_flight) >= self.max_in_flight
+                ):
+                    self.cond.wait(self.ack_timeout_ns / 1e9)
+                    self._expire(time.monotonic_ns())
+                if not self.running:
+                    return
+                if self.effect is not None:
+                    # what the board shows is now up to the effect
+                    cmds, mask = [self.effect], None
+                    self.effect = None
+                else:
+                    mask = self.pending
+                    self.pending = None
+                    cmds = self.commands(mask, self.last_sent)
+
+            port = self.context.serial_port
+            for cmd in cmds:
+                with self.cond:
+                    # text commands are acked one by one, so an update of
+                    # several waits for room before each
+                    while self.running and len(self.in_flight) >= self.max_in_flight:
+                        self.cond.wait(self.ack_timeout_ns / 1e9)
+                        self._expire(time.monotonic_ns())
+                    if not self.running:
+                        return
+                try:
+                    if port is None:
+                        raise serial.SerialException("board not connected")
+                    with self.write_lock:
+                        port.write(cmd)
+                except (serial.SerialException, OSError):
+                    with self.cond:
+                        self.stats["failed"] += 1
+                        # we no longer know what the board shows
+                        self.last_sent = None
+                        self.requested = None
+                    break
+                with self.cond:
+                    self.in_flight.append(time.monotonic_ns())
+                    self.stats["sent"] += 1
+            else:
+                with self.cond:
+                    self.last_sent = mask
@@ -0,0 +1,36 @@
+"""
+Modal screens that take over the keyboard without stopping the game loop.
+
+A modal draws itself when it opens and is then handed each frame's pygame
+events by the main loop until it closes. Button input, LED effects and the
+clock keep running underneath, and the game is redrawn once it closes.
+"""
+
+from typing import List
+
+import pygame
+
+from GameState import GameState
+
+
+class Modal:
+    """A screen in front of the game that gets the keyboard."""
+
+    def handle(self, context, events: List[pygame.event.Event]) -> bool:
+        """
+        Process one frame's events.
+
+        Returns:
+            bool: False once the modal has closed
+        """
+        return False
+
+
+class AnyKeyModal(Modal):
+    """A static screen (help, splash) that any key dismisses."""
+
+    def handle(self, context, events: List[pygame.event.Event]) -> bool:
+        if any(event.type == pygame.KEYDOWN for event in events):
+            context.state = GameState.IDLE
+            return False
+        return True
@@ -6,6 +6,9 @@ It allows users to navigate between different player name fields and save
 changes to the game state.
 """
 
+import math
+from typing import List, Optional
+
 import pygame
 import ptext
 import pygame_textinput
@@ -14,9 +17,10 @@ import game_config as config
 from GameState import GameState
 from Context import Context
 from drawutil import drawtext
+from Modal import Modal
 
 
-class NameEditor:
+class NameEditor(Modal):
     """
     Modal dialog for editing player names.
 
@@ -29,6 +33,7 @@ class NameEditor:
     INPUT_FONT_SIZE: int = 60
     INPUTS_OFFSET: int = 150  # Offset from top of modal where inputs begin
     LABEL_OFFSET: int = 100  # Offset from top of modal where labels begin
+    COLUMN_GAP: int = 40  # Space between columns of inputs
 
     def __init__(self, context: Context) -> None:
         """
@@ -54,22 +59,49 @@ class NameEditor:
         self.input_height = context.fonts["namefont"].get_height()
         self.input_spacing = self.input_height * 2  # Spacing between inputs
 
+        # Inputs run down the modal, then continue in another column
+        modal_height = context.screen_info.current_h - self.height * 2
+        self.rows = max(1, int((modal_height - self.INPUTS_OFFSET) // self.input_spacing))
+        self.columns = math.ceil(config.PLAYERS / self.rows)
+        self.xpos = self.width + 60  # Start a bit inset in the modal
+        self.input_width = (
+            context.screen_info.current_w - (self.width * 2) - 120
+            - (self.columns - 1) * self.COLUMN_GAP
+        ) / self.columns
+
+        # set up by open()
+        self.editing: int = 0
+        self.textmanager: Optional[pygame_textinput.TextInputManager] = None
+        self.textinput: Optional[pygame_textinput.TextInputVisualizer] = None
+
+    def input_origin(self, player: int) -> tuple:
+        """Top left of a player's name input."""
+        column, row = divmod(player, self.rows)
+        return (
+            self.xpos + column * (self.input_width + self.COLUMN_GAP),
+            self.height + self.INPUTS_OFFSET + (row * self.input_spacing),
+        )
+
+    def input_rect(self, player: int) -> tuple:
+        """Box drawn behind a player's name input."""
+        x, y = self.input_origin(player)
+        return (x - 4, y, self.input_width, self.input_height)
+
     def draw_modal(self) -> None:
         """Draw the modal background and structure."""
         # TODO: Implement modal drawing if needed
 
-    def run(self) -> None:
+    def open(self) -> None:
         """
-        Run the name editor modal.
+        Draw the name editor and start editing player 1's name.
 
-        This method handles the main interaction loop for editing player names.
-        It processes keyboard input, manages navigation between fields, and
-        saves changes to the game state.
+        The editor then stays up as context.modal: the main loop hands each
+        frame's events to handle() until ESC closes it.
         """
         self.context.state = GameState.INPUT
 
-        # Which name we are editing (0-3 for 4 players)
-        editing = 0
+        # Which name we are editing (0 to PLAYERS - 1)
+        self.editing = 0
 
         # Draw a modal box at 85% of the screen. Stop the clock.
         self.context.state = GameState.SETUP
@@ -98,9 +130,6 @@ class NameEditor:
             ),
         )
 
-        # Start a bit inset in the modal
-        xpos = self.width + 60
-
         # Center the title
         ptext.draw(
             "Edit Player Names (ESC to exit)",
@@ -115,21 +144,17 @@ class NameEditor:
             pygame.draw.rect(
                 self.context.screen,
                 config.THEME_COLORS["name_input_inactive_bg"],
-                (
-                    xpos - 4,
-                    self.height + self.INPUTS_OFFSET + (i * self.input_spacing),
-                    self.context.screen_info.current_w - (self.width * 2) - 120,
-                    self.input_height,
-                ),
+                self.input_rect(i),
             )
 
             # Input label
+            x, y = self.input_origin(i)
             drawtext(
                 self.context,
                 "robo36",
                 f"Player {(i+1)}",
-                xpos,
-                self.height + self.LABEL_OFFSET + (i * self.input_spacing),
+                x,
+                y - self.INPUTS_OFFSET + self.LABEL_OFFSET,
                 config.THEME_COLORS["name_input_modal_fg"],
                 config.THEME_COLORS["name_input_modal_bg"],
             )
@@ -139,149 +164,117 @@ class NameEditor:
                 self.context,
                 "namefont",
                 self.context.player_names[i],
-                xpos,
-                self.height + self.INPUTS_OFFSET + (i * self.input_spacing),
+                x,
+                y,
                 config.THEME_COLORS["name_input_inactive_fg"],
                 config.THEME_COLORS["name_input_inactive_bg"],
             )
 
         # This manager allows 10 char names
         limit_10 = lambda x: len(x) <= 10
-        textmanager = pygame_textinput.TextInputManager(validator=limit_10)
-
-        def make_textinput() -> pygame_textinput.TextInputVisualizer:
-            """Create a new text input visualizer with current settings."""
-            return pygame_textinput.TextInputVisualizer(
-                manager=textmanager,
-                font_color=config.THEME_COLORS["name_input_active_fg"],
-                cursor_color=config.THEME_COLORS["name_input_cursor"],
-                cursor_blink_interval=500,
-                font_object=self.context.fonts["namefont"],
-            )
+        self.textmanager = pygame_textinput.TextInputManager(validator=limit_10)
+        self.textinput = self.make_textinput()
 
-        textinput = make_textinput()
-
-        textinput.value = self.context.player_names[editing]
-        textmanager.cursor_pos = len(self.context.player_names[editing])
+        self.textinput.value = self.context.player_names[self.editing]
+        self.textmanager.cursor_pos = len(self.context.player_names[self.editing])
 
         pygame.key.set_repeat(200, 25)
-        clock = pygame.time.Clock()
+        self.context.modal = self
+
+    def make_textinput(self) -> pygame_textinput.TextInputVisualizer:
+        """Create a new text input visualizer with current settings."""
+        return pygame_textinput.TextInputVisualizer(
+            manager=self.textmanager,
+            font_color=config.THEME_COLORS["name_input_active_fg"],
+            cursor_color=config.THEME_COLORS["name_input_cursor"],
+            cursor_blink_interval=500,
+            font_object=self.context.fonts["namefont"],
+        )
 
-        while True:
-            # Clear the text input box, make it grey and put the text back.
-            pygame.draw.rect(
-                self.context.screen,
-                config.THEME_COLORS["name_input_active_bg"],
-                (
-                    xpos - 4,
-                    self.height + self.INPUTS_OFFSET + (editing * self.input_spacing),
-                    self.context.screen_info.current_w - (self.width * 2) - 120,
-                    self.input_height,
-                ),
-            )
+    def handle(self, context: Context, events: List[pygame.event.Event]) -> bool:
+        """
+        Process one frame of keyboard input and redraw the name being edited.
+
+        Args:
+            context: Game context
+            events: This frame's pygame events
+
+        Returns:
+            bool: False once ESC has closed the editor
+        """
+        editing = self.editing
+        # Clear the text input box, make it grey and put the text back.
+        pygame.draw.rect(
+            self.context.screen,
+            config.THEME_COLORS["name_input_active_bg"],
+            self.input_rect(editing),
+        )
 
-            events = pygame.event.get()
-            # Pass all of the events to textinput for input handling
-            textinput.update(events)
-
-            # See if we care about any of the events that just fired
-            for event in events:
-                if event.type == pygame.QUIT:
-                    print("Quitting..")
-                    if self.context.serial_port:
-                        print("Closing serial port")
-                        self.context.serial_port.close()
-                    pygame.quit()
-
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    self.context.state = GameState.IDLE
-                    self.context.player_names[editing] = textinput.value.strip()
-                    self.context.save()
-                    return
-
-                if event.type == pygame.KEYDOWN and (
-                    event.key
-                    in (pygame.K_UP, pygame.K_DOWN, pygame.K_RETURN, pygame.K_TAB)
-                ):
-                    # Store the old data
-                    self.context.player_names[editing] = textinput.value.strip()
-                    self.context.save()
-
-                    # Clear the text input box, make it grey and put the text back.
-                    pygame.draw.rect(
-                        self.context.screen,
-                        config.THEME_COLORS["name_input_inactive_bg"],
-                        (
-                            xpos - 4,
-                            self.height
-                            + self.INPUTS_OFFSET
-                            + (editing * self.input_spacing),
-                            self.context.screen_info.current_w - (self.width * 2) - 120,
-                            self.input_height,
-                        ),
-                    )
-
-                    drawtext(
-                        self.context,
-                        "namefont",
-                        self.context.player_names[editing],
-                        xpos,
-                        self.height
-                        + self.INPUTS_OFFSET
-                        + (editing * self.input_spacing),
-                        config.THEME_COLORS["name_input_inactive_fg"],
-                        config.THEME_COLORS["name_input_inactive_bg"],
-                    )
-
-                    # Move to the next row or go up if requested
-                    if event.key == pygame.K_UP:
-                        self.context.player_names[editing] = textinput.value.strip()
-                        editing = editing - 1
-
-                    if event.key in (pygame.K_DOWN, pygame.K_RETURN, pygame.K_TAB):
-                        self.context.player_names[editing] = textinput.value.strip()
-                        editing = editing + 1
-
-                    # Wrap around player indices
-                    if editing > 3:
-                        editing = 0
-
-                    if editing < 0:
-                        editing = 3
-
-                    # Get us a new object for this row
-                    del textinput
-                    textinput = make_textinput()
-
-                    textinput.value = self.context.player_names[editing]
-                    textmanager.cursor_pos = len(self.context.player_names[editing])
-
-                    # Break so we don't overprocess events
-                    break
-
-                # Clear the region
+        # Pass all of the events to textinput for input handling
+        self.textinput.update(events)
+
+        # See if we care about any of the events that just fired
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                self.context.state = GameState.IDLE
+                self.context.player_names[editing] = self.textinput.value.strip()
+                self.context.record("name", editing, self.context.player_names[editing])
+                return False
+
+            if event.type == pygame.KEYDOWN and (
+                event.key
+                in (pygame.K_UP, pygame.K_DOWN, pygame.K_RETURN, pygame.K_TAB)
+            ):
+                # Store the old data
+                self.context.player_names[editing] = self.textinput.value.strip()
+                self.context.record("name", editing, self.context.player_names[editing])
+
+                # Clear the text input box, make it grey and put the text back.
                 pygame.draw.rect(
                     self.context.screen,
-                    (30, 30, 30),
-                    (
-                        xpos - 4,
-                        self.height
-                        + self.INPUTS_OFFSET
-                        + (editing * self.input_spacing),
-                        self.context.screen_info.current_w - (self.width * 2) - 120,
-                        self.input_height,
-                    ),
+                    config.THEME_COLORS["name_input_inactive_bg"],
+                    self.input_rect(editing),
                 )
 
-            # Blit its surface onto the screen
-            # Use the original positioning to maintain compatibility
-            self.context.screen.blit(
-                textinput.surface,
-                (
-                    xpos,
-                    self.height + self.INPUTS_OFFSET + (editing * self.input_spacing),
-                ),
+                drawtext(
+                    self.context,
+                    "namefont",
+                    self.context.player_names[editing],
+                    *self.input_origin(editing),
+                    config.THEME_COLORS["name_input_inactive_fg"],
+                    config.THEME_COLORS["name_input_inactive_bg"],
+                )
+
+                # Move to the next row or go up if requested
+                if event.key == pygame.K_UP:
+                    editing = editing - 1
+
+                if event.key in (pygame.K_DOWN, pygame.K_RETURN, pygame.K_TAB):
+                    editing = editing + 1
+
+                # Wrap around player indices
+                editing %= config.PLAYERS
+                self.editing = editing
+
+                # Get us a new object for this row
+                self.textinput = self.make_textinput()
+
+                self.textinput.value = self.context.player_names[editing]
+                self.textmanager.cursor_pos = len(self.context.player_names[editing])
+
+                # Break so we don't overprocess events
+                break
+
+            # Clear the region
+            pygame.draw.rect(
+                self.context.screen,
+                (30, 30, 30),
+                self.input_rect(editing),
             )
 
-            clock.tick(30)
-            pygame.display.update()
+        # Blit its surface onto the screen
+        # Use the original positioning to maintain compatibility
+        self.context.screen.blit(self.textinput.surface, self.input_origin(editing))
+
+        pygame.display.update()
+        return True
@@ -0,0 +1,390 @@
+"""
+Wireless buzzers over UDP.
+
+Handheld buzzers (board/handheld_Buzzer) join the Wi-Fi network and report
+each press and release in a small datagram. The server acks every datagram
+and a buzzer sends it again until the ack arrives, so repeats are dropped by
+sequence number. Buzzers stamp datagrams with their own clock; the server
+learns how that clock lines up with the host's from when datagrams arrive,
+so wireless presses are arbitrated by when they happened, just like presses
+from a serial board or the GPIO pins.
+
+Datagram from a buzzer, little endian:
+
+    "GB"  version  type  device id (u16)  sequence (u16)  edge_us (u64)  sent_us (u64)
+
+type is PRESS, RELEASE or HELLO (a heartbeat, edge_us unused). edge_us is the
+buzzer's clock when the button moved and sent_us when this copy was sent, so
+a resend repeats edge_us with a new sent_us. The ack echoes the device id
+and sequence, with the host's monotonic time when the datagram arrived:
+
+    "GB"  version  ACK  device id (u16)  sequence (u16)  host_us (u64)
+"""
+
+import asyncio
+import struct
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Set, Tuple
+
+MAGIC = b"GB"
+NET_VERSION = 1
+
+PACKET_PRESS = 0x01
+PACKET_RELEASE = 0x02
+PACKET_HELLO = 0x03
+PACKET_ACK = 0x81
+
+_PACKET_FORMAT = "<2sBBHHQQ"
+_ACK_FORMAT = "<2sBBHHQ"
+PACKET_SIZE = struct.calcsize(_PACKET_FORMAT)
+ACK_SIZE = struct.calcsize(_ACK_FORMAT)
+
+# a datagram this much later than the clock estimate means the buzzer rebooted
+CLOCK_JUMP_US = 1_000_000
+
+
+class Packet(NamedTuple):
+    """A decoded datagram from a buzzer."""
+    type: int
+    device: int
+    sequence: int
+    edge_us: int
+    sent_us: int
+
+
+class Edge(NamedTuple):
+    """A press or release from a buzzer, on the host clock."""
+    device: int
+    sequence: int
+    player: int         # zero based
+    pressed: bool
+    timestamp_us: int   # host monotonic microseconds
+    arrival_ns: int     # host monotonic time the datagram arrived
+
+
+def encode_packet(packet_type: int, device: int, sequence: int, edge_us: int, sent_us: int) -> bytes:
+    """Datagram a buzzer sends."""
+    return struct.pack(
+        _PACKET_FORMAT, MAGIC, NET_VERSION, packet_type, device & 0xFFFF, sequence & 0xFFFF,
+        edge_us & 0xFFFFFFFFFFFFFFFF, sent_us & 0xFFFFFFFFFFFFFFFF,
+    )
+
+
+def decode_packet(data: bytes) -> Optional[Packet]:
+    """
+    Parse a buzzer datagram.
+
+    Returns:
+        Optional[Packet]: None if the datagram is not a valid buzzer packet
+    """
+    if len(data) != PACKET_SIZE:
+        return None
+    magic, version, packet_type, device, sequence, edge_us, sent_us = struct.unpack(_PACKET_FORMAT, data)
+    if magic != MAGIC or version != NET_VERSION:
+        return None
+    if packet_type not in (PACKET_PRESS, PACKET_RELEASE, PACKET_HELLO):
+        return None
+    return Packet(packet_type, device, sequence, edge_us, sent_us)
+
+
+def encode_ack(device: int, sequence: int, host_us: int) -> bytes:
+    """Datagram acknowledging a buzzer packet."""
+    return struct.pack(_ACK_FORMAT, MAGIC, NET_VERSION, PACKET_ACK, device & 0xFFFF,
+                       sequence & 0xFFFF, host_us)
+
+
+def decode_ack(data: bytes) -> Optional[Tuple[int, int, int]]:
+    """
+    Parse an ack.
+
+    Returns:
+        Optional[Tuple[int, int, int]]: (device, sequence, host_us), or None
+    """
+    if len(data) != ACK_SIZE:
+        return None
+    magic, version, packet_type, device, sequence, host_us = struct.unpack(_ACK_FORMAT, data)
+    if magic != MAGIC or version != NET_VERSION or packet_type != PACKET_ACK:
+        return None
+    return device, sequence, host_us
+
+
+class DeviceClock:
+    """
+    Offset of a buzzer's clock from the host's, from one-way arrivals.
+
+    Each datagram gives arrival time minus sent_us, which is the offset plus
+    however long the datagram took. That delay is never negative, so the
+    smallest recent value is the best estimate; how far the others spread
+    above it is the jitter. All buzzers on the same network share roughly
+    the same smallest delay, so it cancels out when their presses are
+    compared.
+    """
+
+    def __init__(self, window: int = 32) -> None:
+        """
+        Args:
+            window: How many recent datagrams to keep
+        """
+        self.samples: Deque[int] = deque(maxlen=window)
+
+    @property
+    def synced(self) -> bool:
+        """True once a datagram has arrived."""
+        return len(self.samples) > 0
+
+    def add(self, sent_us: int, received_us: int) -> None:
+        """Record one datagram's send and arrival times."""
+        self.samples.append(received_us - sent_us)
+
+    @property
+    def offset_us(self) -> int:
+        """Host time minus buzzer time."""
+        return min(self.samples)
+
+    @property
+    def jitter_us(self) -> int:
+        """Mean delay beyond the quickest datagram in the window."""
+        best = self.offset_us
+        return sum(sample - best for sample in self.samples) // len(self.samples)
+
+    def to_host_us(self, device_us: int) -> int:
+        """Convert a buzzer timestamp to host monotonic microseconds."""
+        return device_us + self.offset_us
+
+    def reset(self) -> None:
+        """Forget all samples, e.g. after the buzzer rebooted."""
+        self.samples.clear()
+
+
+class Device:
+    """What the server knows about one buzzer."""
+
+    # how many recent sequence numbers are remembered to spot repeats
+    SEEN = 64
+
+    def __init__(self, device: int, player: Optional[int]) -> None:
+        self.device: int = device
+        self.player: Optional[int] = player
+        self.address: Optional[Tuple[str, int]] = None
+        self.clock: DeviceClock = DeviceClock()
+        self.seen: Deque[int] = deque()
+        self.seen_set: Set[int] = set()
+        self.highest: Optional[int] = None
+        self.last_seen_ns: int = 0
+        self.stats: Dict[str, int] = {
+            "packets": 0,     # datagrams received, repeats included
+            "edges": 0,       # presses and releases passed on
+            "duplicates": 0,  # repeats of an edge already passed on
+            "lost": 0,        # sequence numbers skipped and never seen
+            "restarts": 0,    # times the buzzer's clock started over
+        }
+
+    def first_time(self, sequence: int) -> bool:
+        """
+        Note a sequence number, counting gaps.
+
+        Returns:
+            bool: False if the sequence number was seen recently
+        """
+        if sequence in self.seen_set:
+            return False
+        if self.highest is None:
+            self.highest = sequence
+        else:
+            ahead = (sequence - self.highest) & 0xFFFF
+            if ahead < 0x8000:
+                self.stats["lost"] += ahead - 1
+                self.highest = sequence
+            elif self.stats["lost"] > 0:
+                # a late one that was counted as lost
+                self.stats["lost"] -= 1
+
+        self.seen.append(sequence)
+        self.seen_set.add(sequence)
+        if len(self.seen) > self.SEEN:
+            self.seen_set.discard(self.seen.popleft())
+        return True
+
+    def restart(self) -> None:
+        """Forget the clock and sequence numbers of a rebooted buzzer."""
+        self.clock.reset()
+        self.seen.clear()
+        self.seen_set.clear()
+        self.highest = None
+        self.stats["restarts"] += 1
+
+
+class BuzzerServer(asyncio.DatagramProtocol):
+    """
+    Receives buzzer datagrams, acks them and queues their edges.
+
+    Runs on an asyncio event loop; edges are read from another thread with
+    drain().
+    """
+
+    def __init__(self, players: int, player_map: Optional[Dict[int, int]] = None) -> None:
+        """
+        Args:
+            players: Number of players
+            player_map: Device id to zero based player. Without one, device n
+                plays as player n, wrapping around past the last player
+        """
+        self.players: int = players
+        self.player_map: Dict[int, int] = dict(player_map or {})
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.devices: Dict[int, Device] = {}
+        self.edges: Deque[Edge] = deque()
+        self.stats: Dict[str, int] = {"datagrams": 0, "malformed": 0, "unmapped": 0}
+
+    def player_for(self, device: int) -> Optional[int]:
+        """Zero based player a device plays as, or None."""
+        if self.player_map:
+            return self.player_map.get(device)
+        return (device - 1) % self.players
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        received_ns = time.monotonic_ns()
+        self.stats["datagrams"] += 1
+        packet = decode_packet(data)
+        if packet is None:
+            self.stats["malformed"] += 1
+            return
+        # ack first: the buzzer is waiting, and a repeat needs its ack too
+        self.transport.sendto(encode_ack(packet.device, packet.sequence, received_ns // 1000), addr)
+        self.handle(packet, addr, received_ns)
+
+    def handle(self, packet: Packet, addr, received_ns: int) -> Optional[Edge]:
+        """
+        Update the device a packet came from and queue its edge.
+
+        Returns:
+            Optional[Edge]: The queued edge, None for heartbeats and repeats
+        """
+        device = self.devices.get(packet.device)
+        if device is None:
+            device = self.devices[packet.device] = Device(packet.device, self.player_for(packet.device))
+        device.address = addr
+        device.last_seen_ns = received_ns
+        device.stats["packets"] += 1
+
+        received_us = received_ns // 1000
+        clock = device.clock
+        if clock.synced and received_us - packet.sent_us > clock.offset_us + CLOCK_JUMP_US:
+            device.restart()
+        clock.add(packet.sent_us, received_us)
+
+        first = device.first_time(packet.sequence)
+        if packet.type == PACKET_HELLO:
+            return None
+        if not first:
+            device.stats["duplicates"] += 1
+            return None
+        if device.player is None:
+            self.stats["unmapped"] += 1
+            return None
+
+        device.stats["edges"] += 1
+        edge = Edge(
+            packet.device, packet.sequence, device.player, packet.type == PACKET_PRESS,
+            clock.to_host_us(packet.edge_us), received_ns,
+        )
+        self.edges.append(edge)
+        return edge
+
+    def drain(self) -> List[Edge]:
+        """Take every queued edge. Safe to call from any thread."""
+        edges = []
+        while self.edges:
+            edges.append(self.edges.popleft())
+        return edges
+
+    def device_stats(self) -> Dict[int, Dict[str, int]]:
+        """Counters, clock offset and jitter for every device seen."""
+        return {
+            device.device: dict(
+                device.stats, player=device.player,
+                offset_us=device.clock.offset_us, jitter_us=device.clock.jitter_us,
+            )
+            for device in self.devices.values()
+        }
+
+
+class NetworkInput:
+    """
+    Runs a BuzzerServer on its own asyncio event loop thread.
+    """
+
+    def __init__(
+        self, host: str, port: int, players: int, player_map: Optional[Dict[int, int]] = None
+    ) -> None:
+        """
+        Args:
+            host: Address to listen on, "0.0.0.0" for every interface
+            port: UDP port, 0 for any free port
+            players: Number of players
+            player_map: Device id to zero based player, see BuzzerServer
+        """
+        self.host: str = host
+        self.port: int = port
+        self.server: BuzzerServer = BuzzerServer(players, player_map)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[OSError] = None
+        self.ready = threading.Event()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """The (host, port) actually listened on."""
+        return self.server.transport.get_extra_info("sockname")[:2]
+
+    def start(self) -> None:
+        """
+        Start listening.
+
+        Raises:
+            OSError: If the port cannot be bound
+        """
+        self.ready.clear()
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="net-buzzers", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error:
+            self.thread.join()
+            self.thread = None
+            raise self.error
+
+    def stop(self) -> None:
+        """Stop listening and end the thread."""
+        if self.loop and self.thread:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=1)
+        self.thread = None
+
+    def drain(self) -> List[Edge]:
+        """Take every edge received since the last call."""
+        return self.server.drain()
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        try:
+            transport, _ = self.loop.run_until_complete(self.loop.create_datagram_endpoint(
+                lambda: self.server, local_addr=(self.host, self.port)
+            ))
+        except OSError as err:
+            self.error = err
+            self.ready.set()
+            self.loop.close()
+            return
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            transport.close()
+            self.loop.run_until_complete(asyncio.sleep(0))
+            self.loop.close()
@@ -0,0 +1,448 @@
+"""
+PTY firmware emulator: the board emulator behind a pseudo-terminal.
+
+PtyBoard runs a BoardEmulator (which speaks the exact text and binary
+protocols of firmware/gameshow_to_serial.ino) on a pty pair, so the game
+opens it by device path, through pyserial and the real handshake, exactly
+like the USB board. Like the Nano, the board resets when the host opens the
+port: the host's termios change is noticed and "RESET OK" follows after
+reset_ms.
+
+On top of the protocol it can:
+
+- run scripted scenarios: presses, releases and taps at set times
+- send bursts of thousands of presses per second
+- record what it sent and replay recorded traces verbatim
+- delay its output (latency_ms, jitter_ms) and corrupt bytes (corrupt_rate)
+- be unplugged and plugged back in behind a stable symlink (link_path)
+
+Run it on its own and point the game at it with
+SERIAL_DEVICE = "/tmp/gameshow-board" in settings.toml:
+
+    python PtyBoard.py --link /tmp/gameshow-board --burst 5000 --rate 2000
+
+POSIX only.
+"""
+
+import argparse
+import heapq
+import itertools
+import os
+import random
+import select
+import termios
+import threading
+import time
+import tty
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from BoardEmulator import BoardEmulator
+
+
+def load_trace(path: str) -> List[Tuple[float, bytes]]:
+    """
+    Read a recorded trace.
+
+    Each line is "<ms since start> <bytes as hex>"; blank lines and lines
+    starting with # are skipped.
+
+    Returns:
+        List[Tuple[float, bytes]]: (ms, data) entries in file order
+    """
+    trace = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            at_ms, _, data = line.partition(" ")
+            trace.append((float(at_ms), bytes.fromhex(data)))
+    return trace
+
+
+def save_trace(path: str, trace: Sequence[Tuple[float, bytes]]) -> None:
+    """Write a trace in the format read by load_trace()."""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("# ms since start, bytes sent by the board\n")
+        for at_ms, data in trace:
+            file.write("%.3f %s\n" % (at_ms, data.hex()))
+
+
+class PtyBoard:
+    """
+    A BoardEmulator served on a pseudo-terminal.
+
+    Everything the board does happens on one pump thread, in time order.
+    Button presses can be injected from any thread with press(), release()
+    and tap(), or scheduled ahead with at(), script() and burst().
+    """
+
+    # longest the pump thread sleeps between checks
+    POLL_S = 0.001
+    # our idle line speed; pyserial sets 115200 when it opens the port
+    IDLE_SPEED = termios.B9600
+
+    def __init__(
+        self,
+        board: Optional[BoardEmulator] = None,
+        reset_ms: int = 50,
+        link_path: Optional[str] = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        corrupt_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            board: Emulator to serve, defaults to a binary capable 4 channel board
+            reset_ms: Delay between the host opening the port and "RESET OK"
+            link_path: Stable symlink to the pty, kept across unplug/replug
+            latency_ms: Delay added to everything the board sends
+            jitter_ms: Random extra delay, up to this much, per write
+            corrupt_rate: Chance of flipping one bit in each byte sent
+            seed: Random seed for jitter and corruption
+        """
+        self.board: BoardEmulator = board if board else BoardEmulator()
+        self.reset_ms: int = reset_ms
+        self.link_path: Optional[str] = link_path
+        self.latency_ms: float = latency_ms
+        self.jitter_ms: float = jitter_ms
+        self.corrupt_rate: float = corrupt_rate
+        self.random = random.Random(seed)
+
+        self.master_fd: int = -1
+        self.slave_fd: int = -1
+        self.pty_path: str = ""
+        self.plugged: bool = False
+
+        self.opens: int = 0
+        self.booted: bool = False
+        self.boot_at: Optional[float] = None
+        self.started: float = time.monotonic()
+        self.last_due: float = 0.0
+        self.generation: int = 0
+
+        # (due, seq, action) run by the pump thread
+        self.schedule: List[Tuple[float, int, Callable[[], None]]] = []
+        self.seq = itertools.count()
+        # (ms since start, bytes) the board sent, while recording
+        self.recording: Optional[List[Tuple[float, bytes]]] = None
+        self.stats = {"sent": 0, "received": 0, "corrupted": 0}
+
+        self.running: bool = False
+        self.lock = threading.RLock()
+        self.thread: Optional[threading.Thread] = None
+
+        self.plug()
+
+    @property
+    def device(self) -> str:
+        """Path the host opens: the symlink if there is one, else the pty."""
+        return self.link_path or self.pty_path
+
+    # ------------------------------------------------------------------
+    # lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "PtyBoard":
+        """Start serving the board."""
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="pty-board", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving, close the pty and remove the symlink."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+        self.unplug()
+        if self.link_path and os.path.islink(self.link_path):
+            os.unlink(self.link_path)
+
+    def plug(self) -> None:
+        """Connect the board: a new pty, pointed to by link_path if set."""
+        with self.lock:
+            if self.plugged:
+                return
+            self.master_fd, self.slave_fd = os.openpty()
+            self.pty_path = os.ttyname(self.slave_fd)
+            # raw, so nothing the board sends is echoed back to it
+            tty.setraw(self.slave_fd)
+            attrs = termios.tcgetattr(self.slave_fd)
+            attrs[4] = attrs[5] = self.IDLE_SPEED
+            termios.tcsetattr(self.slave_fd, termios.TCSANOW, attrs)
+
+            if self.link_path:
+                tmp = self.link_path + ".new"
+                if os.path.lexists(tmp):
+                    os.unlink(tmp)
+                os.symlink(self.pty_path, tmp)
+                os.replace(tmp, self.link_path)
+
+            self.booted = False
+            self.boot_at = None
+            self.plugged = True
+
+    def unplug(self) -> None:
+        """
+        Yank the cable: the pty goes away and the host's reads fail.
+
+        The symlink goes too, as /dev/serial/by-id entries do.
+        """
+        with self.lock:
+            if not self.plugged:
+                return
+            self.plugged = False
+            self.booted = False
+            # bytes still in flight are lost with the cable
+            self.generation += 1
+            for fd in (self.master_fd, self.slave_fd):
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            self.master_fd = self.slave_fd = -1
+            if self.link_path and os.path.lexists(self.link_path):
+                os.unlink(self.link_path)
+
+    # ------------------------------------------------------------------
+    # buttons
+    # ------------------------------------------------------------------
+
+    def press(self, channel: int, timestamp_us: Optional[int] = None) -> None:
+        """Press a button (1 based channel) and send the event to the host."""
+        with self.lock:
+            self.board.press(channel, timestamp_us)
+            self._send()
+
+    def release(self, channel: int, timestamp_us: Optional[int] = None) -> None:
+        """Release a button (1 based channel) and send the event to the host."""
+        with self.lock:
+            self.board.release(channel, timestamp_us)
+            self._send()
+
+    def at(self, delay_ms: float, action: Callable[[], None]) -> None:
+        """Run action on the pump thread delay_ms from now."""
+        with self.lock:
+            heapq.heappush(
+                self.schedule, (time.monotonic() + delay_ms / 1000, next(self.seq), action)
+            )
+
+    def tap(self, channel: int, hold_ms: float = 100, delay_ms: float = 0) -> None:
+        """
+        Press a button and release it hold_ms later.
+
+        In text mode the release reports how long it was held, as
+        "SWITCH n RELEASED (down <hold> mS)".
+        """
+        self.at(delay_ms, lambda: self.press(channel))
+        self.at(delay_ms + hold_ms, lambda: self.release(channel))
+
+    def script(self, steps: Sequence[Tuple[float, int, bool]]) -> None:
+        """
+        Schedule a scenario.
+
+        Args:
+            steps: (ms from now, 1 based channel, pressed) entries
+        """
+        for at_ms, channel, pressed in steps:
+            self.at(at_ms, (lambda ch=channel: self.press(ch)) if pressed
+                    else (lambda ch=channel: self.release(ch)))
+
+    def burst(
+        self,
+        count: int,
+        rate_hz: float,
+        channels: Optional[Sequence[int]] = None,
+        delay_ms: float = 0,
+    ) -> None:
+        """
+        Schedule count presses at rate_hz, cycling through channels.
+
+        Each press is released halfway to the next one on its channel, so
+        every press is reported.
+        """
+        channels = list(channels or range(1, self.board.channels + 1))
+        step_ms = 1000 / rate_hz
+        hold_ms = step_ms * len(channels) / 2
+        for n in range(count):
+            self.tap(channels[n % len(channels)], hold_ms, delay_ms + n * step_ms)
+
+    # ------------------------------------------------------------------
+    # traces
+    # ------------------------------------------------------------------
+
+    def record(self) -> None:
+        """Start recording everything the board sends."""
+        with self.lock:
+            self.recording = []
+
+    def recorded(self) -> List[Tuple[float, bytes]]:
+        """Stop recording and return the trace, with times from the first write."""
+        with self.lock:
+            trace, self.recording = self.recording or [], None
+        if not trace:
+            return []
+        first = trace[0][0]
+        return [(at_ms - first, data) for at_ms, data in trace]
+
+    def replay(self, trace: Sequence[Tuple[float, bytes]], delay_ms: float = 0) -> None:
+        """
+        Send a recorded trace to the host verbatim, keeping its timing.
+
+        The emulated board's state is not changed by replayed bytes.
+        """
+        for at_ms, data in trace:
+            self.at(delay_ms + at_ms, lambda data=data: self._output(data))
+
+    # ------------------------------------------------------------------
+    # pump
+    # ------------------------------------------------------------------
+
+    def _host_opened(self) -> bool:
+        # master and slave share termios, so pyserial's settings show up here
+        return termios.tcgetattr(self.slave_fd)[4] != self.IDLE_SPEED
+
+    def _send(self) -> None:
+        # caller holds self.lock; nothing goes out before the board has booted
+        waiting = self.board.inWaiting()
+        if waiting:
+            data = self.board.read(waiting)
+            if self.booted:
+                self._output(data)
+
+    def _output(self, data: bytes) -> None:
+        # apply the configured faults, then write now or when due
+        with self.lock:
+            if not self.plugged:
+                return
+            if self.corrupt_rate:
+                data = bytearray(data)
+                for i in range(len(data)):
+                    if self.random.random() < self.corrupt_rate:
+                        data[i] ^= 1 << self.random.randrange(8)
+                        self.stats["corrupted"] += 1
+                data = bytes(data)
+            if self.recording is not None:
+                self.recording.append(((time.monotonic() - self.started) * 1000, data))
+
+            delay_s = (self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000
+            if not delay_s:
+                self._write(data, self.generation)
+                return
+            # serial is first in first out, so jitter never reorders bytes
+            due = max(time.monotonic() + delay_s, self.last_due)
+            self.last_due = due
+            generation = self.generation
+            heapq.heappush(
+                self.schedule, (due, next(self.seq), lambda: self._write(data, generation))
+            )
+
+    def _write(self, data: bytes, generation: int) -> None:
+        with self.lock:
+            if not self.plugged or generation != self.generation:
+                return
+            try:
+                os.write(self.master_fd, data)
+            except OSError:
+                return
+            self.stats["sent"] += len(data)
+
+    def _boot(self) -> None:
+        # caller holds self.lock
+        self.board.reset_input_buffer()
+        self.board.boot()
+        self.booted = True
+        self.boot_at = None
+        self._send()
+
+    def _run_due(self) -> float:
+        # run everything scheduled up to now, return seconds to the next item
+        while True:
+            with self.lock:
+                if not self.schedule:
+                    return self.POLL_S
+                due, _, action = self.schedule[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    return min(wait, self.POLL_S)
+                heapq.heappop(self.schedule)
+            action()
+
+    def _run(self) -> None:
+        while self.running:
+            timeout = self._run_due()
+            if not self.plugged:
+                time.sleep(timeout)
+                continue
+
+            try:
+                readable, _, _ = select.select([self.master_fd], [], [], timeout)
+                data = os.read(self.master_fd, 4096) if readable else b""
+            except (OSError, ValueError):
+                # unplugged while we waited
+                continue
+
+            with self.lock:
+                if not self.plugged:
+                    continue
+                if self.boot_at is None and not self.booted and self._host_opened():
+                    self.opens += 1
+                    self.boot_at = time.monotonic() + self.reset_ms / 1000
+                if self.boot_at is not None and time.monotonic() >= self.boot_at:
+                    self._boot()
+                if data and self.booted:
+                    self.stats["received"] += len(data)
+                    self.board.write(data)
+                    self._send()
+
+
+def main():
+    """Serve an emulated board until interrupted."""
+    parser = argparse.ArgumentParser(description="Emulated buzzer board on a pseudo-terminal")
+    parser.add_argument("--link", help="stable symlink to create for the pty")
+    parser.add_argument("--text-only", action="store_true", help="emulate firmware without the binary protocol")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to everything sent")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra delay per write")
+    parser.add_argument("--corrupt-rate", type=float, default=0.0, help="chance of corrupting each byte")
+    parser.add_argument("--burst", type=int, default=0, help="presses to send once the game connects")
+    parser.add_argument("--rate", type=float, default=1000.0, help="burst presses per second")
+    parser.add_argument("--replay", help="trace to send once the game connects")
+    parser.add_argument("--record", help="write everything sent to this trace on exit")
+    args = parser.parse_args()
+
+    board = PtyBoard(
+        BoardEmulator(binary_capable=not args.text_only),
+        link_path=args.link,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        corrupt_rate=args.corrupt_rate,
+    ).start()
+    if args.record:
+        board.record()
+    print("Emulated board on %s" % board.device)
+
+    try:
+        while not board.booted:
+            time.sleep(0.01)
+        print("Host connected")
+        # give the host time to negotiate the protocol
+        if args.burst:
+            board.burst(args.burst, args.rate, delay_ms=500)
+        if args.replay:
+            board.replay(load_trace(args.replay), delay_ms=500)
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.record:
+            save_trace(args.record, board.recorded())
+        board.stop()
+
+
+if __name__ == "__main__":
+    main()
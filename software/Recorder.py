@@ -0,0 +1,174 @@
+"""
+Input recording, to replay a show later.
+
+While RECORD_FILE is set, every input the game sees is appended to a
+compact log: each button press or release a backend hands to the main loop
+(parsed serial frames and text lines, GPIO edges, network and simulated
+presses alike), every key press and the window being closed. Each line is a
+JSON array stamped with the microseconds since recording started:
+
+    ["i", t, player, pressed, timestamp_us, arrival]   backend input
+    ["k", t, key, mod, unicode]                        key press
+    ["q", t]                                           window closed
+    ["x", t]                                           end of recording
+
+The first line is a header with the seed the particle effects' random
+numbers were drawn from, the settings that change how input is handled, and
+the scores, names and clock the show started with. replay.py feeds the log
+back through events.py headless; timers and the countdown run again from
+the same clock, so they are not logged.
+"""
+
+import atexit
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pygame
+
+import game_config as config
+
+FORMAT = 1
+
+# settings that change what the same input does, applied again on replay
+RECORDED_SETTINGS: Tuple[str, ...] = (
+    "PLAYERS", "FPS", "CLOCK_ENABLED", "MAX_CLOCK", "CLOCK_STEP", "ANSWER_TIME_MS",
+    "ARBITRATION_WINDOW_MS", "DEBOUNCE_MS", "MIN_PRESS_MS", "UNIQUE_PLAYER_SOUNDS",
+)
+
+
+class Recorder:
+    """Appends the game's input to a log file."""
+
+    def __init__(self, path: str, context, seed: Optional[int] = None) -> None:
+        """
+        Open the log and write its header.
+
+        Args:
+            path: Log file, overwritten
+            context (Context): Game context, with the backend open and any
+                saved state restored
+            seed: Seed for the random module, defaults to a random one
+
+        Note:
+            - Seeds the random module, so particle effects replay the same
+        """
+        self.now_ns = context.now_ns
+        self.started_ns: int = self.now_ns()
+        self.seed: int = random.randrange(2**32) if seed is None else seed
+        random.seed(self.seed)
+        self.entries: int = 0
+
+        self.file = open(path, "w", encoding="utf-8")
+        self.write({
+            "format": FORMAT,
+            "seed": self.seed,
+            "recorded": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "platform": context.backend.name,
+            "emulated_keys": [list(keys) for keys in context.backend.emulated_keys],
+            "settings": {name: getattr(config, name) for name in RECORDED_SETTINGS},
+            "state": {
+                **context.snapshot(),
+                "clock_ms": context.clock,
+                "state": context.state.name,
+            },
+        })
+        # a clean exit or quit key ends the game with sys.exit()
+        atexit.register(self.close)
+
+    def now_us(self) -> int:
+        """Microseconds since recording started."""
+        return (self.now_ns() - self.started_ns) // 1000
+
+    def write(self, entry: Any) -> None:
+        self.file.write(json.dumps(entry, separators=(",", ":")))
+        self.file.write("\n")
+
+    def inputs(self, events) -> None:
+        """
+        Record what a backend poll returned.
+
+        Args:
+            events (List[InputEvent]): Presses and releases, before debounce
+        """
+        if not events or self.file.closed:
+            return
+        t = self.now_us()
+        for event in events:
+            arrival = (event.arrival_ns - self.started_ns) // 1000
+            self.write(["i", t, event.player, int(event.pressed), event.timestamp_us, arrival])
+            self.entries += 1
+
+    def pygame_events(self, events) -> None:
+        """
+        Record the key presses and window close among a frame's pygame events.
+
+        Args:
+            events (List[pygame.event.Event]): The frame's events
+        """
+        if self.file.closed:
+            return
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                self.write(["k", self.now_us(), event.key, event.mod, getattr(event, "unicode", "")])
+            elif event.type == pygame.QUIT:
+                self.write(["q", self.now_us()])
+            else:
+                continue
+            self.entries += 1
+
+    def close(self) -> None:
+        """Mark the end of the recording and close the file. Safe to call twice."""
+        if self.file.closed:
+            return
+        self.write(["x", self.now_us()])
+        self.file.close()
+        atexit.unregister(self.close)
+
+
+def start_recording(context) -> Optional[Recorder]:
+    """
+    Start recording to RECORD_FILE, if it is set.
+
+    strftime() codes in the name give each show its own file, e.g.
+    "shows/%Y%m%d-%H%M%S.jsonl".
+
+    Returns:
+        Optional[Recorder]: The recorder, also set as context.recorder
+    """
+    if not config.RECORD_FILE:
+        return None
+    path = time.strftime(config.RECORD_FILE)
+    context.recorder = Recorder(path, context)
+    print(f"Recording input to {path}")
+    return context.recorder
+
+
+def load_recording(path: str) -> Tuple[Dict[str, Any], List[List[Any]]]:
+    """
+    Read a log written by Recorder.
+
+    Returns:
+        Tuple[Dict[str, Any], List[List[Any]]]: The header and the entries
+        in order
+
+    Raises:
+        ValueError: If the file is not a recording this version can replay
+    """
+    with open(path, encoding="utf-8") as file:
+        lines = [line for line in file if line.strip()]
+    if not lines:
+        raise ValueError(f"{path} is empty")
+    header = json.loads(lines[0])
+    if not isinstance(header, dict) or header.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a format {FORMAT} recording")
+    entries = []
+    for n, line in enumerate(lines[1:], 2):
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            # the game stopped partway through writing its last line
+            if n < len(lines):
+                raise ValueError(f"{path}: line {n} is not valid") from None
+    return header, entries
@@ -0,0 +1,205 @@
+"""
+Game timers: one-shot and periodic, on the monotonic clock.
+
+The game used to have a single repeating pygame timer event for its clock.
+Scheduler keeps any number of timers in a heap ordered by when they are
+due, so the main loop can sleep exactly until the next one instead of
+polling, and each timer can be cancelled or moved.
+
+Timers run on whichever thread drives the scheduler (the main loop or the
+asyncio loop); they are not safe to add from other threads. Other threads
+can cut run_until()'s sleep short by setting woken.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class Timer:
+    """A scheduled callback. Keep it to cancel or reschedule it."""
+
+    def __init__(self, callback: Callable[..., Any], args: Tuple[Any, ...], due_ns: int, period_ns: int) -> None:
+        self.callback: Callable[..., Any] = callback
+        self.args: Tuple[Any, ...] = args
+        self.due_ns: int = due_ns
+        # 0 for a one-shot timer
+        self.period_ns: int = period_ns
+        self.active: bool = True
+        # which of this timer's heap entries is current; older ones are skipped
+        self.entry: int = 0
+
+    def __repr__(self) -> str:
+        name = getattr(self.callback, "__name__", repr(self.callback))
+        return f"Timer({name}, due_ns={self.due_ns}, period_ns={self.period_ns}, active={self.active})"
+
+
+class Scheduler:
+    """
+    Timers kept in a heap by due time.
+
+    Cancelled and rescheduled timers leave their old heap entry behind, and
+    it is dropped when it reaches the top, so both are O(1) apart from the
+    push of the new entry.
+    """
+
+    def __init__(self, now_ns: Callable[[], int] = time.monotonic_ns,
+                 sleep: Optional[Callable[[float], Any]] = None) -> None:
+        """
+        Args:
+            now_ns: Monotonic time source, for tests and replays
+            sleep: Sleep function taking seconds, on the same clock;
+                defaults to waiting on woken, so setting it wakes the sleeper
+        """
+        self.now_ns: Callable[[], int] = now_ns
+        # set from any thread to make run_until() return early; whoever set
+        # it clears it once it has dealt with what woke the loop
+        self.woken: threading.Event = threading.Event()
+        self.sleep: Callable[[float], Any] = sleep or self.woken.wait
+        self.heap: List[Tuple[int, int, Timer]] = []
+        self.entries = itertools.count(1)
+        # called when a timer becomes due sooner than the one a sleeper is waiting for
+        self.on_change: Optional[Callable[[], None]] = None
+
+    def __len__(self) -> int:
+        """Number of active timers."""
+        return sum(1 for _, entry, timer in self.heap if timer.active and timer.entry == entry)
+
+    def call_later(self, delay_ms: float, callback: Callable[..., Any], *args: Any) -> Timer:
+        """
+        Run callback(*args) once, delay_ms from now.
+
+        Returns:
+            Timer: Handle to cancel or reschedule it
+        """
+        timer = Timer(callback, args, self.now_ns() + int(delay_ms * 1_000_000), 0)
+        self.push(timer)
+        return timer
+
+    def call_every(self, period_ms: float, callback: Callable[..., Any], *args: Any,
+                   first_ms: Optional[float] = None) -> Timer:
+        """
+        Run callback(*args) every period_ms, the first time after first_ms
+        (default one period).
+
+        Each run is due a whole number of periods after the first, so time
+        spent in the callback does not push later runs back. Runs missed
+        while the loop was busy are not made up: the timer runs once and
+        carries on from the next period.
+
+        Returns:
+            Timer: Handle to cancel or reschedule it
+        """
+        period_ns = int(period_ms * 1_000_000)
+        if period_ns <= 0:
+            raise ValueError("period_ms must be positive")
+        delay_ns = period_ns if first_ms is None else int(first_ms * 1_000_000)
+        timer = Timer(callback, args, self.now_ns() + delay_ns, period_ns)
+        self.push(timer)
+        return timer
+
+    def cancel(self, timer: Optional[Timer]) -> None:
+        """Stop a timer from running again. Cancelling None or a spent timer does nothing."""
+        if timer:
+            timer.active = False
+
+    def reschedule(self, timer: Timer, delay_ms: float) -> None:
+        """Make a timer next due delay_ms from now, reviving it if it was cancelled or spent."""
+        timer.due_ns = self.now_ns() + int(delay_ms * 1_000_000)
+        timer.active = True
+        self.push(timer)
+
+    def push(self, timer: Timer) -> None:
+        timer.entry = next(self.entries)
+        sooner = not self.heap or timer.due_ns < self.heap[0][0]
+        heapq.heappush(self.heap, (timer.due_ns, timer.entry, timer))
+        if sooner and self.on_change:
+            self.on_change()
+
+    def next_due_ns(self) -> Optional[int]:
+        """
+        When the next timer is due, on the now_ns() clock.
+
+        Returns:
+            Optional[int]: Due time, or None with no timers
+        """
+        while self.heap:
+            due_ns, entry, timer = self.heap[0]
+            if timer.active and timer.entry == entry:
+                return due_ns
+            heapq.heappop(self.heap)
+        return None
+
+    def next_due_ms(self) -> Optional[float]:
+        """
+        Time until the next timer is due.
+
+        Returns:
+            Optional[float]: Milliseconds, 0 if one is already due, or None
+            with no timers
+        """
+        due_ns = self.next_due_ns()
+        if due_ns is None:
+            return None
+        return max(0, due_ns - self.now_ns()) / 1_000_000
+
+    def run_due(self) -> int:
+        """
+        Run every timer that is due now, earliest first.
+
+        Timers a callback makes that are due straight away run on the next
+        call, so a timer re-arming itself cannot keep this from returning.
+
+        Returns:
+            int: Number of callbacks run
+        """
+        now = self.now_ns()
+        ran = 0
+        due: List[Tuple[int, Timer]] = []
+        while True:
+            due_ns = self.next_due_ns()
+            if due_ns is None or due_ns > now:
+                break
+            _, entry, timer = heapq.heappop(self.heap)
+            due.append((entry, timer))
+
+        for entry, timer in due:
+            # cancelled or rescheduled by an earlier callback in this batch
+            if not timer.active or timer.entry != entry:
+                continue
+            if timer.period_ns:
+                missed = (now - timer.due_ns) // timer.period_ns
+                timer.due_ns += (missed + 1) * timer.period_ns
+                self.push(timer)
+            else:
+                timer.active = False
+            timer.callback(*timer.args)
+            ran += 1
+        return ran
+
+    def run_until(self, deadline_ns: int, sleep: Optional[Callable[[float], Any]] = None) -> int:
+        """
+        Run timers as they fall due until deadline_ns, sleeping in between.
+
+        Returns early, without clearing it, once woken is set.
+
+        Args:
+            deadline_ns: When to return, on the now_ns() clock
+            sleep: Sleep function taking seconds, defaults to the scheduler's
+
+        Returns:
+            int: Number of callbacks run
+        """
+        sleep = sleep or self.sleep
+        ran = self.run_due()
+        while True:
+            now = self.now_ns()
+            if now >= deadline_ns or self.woken.is_set():
+                return ran
+            due_ns = self.next_due_ns()
+            wake_ns = deadline_ns if due_ns is None else min(due_ns, deadline_ns)
+            if wake_ns > now:
+                sleep((wake_ns - now) / 1e9)
+            ran += self.run_due()
@@ -0,0 +1,156 @@
+"""
+Player score band for any number of players.
+
+The band is laid out in rows of at most SCORE_COLUMNS tiles, each holding a
+player's name and score. It is kept on its own surface and a tile is only
+redrawn when its name, score or highlight changes, so a frame costs one blit
+however many players there are.
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+import ptext
+import game_config as config
+
+# height of the band, and the size of each tile's text at full size
+BAND_HEIGHT = 240
+NAME_FONT_SIZE = 70
+SCORE_FONT_SIZE = 120
+# tile width the font sizes were chosen for (a quarter of 1920)
+FULL_SIZE_WIDTH = 480
+
+FONT = "fonts/RobotoCondensed-Bold.ttf"
+
+
+def grid(players: int, columns: int) -> Tuple[int, int]:
+    """
+    Rows and columns for a number of players.
+
+    Args:
+        players: Number of tiles
+        columns: Most tiles in a row
+
+    Returns:
+        Tuple[int, int]: (rows, columns), with the players spread evenly
+    """
+    rows = math.ceil(players / max(1, columns))
+    return rows, math.ceil(players / rows)
+
+
+class ScoreBoard:
+    """
+    Draws the player score band, caching what did not change.
+    """
+
+    def __init__(self) -> None:
+        self.band: Optional[pygame.Surface] = None
+        # what the band was laid out for: (width, players)
+        self.layout_key: Optional[Tuple[int, int]] = None
+        self.tiles: List[pygame.Rect] = []
+        # player -> what their tile currently shows
+        self.shown: Dict[int, Tuple[str, int, bool]] = {}
+        self.scale: float = 1.0
+        self.redraws: int = 0
+
+    def layout(self, width: int, players: int) -> None:
+        """
+        Size the band and place each player's tile on it.
+
+        Args:
+            width: Screen width
+            players: Number of players
+        """
+        rows, columns = grid(players, config.SCORE_COLUMNS)
+        row_height = BAND_HEIGHT / rows
+        tile_width = width / columns
+
+        self.tiles = []
+        for player in range(players):
+            row, col = divmod(player, columns)
+            self.tiles.append(pygame.Rect(
+                round(col * tile_width), round(row * row_height),
+                round((col + 1) * tile_width) - round(col * tile_width),
+                round((row + 1) * row_height) - round(row * row_height),
+            ))
+        self.scale = min(1.0, tile_width / FULL_SIZE_WIDTH, row_height / BAND_HEIGHT)
+        self.band = pygame.Surface((width, BAND_HEIGHT))
+        self.layout_key = (width, players)
+        self.shown.clear()
+
+    def font_sizes(self) -> Tuple[int, int]:
+        """Sizes of the names and scores, at the current scale."""
+        return round(NAME_FONT_SIZE * self.scale), round(SCORE_FONT_SIZE * self.scale)
+
+    def draw_tile(self, player: int, name: str, score: int, buzzed: bool) -> None:
+        """Draw one player's tile onto the band."""
+        rect = self.tiles[player]
+        colors = config.THEME_COLORS
+        name_size, score_size = self.font_sizes()
+        self.band.fill(colors["buzzed_in_bg"] if buzzed else colors["player_area_bg"], rect)
+
+        # full size tiles match the original 60/170 placement in a 240 band
+        ptext.draw(
+            name,
+            centerx=rect.centerx,
+            centery=rect.top + rect.height * 0.25,
+            color=colors["buzzed_in_fg"] if buzzed else colors["player_name_fg"],
+            fontname=FONT,
+            fontsize=name_size,
+            shadow=None if buzzed else (1, 1),
+            surf=self.band,
+        )
+        ptext.draw(
+            f"{score:d}",
+            centerx=rect.centerx,
+            centery=rect.top + rect.height * 170 / BAND_HEIGHT,
+            color=colors["buzzed_in_fg"] if buzzed else colors["player_score_fg"],
+            fontname=FONT,
+            fontsize=score_size,
+            shadow=None if buzzed else (1, 1),
+            surf=self.band,
+        )
+        self.redraws += 1
+
+    def draw_dividers(self) -> None:
+        """Draw the lines between tiles."""
+        for rect in self.tiles:
+            if rect.right < self.band.get_width():
+                pygame.draw.line(
+                    self.band, config.THEME_COLORS["separator"],
+                    (rect.right - 2, rect.top), (rect.right - 2, rect.bottom), width=3,
+                )
+            if rect.top > 0:
+                pygame.draw.line(
+                    self.band, config.THEME_COLORS["separator"],
+                    (rect.left, rect.top), (rect.right, rect.top), width=2,
+                )
+
+    def update(self, context) -> bool:
+        """
+        Bring the band up to date with the context.
+
+        Returns:
+            bool: True if any tile was redrawn
+        """
+        key = (context.screen_info.current_w, config.PLAYERS)
+        if key != self.layout_key:
+            self.layout(*key)
+
+        changed = False
+        for player in range(config.PLAYERS):
+            state = (context.player_names[player], context.scores[player], context.player_buzzed_in == player)
+            if self.shown.get(player) != state:
+                self.draw_tile(player, *state)
+                self.shown[player] = state
+                changed = True
+        if changed:
+            self.draw_dividers()
+        return changed
+
+    def draw(self, context) -> None:
+        """Draw the band onto the screen, at the top or bottom."""
+        self.update(context)
+        top_y = 0 if context.invert_display else context.screen_info.current_h - self.band.get_height()
+        context.screen.blit(self.band, (0, top_y))
@@ -0,0 +1,152 @@
+"""
+Background discovery, handshake and reconnection for the serial board.
+
+Opening the port resets the board, which then takes a couple of seconds to
+report "RESET OK". All of that happens on the link's own thread, so the game
+renders from the first frame. The main loop picks up a finished connection
+with take() and reports a dead one with lost(); the link then goes back to
+scanning until the board reappears.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import serial
+
+from hardware import find_serial_devices, handshake, open_serial
+
+
+class SerialLink:
+    """
+    Keeps looking for the board until it is connected, and again after it is lost.
+    """
+
+    def __init__(
+        self,
+        device: Optional[str] = None,
+        vid_pids: Optional[List[str]] = None,
+        handshake_timeout_ms: int = 3000,
+        rescan_ms: int = 500,
+    ) -> None:
+        """
+        Args:
+            device: Serial device to use, or None to discover one by VID/PID
+            vid_pids: "VID:PID" strings accepted during discovery
+            handshake_timeout_ms: How long to wait for each handshake reply
+            rescan_ms: How often to look for the board while disconnected
+        """
+        self.device: Optional[str] = device
+        self.vid_pids: Optional[List[str]] = vid_pids
+        self.handshake_timeout_s: float = handshake_timeout_ms / 1000
+        self.rescan_s: float = rescan_ms / 1000
+
+        # (device, port, binary) waiting for the main loop to take it
+        self.ready: Optional[Tuple[str, Any, bool]] = None
+        self.connected: bool = False
+        self.started_ns: int = 0
+        self.lost_ns: Optional[int] = None
+
+        self.stats: Dict[str, Optional[float]] = {
+            "connects": 0,          # successful handshakes
+            "failed": 0,            # ports that did not complete the handshake
+            "first_connect_ms": None,  # start() to the first connection
+            "recover_ms": None,     # lost() to the latest reconnection
+        }
+
+        self.running: bool = False
+        self.wake = threading.Event()
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start looking for the board."""
+        if self.running:
+            return
+        self.running = True
+        self.started_ns = time.monotonic_ns()
+        self.thread = threading.Thread(target=self._run, name="serial-link", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the link thread. A connection not yet taken is closed."""
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout=self.handshake_timeout_s * 2 + 1)
+            self.thread = None
+        with self.lock:
+            ready, self.ready = self.ready, None
+        if ready:
+            ready[1].close()
+
+    def take(self) -> Optional[Tuple[str, Any, bool]]:
+        """
+        Hand a new connection to the caller. Main thread only.
+
+        Returns:
+            tuple: (device, port, binary) once connected, otherwise None
+        """
+        with self.lock:
+            ready, self.ready = self.ready, None
+        return ready
+
+    def lost(self) -> None:
+        """Report that the port taken earlier failed, and start looking again."""
+        with self.lock:
+            self.connected = False
+            self.lost_ns = time.monotonic_ns()
+        self.wake.set()
+
+    def candidates(self) -> List[str]:
+        """Devices worth trying, in order."""
+        if self.device:
+            return [self.device] if os.path.exists(self.device) else []
+        return find_serial_devices(self.vid_pids)
+
+    def connect(self, device: str) -> bool:
+        """
+        Open device and handshake with the board.
+
+        Returns:
+            bool: True if a connection is ready for take()
+        """
+        try:
+            port = open_serial(device)
+        except (serial.SerialException, OSError) as err:
+            print("Cannot open %s: %s" % (device, err))
+            self.stats["failed"] += 1
+            return False
+
+        try:
+            binary = handshake(port, self.handshake_timeout_s)
+        except (serial.SerialException, OSError):
+            binary = None
+        if binary is None:
+            print("No board answered on %s" % device)
+            port.close()
+            self.stats["failed"] += 1
+            return False
+
+        now_ns = time.monotonic_ns()
+        with self.lock:
+            self.ready = (device, port, binary)
+            self.connected = True
+            self.stats["connects"] += 1
+            if self.stats["first_connect_ms"] is None:
+                self.stats["first_connect_ms"] = (now_ns - self.started_ns) / 1e6
+            if self.lost_ns is not None:
+                self.stats["recover_ms"] = (now_ns - self.lost_ns) / 1e6
+                self.lost_ns = None
+        return True
+
+    def _run(self) -> None:
+        while self.running:
+            if not self.connected:
+                for device in self.candidates():
+                    if not self.running or self.connect(device):
+                        break
+            # while connected, sleep until lost() or stop()
+            self.wake.wait(None if self.connected else self.rescan_s)
+            self.wake.clear()
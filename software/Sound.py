@@ -7,22 +7,25 @@ sound effects used throughout the game.
 
 import os
 import sys
-from typing import Dict
+from concurrent.futures import Executor, Future
+from typing import Dict, Optional
 import pygame
 import game_config as config
 
-# Required sound files that must be present
+# Required sound files that must be present. A set may have any number of
+# PLAYERn sounds; players past the last one reuse them in turn.
 REQUIRED_SOUNDS = [
     "BEEP",
     "BUZZ",
     "TIMESUP",
     "PLAYER1",
-    "PLAYER2",
-    "PLAYER3",
-    "PLAYER4",
     "INVALID",
 ]
-TEST_SOUNDS = ["ONE", "TWO", "THREE", "FOUR"]
+# Spoken player numbers for button test mode, loaded from sounds/test if there
+TEST_SOUNDS = [
+    "ONE", "TWO", "THREE", "FOUR", "FIVE", "SIX",
+    "SEVEN", "EIGHT", "NINE", "TEN", "ELEVEN", "TWELVE",
+]
 
 
 class Sound:
@@ -33,13 +36,21 @@ class Sound:
     and provides methods to play them during gameplay.
     """
 
-    def __init__(self) -> None:
-        """Initialize the sound system and load all sound files."""
+    def __init__(self, executor: Optional[Executor] = None) -> None:
+        """
+        Initialize the mixer and load all sound files.
+
+        Args:
+            executor: Decode the sounds on this in the background; they are
+                waited for the first time one is needed. Without one they
+                are decoded here.
+        """
         self.sounds: Dict[str, pygame.mixer.Sound] = {}
+        # sounds still being decoded by the executor
+        self.pending: Dict[str, Future] = {}
         pygame.mixer.pre_init(44100, -16, 2, 2048)
         pygame.mixer.init()
-        pygame.init()
-        self.load_sounds()
+        self.load_sounds(executor)
 
     def play(self, sound_name: str) -> None:
         """
@@ -48,17 +59,60 @@ class Sound:
         Args:
             sound_name: Name of the sound to play (without extension)
         """
+        self.wait()
         self.sounds[sound_name].play()
 
-    def load_sounds(self) -> None:
+    def wait(self) -> None:
+        """Wait for sounds still being decoded in the background."""
+        while self.pending:
+            key, future = self.pending.popitem()
+            self.sounds[key] = future.result()
+
+    def player_sound(self, player: int) -> str:
+        """
+        Name of the buzz-in sound for a player.
+
+        Args:
+            player: Zero based player
+
+        Returns:
+            str: PLAYERn, wrapping around the PLAYERn sounds the set has
+        """
+        self.wait()
+        count = 1
+        while f"PLAYER{count + 1}" in self.sounds:
+            count += 1
+        return f"PLAYER{player % count + 1}"
+
+    def test_sound(self, player: int) -> str:
+        """
+        Name of the sound button test mode plays for a player.
+
+        Args:
+            player: Zero based player
+
+        Returns:
+            str: The spoken player number, or their buzz-in sound without one
+        """
+        self.wait()
+        if player < len(TEST_SOUNDS) and TEST_SOUNDS[player] in self.sounds:
+            return TEST_SOUNDS[player]
+        return self.player_sound(player)
+
+    def load_sounds(self, executor: Optional[Executor] = None) -> None:
         """
         Load all sounds from the configured sound directory.
 
         This method scans the sound directory for files with the configured
         extension and loads them into the sounds dictionary. It also
-        validates that all required sounds are present.
+        validates that all required sounds are present, before any is
+        decoded.
+
+        Args:
+            executor: Decode on this, leaving the sounds in pending
         """
         print("Loading sounds...")
+        found: Dict[str, str] = {}
         sound_path = config.SOUND_SET_DIR
 
         for dirpath, _, filenames in os.walk(sound_path):
@@ -68,25 +122,35 @@ class Sound:
             for name in filenames:
                 if name.endswith(config.SOUND_EXT):
                     key = name[:-4]  # Remove extension
-                    self.sounds[key] = pygame.mixer.Sound(
-                        os.path.join(sound_path, name)
-                    )
-                    self.sounds[key].set_volume(0.5)
-                    print(f"Loaded sound {key}")
+                    found[key] = os.path.join(sound_path, name)
 
-            # Sanity check: ensure all required sounds are loaded
+            # Sanity check: ensure all required sounds are there
             for key in REQUIRED_SOUNDS:
-                if key not in self.sounds:
+                if key not in found:
                     print(f"ERROR: Missing sound {key}")
                     sys.exit(1)
 
-        # Now load the test sounds
-        for key in TEST_SOUNDS:
-            if key not in self.sounds:
-                print(f"Loading test sound {key}")
-                self.sounds[key] = pygame.mixer.Sound(
-                    os.path.join("sounds/test", f"{key}{config.SOUND_EXT}")
-                )
-                self.sounds[key].set_volume(0.5)
-
-        print("All Sounds loaded.")
+        # Now the test sounds for each player, where there is one
+        for key in TEST_SOUNDS[:config.PLAYERS]:
+            path = os.path.join("sounds/test", f"{key}{config.SOUND_EXT}")
+            if key not in found and os.path.exists(path):
+                found[key] = path
+
+        for key, path in found.items():
+            if executor:
+                self.pending[key] = executor.submit(load_sound, path)
+            else:
+                self.sounds[key] = load_sound(path)
+                print(f"Loaded sound {key}")
+
+        if self.pending:
+            print(f"Loading {len(self.pending)} sounds in the background.")
+        else:
+            print("All Sounds loaded.")
+
+
+def load_sound(path: str) -> pygame.mixer.Sound:
+    """Decode one sound file, at the game's volume."""
+    sound = pygame.mixer.Sound(path)
+    sound.set_volume(0.5)
+    return sound
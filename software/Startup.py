@@ -0,0 +1,132 @@
+"""
+Startup pipeline.
+
+The game used to start one step after another: pygame.init(), every sound
+decoded, the fonts opened, and only then a first frame. main() now opens
+the window and draws a first frame as soon as the pygame modules the game
+uses are up, then loads sounds, fonts and images on a small thread pool
+while it restores the state file and opens the backend on the main thread.
+
+Startup times each main thread phase and each background load, and prints
+the breakdown once the game is ready, with when the first frame was shown.
+It is an Executor, so anything that loads through an executor (Sound,
+render.load_assets) can be handed it and is timed.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pygame
+
+
+def init_pygame() -> None:
+    """
+    Start the pygame modules the game uses, instead of all of them.
+
+    pygame.init() also starts joysticks, game controllers and the rest. The
+    mixer is started by Sound, with the settings it needs.
+    """
+    pygame.display.init()
+    pygame.font.init()
+    # pygame.init() starts the timer behind pygame.time.get_ticks(); the
+    # first tick does the same
+    pygame.time.Clock().tick()
+
+
+class Startup(Executor):
+    """
+    Times startup, and runs loads on a thread pool while it goes on.
+    """
+
+    def __init__(self, workers: int, started: Optional[float] = None,
+                 now: Callable[[], float] = time.perf_counter) -> None:
+        """
+        Args:
+            workers: Threads loading in the background; 0 loads each thing
+                on the main thread when it is asked for
+            started: now() when the program started, so the imports before
+                main() are counted; defaults to now
+            now: Time source in seconds
+        """
+        self.now = now
+        self.started: float = now() if started is None else started
+        self.pool: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(workers, thread_name_prefix="startup") if workers > 0 else None
+        )
+        # (name, ms) for each main thread phase, in order
+        self.phases: List[Tuple[str, float]] = []
+        if started is not None:
+            self.phases.append(("imports", self.ms_since(started)))
+        # function name -> [loads, ms], added up across the pool
+        self.loads: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+        self.first_frame_ms: Optional[float] = None
+        self.ready_ms: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def ms_since(self, then: float) -> float:
+        """Milliseconds from then to now."""
+        return (self.now() - then) * 1000
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the block as a startup phase."""
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.phases.append((name, self.ms_since(start)))
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        """
+        Run fn(*args, **kwargs) in the background, timed under fn's name.
+
+        Returns:
+            Future: fn's result; with no workers, already done
+        """
+        def timed() -> Any:
+            start = self.now()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self.lock:
+                    load = self.loads[fn.__name__]
+                    load[0] += 1
+                    load[1] += self.ms_since(start)
+
+        if self.pool:
+            return self.pool.submit(timed)
+        future: Future = Future()
+        try:
+            future.set_result(timed())
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def first_frame(self) -> None:
+        """Note the first frame is on the screen."""
+        self.first_frame_ms = self.ms_since(self.started)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Stop the pool and note the game is ready."""
+        if self.pool:
+            self.pool.shutdown(wait, cancel_futures=cancel_futures)
+        if self.ready_ms is None:
+            self.ready_ms = self.ms_since(self.started)
+
+    def report(self) -> List[str]:
+        """The timing breakdown, as lines to print."""
+        ready = self.ms_since(self.started) if self.ready_ms is None else self.ready_ms
+        lines = [f"Startup took {ready:.0f}ms" + (
+            f", first frame at {self.first_frame_ms:.0f}ms" if self.first_frame_ms is not None else ""
+        )]
+        lines += [f"  {name:16} {ms:7.1f}ms" for name, ms in self.phases]
+        if self.loads:
+            lines.append("  in the background:")
+            with self.lock:
+                lines += [f"    {name:14} {ms:7.1f}ms  ({count:.0f} loaded)"
+                          for name, (count, ms) in sorted(self.loads.items())]
+        return lines
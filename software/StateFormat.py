@@ -0,0 +1,233 @@
+"""
+Versioned JSON format of the state file.
+
+The state file used to be a pickle, which runs whatever code the file asks
+for when loaded, breaks when the objects in it change shape, and gives no
+way to tell an old file from a damaged one. It is now one line of compact
+JSON with a "format" number:
+
+    {"format":2,"player_names":["Alice","Bob"],"scores":[3,1],...}
+
+Each format has a schema, checked on every load and save. Files in an
+older format are upgraded when loaded, and a snapshot can be downgraded to
+write a file an older version of the game can read (see statefile.py).
+A file from a newer version is loaded if it still has everything this
+version needs. Pickles from before this format are imported once, without
+running anything in them.
+"""
+
+import io
+import json
+import pickle
+from typing import Any, Callable, Dict, Tuple
+
+import game_config as config
+from GameState import GameState
+
+FORMAT = 2
+
+# where the state was saved, as a pickle, before this format
+LEGACY_STATE_FILE = "gamestate.pickle"
+
+
+def is_int(value: Any) -> bool:
+    """An int, and not a bool, which JSON and isinstance() do not tell apart."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+STATES = frozenset(state.value for state in GameState)
+
+# key: type checks for its value, for each format
+SCHEMAS: Dict[int, Dict[str, Callable[[Any], bool]]] = {
+    # what the pickles held
+    1: {
+        "player_names": lambda v: isinstance(v, list) and all(isinstance(n, str) for n in v),
+        "scores": lambda v: isinstance(v, list) and all(is_int(s) for s in v),
+        "invert_display": lambda v: isinstance(v, bool),
+    },
+}
+# with the journal: the clock and state, and the last journal record included
+SCHEMAS[2] = {
+    **SCHEMAS[1],
+    "state": lambda v: is_int(v) and v in STATES,
+    "clock_ms": lambda v: is_int(v) and v >= 0,
+    "player_buzzed_in": lambda v: is_int(v) and v >= -1,
+    "saved_ms": is_int,
+    "journal_seq": lambda v: is_int(v) and v >= 0,
+}
+
+
+def upgrade_1(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Format 1 to 2: a stopped, full clock and an empty journal."""
+    return {
+        **state,
+        "state": GameState.IDLE.value,
+        "clock_ms": config.MAX_CLOCK,
+        "player_buzzed_in": -1,
+        "saved_ms": 0,
+        "journal_seq": 0,
+    }
+
+
+def downgrade_2(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Format 2 to 1: only what format 1 has."""
+    return {key: state[key] for key in SCHEMAS[1]}
+
+
+# format: function to the next format up, and to the next one down
+UPGRADES: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {1: upgrade_1}
+DOWNGRADES: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {2: downgrade_2}
+
+
+# made once: json.dumps() and loads() make new ones for any options
+ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+DECODER = json.JSONDecoder()
+
+
+class StateFormatError(ValueError):
+    """A state file that cannot be read, or a snapshot that cannot be written."""
+
+
+def validate(state: Dict[str, Any], version: int = FORMAT) -> None:
+    """
+    Check a snapshot against a format's schema. Keys it does not have are ignored.
+
+    Raises:
+        StateFormatError: If a key is missing or its value is wrong
+    """
+    for key, valid in SCHEMAS[version].items():
+        if key not in state:
+            raise StateFormatError(f"format {version} state has no {key}")
+        if not valid(state[key]):
+            raise StateFormatError(f"format {version} state has a bad {key}: {state[key]!r}")
+    if len(state["scores"]) != len(state["player_names"]):
+        raise StateFormatError(
+            f"{len(state['scores'])} scores for {len(state['player_names'])} players"
+        )
+
+
+def migrate(state: Dict[str, Any], version: int, to: int = FORMAT) -> Dict[str, Any]:
+    """
+    Upgrade or downgrade a snapshot one format at a time.
+
+    Args:
+        state: Snapshot in format version
+        version: Its format
+        to: Format wanted
+
+    Raises:
+        StateFormatError: If there is no way from one to the other
+    """
+    while version != to:
+        steps = UPGRADES if version < to else DOWNGRADES
+        if version not in steps:
+            raise StateFormatError(f"cannot convert state from format {version} to {to}")
+        state = steps[version](state)
+        version += 1 if version < to else -1
+    return state
+
+
+def encode(state: Dict[str, Any], version: int = FORMAT) -> bytes:
+    """
+    A snapshot as written to the state file.
+
+    Args:
+        state: Context.snapshot()
+        version: Format to write, to be read by an older version of the game
+
+    Raises:
+        StateFormatError: If the snapshot does not fit the format
+    """
+    state = migrate(state, FORMAT, version)
+    validate(state, version)
+    data = {"format": version, **{key: state[key] for key in SCHEMAS[version]}}
+    return ENCODER.encode(data).encode("utf-8")
+
+
+def decode(data: bytes) -> Dict[str, Any]:
+    """
+    Read a state file written by encode(), in any format.
+
+    Returns:
+        Dict[str, Any]: The snapshot in the current format
+
+    Raises:
+        StateFormatError: If it is not a state file this version can read
+    """
+    try:
+        saved = DECODER.decode(data.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise StateFormatError(f"not a state file: {e}") from e
+    if not isinstance(saved, dict) or not is_int(saved.get("format")):
+        raise StateFormatError("not a state file: no format")
+
+    version = saved.pop("format")
+    if version > FORMAT:
+        # a newer game wrote this; fine if it still has all we need
+        validate(saved, FORMAT)
+        return {key: saved[key] for key in SCHEMAS[FORMAT]}
+    if version not in SCHEMAS:
+        raise StateFormatError(f"unknown state format {version}")
+    validate(saved, version)
+    if version == FORMAT:
+        return {key: saved[key] for key in SCHEMAS[FORMAT]}
+    state = migrate(saved, version)
+    validate(state)
+    return state
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Loads only lists, dicts, strings, numbers and bools, as the old state files held."""
+
+    def find_class(self, module: str, name: str) -> Any:
+        raise pickle.UnpicklingError(f"state pickle refers to {module}.{name}")
+
+
+def is_pickle(data: bytes) -> bool:
+    """True for a pickle, as the game wrote before this format."""
+    # protocol 2 and later start with PROTO; Python 3 never wrote older ones
+    return data[:1] == b"\x80"
+
+
+def import_pickle(data: bytes) -> Dict[str, Any]:
+    """
+    Read a state file from before this format, without running any code in it.
+
+    Returns:
+        Dict[str, Any]: The snapshot in the current format
+
+    Raises:
+        StateFormatError: If it is not a state pickle
+    """
+    try:
+        saved = _PlainUnpickler(io.BytesIO(data)).load()
+    except (pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError) as e:
+        raise StateFormatError(f"not a state pickle: {e}") from e
+    if not isinstance(saved, dict):
+        raise StateFormatError("not a state pickle: no state in it")
+    # the last pickles, written alongside the journal, already had the clock
+    try:
+        validate(saved, 2)
+        return migrate({key: saved[key] for key in SCHEMAS[2]}, 2)
+    except StateFormatError:
+        validate(saved, 1)
+        return migrate({key: saved[key] for key in SCHEMAS[1]}, 1)
+
+
+def fit_players(state: Dict[str, Any], players: int) -> Tuple[Dict[str, Any], bool]:
+    """
+    Fit a snapshot to PLAYERS, dropping players past it or adding new ones.
+
+    Returns:
+        Tuple[Dict[str, Any], bool]: The snapshot, and whether it was changed
+    """
+    names = state["player_names"][:players]
+    scores = state["scores"][:players]
+    fitted = {
+        **state,
+        "player_names": names + [f"Player {i+1}" for i in range(len(names), players)],
+        "scores": scores + [0] * (players - len(scores)),
+    }
+    if fitted["player_buzzed_in"] >= players:
+        fitted["player_buzzed_in"] = -1
+    return fitted, len(state["scores"]) != players
@@ -0,0 +1,246 @@
+"""
+Crash-safe, write-behind saving of the game state.
+
+Context.save() used to pickle the state file on the main thread on every
+score key and every move in the name editor. On an SD card that can take
+tens of milliseconds, and a power cut during the write left a truncated
+file that would not load. StateStore instead:
+
+- takes the newest snapshot and writes it from a background thread after
+  SAVE_DELAY_MS, so a burst of changes is one write
+- writes to a temporary file, fsyncs it and renames it over the state file,
+  so the file is always either the old state or the new one
+- keeps STATE_GENERATIONS previous files as name.1, name.2, ..., and
+  restores from the newest one that loads if the others are damaged
+
+The files are in the versioned JSON format of StateFormat.py. A state file
+still in the old pickle format is imported and written again as JSON the
+first time it is loaded.
+"""
+
+import atexit
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from StateFormat import StateFormatError, decode, encode, import_pickle, is_pickle
+
+# snapshot fields that change on every save, even when the game has not
+UNCOMPARED = ("saved_ms",)
+
+
+def same_state(snapshot: Dict[str, Any], other: Optional[Dict[str, Any]]) -> bool:
+    """True if two snapshots differ at most in UNCOMPARED fields."""
+    if other is None:
+        return False
+    return ({k: v for k, v in snapshot.items() if k not in UNCOMPARED}
+            == {k: v for k, v in other.items() if k not in UNCOMPARED})
+
+
+class StateStore:
+    """The state file and its previous generations, written behind the game."""
+
+    def __init__(self, path: str, generations: int = 3, delay_ms: int = 250,
+                 legacy: Optional[str] = None) -> None:
+        """
+        Args:
+            path: State file
+            generations: Previous versions kept next to it
+            delay_ms: How long to gather changes before writing
+            legacy: State file of older versions of the game, imported if
+                there is none at path
+        """
+        self.path: str = path
+        self.legacy: Optional[str] = legacy
+        self.generations: int = generations
+        self.delay_s: float = delay_ms / 1000
+
+        self.pending: Optional[Dict[str, Any]] = None  # newest snapshot not yet written
+        self.written: Optional[Dict[str, Any]] = None  # last snapshot on disk
+        self.writing: bool = False
+        # flush() wants the pending snapshot written without waiting out the delay
+        self.hurry: bool = False
+        self.stats: Dict[str, int] = {
+            "requested": 0,   # snapshots handed to save()
+            "written": 0,     # files written
+            "coalesced": 0,   # snapshots replaced by a newer one before being written
+            "unchanged": 0,   # snapshots skipped as the same as the file
+            "failed": 0,      # writes that raised
+        }
+
+        self.cond = threading.Condition()
+        # one write at a time, whichever thread it comes from
+        self.write_lock = threading.Lock()
+        # called with each snapshot once it is on disk, from the thread that wrote it
+        self.on_written: Optional[Callable[[Dict[str, Any]], None]] = None
+
+        self.running: bool = False
+        self.thread: Optional[threading.Thread] = None
+
+    def files(self) -> List[str]:
+        """The state file and its generations, newest first."""
+        return [self.path] + [f"{self.path}.{n}" for n in range(1, self.generations + 1)]
+
+    def save(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Queue a snapshot to be written. Returns straight away.
+
+        Args:
+            snapshot: What Context.snapshot() returned; not changed afterwards
+        """
+        with self.cond:
+            if not self.running:
+                self.start()
+            if self.pending is not None:
+                self.stats["coalesced"] += 1
+            self.pending = snapshot
+            self.stats["requested"] += 1
+            self.cond.notify_all()
+
+    def start(self) -> None:
+        """Start the writer thread. save() does this when first called."""
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="state-writer", daemon=True)
+        self.thread.start()
+        # quitting from the keyboard ends the game with sys.exit()
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        """Write anything still pending and stop the writer thread."""
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        atexit.unregister(self.close)
+        # the thread may have stopped between gathering changes and writing
+        with self.cond:
+            snapshot, self.pending = self.pending, None
+        if snapshot is not None:
+            self._write_logged(snapshot)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every snapshot saved so far is on disk.
+
+        Returns:
+            bool: False if timeout passed first
+        """
+        with self.cond:
+            self.hurry = True
+            self.cond.notify_all()
+            done = self.cond.wait_for(lambda: self.pending is None and not self.writing, timeout)
+            self.hurry = False
+            return done
+
+    def write(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Write a snapshot now, on the calling thread.
+
+        Raises:
+            OSError: If the file could not be written; the previous state
+                file is left as it was
+            StateFormatError: If the snapshot does not fit the state format
+        """
+        with self.write_lock:
+            if same_state(snapshot, self.written):
+                self.stats["unchanged"] += 1
+                return
+            data = encode(snapshot)
+            temp = self.path + ".tmp"
+            with open(temp, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+
+            # move each generation back one, dropping the oldest
+            files = self.files()
+            for newer, older in reversed(list(zip(files, files[1:]))):
+                if os.path.exists(newer):
+                    os.replace(newer, older)
+            os.replace(temp, self.path)
+            self._sync_directory()
+            self.written = snapshot
+            self.stats["written"] += 1
+            if self.on_written:
+                self.on_written(snapshot)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the newest state file that loads.
+
+        Returns:
+            Optional[Dict[str, Any]]: The saved snapshot, in the current
+            format, or None if there is no usable file
+        """
+        files = self.files()
+        if self.legacy and not any(os.path.exists(path) for path in files):
+            files = [self.legacy]
+        damaged = []
+        for path in files:
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "rb") as file:
+                    data = file.read()
+                imported = is_pickle(data)
+                snapshot = import_pickle(data) if imported else decode(data)
+            except (OSError, StateFormatError) as e:
+                damaged.append(f"{path} ({e})")
+                continue
+            if damaged:
+                print(f"Restored game state from {path}; could not read {', '.join(damaged)}")
+            if imported:
+                # once only: from now on it is written as JSON
+                print(f"Imported game state from {path}, saving it to {self.path}")
+                self._write_logged(snapshot)
+            self.written = snapshot
+            return snapshot
+        if damaged:
+            print(f"Could not read any saved game state: {', '.join(damaged)}")
+        return None
+
+    def _sync_directory(self) -> None:
+        # make the renames themselves survive a power cut; not possible on Windows
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _write_logged(self, snapshot: Dict[str, Any]) -> None:
+        try:
+            self.write(snapshot)
+        except (OSError, StateFormatError) as e:
+            self.stats["failed"] += 1
+            # the next save writes everything again
+            print(f"Could not save game state: {e}")
+
+    def _run(self) -> None:
+        while True:
+            with self.cond:
+                while self.running and self.pending is None:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                # let a burst of changes finish
+                deadline = time.monotonic() + self.delay_s
+                while self.running and not self.hurry and time.monotonic() < deadline:
+                    self.cond.wait(deadline - time.monotonic())
+                if not self.running:
+                    return
+                snapshot, self.pending = self.pending, None
+                self.writing = True
+                self.hurry = False
+            self._write_logged(snapshot)
+            with self.cond:
+                self.writing = False
+                self.cond.notify_all()
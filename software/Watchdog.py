@@ -0,0 +1,247 @@
+"""
+Main loop stall watchdog.
+
+The main loop beats a heartbeat at the start of every frame. A thread checks
+it, and when no frame has started for WATCHDOG_STALL_MS it captures what the
+main thread is doing (its stack, from sys._current_frames()), the game state
+and the last inputs the game saw, and writes them to a rotating log. Each
+stall is put down to a cause from the innermost frames of the stack (a
+serial write waiting on the board, the state file, a modal screen, drawing,
+sound) and counted, so the counts can be asked for during a show.
+
+The watchdog only reads; it cannot unstick the loop.
+"""
+
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Dict, Optional, Sequence, Tuple
+
+import pygame
+
+import game_config as config
+
+# source files, and optionally the function in them, each cause is put down
+# to; the innermost frame of the stack that matches one decides
+CAUSES: Tuple[Tuple[str, str, Optional[str]], ...] = (
+    ("serial", "serialposix.py", None),
+    ("serial", "serialutil.py", None),
+    ("serial", "serialwin32.py", None),
+    ("serial", "SerialLink.py", None),
+    ("serial", "LedService.py", None),
+    ("serial", "hardware.py", None),
+    ("save", "Context.py", "save"),
+    ("save", "Context.py", "write_state"),
+    ("save", "Context.py", "restore"),
+    ("save", "Journal.py", None),
+    ("save", "StateStore.py", None),
+    ("modal", "Modal.py", None),
+    ("modal", "NameEditor.py", None),
+    ("modal", "pygame_textinput.py", None),
+    ("sound", "Sound.py", None),
+    ("render", "render.py", None),
+    ("render", "drawutil.py", None),
+    ("render", "ptext.py", None),
+    ("render", "ScoreBoard.py", None),
+    ("render", "Particle.py", None),
+    ("render", "particleutil.py", None),
+    ("input", "backends.py", None),
+    ("input", "GpiodInput.py", None),
+    ("input", "NetBuzzer.py", None),
+)
+
+# inputs kept to show what led up to a stall
+RECENT_INPUTS = 20
+
+
+def stall_cause(stack: Sequence[traceback.FrameSummary]) -> str:
+    """
+    What a stalled stack was waiting on.
+
+    Args:
+        stack: The main thread's stack, outermost frame first
+
+    Returns:
+        str: A name from CAUSES, or "other"
+    """
+    for frame in reversed(stack):
+        filename = os.path.basename(frame.filename)
+        for cause, source, function in CAUSES:
+            if filename == source and function in (None, frame.name):
+                return cause
+    return "other"
+
+
+def describe_input(event) -> str:
+    """One line for an InputEvent or pygame event, for the stall log."""
+    if hasattr(event, "player"):
+        action = "press" if event.pressed else "release"
+        return f"{action} player {event.player + 1}"
+    if event.type == pygame.KEYDOWN:
+        return f"key {pygame.key.name(event.key)} mod {event.mod:#x}"
+    return pygame.event.event_name(event.type)
+
+
+class Watchdog:
+    """Watches the main loop's heartbeat from another thread."""
+
+    def __init__(self, context, stall_ms: int, log_file: str,
+                 log_bytes: int = 1_000_000, log_count: int = 3) -> None:
+        """
+        Args:
+            context (Context): Game context, read for the state at a stall
+            stall_ms: How long a frame may take before it is a stall
+            log_file: Stall log, rotated at log_bytes
+            log_bytes: Size at which the log is rotated
+            log_count: Rotated logs kept
+        """
+        self.context = context
+        self.stall_ns: int = stall_ms * 1_000_000
+        # the thread that beats, whose stack is captured
+        self.thread_id: int = threading.get_ident()
+        self.last_beat_ns: int = time.monotonic_ns()
+        # beat of the stall being reported, so it is logged once
+        self.reported_ns: Optional[int] = None
+        self.stall_cause: str = ""
+
+        self.lock = threading.Lock()
+        self.recent: Deque[Tuple[int, str]] = deque(maxlen=RECENT_INPUTS)
+        self.counts: Dict[str, int] = {}
+        self.longest_ms: int = 0
+
+        self.log = logging.getLogger(f"gameshow.watchdog.{id(self)}")
+        self.log.propagate = False
+        self.log.setLevel(logging.INFO)
+        self.handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=log_bytes, backupCount=log_count, encoding="utf-8", delay=True
+        )
+        self.handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self.log.addHandler(self.handler)
+
+        self.running: bool = False
+        self.wake = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Watchdog":
+        """Start watching, from the thread that runs the main loop."""
+        self.thread_id = threading.get_ident()
+        self.last_beat_ns = time.monotonic_ns()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="watchdog", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop watching and close the log."""
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.log.removeHandler(self.handler)
+        self.handler.close()
+
+    def beat(self) -> None:
+        """
+        A frame has started. Called by the main loop.
+
+        Ends a stall being reported, logging how long it lasted.
+        """
+        now = time.monotonic_ns()
+        if self.reported_ns is not None and self.reported_ns == self.last_beat_ns:
+            stalled_ms = (now - self.reported_ns) // 1_000_000
+            with self.lock:
+                self.longest_ms = max(self.longest_ms, stalled_ms)
+            self.log.info("STALL ended after %d ms (%s)", stalled_ms, self.stall_cause)
+        self.reported_ns = None
+        self.last_beat_ns = now
+
+    def saw(self, events) -> None:
+        """
+        Keep the newest inputs, to log with a stall.
+
+        Args:
+            events: InputEvents from the backend or a frame's pygame events
+        """
+        if not events:
+            return
+        now = time.monotonic_ns()
+        lines = [describe_input(event) for event in events
+                 if hasattr(event, "player") or event.type == pygame.KEYDOWN]
+        with self.lock:
+            for line in lines:
+                self.recent.append((now, line))
+
+    def run(self) -> None:
+        """Check the heartbeat a few times per stall period."""
+        interval = max(self.stall_ns / 4e9, 0.005)
+        while self.running:
+            self.wake.wait(interval)
+            self.check()
+
+    def check(self) -> Optional[str]:
+        """
+        Report a stall if the main loop has not beaten for too long.
+
+        Returns:
+            Optional[str]: The cause of a stall newly reported, or None
+        """
+        beat = self.last_beat_ns
+        now = time.monotonic_ns()
+        if now - beat < self.stall_ns or self.reported_ns == beat:
+            return None
+
+        frame = sys._current_frames().get(self.thread_id)
+        stack = traceback.extract_stack(frame) if frame else traceback.StackSummary()
+        cause = stall_cause(stack)
+        with self.lock:
+            self.counts[cause] = self.counts.get(cause, 0) + 1
+            recent = list(self.recent)
+        self.reported_ns = beat
+        self.stall_cause = cause
+
+        state = getattr(self.context.state, "name", self.context.state)
+        lines = [f"STALL no frame for {(now - beat) // 1_000_000} ms, cause {cause}, state {state}"]
+        lines.append("Last input:")
+        lines.extend(f"  {(t - now) / 1e9:+.3f} s {text}" for t, text in recent)
+        lines.append("Main thread:")
+        lines.extend(line.rstrip("\n") for line in stack.format())
+        self.log.warning("\n".join(lines))
+        return cause
+
+    def stats(self) -> Dict[str, int]:
+        """Stalls so far by cause, plus the longest that has ended in "longest_ms"."""
+        with self.lock:
+            return {**self.counts, "longest_ms": self.longest_ms}
+
+    def report(self) -> str:
+        """Stall counts in a line, for the console."""
+        stats = self.stats()
+        longest = stats.pop("longest_ms")
+        if not stats:
+            return "No stalls"
+        counts = ", ".join(f"{cause} {n}" for cause, n in sorted(stats.items()))
+        return f"Stalls: {counts} (longest {longest} ms)"
+
+
+def start_watchdog(context) -> Optional[Watchdog]:
+    """
+    Start watching the main loop, if WATCHDOG_STALL_MS is set.
+
+    Call from the thread that runs the main loop.
+
+    Returns:
+        Optional[Watchdog]: The watchdog, also set as context.watchdog
+    """
+    if not config.WATCHDOG_STALL_MS:
+        return None
+    context.watchdog = Watchdog(
+        context, config.WATCHDOG_STALL_MS, config.WATCHDOG_LOG,
+        config.WATCHDOG_LOG_BYTES, config.WATCHDOG_LOG_COUNT,
+    ).start()
+    return context.watchdog
@@ -0,0 +1,885 @@
+"""
+backends.py
+
+Hardware backends: where button presses come from and where LED states go.
+
+The game only talks to context.backend. Each backend turns its hardware into
+InputEvents for the main loop and writes LED states out:
+
+    GpioBackend       Raspberry Pi GPIO ("rpi")
+    SerialBackend     usb_gpio_v4 board over USB serial ("pcserial")
+    MultiSerialBackend  several usb_gpio_v4 boards at once ("pcserial" with SERIAL_BOARDS)
+    NetworkBackend    wireless handheld buzzers over UDP ("network")
+    KeyboardBackend   no hardware, keys stand in for buttons ("pc")
+    SimulatedBackend  scripted or random presses at any rate ("simulated")
+"""
+
+import contextlib
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import List, Optional, Sequence, Tuple
+
+import pygame
+import serial
+
+import game_config as config
+import protocol
+from BuzzArbiter import MicrosUnwrapper
+from ClockSync import ClockSync
+from GpiodInput import GpiodInput, GpiodOutput
+from LedEffects import EffectEngine
+from LedService import LedService
+from NetBuzzer import NetworkInput
+from SerialLink import SerialLink
+from hardware import serial_send_frame, start_effect
+
+DEBUG_SERIAL = False
+
+# round trips a (re)connected board is pinged for, one a frame, before its
+# clock alignment is logged and it drops to one PING per interval
+SYNC_PINGS = 4
+
+# RPi.GPIO, imported when the GPIO backend is opened
+GPIO = None
+
+# keys that stand in for player buttons, in player order
+KEYPAD_KEYS = (
+    pygame.K_KP1, pygame.K_KP2, pygame.K_KP3, pygame.K_KP4, pygame.K_KP5, pygame.K_KP6,
+    pygame.K_KP7, pygame.K_KP8, pygame.K_KP9, pygame.K_KP0, pygame.K_KP_PERIOD, pygame.K_KP_ENTER,
+)
+PC_KEYS = (pygame.K_z, pygame.K_x, pygame.K_c, pygame.K_v)
+
+
+@dataclass
+class InputEvent:
+    """A button press or release from a backend."""
+    player: int                         # zero based
+    pressed: bool = True                # False for a release
+    timestamp_us: Optional[int] = None  # in the source's timeline, None if unknown
+    arrival_ns: int = field(default_factory=time.monotonic_ns)  # host time of the raw input
+
+
+class Backend:
+    """
+    A backend with no buttons and no LEDs.
+
+    Subclasses override what their hardware supports. Presses without a
+    timestamp take effect immediately; timestamped ones are arbitrated.
+    """
+
+    name: str = "none"
+    # sets of keys that stand in for the player buttons, each in player order
+    emulated_keys: Sequence[Sequence[int]] = (KEYPAD_KEYS,)
+
+    def open(self, context) -> bool:
+        """
+        Set up the hardware.
+
+        Returns:
+            bool: False if the hardware is not available
+        """
+        return True
+
+    def close(self, context) -> None:
+        """Release the hardware."""
+
+    def poll(self, context) -> List[InputEvent]:
+        """Return input that arrived since the last poll. Main thread only."""
+        return []
+
+    def emulates(self, key: int) -> Optional[int]:
+        """Return the player a key stands in for, or None."""
+        for keys in self.emulated_keys:
+            if key in keys and list(keys).index(key) < config.PLAYERS:
+                return list(keys).index(key)
+        return None
+
+    def whole_frame(self, context) -> bool:
+        """True if LEDs are written all at once with write_leds()."""
+        return False
+
+    def write_led(self, context, led: int, state: bool) -> None:
+        """Show one LED."""
+
+    def write_leds(self, context, mask: int) -> None:
+        """Show every LED from a bitmask, for whole_frame() backends."""
+
+    def flush(self, context) -> None:
+        """Send this frame's LED changes, at the end of the frame."""
+        if context.led_service:
+            context.led_service.flush()
+
+    def runs_effects(self, context) -> bool:
+        """True if the hardware can animate LED effects by itself."""
+        return False
+
+    def start_effect(self, context, frame: bytes) -> None:
+        """Hand an EFFECT frame to the hardware, for runs_effects() backends."""
+
+    def stop_effect(self, context) -> None:
+        """Return LEDs to write_led()/write_leds() control."""
+
+
+class KeyboardBackend(Backend):
+    """Development mode: keypad 1-9, 0, ., Enter and Z,X,C,V are the player buttons."""
+
+    name = "keyboard"
+    emulated_keys = (KEYPAD_KEYS, PC_KEYS)
+
+
+class GpioBackend(Backend):
+    """
+    Buttons and LEDs wired straight to the Raspberry Pi.
+
+    Buttons are read on another thread (RPi.GPIO callbacks, or libgpiod when
+    INPUT_BACKEND is "gpiod") and handed over through context.buzz_queue.
+    With "gpiod" the LEDs are driven through libgpiod too, and RPi.GPIO is
+    never imported.
+    """
+
+    name = "rpi"
+    emulated_keys = ()
+
+    def __init__(self) -> None:
+        self.reader: Optional[GpiodInput] = None
+        self.leds: Optional[GpiodOutput] = None
+
+    def open(self, context) -> bool:
+        """
+        Setup Raspberry Pi GPIO pins for buttons and LEDs.
+
+        Note:
+            - Uses BCM pin numbering scheme
+            - Button pins are configured as inputs with internal pull-up resistors
+            - Button events are detected on falling edge (button press to ground)
+              with a 50ms debounce, and queued from RPi.GPIO's thread
+            - With INPUT_BACKEND "gpiod" the buttons and LEDs go through
+              libgpiod instead, see open_gpiod()
+            - GPIO warnings are disabled to suppress pin 20 warnings
+            - All LEDs are initialized to off state
+            - Returns False if RPi.GPIO cannot be loaded, or if PLAYER_MAP or
+              GPIO_LED_MAP has fewer pins than there are players
+        """
+        if min(len(config.PLAYER_MAP), len(config.GPIO_LED_MAP)) < config.PLAYERS:
+            print("Cannot use GPIO: PLAYER_MAP and GPIO_LED_MAP need a pin for each of %d players"
+                  % config.PLAYERS)
+            return False
+        if config.INPUT_BACKEND == "gpiod":
+            return self.open_gpiod(context)
+
+        global GPIO  # pylint: disable=global-statement
+        if GPIO is None:
+            try:
+                import RPi.GPIO as GPIO  # pylint: disable=import-outside-toplevel
+            except (ImportError, RuntimeError) as err:
+                # not a Pi, or no access to the GPIO registers
+                print("Cannot use GPIO: %s" % err)
+                return False
+
+        # Setup the GPIOs as inputs with Pull Ups since the buttons are connected to GND
+        GPIO.setmode(GPIO.BCM)
+        for k in config.PLAYER_MAP:
+            GPIO.setup(k, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            GPIO.add_event_detect(k, GPIO.FALLING, partial(self.button_event, context), bouncetime=50)
+
+        for k in config.GPIO_LED_MAP:
+            GPIO.setup(k, GPIO.OUT)
+
+        # I have no idea where these warnings are coming from on pin 20, let's
+        # disable them. maybe it's complaining because pin 20 is MOSI/SPI but we're
+        # not using that and everything works fine.
+        GPIO.setwarnings(False)
+
+        for k in range(config.PLAYERS):
+            self.write_led(context, k, False)
+            context.led_state[k] = False
+        return True
+
+    def open_gpiod(self, context) -> bool:
+        """
+        Request the LED lines as outputs and start reading the buttons, all
+        through libgpiod.
+
+        Returns:
+            bool: False if the gpiod package is missing or the lines could
+            not be requested
+        """
+        try:
+            self.leds = GpiodOutput(config.GPIOD_CHIP, config.GPIO_LED_MAP)
+            self.leds.open()
+            # one bulk request, one reader thread, kernel timestamps
+            self.reader = GpiodInput(
+                context, config.GPIOD_CHIP, config.PLAYER_REVERSE_MAP, config.GPIOD_DEBOUNCE_MS
+            )
+            self.reader.start()
+        except (RuntimeError, OSError) as err:
+            print("Cannot use gpiod: %s" % err)
+            self.close(context)
+            return False
+        context.gpio_input = self.reader
+
+        for k in range(config.PLAYERS):
+            self.write_led(context, k, False)
+            context.led_state[k] = False
+        return True
+
+    def close(self, context) -> None:
+        if self.reader:
+            self.reader.stop()
+            self.reader = None
+        if self.leds:
+            self.leds.release()
+            self.leds = None
+        elif GPIO is not None:
+            GPIO.cleanup()
+
+    def button_event(self, context, channel: int) -> None:
+        """RPi.GPIO callback: stamp and queue the press for the main loop."""
+        context.buzz_queue.push(config.PLAYER_REVERSE_MAP[channel])
+
+    def poll(self, context) -> List[InputEvent]:
+        # the capture time stands in for a hardware timestamp
+        return [
+            InputEvent(buzz.player, True, buzz.captured_ns // 1000, buzz.captured_ns)
+            for buzz in context.buzz_queue.drain()
+        ]
+
+    def write_led(self, context, led: int, state: bool) -> None:
+        if self.leds:
+            self.leds.set(config.GPIO_LED_MAP[led], state)
+        else:
+            GPIO.output(config.GPIO_LED_MAP[led], state)
+
+
+class SerialBackend(Backend):
+    """
+    The usb_gpio_v4 board (firmware/gameshow_to_serial.ino) on a serial port.
+
+    Presses carry the board's micros() at the edge. LED updates go through
+    the LedService open() starts, so the main loop never waits for the board
+    to answer one.
+    """
+
+    name = "serial"
+
+    def __init__(self, device: Optional[str], vid_pids: Optional[List[str]] = None) -> None:
+        """
+        Args:
+            device: Serial device, or None to discover the board by VID/PID
+            vid_pids: "VID:PID" strings accepted during discovery
+        """
+        self.device: Optional[str] = device
+        self.vid_pids: Optional[List[str]] = vid_pids
+        self.link: Optional[SerialLink] = None
+        # PING waiting for its PONG: (sequence, sent_ns, clock to record it in)
+        self.ping_sent: Optional[Tuple[int, int, ClockSync]] = None
+        # the firmware answered a PING with NAK: it predates PING
+        self.ping_rejected: bool = False
+
+    def open(self, context) -> bool:
+        """
+        Start connecting to the board in the background.
+
+        The game runs from the keyboard until the board has answered, and
+        again whenever it is unplugged; poll() picks the board up as soon as
+        it (re)appears.
+        """
+        context.serial_port = None
+        context.led_service = LedService(
+            context, config.LED_ACK_TIMEOUT_MS, config.LED_MAX_IN_FLIGHT
+        )
+        context.led_service.start()
+
+        print("Looking for serial board %s" % (self.device or "(auto-detect)"))
+        self.link = SerialLink(
+            self.device, self.vid_pids, config.SERIAL_HANDSHAKE_TIMEOUT_MS, config.SERIAL_RESCAN_MS
+        )
+        self.link.start()
+        return True
+
+    def close(self, context) -> None:
+        if self.link:
+            self.link.stop()
+            self.link = None
+        if context.led_service:
+            context.led_service.stop()
+            context.led_service = None
+        if context.serial_port:
+            context.serial_port.close()
+            context.serial_port = None
+
+    def attach(self, context, device: str, port, binary: bool) -> None:
+        """
+        Start using a port the link has finished connecting.
+
+        The board came out of reset dark, so everything it should show is
+        sent again: the LED state on the next flush, or the running effect.
+        """
+        context.serial_port = port
+        context.serial_binary = binary
+        context.frame_decoder.reset()
+        context.serial_backlog = []
+        context.board_clock.reset()
+        self.ping_sent = None
+        self.ping_rejected = False
+        if context.led_service:
+            context.led_service.invalidate()
+        if context.effects.active:
+            start_effect(context, context.effects.effect, context.effects.player,
+                         context.effects.period_ms)
+
+        stats = self.link.stats
+        if stats["recover_ms"] is not None and stats["connects"] > 1:
+            print("Serial board back on %s after %.0f ms" % (device, stats["recover_ms"]))
+        else:
+            print("Serial board ready on %s after %.0f ms" % (device, stats["first_connect_ms"]))
+
+    def detach(self, context, err) -> None:
+        """Drop a port that failed and let the link look for the board again."""
+        print("Serial board lost: %s" % err)
+        port = context.serial_port
+        context.serial_port = None
+        context.serial_binary = False
+        self.ping_sent = None
+        try:
+            port.close()
+        except (serial.SerialException, OSError):
+            pass
+        if context.led_service:
+            context.led_service.invalidate()
+        if self.link:
+            self.link.lost()
+
+    def poll(self, context) -> List[InputEvent]:
+        """
+        Drain all pending serial data.
+
+        Note:
+            - Takes over a newly connected port from the link first
+            - A read error or a vanished device node means the board went
+              away: the port is dropped
+              and the link starts looking for it again
+            - Text protocol messages: "SWITCH <number> PRESSED [<micros>]"
+            - Binary protocol PRESS frames always carry a timestamp
+            - LED acknowledgements are handed to the LED service
+            - Debug output is controlled by DEBUG_SERIAL flag
+        """
+        if self.link:
+            ready = self.link.take()
+            if ready:
+                self.attach(context, *ready)
+
+        if not context.serial_port:
+            return []
+        try:
+            if self.port_gone(context):
+                raise serial.SerialException("device %s is gone" % context.serial_port.port)
+            if context.serial_binary:
+                return self.read_frames(context)
+            return self.read_lines(context)
+        except (serial.SerialException, OSError) as err:
+            self.detach(context, err)
+            return []
+
+    def port_gone(self, context) -> bool:
+        """
+        True if the port's device node disappeared, i.e. the cable was pulled.
+
+        A hung up port can still report nothing waiting, so reads alone do
+        not always notice.
+        """
+        device = getattr(context.serial_port, "port", None)
+        return isinstance(device, str) and not os.path.exists(device)
+
+    def read_lines(self, context) -> List[InputEvent]:
+        """Parse text protocol lines."""
+        events = []
+        while context.serial_port.inWaiting() > 0:
+            # when the bytes were noticed, the raw input time for latency
+            # tracking; they may have waited up to a frame, see Latency.py
+            arrival_ns = time.monotonic_ns()
+            received_data = context.serial_port.readline()
+            if DEBUG_SERIAL:
+                print(f"recv: {str(received_data)}")
+            parts = received_data.split()
+            if context.led_service and parts and parts[0] in (b"LED", b"INVALID"):
+                # acknowledgement of a command sent by the LED service
+                context.led_service.acked(parts[0] == b"LED")
+                continue
+
+            if not (parts and len(parts) >= 3 and parts[0] == b"SWITCH"):
+                continue
+
+            try:
+                player = int(parts[1]) - 1
+                # newer firmware stamps each press with micros() at the edge
+                stamp = int(parts[3]) if parts[2] == b"PRESSED" and len(parts) >= 4 else None
+            except ValueError:
+                # a line garbled on the wire
+                print(f"Dropped bad serial line: {received_data!r}")
+                continue
+            if not 0 <= player < len(context.led_state):
+                continue
+            if parts[2] == b"PRESSED":
+                stamp = context.board_clock.unwrap(stamp) if stamp is not None else None
+                events.append(InputEvent(player, True, stamp, arrival_ns))
+            elif parts[2] == b"RELEASED":
+                events.append(InputEvent(player, False, None, arrival_ns))
+        return events
+
+    def read_frames(self, context) -> List[InputEvent]:
+        """
+        Parse binary protocol frames.
+
+        Frames held back while hardware.serial_send_frame() waited for an ack
+        are processed first, in the order they arrived.
+        """
+        frames = context.serial_backlog
+        context.serial_backlog = []
+
+        arrival_ns = time.monotonic_ns()
+        waiting = context.serial_port.inWaiting()
+        if waiting > 0:
+            frames.extend(context.frame_decoder.feed(context.serial_port.read(waiting)))
+
+        events = []
+        for frame in frames:
+            if DEBUG_SERIAL:
+                print(f"recv: {frame.type:02x} {frame.payload.hex()}")
+            if frame.type == protocol.FRAME_PONG:
+                self.pong(context, frame, arrival_ns)
+                continue
+            if frame.type == protocol.FRAME_NAK and frame.channel == protocol.FRAME_PING:
+                self.ping_sent = None
+                self.ping_rejected = True
+                continue
+            if context.led_service and frame.type in (protocol.FRAME_ACK, protocol.FRAME_NAK):
+                context.led_service.acked(frame.type == protocol.FRAME_ACK)
+                continue
+
+            if frame.type in (protocol.FRAME_PRESS, protocol.FRAME_RELEASE) \
+                    and 1 <= frame.channel <= len(context.led_state):
+                events.append(InputEvent(
+                    frame.channel - 1,
+                    frame.type == protocol.FRAME_PRESS,
+                    context.board_clock.unwrap(frame.timestamp_us),
+                    arrival_ns,
+                ))
+        return events
+
+    def ping(self, context, clock: ClockSync) -> None:
+        """
+        Send a PING to time a round trip for a ClockSync.
+
+        Returns at once: poll() matches the PONG when it arrives and records
+        the round trip in clock. The frame is written under the LED
+        service's write lock, so it never lands in the middle of an LED
+        update from the writer thread.
+
+        Args:
+            context: Game context holding the binary protocol serial_port
+            clock: Where the round trip is recorded
+        """
+        sequence = clock.next_sequence()
+        with context.led_service.write_lock if context.led_service else contextlib.nullcontext():
+            sent_ns = time.monotonic_ns()
+            context.serial_port.write(protocol.encode_ping(sequence))
+        self.ping_sent = (sequence, sent_ns, clock)
+
+    def pong(self, context, frame: protocol.Frame, received_ns: int) -> None:
+        """Record the round trip of the PING a PONG answers; late PONGs are dropped."""
+        if self.ping_sent is None or frame.channel != self.ping_sent[0]:
+            return
+        _, sent_ns, clock = self.ping_sent
+        self.ping_sent = None
+        clock.add(sent_ns, context.board_clock.unwrap(frame.timestamp_us), received_ns)
+
+    def ping_expired(self, now_ns: int, timeout_ns: int) -> bool:
+        """
+        Give up on a PING that has waited longer than timeout_ns.
+
+        Returns:
+            bool: True if one was given up on, counted as a timeout
+        """
+        if self.ping_sent is None or now_ns - self.ping_sent[1] < timeout_ns:
+            return False
+        self.ping_sent[2].stats["timeouts"] += 1
+        self.ping_sent = None
+        return True
+
+    def whole_frame(self, context) -> bool:
+        # the LED service diffs whole frames; binary frames carry every LED
+        return True
+
+    def write_leds(self, context, mask: int) -> None:
+        if context.led_service:
+            # sent by led_service.flush() at the end of the frame
+            return
+        # a port set up without open(): only binary frames, which carry
+        # every LED, are sent directly
+        if context.serial_port and context.serial_binary:
+            serial_send_frame(context, protocol.encode_leds(mask))
+
+    def runs_effects(self, context) -> bool:
+        return bool(context.serial_port and context.serial_binary)
+
+    def start_effect(self, context, frame: bytes) -> None:
+        if context.led_service:
+            context.led_service.start_effect(frame)
+        else:
+            serial_send_frame(context, frame)
+
+    def stop_effect(self, context) -> None:
+        if context.led_service:
+            context.led_service.stop_effect()
+
+
+class BoardContext:
+    """
+    The part of the game context that drives one serial board.
+
+    SerialBackend, LedService and the hardware.py serial helpers only use
+    these attributes, so with several boards each one gets its own
+    BoardContext in place of the game's context.
+    """
+
+    def __init__(self, channels: int) -> None:
+        """
+        Args:
+            channels: Buttons (and LEDs) on the board
+        """
+        self.serial_port = None
+        self.serial_binary: bool = False
+        self.frame_decoder = protocol.FrameDecoder()
+        self.serial_backlog: List[protocol.Frame] = []
+        self.board_clock: MicrosUnwrapper = MicrosUnwrapper()
+        self.led_service: Optional[LedService] = None
+        self.led_state: List[bool] = [False] * channels
+        # effects are animated by the game, never started on a single board
+        self.effects: EffectEngine = EffectEngine(channels)
+
+
+class SerialBoard:
+    """One board of a MultiSerialBackend."""
+
+    def __init__(self, device: str, players: Sequence[int]) -> None:
+        """
+        Args:
+            device: Serial device the board is on
+            players: Zero based player for each channel, -1 if unused
+        """
+        self.device: str = device
+        self.players: List[int] = list(players)
+        self.view: BoardContext = BoardContext(len(self.players))
+        self.serial: SerialBackend = SerialBackend(device)
+        self.clock: ClockSync = ClockSync()
+        # the port the clock was synced on; a new one means the board reset
+        self.port = None
+        self.pings: bool = True
+        # SYNC_PINGS round trips made since the board (re)connected
+        self.aligned: bool = False
+        self.next_ping_ns: int = 0
+
+
+class MultiSerialBackend(Backend):
+    """
+    Several usb_gpio_v4 boards merged into one set of players.
+
+    Each board runs as its own SerialBackend with its own port, LED service
+    and clock. SERIAL_BOARDS maps every (board, channel) to a player. Boards
+    are pinged now and then to learn how their micros() line up with the
+    host clock, and every press is moved onto the host clock before it
+    reaches the game, so the arbiter compares presses from different boards
+    by when they really happened.
+
+    Note:
+        - Needs binary protocol firmware to align clocks; boards that do not
+          answer PING are timed by when their presses arrived
+        - Boards are read in turn, starting with a different one each frame
+        - PINGs never block the frame: the PONG is picked up by a later
+          poll(). A board that (re)connected is pinged again as soon as each
+          PONG is back until it has SYNC_PINGS round trips
+        - No PING is sent while the arbiter is collecting presses; round
+          trips measured while presses are being read are slow and would
+          only be thrown away
+    """
+
+    name = "multiserial"
+
+    def __init__(
+        self,
+        boards: Sequence[Tuple[str, Sequence[int]]],
+        ping_interval_ms: int = 1000,
+        ping_timeout_ms: int = 50,
+    ) -> None:
+        """
+        Args:
+            boards: (device, players) for each board, with one player per
+                channel numbered from 1 and 0 for channels not in use;
+                players past config.PLAYERS are not used either
+            ping_interval_ms: Time between clock sync PINGs to each board
+            ping_timeout_ms: How long to wait for a PONG
+        """
+        self.boards: List[SerialBoard] = [
+            SerialBoard(device, [player - 1 if 0 < player <= config.PLAYERS else -1 for player in players])
+            for device, players in boards
+        ]
+        self.ping_interval_ns: int = ping_interval_ms * 1_000_000
+        self.ping_timeout_ns: int = ping_timeout_ms * 1_000_000
+        self.turn: int = 0
+
+    def open(self, context) -> bool:
+        context.serial_port = None
+        context.led_service = None
+        for board in self.boards:
+            board.serial.open(board.view)
+        return True
+
+    def close(self, context) -> None:
+        for board in self.boards:
+            board.serial.close(board.view)
+
+    def poll(self, context) -> List[InputEvent]:
+        """
+        Read every board and merge their events in time order.
+
+        Note:
+            - A board that (re)connected is pinged once a frame until it has
+              SYNC_PINGS round trips, so its presses are aligned soon
+            - Until a board is synced its presses use their arrival time
+        """
+        now_ns = time.monotonic_ns()
+        start = self.turn % len(self.boards)
+        self.turn += 1
+
+        events = []
+        for board in self.boards[start:] + self.boards[:start]:
+            raw = board.serial.poll(board.view)
+            if board.view.serial_port is not board.port:
+                # connected, lost or reconnected: the board's clock started over
+                board.port = board.view.serial_port
+                board.clock.reset()
+                board.pings = True
+                board.aligned = False
+                board.next_ping_ns = 0
+
+            events.extend(filter(None, (self.map_event(board, event) for event in raw)))
+            self.check_sync(board, now_ns)
+
+            if self.ping_due(context, board, now_ns):
+                self.sync(board, now_ns)
+
+        events.sort(key=lambda e: e.arrival_ns // 1000 if e.timestamp_us is None else e.timestamp_us)
+        return events
+
+    def map_event(self, board: SerialBoard, event: InputEvent) -> Optional[InputEvent]:
+        """
+        Turn a board's event into a player's, on the host clock.
+
+        Returns:
+            Optional[InputEvent]: None if the channel has no player
+        """
+        if not 0 <= event.player < len(board.players) or board.players[event.player] < 0:
+            return None
+        stamp = event.timestamp_us
+        if stamp is not None:
+            stamp = board.clock.to_host_us(stamp) if board.clock.synced else event.arrival_ns // 1000
+        return InputEvent(board.players[event.player], event.pressed, stamp, event.arrival_ns)
+
+    def ping_due(self, context, board: SerialBoard, now_ns: int) -> bool:
+        """True if the board should be pinged now."""
+        if not (board.view.serial_port and board.view.serial_binary and board.pings):
+            return False
+        if board.serial.ping_sent is not None:
+            return False
+        return now_ns >= board.next_ping_ns and not context.arbiter.pending()
+
+    def check_sync(self, board: SerialBoard, now_ns: int) -> None:
+        """Note what came of the board's last PING, once poll() has read the reply."""
+        board.serial.ping_expired(now_ns, self.ping_timeout_ns)
+        if board.serial.ping_rejected and board.pings:
+            board.pings = False
+            print("Board %s does not answer PING; using arrival times" % board.device)
+        if not board.aligned and len(board.clock.samples) >= SYNC_PINGS:
+            board.aligned = True
+            print("Board %s clock aligned: offset %d us, +/- %d us" % (
+                board.device, board.clock.offset_us, board.clock.uncertainty_us
+            ))
+
+    def sync(self, board: SerialBoard, now_ns: int) -> None:
+        """Send a board a PING; until it is aligned the next one is due at once."""
+        try:
+            board.serial.ping(board.view, board.clock)
+        except (serial.SerialException, OSError) as err:
+            board.serial.detach(board.view, err)
+            return
+        board.next_ping_ns = now_ns + (self.ping_interval_ns if board.aligned else 0)
+
+    def whole_frame(self, context) -> bool:
+        return True
+
+    def write_leds(self, context, mask: int) -> None:
+        # each board shows the LEDs of the players on its channels
+        for board in self.boards:
+            for channel, player in enumerate(board.players):
+                board.view.led_state[channel] = player >= 0 and bool(mask >> player & 1)
+
+    def flush(self, context) -> None:
+        for board in self.boards:
+            if board.view.led_service:
+                board.view.led_service.flush()
+
+
+class NetworkBackend(Backend):
+    """
+    Wireless handheld buzzers reporting over UDP (see NetBuzzer.py).
+
+    Buzzers stamp presses with their own clock, which the server maps onto
+    the host clock, so their presses are arbitrated like wired ones.
+    """
+
+    name = "network"
+
+    def __init__(self, host: str, port: int, player_map: Optional[dict] = None) -> None:
+        """
+        Args:
+            host: Address to listen on
+            port: UDP port to listen on
+            player_map: Device id to zero based player, or None to let
+                device n play as player n
+        """
+        self.host: str = host
+        self.port: int = port
+        self.player_map: Optional[dict] = player_map
+        self.input: Optional[NetworkInput] = None
+
+    def open(self, context) -> bool:
+        self.input = NetworkInput(self.host, self.port, config.PLAYERS, self.player_map)
+        try:
+            self.input.start()
+        except OSError as err:
+            print("Cannot listen for buzzers on %s:%d: %s" % (self.host, self.port, err))
+            self.input = None
+            return False
+        print("Listening for buzzers on %s:%d" % self.input.address)
+        return True
+
+    def close(self, context) -> None:
+        if self.input:
+            self.input.stop()
+            self.input = None
+
+    def poll(self, context) -> List[InputEvent]:
+        if not self.input:
+            return []
+        return [
+            InputEvent(edge.player, edge.pressed, edge.timestamp_us, edge.arrival_ns)
+            for edge in self.input.drain()
+        ]
+
+
+class SimulatedBackend(Backend):
+    """
+    Generates presses without any hardware, for load tests and demos.
+
+    Scripted presses happen at fixed times after open(); random presses are
+    spread evenly at rate_hz with a random player each. Every press is
+    timestamped, so they all go through arbitration like real ones.
+    """
+
+    name = "simulated"
+
+    def __init__(
+        self,
+        rate_hz: float = 0.0,
+        players: int = 4,
+        script: Optional[Sequence[Tuple[int, int, bool]]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            rate_hz: Random presses per second, 0 for none
+            players: Number of players to pick from
+            script: (ms after open, zero based player, pressed) entries in time order
+            seed: Random seed, for repeatable runs
+        """
+        self.rate_hz: float = rate_hz
+        self.players: int = players
+        self.script: List[Tuple[int, int, bool]] = [
+            (int(at_ms), int(player), bool(pressed)) for at_ms, player, pressed in script or []
+        ]
+        self.random = random.Random(seed)
+
+        self.started_ns: int = 0
+        self.script_pos: int = 0
+        self.generated: int = 0
+
+    def open(self, context) -> bool:
+        self.started_ns = time.monotonic_ns()
+        self.script_pos = 0
+        self.generated = 0
+        return True
+
+    def poll(self, context, now_ns: Optional[int] = None) -> List[InputEvent]:
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        events = []
+
+        while self.script_pos < len(self.script):
+            at_ms, player, pressed = self.script[self.script_pos]
+            at_ns = self.started_ns + at_ms * 1_000_000
+            if at_ns > now_ns:
+                break
+            events.append(InputEvent(player, pressed, at_ns // 1000, at_ns))
+            self.script_pos += 1
+
+        if self.rate_hz > 0:
+            due = int((now_ns - self.started_ns) * self.rate_hz / 1e9)
+            for n in range(self.generated, due):
+                at_ns = self.started_ns + int((n + 1) * 1e9 / self.rate_hz)
+                player = self.random.randrange(self.players)
+                events.append(InputEvent(player, True, at_ns // 1000, at_ns))
+            self.generated = max(self.generated, due)
+
+        return events
+
+
+def create_backend() -> Backend:
+    """Build the backend for config.PLATFORM."""
+    if config.PLATFORM == "rpi":
+        return GpioBackend()
+    if config.PLATFORM == "pcserial" and config.SERIAL_BOARDS:
+        return MultiSerialBackend(
+            [(board["device"], board["players"]) for board in config.SERIAL_BOARDS],
+            config.CLOCK_SYNC_INTERVAL_MS, config.CLOCK_SYNC_TIMEOUT_MS,
+        )
+    if config.PLATFORM == "pcserial":
+        return SerialBackend(config.SERIAL_DEVICE, config.SERIAL_VID_PID)
+    if config.PLATFORM == "network":
+        return NetworkBackend(
+            config.NET_BUZZER_HOST, config.NET_BUZZER_PORT,
+            {int(device): int(player) - 1 for device, player in config.NET_BUZZERS} or None,
+        )
+    if config.PLATFORM == "simulated":
+        return SimulatedBackend(
+            config.SIM_PRESS_RATE_HZ, config.PLAYERS, config.SIM_SCRIPT, config.SIM_SEED
+        )
+    return KeyboardBackend()
+
+
+def open_backend(context) -> Backend:
+    """
+    Open the configured backend and make it context.backend.
+
+    Falls back to the keyboard if the hardware is not available.
+    """
+    backend = create_backend()
+    if not backend.open(context):
+        print("Falling back to keyboard input.")
+        backend = KeyboardBackend()
+        backend.open(context)
+    context.backend = backend
+    return backend
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+"""
+Buzz latency benchmark.
+
+Runs the game headless against a pty-backed emulated board, presses each
+player's button in turn and follows every buzz from the serial bytes to the
+"Buzzed in!" frame on screen (see Latency.py). Prints percentiles per stage
+and per player.
+
+Every stage is measured from when the emulated board wrote the press to the
+pty, not from when the game polled the port, so the time the bytes wait in
+the tty buffer for the next frame is counted. Presses fall at a random point
+within a frame, as real ones do.
+
+Use it as a regression check by saving a baseline and comparing later runs:
+
+    python benchmark.py --presses 200 --json baseline.json
+    python benchmark.py --presses 200 --baseline baseline.json
+
+The comparison exits non-zero if input-to-sound or input-to-screen got slower
+than the baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, Optional
+
+# headless: no window, no audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# pylint: disable=wrong-import-position
+import game_config as config
+from BoardEmulator import BoardEmulator
+from Context import Context
+from GameState import GameState
+from Latency import LatencyTracker
+from PtyBoard import PtyBoard
+from backends import SerialBackend
+from events import run_frame
+from render import init_game
+
+# stages compared against a baseline
+GATED_STAGES = ("sound", "screen")
+GATED_PERCENTILES = ("p50", "p90")
+
+
+class PressLatencyTracker(LatencyTracker):
+    """
+    A LatencyTracker that starts each trace when the board sent the press.
+
+    The game's own "input" time is when it read the bytes off the port.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        # player -> host monotonic ns the board wrote their last press
+        self.sent_ns: Dict[int, int] = {}
+
+    def begin(self, player: int, input_ns: int, parse_ns: Optional[int] = None) -> None:
+        super().begin(player, self.sent_ns.get(player, input_ns), parse_ns)
+
+
+def press(board, latency, player):
+    """Press a player's button, noting when the press was sent."""
+    latency.sent_ns[player] = time.monotonic_ns()
+    board.press(player + 1)
+
+
+def wait_frames(context, done, timeout_s):
+    """
+    Run frames until done() is true.
+
+    Returns:
+        bool: False if timeout_s passed first
+    """
+    deadline = time.monotonic() + timeout_s
+    while not done():
+        if time.monotonic() > deadline:
+            return False
+        run_frame(context)
+    return True
+
+
+def run_benchmark(presses=100, fps=None, timeout_s=5.0, seed=0):
+    """
+    Press buttons on an emulated board and measure each buzz.
+
+    Args:
+        presses (int): Number of buzzes, spread over the players in turn
+        fps (int): Frame rate cap, defaults to config.FPS; 0 runs uncapped
+        timeout_s (float): Longest to wait for the board or for one buzz
+        seed (int): Seed for where in a frame each press falls
+
+    Returns:
+        LatencyTracker: The collected latencies, from when each press was sent
+    """
+    if fps is not None:
+        config.FPS = fps
+    config.DISPLAY_STYLE = "windowed"
+    frame_ms = 1000 / config.FPS if config.FPS else 0
+    rng = random.Random(seed)
+
+    board = PtyBoard(BoardEmulator(channels=config.PLAYERS)).start()
+    context = Context()
+    backend = SerialBackend(board.device)
+    context.backend = backend
+    try:
+        backend.open(context)
+        init_game(context)
+        if not wait_frames(context, lambda: context.serial_port, timeout_s):
+            raise RuntimeError("emulated board did not connect")
+
+        context.latency = PressLatencyTracker()
+        for n in range(presses):
+            player = n % config.PLAYERS
+            context.state = GameState.RUNNING
+            context.player_buzzed_in = -1
+            context.arbiter.reset()
+
+            completed = context.latency.completed
+            # sent from the board's own thread, while the game sleeps or draws
+            board.at(rng.uniform(0, frame_ms), lambda player=player: press(board, context.latency, player))
+            if not wait_frames(context, lambda: context.latency.completed > completed, timeout_s):
+                raise RuntimeError("buzz %d for player %d never reached the screen" % (n, player + 1))
+            board.release(player + 1)
+        return context.latency
+    finally:
+        backend.close(context)
+        board.stop()
+
+
+def compare(summary, baseline, tolerance):
+    """
+    Find gated percentiles that got slower than the baseline.
+
+    Returns:
+        list: Descriptions of each regression
+    """
+    regressions = []
+    for stage in GATED_STAGES:
+        for pct in GATED_PERCENTILES:
+            old = baseline.get(stage, {}).get(pct)
+            new = summary.get(stage, {}).get(pct)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append("input->%s %s %.2f ms, baseline %.2f ms" % (stage, pct, new, old))
+    return regressions
+
+
+def main():
+    """Parse arguments, run the benchmark and report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--presses", type=int, default=100, help="number of buzzes (default: 100)")
+    parser.add_argument("--fps", type=int, default=None, help="frame rate cap, 0 for uncapped (default: FPS)")
+    parser.add_argument("--json", help="write the summary to this file")
+    parser.add_argument("--baseline", help="compare against a summary written by --json")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown against the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    latency = run_benchmark(args.presses, args.fps)
+    print(latency.report())
+    summary = latency.summary()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(summary, json.load(file), args.tolerance)
+        for line in regressions:
+            print("SLOWER: " + line)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against %s" % args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+
+"""
+Wireless buzzer simulator.
+
+Drives any number of virtual handheld buzzers, each with its own UDP socket,
+clock offset, clock drift and packet loss, and reports how the buzzer
+server coped: acks, resends, repeats dropped and how closely presses were
+placed on the host clock. By default the server runs in-process on
+loopback; --port sends to a running game instead (PLATFORM "network").
+
+    python buzzersim.py --buzzers 300 --rate 1 --seconds 10 --loss 0.05
+    python buzzersim.py --buzzers 4 --rate 0.5 --seconds 60 --port 4210
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Dict, Optional
+
+import game_config as config
+from Latency import Histogram
+from NetBuzzer import (
+    PACKET_HELLO,
+    PACKET_PRESS,
+    PACKET_RELEASE,
+    BuzzerServer,
+    decode_ack,
+    encode_packet,
+)
+
+
+class VirtualBuzzer(asyncio.DatagramProtocol):
+    """
+    One simulated handheld buzzer.
+
+    Sends each packet until it is acked, up to retries times, waiting
+    retry_ms and then twice as long before each resend.
+    """
+
+    def __init__(
+        self,
+        device: int,
+        rng: random.Random,
+        loss: float = 0.0,
+        retry_ms: float = 20.0,
+        retries: int = 5,
+        drift_ppm: float = 50.0,
+    ) -> None:
+        """
+        Args:
+            device: Device id
+            rng: Random source for clock, timing and loss
+            loss: Chance of each datagram or ack being lost
+            retry_ms: Wait for the first ack
+            retries: Resends before giving up
+            drift_ppm: Largest clock rate error, either way
+        """
+        self.device: int = device
+        self.rng: random.Random = rng
+        self.loss: float = loss
+        self.retry_s: float = retry_ms / 1000
+        self.retries: int = retries
+        # the buzzer's clock: booted at a random moment, running a little fast or slow
+        self.boot_us: int = time.monotonic_ns() // 1000 - rng.randrange(1_000_000, 3_600_000_000)
+        self.rate: float = 1 + rng.uniform(-drift_ppm, drift_ppm) / 1e6
+
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.sequence: int = 0
+        self.waiting: Dict[int, asyncio.Future] = {}
+        # host time of each edge, keyed by sequence number, to check alignment
+        self.edges: Dict[int, int] = {}
+        self.stats: Dict[str, int] = {"sent": 0, "resent": 0, "acked": 0, "failed": 0, "dropped": 0}
+        self.ack_latency: Histogram = Histogram()
+
+    def micros(self, host_us: Optional[int] = None) -> int:
+        """The buzzer's clock at a host time, defaulting to now."""
+        if host_us is None:
+            host_us = time.monotonic_ns() // 1000
+        return int((host_us - self.boot_us) * self.rate)
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        ack = decode_ack(data)
+        if ack is None or ack[0] != self.device:
+            return
+        if self.rng.random() < self.loss:
+            self.stats["dropped"] += 1
+            return
+        future = self.waiting.pop(ack[1], None)
+        if future and not future.done():
+            future.set_result(ack[2])
+
+    def send(self, packet_type: int, sequence: int, edge_us: int) -> None:
+        """Send one copy of a packet, unless the network loses it."""
+        self.stats["sent"] += 1
+        if self.rng.random() < self.loss:
+            self.stats["dropped"] += 1
+            return
+        self.transport.sendto(encode_packet(packet_type, self.device, sequence, edge_us, self.micros()))
+
+    async def report(self, packet_type: int) -> bool:
+        """
+        Report an edge (or a heartbeat) now and wait for the ack.
+
+        Returns:
+            bool: True if the server acked it
+        """
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        sequence = self.sequence
+        host_us = time.monotonic_ns() // 1000
+        edge_us = self.micros(host_us)
+        if packet_type != PACKET_HELLO:
+            self.edges[sequence] = host_us
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[sequence] = future
+        wait_s = self.retry_s
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats["resent"] += 1
+            self.send(packet_type, sequence, edge_us)
+            try:
+                await asyncio.wait_for(asyncio.shield(future), wait_s)
+            except asyncio.TimeoutError:
+                wait_s *= 2
+                continue
+            self.stats["acked"] += 1
+            self.ack_latency.add(time.monotonic_ns() - host_us * 1000)
+            return True
+
+        self.waiting.pop(sequence, None)
+        self.stats["failed"] += 1
+        return False
+
+    async def play(self, rate_hz: float, seconds: float) -> None:
+        """Say hello, then press at random around rate_hz until time is up."""
+        await self.report(PACKET_HELLO)
+        deadline = time.monotonic() + seconds
+        while True:
+            pause = self.rng.expovariate(rate_hz) if rate_hz > 0 else seconds
+            if time.monotonic() + pause > deadline:
+                break
+            await asyncio.sleep(pause)
+            await self.report(PACKET_PRESS)
+            await asyncio.sleep(self.rng.uniform(0.05, 0.15))
+            await self.report(PACKET_RELEASE)
+
+
+async def run_simulation(
+    buzzers: int = 100,
+    rate_hz: float = 1.0,
+    seconds: float = 5.0,
+    loss: float = 0.0,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    seed: Optional[int] = None,
+) -> Dict[str, object]:
+    """
+    Run virtual buzzers against a buzzer server.
+
+    Args:
+        buzzers: Number of virtual buzzers, device ids 1 up
+        rate_hz: Presses per second per buzzer
+        seconds: How long each buzzer plays
+        loss: Chance of each datagram or ack being lost
+        host: Server address
+        port: Server port, 0 to start a server in-process on loopback
+        seed: Random seed, for repeatable runs
+
+    Returns:
+        Dict[str, object]: Totals from the buzzers, and from the server when
+        it ran in-process
+    """
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+
+    server = None
+    server_transport = None
+    if not port:
+        server = BuzzerServer(config.PLAYERS)
+        server_transport, _ = await loop.create_datagram_endpoint(
+            lambda: server, local_addr=(host, 0)
+        )
+        port = server_transport.get_extra_info("sockname")[1]
+
+    fleet = []
+    for device in range(1, buzzers + 1):
+        buzzer = VirtualBuzzer(device, random.Random(rng.random()), loss)
+        await loop.create_datagram_endpoint(lambda b=buzzer: b, remote_addr=(host, port))
+        fleet.append(buzzer)
+
+    try:
+        await asyncio.gather(*(buzzer.play(rate_hz, seconds) for buzzer in fleet))
+    finally:
+        for buzzer in fleet:
+            buzzer.transport.close()
+        if server_transport:
+            server_transport.close()
+
+    ack_latency = Histogram()
+    for buzzer in fleet:
+        ack_latency.samples.extend(buzzer.ack_latency.samples)
+    result: Dict[str, object] = {
+        "buzzers": buzzers,
+        "buzzer": {name: sum(b.stats[name] for b in fleet) for name in fleet[0].stats},
+        "ack_ms": milliseconds(ack_latency),
+    }
+    if server:
+        result["server"] = summarize_server(server, {b.device: b for b in fleet})
+    return result
+
+
+def milliseconds(histogram: Histogram) -> Dict[str, Optional[float]]:
+    """p50, p99 and worst of a histogram, in milliseconds."""
+    return {
+        name: None if value is None else round(value / 1e6, 3)
+        for name, value in (
+            ("p50", histogram.percentile(50)),
+            ("p99", histogram.percentile(99)),
+            ("max", histogram.percentile(100)),
+        )
+    }
+
+
+def summarize_server(server: BuzzerServer, fleet: Dict[int, VirtualBuzzer]) -> Dict[str, object]:
+    """
+    Totals from an in-process server.
+
+    align_ms is how far each edge's host timestamp landed from when the
+    virtual buzzer really moved; repeats_passed counts edges the server
+    let through twice and should be 0.
+    """
+    edges = server.drain()
+    seen = set()
+    repeats = 0
+    align = Histogram()
+    for edge in edges:
+        key = (edge.device, edge.sequence)
+        repeats += key in seen
+        seen.add(key)
+        align.add(abs(edge.timestamp_us - fleet[edge.device].edges[edge.sequence]) * 1000)
+
+    device_stats = server.device_stats()
+    jitter = Histogram()
+    jitter.samples = [stats["jitter_us"] * 1000 for stats in device_stats.values()]
+    result: Dict[str, object] = {
+        name: sum(stats[name] for stats in device_stats.values())
+        for name in ("packets", "edges", "duplicates", "lost", "restarts")
+    }
+    result.update(
+        devices=len(device_stats),
+        repeats_passed=repeats,
+        align_ms=milliseconds(align),
+        jitter_ms=milliseconds(jitter),
+    )
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--buzzers", type=int, default=100, help="virtual buzzers (default 100)")
+    parser.add_argument("--rate", type=float, default=1.0, help="presses per second per buzzer")
+    parser.add_argument("--seconds", type=float, default=5.0, help="how long to run")
+    parser.add_argument("--loss", type=float, default=0.0, help="chance each datagram is lost")
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", type=int, default=0, help="server port, 0 for an in-process server")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run_simulation(
+        args.buzzers, args.rate, args.seconds, args.loss, args.host, args.port, args.seed
+    ))
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,6 @@ Handles event processing for the gameshow application, including keyboard, seria
 """
 
 import sys
-import math
 import pygame
 import game_config as config
 
@@ -14,281 +13,317 @@ from particleutil import spawn_exploding_particles
 from NameEditor import NameEditor
 
 from render import draw_clock, draw_splash, draw_help, render_all
-from hardware import set_led, set_all_leds
+from hardware import set_led, set_all_leds, start_effect, update_effects
+from LedEffects import Effect
+from backends import InputEvent
+from KeyMap import KEYMAP
 
-DEBUG_SERIAL = False
 
-def button_event(context, channel):
+def handle_input_event(context, event):
     """
-    Register a button press event from a player buzzer.
-    
-    This function is called when a player presses their buzzer button. It maps
-    the hardware channel (GPIO pin or serial input) to the correct player number
-    and stores the information for processing in the main game loop.
+    Route a button press or release from the backend into the game.
 
     Args:
-        context (Context): Current game context containing player and LED state
-        channel (int): Hardware channel number (GPIO pin or serial input number)
+        context (Context): Current game context
+        event (InputEvent): Press or release, with the player already mapped
 
     Note:
-        - For GPIO mode: Maps channel to player using PLAYER_REVERSE_MAP
-        - For serial mode: Assumes 1:1 mapping (channel-1 = player index)
-        - The actual game state transition happens in the main event loop
+        - Button test mode plays the player's sound on every press
+        - Presses only have an effect when game state is RUNNING
+        - Timestamped presses are submitted to context.arbiter so
+          near-simultaneous buzz-ins are decided by when they happened
+        - Presses without one (keyboard, older firmware) take effect immediately
     """
-    # if it's serial it's a 1:1 map
-    if context.serial_port and config.PLATFORM == "pcserial":
-        context.player_buzzed_in = channel - 1
+    if not event.pressed:
+        return
+
+    if context.button_test:
+        context.sound.play(context.sound.test_sound(event.player))
+
+    if context.state != GameState.RUNNING:
+        return
+
+    if context.latency:
+        context.latency.begin(event.player, event.arrival_ns)
+
+    if event.timestamp_us is not None:
+        context.arbiter.submit(event.player, event.timestamp_us, event.arrival_ns)
         return
 
-    # if GPIO we have to map it back to the right player
-    context.player_buzzed_in = config.PLAYER_REVERSE_MAP[channel]
+    if context.player_buzzed_in == -1:
+        context.player_buzzed_in = event.player
+
 
-def handle_serial_input(context):
+def handle_input(context):
     """
-    Process incoming serial data from external hardware.
-    
-    This function checks for incoming serial data and processes button press
-    events from external hardware (typically Arduino). It converts serial
-    messages into pygame events for integration with the main event system.
+    Process everything the backend received since the last frame.
 
     Args:
-        context (Context): Current game context containing serial port information
+        context (Context): Current game context containing the backend
 
     Note:
-        - Only processes data when serial port is available
-        - Expects messages in format: "SWITCH <number> PRESSED"
-        - Only processes button presses when game state is RUNNING
-        - Converts serial events to pygame events for consistent handling
-        - Button numbers are mapped to player indices
-        - Debug output is controlled by DEBUG_SERIAL flag
-    """
-    # do we have serial data?
-    if context.serial_port:
-        if context.serial_port.inWaiting() > 0:
-            received_data = context.serial_port.readline(context.serial_port.inWaiting())
-            if DEBUG_SERIAL:
-                print(f"recv: {str(received_data)}")
-            parts = received_data.split()
-            if ( parts and len(parts) >= 3 ):
-                if context.button_test:
-                    context.sound.play(['ONE','TWO','THREE','FOUR'][int(parts[1]) - 1])
-
-                if (
-                    parts[0] == b"SWITCH"
-                    and parts[2] == b"PRESSED"
-                    and context.state == GameState.RUNNING
-                ):
-                    button_event(context, int(parts[1]))
-                    ser_event = pygame.event.Event(int(parts[1]))
-                    pygame.event.post(ser_event)
-            
+        - Events rejected by context.debounce as bounce are dropped here
+        - Everything the backend returned is recorded, bounce included, so
+          a replay filters it the same way
+    """
+    events = context.backend.poll(context)
+    if context.recorder:
+        context.recorder.inputs(events)
+    if context.watchdog:
+        context.watchdog.saw(events)
+    for event in events:
+        if context.debounce.accept(event):
+            handle_input_event(context, event)
 
-def handle_clock_event(context):
+
+def handle_arbitration(context):
     """
-    Process one tick of the game clock timer.
-    
-    This function handles the countdown timer logic, updating the clock
-    value and triggering appropriate events when time runs out. It also
-    manages LED attraction mode when the game is idle.
+    Resolve a pending buzz-in arbitration window once it has elapsed.
 
     Args:
-        context (Context): Current game context containing clock and game state
+        context (Context): Current game context containing the arbiter
 
     Note:
-        - Decrements clock by CLOCK_STEP milliseconds each tick
-        - Plays warning beep when 4 seconds or less remain
+        - Does nothing while the window is still open
+        - Presses are discarded if the game left RUNNING in the meantime
+        - The result, including the winning margin, is kept in
+          context.last_arbitration and logged to the console
+    """
+    result = context.arbiter.poll()
+    if result is None:
+        return
+
+    if context.state != GameState.RUNNING or context.player_buzzed_in > -1:
+        return
+
+    context.last_arbitration = result
+    context.player_buzzed_in = result.winner
+    print(result.describe())
+
+
+def update_clock(context):
+    """
+    Act on the game clock reaching a second boundary or running out.
+
+    Args:
+        context (Context): Current game context containing the game clock
+
+    Note:
+        - Called every frame, so the beeps and time's up land within a frame
+          of the exact moment; the clock itself is measured, not counted
+        - Plays warning beep as each of the last 4 seconds begins
+        - Journals the time left as each second begins
         - Triggers time's up event when clock reaches zero
         - Sets all LEDs on when time expires
         - Plays TIMESUP sound effect
-        - Transitions game state to TIMEUP
-        - In idle mode, cycles through LEDs for attraction effect
-        - LED cycling creates a "walking light" pattern
-    """
-    if context.clock > 0:
-        if context.state == GameState.RUNNING:
-            if config.CLOCK_ENABLED:
-                context.clock = context.clock - config.CLOCK_STEP
-                minutes = math.floor(context.clock / 60000)
-                sec = int((context.clock - (minutes * 60000)) / 1000)
-
-                if context.prev_sec != sec:
-                    context.prev_sec = sec
-                    if context.prev_sec <= 4:
-                        context.sound.play("BEEP")
-
-                # handle timeout
-                if context.clock == 0:
-                    # play sound
-                    set_all_leds(context, True)
+        - Transitions game state to TIMEUP, which stops the clock
+    """
+    if not context.game_clock.running:
+        return
 
-                    context.sound.play("TIMESUP")
-                    context.state = GameState.TIMEUP
+    sec = context.game_clock.seconds_shown()
+    if context.prev_sec != sec:
+        context.prev_sec = sec
+        # so a restart can put the clock back to within a second
+        context.record("clock", context.clock)
+        if context.prev_sec <= 4:
+            context.sound.play("BEEP")
 
-    if context.state == GameState.IDLE:
-        # in idle state, walk the LEDs.
-        set_led(context, context.led_attract_cycle, True, True)
+    # handle timeout
+    if sec == 0:
+        # play sound
+        set_all_leds(context, True)
 
-        context.led_attract_cycle += 1
-        if context.led_attract_cycle > config.PLAYERS - 1:
-            context.led_attract_cycle = 0
+        context.sound.play("TIMESUP")
+        context.state = GameState.TIMEUP
 
 
-def handle_keyboard_event(context, event):
+def handle_clock_event(context):
     """
-    Process keyboard input events and execute corresponding actions.
-    
-    This function handles all keyboard input for the game, including
-    player scoring, game control, sound effects, and system commands.
-    It provides both MC (Master of Ceremonies) controls and player
-    simulation controls.
+    Process one tick of the CLOCK_STEP timer.
+
+    Checks the game clock and manages LED attraction mode when the game is
+    idle.
 
     Args:
-        context (Context): Current game context containing game state and scores
-        event (pygame.event.Event): The keyboard event to process
+        context (Context): Current game context containing clock and game state
 
     Note:
-        - Any keypress exits BUZZIN state
-        - Shift+Escape provides clean exit
-        - Number keys 1-4 add points to respective players
-        - Q,W,E,R keys subtract points from respective players
-        - Space bar controls game state transitions
-        - P/L keys adjust clock time (+/- 5 seconds)
-        - B/T keys play sound effects
-        - H key shows help screen
-        - I key toggles display inversion
-        - N key opens name editor
-        - S key shows splash screen
-        - Shift+A resets entire game
-        - Shift+Z resets clock only
-        - Keypad keys simulate player buttons in development mode
-        - Z,X,C,V keys simulate player buttons in PC mode
+        - The countdown runs on context.game_clock whether or not ticks
+          arrive on time; see update_clock()
+        - In idle mode, starts the "walking light" LED chase if it is not running
     """
-    # any keypress will take us out of buzzed in.
-    if context.state == GameState.BUZZIN:
-        context.state = GameState.IDLE
-        
-    # handle button test mode
-    if event.key == pygame.K_d and pygame.key.get_mods() & pygame.KMOD_SHIFT:
-        context.button_test = not context.button_test
-
-    # handle quit event (shift-escape)
-    if event.key == pygame.K_ESCAPE and pygame.key.get_mods() & pygame.KMOD_SHIFT:
-        print("\n\nClean Exit: exiting at user request...")
-        pygame.display.quit()
-        pygame.quit()
-        sys.exit()
-
-    # MC Controls
-    #
-    # 1,2,3,4 = Adds a point to that player 1,2,3,4
-    # q,w,e,r = Deduct a point from player 1,2,3,4
-    # shift-a = reset all
-    # shift-z = reset round
-    # (see help for the rest)
-    #
-    # Player scoring - add points
-    score_add_keys = [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4]
-    for i, key in enumerate(score_add_keys):
-        if event.key == key:
-            context.scores[i] += 1
-            context.save()
-            break
-
-    # Player scoring - subtract points
-    score_subtract_keys = [pygame.K_q, pygame.K_w, pygame.K_e, pygame.K_r]
-    for i, key in enumerate(score_subtract_keys):
-        if event.key == key:
-            context.scores[i] -= 1
-            context.save()
-            break
-
-    # Button emulation for non-RPi platforms
-    if config.PLATFORM != "rpi" and context.state == GameState.RUNNING:
-        # Keypad keys for development mode
-        keypad_keys = [pygame.K_KP1, pygame.K_KP2, pygame.K_KP3, pygame.K_KP4]
-        for i, key in enumerate(keypad_keys):
-            if event.key == key:
-                if context.button_test:
-                    context.sound.play(['ONE','TWO','THREE','FOUR'][i])
-
-                if context.state == GameState.RUNNING:
-                    button_event(context, config.PLAYER_MAP[i])
-                break
-
-    # PC mode button emulation
-    if config.PLATFORM == "pc":
-        # Z,X,C,V keys for PC mode
-        pc_keys = [pygame.K_z, pygame.K_x, pygame.K_c, pygame.K_v]
-        for i, key in enumerate(pc_keys):
-            if event.key == key:
-                if context.button_test:
-                    context.sound.play(['ONE','TWO','THREE','FOUR'][i])
-
-                if context.state == GameState.RUNNING:
-                    button_event(context, config.PLAYER_MAP[i])
-                break
-
-    # sounds
-    if event.key == pygame.K_b:
-        context.sound.play("BUZZ")
+    update_clock(context)
+
+    if context.state == GameState.IDLE and not context.effects.active:
+        # in idle state, walk the LEDs. Any set_led() stops the walk.
+        start_effect(context, Effect.CHASE, period_ms=config.ATTRACT_PERIOD_MS)
+
+
+def quit_game(context, arg=None):
+    """Clean exit."""
+    print("\n\nClean Exit: exiting at user request...")
+    pygame.display.quit()
+    pygame.quit()
+    sys.exit()
+
+
+def score_add(context, arg):
+    """Add a point to player arg, counted from 1."""
+    i = int(arg) - 1
+    if 0 <= i < len(context.scores):
+        context.scores[i] += 1
+        context.record("score", i, 1)
+
+
+def score_subtract(context, arg):
+    """Take a point from player arg, counted from 1."""
+    i = int(arg) - 1
+    if 0 <= i < len(context.scores):
+        context.scores[i] -= 1
+        context.record("score", i, -1)
+
+
+def clock_add(context, arg):
+    """Add arg seconds to the clock, or take them off, stopping at zero."""
+    context.clock = max(context.clock + int(arg) * 1000, 0)
 
-    if event.key == pygame.K_t:
-        context.sound.play("TIMESUP")
 
-    # clock changes
-    if event.key == pygame.K_p:
-        context.clock = context.clock + 5000
+def play_sound(context, arg):
+    """Play the sound effect named arg."""
+    context.sound.play(arg)
 
-    if event.key == pygame.K_l:
-        context.clock = context.clock - 5000
-        context.clock = max(context.clock, 0)
 
-    # reset all
-    if event.key == pygame.K_a and pygame.key.get_mods() & pygame.KMOD_SHIFT:
-        context.reset_game()
-        draw_clock(context)
-        context.save()
+def reset_game(context, arg=None):
+    """Reset scores and clock."""
+    context.reset_game()
+    draw_clock(context)
+    context.save()
 
-    # reset round
-    if event.key == pygame.K_z and pygame.key.get_mods() & pygame.KMOD_SHIFT:
-        context.reset_clock()
-        draw_clock(context)
 
-    if event.key == pygame.K_h:
-        draw_help(context)
+def reset_round(context, arg=None):
+    """Reset the clock only."""
+    context.reset_clock()
+    draw_clock(context)
 
-    if event.key == pygame.K_i:
-        context.invert_display = not context.invert_display
 
-    if event.key == pygame.K_n:
-        modal = NameEditor(context)
-        modal.run()
+def toggle_button_test(context, arg=None):
+    """Turn button test mode on or off."""
+    context.button_test = not context.button_test
 
-    if event.key == pygame.K_s and context.state == GameState.IDLE:
+
+def toggle_invert(context, arg=None):
+    """Flip the score band between the top and bottom of the screen."""
+    context.invert_display = not context.invert_display
+    context.record("invert", context.invert_display)
+
+
+def show_help(context, arg=None):
+    """Show the help screen."""
+    draw_help(context)
+
+
+def name_players(context, arg=None):
+    """Open the name editor."""
+    NameEditor(context).open()
+
+
+def show_splash(context, arg=None):
+    """Show the splash screen, only while the game is stopped."""
+    if context.state == GameState.IDLE:
         draw_splash(context)
 
-    # space -- transitions state
-    if event.key == pygame.K_SPACE:
-        set_all_leds(context, False)
-        context.player_buzzed_in = -1
-        if context.state == GameState.BUZZIN:
+
+def stall_report(context, arg=None):
+    """Print how often the main loop has stalled, and on what."""
+    if context.watchdog:
+        print(context.watchdog.report())
+    else:
+        print("Stall watchdog is off (WATCHDOG_STALL_MS = 0)")
+
+
+def start_stop(context, arg=None):
+    """
+    Start or stop the clock, moving the game on from a buzz-in or time's up.
+
+    Note:
+        - Clears the LEDs and any buzz-in
+        - If time ran out, restarts from MAX_CLOCK
+    """
+    set_all_leds(context, False)
+    context.player_buzzed_in = -1
+    context.arbiter.reset()
+    if context.state == GameState.BUZZIN:
+        context.sound.play("BEEP")
+        context.state = GameState.RUNNING
+    else:
+        if context.state == GameState.IDLE:
             context.sound.play("BEEP")
             context.state = GameState.RUNNING
         else:
-            if context.state == GameState.IDLE:
-                context.sound.play("BEEP")
+            if context.state == GameState.TIMEUP:
+                # you can either add time here, or if we
+                # are at zero we will start at zero
+                if context.clock == 0:
+                    context.clock = config.MAX_CLOCK
                 context.state = GameState.RUNNING
             else:
-                if context.state == GameState.TIMEUP:
-                    # you can either add time here, or if we
-                    # are at zero we will start at zero
-                    if context.clock == 0:
-                        context.clock = config.MAX_CLOCK
-                    context.state = GameState.RUNNING
-                else:
-                    context.state = GameState.IDLE
+                context.state = GameState.IDLE
+
+
+# What each KeyMap action name does. Each is called with the context and the
+# binding's argument, or None.
+ACTIONS = {
+    "start_stop": start_stop,
+    "quit": quit_game,
+    "help": show_help,
+    "score_add": score_add,
+    "score_subtract": score_subtract,
+    "clock_add": clock_add,
+    "sound": play_sound,
+    "name_players": name_players,
+    "invert_display": toggle_invert,
+    "splash": show_splash,
+    "reset_game": reset_game,
+    "button_test": toggle_button_test,
+    "reset_clock": reset_round,
+    "stall_report": stall_report,
+}
+
+for spec in KEYMAP.unknown_actions(ACTIONS):
+    print(f"KEYMAP: {spec} is bound to an unknown action, ignoring it")
 
 
+def handle_keyboard_event(context, event):
+    """
+    Process keyboard input events and execute corresponding actions.
+    
+    Each key is looked up once in KEYMAP by key and the modifiers held when
+    it went down, and runs the action it is bound to. The default bindings are listed in KeyMap.py
+    and on the help screen; KEYMAP in settings.toml changes them.
+
+    Args:
+        context (Context): Current game context containing game state and scores
+        event (pygame.event.Event): The keyboard event to process
+
+    Note:
+        - Any keypress exits BUZZIN state
+        - Keypad keys simulate player buttons unless the backend is GPIO
+        - Z,X,C,V keys simulate player buttons with the keyboard backend
+    """
+    # any keypress will take us out of buzzed in.
+    if context.state == GameState.BUZZIN:
+        context.state = GameState.IDLE
+        context.scheduler.cancel(context.answer_timer)
+
+    # Button emulation: keypad keys, plus Z,X,C,V with the keyboard backend
+    player = context.backend.emulates(event.key)
+    if player is not None:
+        handle_input_event(context, InputEvent(player, arrival_ns=context.now_ns()))
+
+    binding = KEYMAP.lookup(event.key, event.mod)
+    if binding and binding.action in ACTIONS:
+        ACTIONS[binding.action](context, binding.arg)
 
 
 def handle_buzz_in(context):
@@ -303,23 +338,37 @@ def handle_buzz_in(context):
         context (Context): Current game context containing player and game state
 
     Note:
-        - Transitions game state to BUZZIN
+        - Journals the buzz-in and transitions game state to BUZZIN
+        - Adds it to the match history, if HISTORY_FILE is set
         - Plays unique player sound if enabled, otherwise plays generic BUZZ sound
         - Turns on only the buzzing player's LED (exclusive mode)
+        - Starts the ANSWER_TIME_MS answer timer, if one is set
         - Spawns particle explosion effect at screen center
         - Particle effects provide visual feedback for successful buzz-in
     """
+    context.record("buzz", context.player_buzzed_in, context.clock)
     context.state = GameState.BUZZIN
+    if context.latency:
+        context.latency.mark(context.player_buzzed_in, "state")
+    if context.history:
+        context.history.buzz(context.player_buzzed_in)
 
     # play a sound
     if config.UNIQUE_PLAYER_SOUNDS:
-        context.sound.play(f"PLAYER{context.player_buzzed_in + 1:d}")
+        context.sound.play(context.sound.player_sound(context.player_buzzed_in))
     else:
         context.sound.play("BUZZ")
+    if context.latency:
+        context.latency.mark(context.player_buzzed_in, "sound")
 
     # light only that player
     set_led(context, context.player_buzzed_in, True, True)
 
+    if config.ANSWER_TIME_MS:
+        context.answer_timer = context.scheduler.call_later(
+            config.ANSWER_TIME_MS, answer_time_up, context, context.player_buzzed_in
+        )
+
     # explode some particles
     #spawn_exploding_particles(
     #     context.screen_info,
@@ -340,6 +389,148 @@ def handle_buzz_in(context):
          500
      ) 
 
+def answer_time_up(context, player):
+    """
+    Sound the end of a player's time to answer.
+
+    Args:
+        context (Context): Current game context
+        player (int): Player whose answer timer this is
+
+    Note:
+        - Does nothing if the MC has already moved on from that buzz-in
+    """
+    if context.state == GameState.BUZZIN and context.player_buzzed_in == player:
+        context.sound.play("TIMESUP")
+
+
+def start_timers(context):
+    """
+    Start the repeating timers the game needs in either runtime.
+
+    Args:
+        context (Context): Current game context containing the scheduler
+    """
+    context.scheduler.call_every(config.CLOCK_STEP, handle_clock_event, context)
+
+
+def wait_for_frame(context):
+    """
+    Sleep until the next frame is due, running timers as they fall due.
+
+    Args:
+        context (Context): Current game context containing the scheduler
+
+    Note:
+        - Frames are due every 1/FPS seconds; after a slow frame the next
+          one starts straight away rather than trying to catch up
+        - FPS 0 runs uncapped, only running timers already due
+        - A button press queued from another thread ends the wait early, see
+          BuzzQueue.py
+    """
+    if not config.FPS:
+        context.scheduler.run_due()
+        return
+    now = context.scheduler.now_ns()
+    context.frame_due_ns = max(context.frame_due_ns + 1_000_000_000 // config.FPS, now)
+    context.scheduler.run_until(context.frame_due_ns)
+    # a button press woke us early: frames carry on from this one
+    context.frame_due_ns = min(context.frame_due_ns, context.scheduler.now_ns())
+
+
+def handle_events(context):
+    """
+    Process this frame's pygame events.
+
+    Args:
+        context (Context): Current game context
+
+    Returns:
+        bool: False once the window has been closed
+
+    Note:
+        - While a modal (help, splash, name editor) is up it gets every
+          event instead of the game, until it closes
+    """
+    running = True
+    events = pygame.event.get()
+    if context.recorder:
+        context.recorder.pygame_events(events)
+    if context.watchdog:
+        context.watchdog.saw(events)
+    if any(event.type == pygame.QUIT for event in events):
+        running = False
+
+    if context.modal:
+        if not context.modal.handle(context, events):
+            context.modal = None
+        return running
+
+    for event in events:
+        if event.type == pygame.KEYDOWN:
+            handle_keyboard_event(context, event)
+    return running
+
+
+def advance_buzz_in(context):
+    """
+    Start the buzz-in once a player has won it.
+
+    The player number will have been set via handle_input_event() or
+    arbitration, even if no event is pending.
+    """
+    if context.player_buzzed_in > -1 and context.state == GameState.RUNNING:
+        # advance to next state, let render figure it out
+        # make some blinking lights and sound
+        handle_buzz_in(context)
+        context.state = GameState.BUZZIN
+
+
+def update_leds(context):
+    """Animate any LED effect the board is not running itself and send the changes."""
+    update_effects(context)
+    # send the LED changes as a single update
+    context.backend.flush(context)
+
+
+def render_frame(context):
+    """
+    Draw the frame, unless a modal is covering the game.
+
+    The pattern here is to set the state of the game and then render;
+    no rendering should happen before this.
+    """
+    if not context.modal:
+        render_all(context)
+
+
+def run_frame(context):
+    """
+    Run one iteration of the main loop: input, game logic, LEDs and render.
+
+    Args:
+        context (Context): Current game context
+
+    Returns:
+        bool: False once the window has been closed
+    """
+    if context.watchdog:
+        context.watchdog.beat()
+    # Handle button input from the backend
+    handle_input(context)
+    handle_arbitration(context)
+    # Handle Events
+    running = handle_events(context)
+    update_clock(context)
+    advance_buzz_in(context)
+    update_leds(context)
+    render_frame(context)
+
+    wait_for_frame(context)
+
+    return running
+
+
 def event_loop(context):
     """
     Main game event loop that processes input and updates the game.
@@ -352,47 +543,23 @@ def event_loop(context):
         context (Context): Current game context containing all game state and systems
 
     Note:
-        - Sets up timer for clock events using PYGAME_CLOCKEVENT
-        - Processes serial input for external hardware
-        - Handles pygame events (quit, keyboard, custom timer)
+        - Starts the CLOCK_STEP timer on context.scheduler, which runs
+          timers while the loop waits for each frame
+        - Processes button input from context.backend (GPIO, serial,
+          keyboard or simulated)
+        - Handles pygame events (quit, keyboard, button wake-ups)
         - Manages player buzz-in state transitions
         - Calls render_all() to update the display
-        - Maintains consistent frame rate using pygame clock
-        - Continues until running flag is set to 0
+        - Sleeps until each frame is due, running timers as they fall due
+        - Continues until the window is closed
         - Handles both hardware and simulated input methods
     """
     # ------------------ main event loop ------------------
-    running = 1
-    pygame.time.set_timer(config.PYGAME_CLOCKEVENT, config.CLOCK_STEP)
+    running = True
+    start_timers(context)
 
     print("\nAll systems go! Game Running.\n")
 
     while running:
-        # Handle Serial Input
-        handle_serial_input(context)
-        # Handle Events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = 0
-
-            if event.type == pygame.KEYDOWN:
-                handle_keyboard_event(context, event)
-
-            if event.type == config.PYGAME_CLOCKEVENT:
-                handle_clock_event(context)
-
-            if context.player_buzzed_in > -1:
-                # now handle player buzz-in. The player number will have been set via
-                # button_event()
-                if context.state == GameState.RUNNING:
-                    # advance to next state, let render figure it out
-                    # make some blinking lights and sound
-                    handle_buzz_in(context)
-                    context.state = GameState.BUZZIN
-
-        # the pattern here is to set the state of the game and then render
-        # no rendering should happen before this line.
-        render_all(context)
-       
-        context.pyclock.tick(config.FPS)
+        running = run_frame(context)
 
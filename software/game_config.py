@@ -5,7 +5,6 @@ This module uses dynaconf to load configuration from settings.toml and provides
 a compatible interface for the existing codebase.
 """
 
-import glob
 from dynaconf import Dynaconf
 from typing import List, Dict, Optional, Any
 
@@ -135,11 +134,39 @@ def get_player_reverse_map() -> Dict[int, int]:
 
 # Game Settings
 PLAYERS: int = settings.get('PLAYERS', 4)
+# Most score tiles in a row before the score band wraps onto another row
+SCORE_COLUMNS: int = settings.get('SCORE_COLUMNS', 6)
 FPS: int = settings.get('FPS', 60)
 CLOCK_ENABLED: bool = settings.get('CLOCK_ENABLED', True)
 MAX_CLOCK: int = settings.get('MAX_CLOCK', 60000)
 CLOCK_STEP: int = settings.get('CLOCK_STEP', 1000)
-PYGAME_CLOCKEVENT: int = settings.get('PYGAME_CLOCKEVENT', pygame.USEREVENT + 1)
+# Show seconds and tenths (9.9) in the last ten seconds of the countdown
+CLOCK_TENTHS: bool = settings.get('CLOCK_TENTHS', False)
+# "loop" runs input, clock, LEDs and drawing in turn each frame; "asyncio"
+# runs them as separate tasks, with button input polled every INPUT_POLL_MS
+# and LED changes sent every LED_UPDATE_MS
+RUNTIME: str = settings.get('RUNTIME', 'loop')
+INPUT_POLL_MS: int = settings.get('INPUT_POLL_MS', 1)
+LED_UPDATE_MS: int = settings.get('LED_UPDATE_MS', 10)
+
+# MC key bindings on top of the defaults in KeyMap.py, key spec to action,
+# e.g. {"F5" = "start_stop", "B" = "none"}
+KEYMAP: Dict[str, str] = settings.get('KEYMAP', {})
+
+# Time a player has to answer after buzzing in, in milliseconds; TIMESUP
+# plays when it runs out. 0 for no limit
+ANSWER_TIME_MS: int = settings.get('ANSWER_TIME_MS', 0)
+
+# Buzz-in arbitration window in milliseconds. Timestamped presses that arrive
+# within this window of the first one are compared by hardware time.
+ARBITRATION_WINDOW_MS: int = settings.get('ARBITRATION_WINDOW_MS', 10)
+
+# Host-side debounce, one value for everyone or a list in player order. Edges
+# within DEBOUNCE_MS of the last accepted one are dropped as bounce, and
+# releases after less than MIN_PRESS_MS are dropped as glitches. The first
+# edge always passes straight through. 0 turns a check off.
+DEBOUNCE_MS: Any = settings.get('DEBOUNCE_MS', 30)
+MIN_PRESS_MS: Any = settings.get('MIN_PRESS_MS', 10)
 
 # Sound Settings
 SOUND_SET_DIR: str = settings.get('SOUND_SET_DIR', 'sounds/trek/wav')
@@ -152,24 +179,78 @@ DRAW_LOGO: bool = settings.get('DRAW_LOGO', True)
 LOGO: str = settings.get('LOGO', 'images/dirtytalk-logo-nobg.png')
 SPLASH: str = settings.get('SPLASH', 'images/dirtytalk-logo-nobg.png')
 LOGO_RESIZE_FACTOR: float = settings.get('LOGO_RESIZE_FACTOR', 0.5)
-STATE_FILE_NAME: str = settings.get('STATE_FILE_NAME', 'gamestate.pickle')
+STATE_FILE_NAME: str = settings.get('STATE_FILE_NAME', 'gamestate.json')
+# Previous state files kept as STATE_FILE_NAME.1, .2, ... in case the newest
+# is damaged, and how long to gather changes before writing
+STATE_GENERATIONS: int = settings.get('STATE_GENERATIONS', 3)
+SAVE_DELAY_MS: int = settings.get('SAVE_DELAY_MS', 250)
+# Changes are journaled to STATE_FILE_NAME.journal; a snapshot is saved to
+# the state file, and the journal compacted, every this many changes
+JOURNAL_SNAPSHOT_EVERY: int = settings.get('JOURNAL_SNAPSHOT_EVERY', 200)
+# Log every input to this file for replay.py, "" for none. strftime() codes
+# give each show its own file, e.g. "shows/%Y%m%d-%H%M%S.jsonl"
+RECORD_FILE: str = settings.get('RECORD_FILE', '')
+# Threads loading sounds, fonts and images at startup, 0 for none
+STARTUP_WORKERS: int = settings.get('STARTUP_WORKERS', 4)
+# SQLite database every round, game and buzz-in is added to, "" for none
+HISTORY_FILE: str = settings.get('HISTORY_FILE', 'history.db')
+# Log the main thread's stack when no frame starts for this long, 0 for off.
+# The log is rotated at WATCHDOG_LOG_BYTES, keeping WATCHDOG_LOG_COUNT old ones
+WATCHDOG_STALL_MS: int = settings.get('WATCHDOG_STALL_MS', 1000)
+WATCHDOG_LOG: str = settings.get('WATCHDOG_LOG', 'stalls.log')
+WATCHDOG_LOG_BYTES: int = settings.get('WATCHDOG_LOG_BYTES', 1_000_000)
+WATCHDOG_LOG_COUNT: int = settings.get('WATCHDOG_LOG_COUNT', 3)
 
 # Hardware Configuration
 PLAYER_MAP: List[int] = settings.get('PLAYER_MAP', [16, 17, 18, 19])
 GPIO_LED_MAP: List[int] = settings.get('GPIO_LED_MAP', [20, 21, 22, 23])
 PLATFORM: str = settings.get('PLATFORM', 'pcserial')
+# How buttons are read and LEDs driven on the Pi: "rpigpio" (RPi.GPIO
+# callbacks) or "gpiod" (Linux GPIO character device, kernel timestamped
+# edges, no RPi.GPIO needed)
+INPUT_BACKEND: str = settings.get('INPUT_BACKEND', 'rpigpio')
+GPIOD_CHIP: str = settings.get('GPIOD_CHIP', '/dev/gpiochip0')
+# Kernel debounce for the gpiod backend. Debounced edges are only reported
+# once the line settles, so 0 keeps the first edge's timestamp.
+GPIOD_DEBOUNCE_MS: int = settings.get('GPIOD_DEBOUNCE_MS', 0)
+# Presses generated by the "simulated" platform: random ones at a steady rate,
+# plus scripted [ms after start, zero based player, pressed] entries
+SIM_PRESS_RATE_HZ: float = settings.get('SIM_PRESS_RATE_HZ', 1.0)
+SIM_SCRIPT: List[List[Any]] = settings.get('SIM_SCRIPT', [])
+SIM_SEED: Optional[int] = settings.get('SIM_SEED', None)
 
-# Serial port configuration
-serial_devices: List[str] = glob.glob("/dev/cu.usbserial*")
-SERIAL_DEVICE: Optional[str] = settings.get('SERIAL_DEVICE', None)
+# Network platform: where wireless buzzers send their datagrams, and
+# [device id, player] pairs (players numbered from 1). Without pairs,
+# buzzer n plays as player n
+NET_BUZZER_HOST: str = settings.get('NET_BUZZER_HOST', '0.0.0.0')
+NET_BUZZER_PORT: int = settings.get('NET_BUZZER_PORT', 4210)
+NET_BUZZERS: List[List[int]] = settings.get('NET_BUZZERS', [])
 
-# Auto-detect serial device if in pcserial mode
-if PLATFORM == "pcserial":
-    if not serial_devices:
-        raise FileNotFoundError("No serial devices found in /dev/cu.usbserial*")
-    SERIAL_DEVICE = serial_devices[0]
-    print(f"Game show is starting for platform {PLATFORM} with serial devices: {serial_devices}")
-    print(f"SERIAL_DEVICE set to: {SERIAL_DEVICE}")
+# Serial port configuration. Without SERIAL_DEVICE the board is found by the
+# USB VID:PID of its serial chip (FTDI FT232R and CH340 Nanos by default)
+SERIAL_DEVICE: Optional[str] = settings.get('SERIAL_DEVICE', None)
+SERIAL_VID_PID: List[str] = settings.get('SERIAL_VID_PID', ['0403:6001', '1a86:7523'])
+# How long to wait for each handshake reply, how often to look for the board
+# while it is unplugged, and how long a single read may block
+SERIAL_HANDSHAKE_TIMEOUT_MS: int = settings.get('SERIAL_HANDSHAKE_TIMEOUT_MS', 3000)
+SERIAL_RESCAN_MS: int = settings.get('SERIAL_RESCAN_MS', 500)
+SERIAL_READ_TIMEOUT_MS: int = settings.get('SERIAL_READ_TIMEOUT_MS', 100)
+# "binary" negotiates the compact framed protocol and falls back to "text"
+SERIAL_PROTOCOL: str = settings.get('SERIAL_PROTOCOL', 'binary')
+# LED updates are sent in the background; these bound how long we wait for
+# the board to ack and how many commands may be outstanding at once
+LED_ACK_TIMEOUT_MS: int = settings.get('LED_ACK_TIMEOUT_MS', 250)
+LED_MAX_IN_FLIGHT: int = settings.get('LED_MAX_IN_FLIGHT', 4)
+# Several boards at once: one {device, players} table per board, players
+# numbered from 1 in channel order and 0 for an unused channel. Overrides
+# SERIAL_DEVICE. Each board's clock is aligned to the host's by a PING every
+# CLOCK_SYNC_INTERVAL_MS, waiting at most CLOCK_SYNC_TIMEOUT_MS for the reply
+SERIAL_BOARDS: List[Dict[str, Any]] = settings.get('SERIAL_BOARDS', [])
+CLOCK_SYNC_INTERVAL_MS: int = settings.get('CLOCK_SYNC_INTERVAL_MS', 1000)
+CLOCK_SYNC_TIMEOUT_MS: int = settings.get('CLOCK_SYNC_TIMEOUT_MS', 50)
+# Step period of the idle "walking light". Boards that speak the binary
+# protocol run it themselves; otherwise the host animates it.
+ATTRACT_PERIOD_MS: int = settings.get('ATTRACT_PERIOD_MS', 1000)
 
 # Display Settings
 DISPLAY_STYLE: str = settings.get('DISPLAY_STYLE', 'fullscreen')
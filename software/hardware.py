@@ -1,149 +1,327 @@
 """
 hardware.py
 
-Handles hardware interactions for the gameshow application, including GPIO and serial communication.
+Handles hardware interactions for the gameshow application: LEDs and effects
+through context.backend (see backends.py), and the serial board link.
 """
 
 import os
+import time
 import serial
+from serial.tools import list_ports
 import game_config as config
+import protocol
 
 DEBUG_SERIAL = False
 
-# conditional importing of Raspberry PI if need be.
-if config.PLATFORM == "rpi":
-    from RPi.GPIO import GPIO
-
-def serial_send(context, cmd):
-    if config.PLATFORM == "pcserial":
-        context.serial_port.write(cmd)
-        context.serial_port.flush()
-        print("sent: " + str(cmd)) if DEBUG_SERIAL else None
-        resp = context.serial_port.readline()
-        print("recv: " + str(resp)) if DEBUG_SERIAL else None
-        return True
-    return False
 
+def serial_send_frame(context, frame):
+    """
+    Send one binary frame and wait for the board to acknowledge it.
+
+    Button events that arrive while we wait are kept in context.serial_backlog
+    so SerialBackend.poll() still sees them.
 
-def button_event(context, channel):
-    if context.serial_port and config.PLATFORM == "pcserial":
-        context.player_buzzed_in = channel - 1
-        return
-    context.player_buzzed_in = config.PLAYER_REVERSE_MAP[channel]
+    Returns:
+        bool: True if the board acked the frame, False if it was rejected or
+        no reply came within SERIAL_READ_TIMEOUT_MS
+    """
+    context.serial_port.write(frame)
+    context.serial_port.flush()
+    print("sent: " + frame.hex()) if DEBUG_SERIAL else None
+    deadline = time.monotonic() + config.SERIAL_READ_TIMEOUT_MS / 1000
+    while time.monotonic() < deadline:
+        data = context.serial_port.read(protocol.FRAME_SIZE)
+        for reply in context.frame_decoder.feed(data):
+            print("recv: %02x %s" % (reply.type, reply.payload.hex())) if DEBUG_SERIAL else None
+            if reply.type == protocol.FRAME_ACK:
+                return True
+            if reply.type == protocol.FRAME_NAK:
+                return False
+            context.serial_backlog.append(reply)
+    print("No reply to frame %s" % frame.hex())
+    return False
 
 
 def set_led(context, led, new_state, exclusive=False):
+    stop_effect(context)
+
+    if context.backend.whole_frame(context):
+        # one update carries every LED, so exclusive costs nothing extra
+        leds = [False] * len(context.led_state) if exclusive else list(context.led_state)
+        leds[led] = new_state
+        set_led_mask(context, protocol.leds_to_mask(leds))
+        return
+
     if exclusive:
         set_all_leds(context, False)
 
-    if config.PLATFORM == "rpi":
-        GPIO.output(config.GPIO_LED_MAP[led], new_state)
-
-    if config.PLATFORM == "pcserial":
-        serial_send(context, b"LED %d %d\n" % ((led + 1), new_state))
+    context.backend.write_led(context, led, new_state)
     context.led_state[led] = new_state
 
 
 def set_all_leds(context, new_state=False):
+    stop_effect(context)
+
+    if context.backend.whole_frame(context):
+        set_led_mask(context, (1 << config.PLAYERS) - 1 if new_state else 0)
+        return
+
     for k in range(0, config.PLAYERS):
         set_led(context, k, new_state, False)
 
 
-def setup_serial(context, device):
+def set_led_mask(context, mask):
     """
-    Configure and initialize serial communication for external hardware.
+    Set every LED from a bitmask in a single update.
 
-    This function sets up serial communication with external hardware (typically
-    Arduino) that handles physical buttons and LEDs. It establishes the connection,
-    waits for the hardware to reset, and verifies communication is working.
+    Args:
+        context (Context): Game context whose backend writes whole frames
+        mask (int): LED bitmask, bit 0 is player 1
+    """
+    context.backend.write_leds(context, mask)
+    for k, state in enumerate(protocol.mask_to_leds(mask, len(context.led_state))):
+        context.led_state[k] = state
+
+
+def start_effect(context, effect, player=-1, period_ms=1000):
+    """
+    Start an LED effect, replacing any running one.
+
+    Backends that can (boards on the binary protocol) run the effect
+    themselves from a single command; otherwise update_effects() animates the
+    LEDs from the host.
 
     Args:
-        context (Context): Game context to store the serial port object
-        device (str): Serial port device name (e.g., "/dev/cu.usbserial*")
+        context (Context): Game context
+        effect (Effect): Effect to run
+        player (int): Zero based player for BLINK and SOLO, -1 for everyone
+        period_ms (int): Effect period in milliseconds
+    """
+    context.effects.start(effect, player, period_ms)
+    context.effects_on_board = context.backend.runs_effects(context)
+
+    if context.effects_on_board:
+        frame = protocol.encode_effect(effect.value, player + 1, context.effects.period_ms)
+        context.backend.start_effect(context, frame)
+
+    update_effects(context)
+
+
+def stop_effect(context):
+    """
+    Stop the running LED effect, leaving the LEDs as they are.
+
+    Args:
+        context (Context): Game context
+    """
+    if not context.effects.active:
+        return
+    context.effects.stop()
+    if context.effects_on_board:
+        context.backend.stop_effect(context)
+    context.effects_on_board = False
+
+
+def update_effects(context):
+    """
+    Bring context.led_state up to date with the running LED effect.
+
+    Call once per frame. When the board runs the effect this only mirrors its
+    LEDs for draw_leds(); otherwise the changed LEDs are written out.
+
+    Args:
+        context (Context): Game context
+    """
+    if not context.effects.active:
+        return
+
+    leds = context.effects.leds()
+    if context.effects_on_board or leds == context.led_state:
+        context.led_state[:] = leds
+        return
+
+    if context.backend.whole_frame(context):
+        set_led_mask(context, protocol.leds_to_mask(leds))
+        return
+
+    for k, state in enumerate(leds):
+        if state != context.led_state[k]:
+            context.backend.write_led(context, k, state)
+            context.led_state[k] = state
+
+
+def parse_vid_pid(entry):
+    """
+    Parse a "VID:PID" string as shown by lsusb, e.g. "1a86:7523".
 
     Returns:
-        serial.Serial: Configured serial port object, or False if setup fails
+        tuple: (vid, pid) as integers
+    """
+    vid, pid = entry.split(":")
+    return int(vid, 16), int(pid, 16)
 
-    Note:
-        - Only works when PLATFORM is set to "pcserial"
-        - Falls back to PC mode if serial device doesn't exist
-        - Waits for hardware reset and "RESET OK" message
-        - Flushes input/output buffers after successful connection
-        - Baud rate is fixed at 115200 with 8N1 configuration
+
+def find_serial_devices(vid_pids=None):
     """
-    if config.PLATFORM != "pcserial":
-        return False
+    List serial ports belonging to a known USB to serial chip.
 
-    # does the device exist?
-    if not os.path.exists(config.SERIAL_DEVICE):
-        print("Serial device %s does not exist." % config.SERIAL_DEVICE)
-        print("Falling back to PC mode.")
-        config.PLATFORM = "pc"
-        return False
+    Args:
+        vid_pids (list): "VID:PID" strings to accept, defaults to SERIAL_VID_PID.
+            An empty list accepts any USB serial port.
 
-    context.serial_port = serial.Serial(
-        device, 115200, bytesize=8, parity=serial.PARITY_NONE, stopbits=1, timeout=None
-    )  # open serial port
+    Returns:
+        list: Device paths, sorted so the choice is stable between runs
+    """
+    wanted = {parse_vid_pid(entry) for entry in (config.SERIAL_VID_PID if vid_pids is None else vid_pids)}
+    devices = []
+    for port in list_ports.comports():
+        if port.vid is None:
+            continue
+        if wanted and (port.vid, port.pid) not in wanted:
+            continue
+        devices.append(port.device)
+    return sorted(devices)
+
+
+def open_serial(device):
+    """
+    Open the board's serial port.
 
-    while not context.serial_port.isOpen():
-        pass
+    Reads time out after SERIAL_READ_TIMEOUT_MS so nothing waiting on the
+    board can hang forever.
 
-    print("Serial port open")
-    # sleep for board to reset as it resets on open
-    print("Waiting for board to reset...")
+    Args:
+        device (str): Serial port device name
 
-    while True:
-        line = context.serial_port.readline()
-        print("recv: " + str(line)) if DEBUG_SERIAL else None
-        if line == b"RESET OK\r\n":
-            break
+    Returns:
+        serial.Serial: The open port (opening resets the board)
+    """
+    return serial.Serial(
+        device, 115200, bytesize=8, parity=serial.PARITY_NONE, stopbits=1,
+        timeout=config.SERIAL_READ_TIMEOUT_MS / 1000, write_timeout=1
+    )
 
-    print("Board reset")
+
+def wait_for_line(port, prefixes, timeout_s):
+    """
+    Read lines until one starts with one of prefixes or the timeout passes.
+
+    Args:
+        port (serial.Serial): Open serial port
+        prefixes (tuple): Accepted line prefixes (bytes)
+        timeout_s (float): How long to wait in seconds
+
+    Returns:
+        bytes: The matching line, or None on timeout
+    """
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        line = port.readline()
+        if line:
+            print("recv: " + str(line)) if DEBUG_SERIAL else None
+        if line.startswith(prefixes):
+            return line
+    return None
+
+
+def negotiate_protocol(port, timeout_s=1.0):
+    """
+    Ask the board to switch to the binary protocol.
+
+    Firmware that supports it answers "PROTO <version> OK". Anything else
+    (older firmware answers "ERROR") leaves us on the text protocol.
+
+    Args:
+        port (serial.Serial): Open serial port, board reset and idle
+        timeout_s (float): How long to wait for an answer
+
+    Returns:
+        bool: True if the binary protocol is now in use
+    """
+    port.write(b"PROTO %d\n" % protocol.PROTOCOL_VERSION)
+    port.flush()
+
+    line = wait_for_line(port, (b"PROTO", b"ERROR", b"INVALID"), timeout_s)
+    binary = line is not None and line.strip() == b"PROTO %d OK" % protocol.PROTOCOL_VERSION
+    print("Using %s serial protocol" % ("binary" if binary else "text"))
+    return binary
+
+
+def handshake(port, timeout_s):
+    """
+    Wait for the board to come out of reset and agree on a protocol.
+
+    Args:
+        port (serial.Serial): Freshly opened serial port
+        timeout_s (float): How long to wait for each reply
+
+    Returns:
+        bool: True for the binary protocol, False for text, or None if the
+            board never reported "RESET OK"
+    """
+    # the board resets when the port is opened
+    if wait_for_line(port, (b"RESET OK",), timeout_s) is None:
+        return None
 
     # flush the serial buffers at the start of the game
-    if context.serial_port:
-        context.serial_port.reset_input_buffer()
-        context.serial_port.reset_output_buffer()
+    port.reset_input_buffer()
+    port.reset_output_buffer()
 
-    return context.serial_port
+    if config.SERIAL_PROTOCOL == "binary":
+        return negotiate_protocol(port, timeout_s)
+    return False
 
 
-def setup_gpio(context):
+def setup_serial(context, device, timeout_s=None):
     """
-    Setup Raspberry Pi GPIO pins for buttons and LEDs.
+    Configure and initialize serial communication for external hardware.
 
-    This function configures the GPIO pins for player button inputs and LED outputs
-    when running on Raspberry Pi hardware. It sets up button detection with
-    debouncing and configures LED pins as outputs.
+    This function sets up serial communication with external hardware (typically
+    Arduino) that handles physical buttons and LEDs. It establishes the connection,
+    waits for the hardware to reset, and verifies communication is working.
+    It blocks until then; the game connects in the background through
+    SerialLink instead.
 
     Args:
-        context (Context): Game context (not used in this function but required for consistency)
+        context (Context): Game context to store the serial port object
+        device (str): Serial port device name (e.g., "/dev/ttyUSB0")
+        timeout_s (float): How long to wait for each reply, defaults to
+            SERIAL_HANDSHAKE_TIMEOUT_MS
+
+    Returns:
+        serial.Serial: Configured serial port object, or False if setup fails
 
     Note:
-        - Only runs when PLATFORM is set to "rpi"
-        - Uses BCM pin numbering scheme
-        - Button pins are configured as inputs with internal pull-up resistors
-        - LED pins are configured as outputs
-        - Button events are detected on falling edge (button press to ground)
-        - Debounce time is set to 50ms to prevent false triggers
-        - GPIO warnings are disabled to suppress pin 20 warnings
-        - All LEDs are initialized to off state
-    """
-    if config.PLATFORM != "rpi":
-        return
+        - Returns False if the serial device doesn't exist or the board does
+          not answer, so the caller can fall back to another backend
+        - Waits for hardware reset and "RESET OK" message
+        - Flushes input/output buffers after successful connection
+        - Negotiates the binary protocol when SERIAL_PROTOCOL is "binary",
+          falling back to text if the firmware does not support it
+        - Baud rate is fixed at 115200 with 8N1 configuration
+    """
+    # does the device exist?
+    if not device or not os.path.exists(device):
+        print("Serial device %s does not exist." % device)
+        return False
 
-    # Setup the GPIOs as inputs with Pull Ups since the buttons are connected to GND
-    GPIO.setmode(GPIO.BCM)
-    for k in config.PLAYER_MAP:
-        GPIO.setup(k, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        GPIO.add_event_detect(k, GPIO.FALLING, button_event, bouncetime=50)
+    if timeout_s is None:
+        timeout_s = config.SERIAL_HANDSHAKE_TIMEOUT_MS / 1000
 
-    for k in config.GPIO_LED_MAP:
-        GPIO.setup(k, GPIO.OUT)
+    port = open_serial(device)
+    print("Serial port open")
+    print("Waiting for board to reset...")
 
-    # I have no idea where these warnings are coming from on pin 20, let's
-    # disable them. maybe it's complaining because pin 20 is MOSI/SPI but we're
-    # not using that and everything works fine.
-    GPIO.setwarnings(False)
+    binary = handshake(port, timeout_s)
+    if binary is None:
+        print("Board did not reset")
+        port.close()
+        return False
 
-    set_all_leds(context)
+    print("Board reset")
+    context.serial_port = port
+    context.serial_binary = binary
+    context.frame_decoder.reset()
+    context.serial_backlog.clear()
+    return port
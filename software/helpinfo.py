@@ -1,37 +1,108 @@
 """
 Help information and key mappings for the game show application.
 
-This module contains the help text and key mappings that are displayed
-to users when they request help or need to understand the controls.
+This module builds the help screen from the key bindings in KeyMap, so
+the keys shown are always the keys that work.
 """
 
-from typing import List, TypedDict
+from typing import Dict, List, Optional, TypedDict
+
+import game_config as config
+from KeyMap import KEYMAP, Binding, KeyMap, key_label
 
 class HelpKey(TypedDict):
     """Type definition for help key entries."""
     key: str
     text: str
 
-HELP_KEYS: List[HelpKey] = [
-    {"key": "SPACE", "text": "Stop/Start clock"},
-    {"key": "SHIFT-ESC", "text": "Quit"},
-    {"key": "H or ?", "text": "HELP"},
-    {"key": "1", "text": "+1 point Player 1"},
-    {"key": "2", "text": "+1 point Player 2"},
-    {"key": "3", "text": "+1 point Player 3"},
-    {"key": "4", "text": "+1 point Player 4"},
-    {"key": "Q", "text": "-1 point Player 1"},
-    {"key": "W", "text": "-1 point Player 2"},
-    {"key": "E", "text": "-1 point Player 3"},
-    {"key": "R", "text": "-1 point Player 4"},
-    {"key": "P", "text": "Clock: +5 seconds"},
-    {"key": "L", "text": "Clock: -5 seconds"},
-    {"key": "T", "text": 'Play a "time\'s up" sound'},
-    {"key": "B", "text": "Play a buzzer sound"},
-    {"key": "N", "text": "Name Players"},
-    {"key": "I", "text": "Invert Display (toggle)"},
-    {"key": "S", "text": "Draw Splash Screen"},
-    {"key": "SHIFT-A", "text": "Reset game"},
-    {"key": "SHIFT-D", "text": "Button Debug Mode"},
-    {"key": "SHIFT-Z", "text": "Reset Clock"},
-]
+
+# help text for each events.ACTIONS name; {} is the binding's argument
+ACTION_HELP: Dict[str, str] = {
+    "start_stop": "Stop/Start clock",
+    "quit": "Quit",
+    "help": "HELP",
+    "score_add": "+1 point Player {}",
+    "score_subtract": "-1 point Player {}",
+    "clock_add": "Clock: {:+d} seconds",
+    "sound": "Play the {} sound",
+    "name_players": "Name Players",
+    "invert_display": "Invert Display (toggle)",
+    "splash": "Draw Splash Screen",
+    "reset_game": "Reset game",
+    "button_test": "Button Debug Mode",
+    "reset_clock": "Reset Clock",
+    "stall_report": "Print stall counts",
+}
+
+# actions whose argument is a player number
+PLAYER_ACTIONS = ("score_add", "score_subtract")
+
+
+def player_of(binding: Binding) -> Optional[int]:
+    """The player a scoring binding is for, or None for other bindings."""
+    if binding.action in PLAYER_ACTIONS and binding.arg and binding.arg.isdigit():
+        return int(binding.arg)
+    return None
+
+
+def help_text(binding: Binding) -> str:
+    """What a binding does, in words."""
+    text = ACTION_HELP.get(binding.action, binding.action)
+    if binding.arg is None:
+        return text
+    arg = int(binding.arg) if binding.arg.lstrip("+-").isdigit() else binding.arg
+    return text.format(arg)
+
+
+def build_help(keymap: KeyMap, players: int) -> List[HelpKey]:
+    """
+    Help lines for every binding, in keymap order.
+
+    Keys that do the same thing share a line ("H or SHIFT-/"). Scoring
+    keys for players not in the game are left out, and with more than four
+    players each run of scoring keys for consecutive players is one line
+    ("1 to =").
+    """
+    lines: List[HelpKey] = []
+    # index of each line by its text, to add keys to it
+    by_text: Dict[str, int] = {}
+    # the run of scoring keys being collected: action, keys, first and last player
+    run: Optional[List] = None
+
+    def end_run() -> None:
+        if run:
+            action, keys, first, last = run
+            label = keys[0] if len(keys) == 1 else f"{keys[0]} to {keys[-1]}"
+            text = help_text(Binding("", action, str(first)))
+            if last != first:
+                text = text.replace(f"Player {first}", f"Player {first}-{last}")
+            lines.append({"key": label, "text": text})
+
+    for binding in keymap:
+        player = player_of(binding)
+        if player is not None:
+            if player > players:
+                continue
+            if players > 4:
+                if run and run[0] == binding.action and player == run[3] + 1:
+                    run[1].append(key_label(binding.spec))
+                    run[3] = player
+                else:
+                    end_run()
+                    run = [binding.action, [key_label(binding.spec)], player, player]
+                continue
+
+        end_run()
+        run = None
+        text = help_text(binding)
+        if text in by_text:
+            line = lines[by_text[text]]
+            line["key"] = f"{line['key']} or {key_label(binding.spec)}"
+        else:
+            by_text[text] = len(lines)
+            lines.append({"key": key_label(binding.spec), "text": text})
+    end_run()
+    return lines
+
+
+HELP_KEYS: List[HelpKey] = build_help(KEYMAP, config.PLAYERS)
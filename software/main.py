@@ -5,7 +5,8 @@ The Dirty Talk Game Show
 A four player game show buzzer system with a large clock and score display.
 
 This module implements the main game logic for a game show buzzer system that supports
-multiple platforms (Raspberry Pi with GPIO, PC with serial, PC development mode).
+multiple platforms (Raspberry Pi with GPIO, PC with serial, PC development mode,
+simulated presses).
 It handles player input, scoring, timing, sound effects, and visual rendering.
 
 Features:
@@ -21,27 +22,59 @@ Author: J. Adams <jna@retina.net>
 Date: 2023
 """
 
+import time
+
+# before the imports, so the startup report counts them
+STARTED = time.perf_counter()
+
 import game_config as config
 from Context import Context
-from hardware import setup_gpio, setup_serial
-from render import init_game, render_all
+from backends import open_backend
+from render import draw_loading, load_assets, open_display, render_all
 from events import event_loop
+from AsyncRuntime import run_async
+from Recorder import start_recording
+from Watchdog import start_watchdog
+from History import start_history
+from Startup import Startup, init_pygame
 
 def main():
     """
     Initializes the game context, hardware, and starts the main event loop.
+
+    A first frame is drawn as soon as the window is open; sounds, fonts and
+    images load on STARTUP_WORKERS threads meanwhile (see Startup.py).
     """
-    context = Context()
-    context.restore()
-    setup_gpio(context)
-    if config.PLATFORM == "pcserial":
-        context.serial_port = None
-        if config.SERIAL_DEVICE:
-            print("Setting up serial port %s" % config.SERIAL_DEVICE)
-        context.serial_port = setup_serial(context, config.SERIAL_DEVICE)
-    init_game(context)
-    render_all(context)
-    event_loop(context)
+    startup = Startup(config.STARTUP_WORKERS, STARTED)
+    with startup.phase("pygame"):
+        init_pygame()
+    with startup.phase("context"):
+        context = Context(executor=startup)
+    with startup.phase("display"):
+        open_display(context)
+        draw_loading(context)
+    startup.first_frame()
+    with startup.phase("start loads"):
+        assets_loaded = load_assets(context, startup)
+    with startup.phase("restore"):
+        context.restore()
+    with startup.phase("backend"):
+        open_backend(context)
+    with startup.phase("wait for loads"):
+        assets_loaded()
+        context.sound.wait()
+    with startup.phase("first game frame"):
+        render_all(context)
+    startup.shutdown()
+    print("\n".join(startup.report()))
+
+    start_recording(context)
+    start_watchdog(context)
+    start_history(context)
+    if config.RUNTIME == "asyncio":
+        run_async(context)
+    else:
+        event_loop(context)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,206 @@
+"""
+protocol.py
+
+Binary serial protocol shared by the host and the board emulator.
+
+After the board prints "RESET OK" the host may send "PROTO <version>" as a
+text command. Firmware that understands it answers "PROTO <version> OK" and
+both ends switch to fixed size binary frames. Older firmware answers "ERROR"
+and the text protocol stays in use.
+
+Every frame is FRAME_SIZE bytes:
+
+    +------+------+-----------------------+-------+
+    | SYNC | TYPE | PAYLOAD (5 bytes)     | CRC-8 |
+    +------+------+-----------------------+-------+
+
+The CRC covers TYPE and PAYLOAD. Multi-byte values are little endian.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import List, Tuple
+
+PROTOCOL_VERSION = 1
+
+FRAME_SYNC = 0xA5
+FRAME_SIZE = 8
+PAYLOAD_SIZE = 5
+
+# host -> board
+FRAME_LEDS = 0x01       # payload: 16 bit LED bitmask (bit 0 = player 1)
+FRAME_EFFECT = 0x02     # payload: effect id, channel (1 based, 0 = all), period in mS
+FRAME_PING = 0x03       # payload: sequence number, echoed in the PONG
+
+# board -> host
+FRAME_ACK = 0x81        # payload: acked frame type, resulting 16 bit LED bitmask
+FRAME_PRESS = 0x82      # payload: channel (1 based), micros() at the edge
+FRAME_RELEASE = 0x83    # payload: channel (1 based), micros() at the edge
+FRAME_PONG = 0x84       # payload: PING sequence number, micros() when it arrived
+FRAME_NAK = 0x8F        # payload: rejected frame type
+
+_EDGE_FORMAT = "<BI"
+_EFFECT_FORMAT = "<BBH"
+_MASK_FORMAT = "<H"
+
+
+@dataclass
+class Frame:
+    """A decoded frame."""
+    type: int
+    payload: bytes
+
+    @property
+    def channel(self) -> int:
+        """Channel number of a PRESS or RELEASE frame, sequence number of a PING or PONG."""
+        return self.payload[0]
+
+    @property
+    def timestamp_us(self) -> int:
+        """Board micros() of a PRESS, RELEASE or PONG frame."""
+        return struct.unpack_from(_EDGE_FORMAT, self.payload)[1]
+
+    @property
+    def effect(self) -> Tuple[int, int, int]:
+        """Effect id, channel and period in mS of an EFFECT frame."""
+        return struct.unpack_from(_EFFECT_FORMAT, self.payload)
+
+    @property
+    def led_mask(self) -> int:
+        """LED bitmask of a LEDS or ACK frame."""
+        # boards with up to 8 LEDs leave the high byte zero
+        offset = 0 if self.type == FRAME_LEDS else 1
+        return struct.unpack_from(_MASK_FORMAT, self.payload, offset)[0]
+
+
+def crc8(data: bytes) -> int:
+    """CRC-8 (polynomial 0x07), as computed by the firmware."""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def encode_frame(frame_type: int, payload: bytes = b"") -> bytes:
+    """
+    Build a frame.
+
+    Args:
+        frame_type: One of the FRAME_* type constants
+        payload: Up to PAYLOAD_SIZE bytes, zero padded
+
+    Returns:
+        bytes: FRAME_SIZE bytes ready to write to the port
+    """
+    if len(payload) > PAYLOAD_SIZE:
+        raise ValueError(f"payload too long: {len(payload)} bytes")
+    body = bytes([frame_type]) + payload.ljust(PAYLOAD_SIZE, b"\x00")
+    return bytes([FRAME_SYNC]) + body + bytes([crc8(body)])
+
+
+def encode_leds(mask: int) -> bytes:
+    """Frame setting every LED at once from a bitmask."""
+    return encode_frame(FRAME_LEDS, struct.pack(_MASK_FORMAT, mask & 0xFFFF))
+
+
+def encode_effect(effect: int, channel: int, period_ms: int) -> bytes:
+    """Frame starting an LED effect that the board runs by itself."""
+    return encode_frame(FRAME_EFFECT, struct.pack(_EFFECT_FORMAT, effect, channel, period_ms & 0xFFFF))
+
+
+def encode_ack(acked_type: int, mask: int) -> bytes:
+    """Frame acknowledging a command with the resulting LED bitmask."""
+    return encode_frame(FRAME_ACK, bytes([acked_type]) + struct.pack(_MASK_FORMAT, mask & 0xFFFF))
+
+
+def encode_nak(rejected_type: int) -> bytes:
+    """Frame rejecting an unknown command."""
+    return encode_frame(FRAME_NAK, bytes([rejected_type]))
+
+
+def encode_ping(sequence: int) -> bytes:
+    """Frame asking the board for its micros(), to align its clock with ours."""
+    return encode_frame(FRAME_PING, bytes([sequence & 0xFF]))
+
+
+def encode_pong(sequence: int, timestamp_us: int) -> bytes:
+    """Frame answering a PING with the board's micros()."""
+    return encode_frame(FRAME_PONG, struct.pack(_EDGE_FORMAT, sequence & 0xFF, timestamp_us & 0xFFFFFFFF))
+
+
+def encode_press(channel: int, timestamp_us: int) -> bytes:
+    """Frame reporting a button press."""
+    return encode_frame(FRAME_PRESS, struct.pack(_EDGE_FORMAT, channel, timestamp_us & 0xFFFFFFFF))
+
+
+def encode_release(channel: int, timestamp_us: int) -> bytes:
+    """Frame reporting a button release."""
+    return encode_frame(FRAME_RELEASE, struct.pack(_EDGE_FORMAT, channel, timestamp_us & 0xFFFFFFFF))
+
+
+def leds_to_mask(led_state: List[bool]) -> int:
+    """Convert a list of LED states to a bitmask."""
+    mask = 0
+    for i, state in enumerate(led_state):
+        if state:
+            mask |= 1 << i
+    return mask
+
+
+def mask_to_leds(mask: int, count: int) -> List[bool]:
+    """Convert a bitmask to a list of count LED states."""
+    return [bool(mask & (1 << i)) for i in range(count)]
+
+
+class FrameDecoder:
+    """
+    Incremental frame decoder.
+
+    Bytes can be fed in any chunking. Frames with a bad checksum are dropped
+    and the decoder resynchronises on the next SYNC byte.
+    """
+
+    def __init__(self) -> None:
+        self.buffer: bytearray = bytearray()
+        self.bad_frames: int = 0
+
+    def feed(self, data: bytes) -> List[Frame]:
+        """
+        Add received bytes and return any complete frames.
+
+        Args:
+            data: Bytes read from the port
+
+        Returns:
+            List[Frame]: Frames completed by this data, in order
+        """
+        self.buffer.extend(data)
+        frames: List[Frame] = []
+
+        while True:
+            start = self.buffer.find(FRAME_SYNC)
+            if start < 0:
+                self.buffer.clear()
+                break
+            if start > 0:
+                del self.buffer[:start]
+            if len(self.buffer) < FRAME_SIZE:
+                break
+
+            body = bytes(self.buffer[1:FRAME_SIZE - 1])
+            if crc8(body) != self.buffer[FRAME_SIZE - 1]:
+                # not a real frame boundary, skip this sync byte
+                self.bad_frames += 1
+                del self.buffer[:1]
+                continue
+
+            frames.append(Frame(body[0], body[1:]))
+            del self.buffer[:FRAME_SIZE]
+
+        return frames
+
+    def reset(self) -> None:
+        """Drop any partially received frame."""
+        self.buffer.clear()
@@ -1,6 +1,8 @@
 # render.py
 
 import math
+import os
+from concurrent.futures import Future
 import pygame
 import pygame.gfxdraw
 import ptext
@@ -8,7 +10,28 @@ import game_config as config
 from drawutil import drawtext
 from particleutil import spawn_exploding_particles
 from GameState import GameState
+from LedEffects import Effect
 from helpinfo import HELP_KEYS
+from Modal import AnyKeyModal
+from GameClock import format_clock
+from Startup import init_pygame
+
+# the only pygame events the game reads: quit and keys
+ALLOWED_EVENTS = [pygame.QUIT, pygame.KEYDOWN]
+
+# fonts loaded into context.fonts: name, file in fonts/, size
+FONTS = [
+    ("bebas40", "BebasKai-Regular.otf", 40),
+    ("robo24", "RobotoCondensed-Bold.ttf", 24),
+    ("robo36", "RobotoCondensed-Bold.ttf", 36),
+    ("robo50", "RobotoCondensed-Bold.ttf", 50),
+    ("robo90", "RobotoCondensed-Bold.ttf", 90),
+    ("robo250", "RobotoCondensed-Bold.ttf", 250),
+]
+# the font ptext draws with, and the sizes of it a frame uses: title,
+# state, clock and buzz-in message; opened ahead by load_assets()
+TEXT_FONT = "fonts/RobotoCondensed-Bold.ttf"
+FRAME_FONT_SIZES = [70, 90, 200, 150]
 
 def clear_display(context):
     context.screen.fill((0, 0, 0))
@@ -28,6 +51,7 @@ def draw_leds(context):
     Note:
         - Only renders when config.DEBUG_LEDS is True
         - Shows LED states as colored circles (blue for on, dark gray for off)
+        - A running FADE effect is drawn at its current brightness
         - Positioned on the left side of the screen for easy visibility
         - Useful for debugging when running without physical hardware
     """
@@ -44,8 +68,12 @@ def draw_leds(context):
         context.screen, (255, 255, 255), (xpos, ypos, config.PLAYERS * 85, 80), 2
     )
 
+    fading = context.effects.effect == Effect.FADE
+
     for k in range(0, config.PLAYERS):
-        if context.led_state[k]:
+        if fading:
+            color = (0, 0, max(20, context.effects.level()))
+        elif context.led_state[k]:
             color = (0, 0, 255)
         else:
             color = (20, 20, 20)
@@ -73,112 +101,11 @@ def draw_scores(context):
         - Highlights the currently buzzing player with different colors
         - Draws separators between player areas
         - Uses theme colors for consistent visual appearance
-        - Responsive layout that adapts to screen dimensions
+        - Lays out config.PLAYERS tiles in rows of at most SCORE_COLUMNS
+        - Only tiles that changed are redrawn (see ScoreBoard.py)
     """
-    i = 1
-
-    if context.invert_display:
-        top_y = 0
-    else:
-        top_y = context.screen_info.current_h - 240
-
-    while i < config.PLAYERS + 1:
-        if context.invert_display:
-            # background
-            pygame.draw.rect(
-                context.screen,
-                config.THEME_COLORS["buzzed_in_bg"] if context.player_buzzed_in == (i - 1) else config.THEME_COLORS["player_area_bg"],
-                (
-                    (i - 1) * context.screen_info.current_w / config.PLAYERS,
-                    0,
-                    (context.screen_info.current_w / config.PLAYERS),
-                    240,
-                ),
-            )
-
-            # player name
-            ptext.draw(
-                context.player_names[i - 1],
-                centerx=(context.screen_info.current_w / 8 * ((i * 2) - 1)),
-                centery=60,
-                color=config.THEME_COLORS["buzzed_in_fg"] if context.player_buzzed_in == (i - 1) else config.THEME_COLORS["player_name_fg"],
-                fontname="fonts/RobotoCondensed-Bold.ttf",
-                fontsize=70,
-                shadow=(1,1) if context.player_buzzed_in != (i - 1) else None 
-            )
-
-            # score
-            ptext.draw(
-                f"{context.scores[i - 1]:d}",
-                centerx=(context.screen_info.current_w / 8 * ((i * 2) - 1)),
-                centery=170,
-                color=config.THEME_COLORS["buzzed_in_fg"] if context.player_buzzed_in == (i - 1) else config.THEME_COLORS["player_score_fg"],
-                fontname="fonts/RobotoCondensed-Bold.ttf",
-                fontsize=120,
-                shadow=(1,1) if context.player_buzzed_in != (i - 1) else None
-            )
-
-            # divider
-            if i < config.PLAYERS:
-                pygame.draw.line(
-                    context.screen,
-                    config.THEME_COLORS["separator"],
-                    ((context.screen_info.current_w / 4 * i - 2), 0),
-                    ((context.screen_info.current_w / 4 * i - 2), 240),
-                    width=3,
-                )
-        else:
-            # background
-            pygame.draw.rect(
-                context.screen,
-                config.THEME_COLORS["buzzed_in_bg"] if context.player_buzzed_in == (i - 1) else config.THEME_COLORS["player_area_bg"],
-                (
-                    (i - 1) * context.screen_info.current_w / 4,
-                    top_y,
-                    (context.screen_info.current_w / 4),
-                    context.screen_info.current_h,
-                ),
-            )
-
-            # player name
-            ptext.draw(
-                context.player_names[i - 1],
-                centerx=(context.screen_info.current_w / 8 * ((i * 2) - 1)),
-                centery=top_y + 50,
-                color=config.THEME_COLORS["buzzed_in_fg"] if context.player_buzzed_in == (i - 1) else config.THEME_COLORS["player_name_fg"],
-                fontname="fonts/RobotoCondensed-Bold.ttf",
-                fontsize=70,
-                shadow=(1,1) if context.player_buzzed_in != (i - 1) else None
-            )
-
-            # score
-            ptext.draw(
-                f"{context.scores[i - 1]:d}",
-                centerx=(context.screen_info.current_w / 8 * ((i * 2) - 1)),
-                centery=top_y + 170,
-                color=config.THEME_COLORS["buzzed_in_fg"] if context.player_buzzed_in == (i - 1) else config.THEME_COLORS["player_score_fg"],
-                fontname="fonts/RobotoCondensed-Bold.ttf",
-                fontsize=120,
-                shadow=(1,1) if context.player_buzzed_in != (i - 1) else None
-            )
-
-            # divider
-            if i < config.PLAYERS:
-                pygame.draw.line(
-                    context.screen,
-                    config.THEME_COLORS["separator"],
-                    (
-                        (context.screen_info.current_w / 4 * i - 2),
-                        top_y,
-                    ),
-                    (
-                        (context.screen_info.current_w / 4 * i - 2),
-                        context.screen_info.current_h,
-                    ),
-                    width=3,
-                )
-
-        i += 1
+    context.scoreboard.draw(context)
+    top_y = context.screen_info.current_h - 240
 
     if context.invert_display:
         # draw separator under scores
@@ -211,16 +138,17 @@ def draw_title(context):
         context (Context): Current game context containing display information
 
     Note:
-        - Loads and scales logo image based on LOGO_RESIZE_FACTOR
+        - Loads and scales logo image based on LOGO_RESIZE_FACTOR, once
         - Supports both normal and inverted display modes
         - Logo is drawn on both left and right sides for symmetry
         - Title text is centered between the logos
         - Uses theme colors for consistent appearance
         - Only draws logo when DRAW_LOGO is enabled
     """
-    img = pygame.image.load(config.LOGO).convert_alpha()
+    if "logo" not in context.images:
+        context.images["logo"] = load_logo().convert_alpha()
     line_padding = 60
-    resized_img = pygame.transform.scale(img, (int(img.get_width() * config.LOGO_RESIZE_FACTOR), int(img.get_height() * config.LOGO_RESIZE_FACTOR)))
+    resized_img = context.images["logo"]
 
     if context.invert_display:
         # logo left and right on bottom
@@ -277,9 +205,9 @@ def draw_title(context):
 
 def draw_splash(context):
     """
-    Display splash screen and wait for user input.
+    Display splash screen until the user presses a key.
     
-    This function shows a splash screen image and pauses the game until
+    This function shows a splash screen image and leaves it up until
     the user presses any key. It's used for game startup and can be
     triggered manually during gameplay.
 
@@ -289,17 +217,20 @@ def draw_splash(context):
     Note:
         - Loads and displays splash image from config.SPLASH
         - Centers the image on screen
-        - Blocks execution until any key is pressed
+        - Stays up as context.modal until any key is pressed; the main
+          loop keeps running underneath
         - Transitions game state to SPLASH during display
-        - Returns to IDLE state after keypress
-        - Calls render_all() to refresh the display
+        - Returns to IDLE state after keypress, and the next frame
+          redraws the game
         - Uses pygame.display.flip() for immediate visual feedback
     """
     print("Drawing splash screen and pausing. Press any key to resume.")
     context.state = GameState.SPLASH
     clear_display(context)
 
-    img = pygame.image.load(config.SPLASH)
+    if "splash" not in context.images:
+        context.images["splash"] = pygame.image.load(config.SPLASH)
+    img = context.images["splash"]
     context.screen.blit(
         img,
         (
@@ -309,17 +240,8 @@ def draw_splash(context):
     )
     pygame.display.flip()
 
-    # block for keypress
-    waiting = True
-    while waiting:
-        event = pygame.event.wait()
-        if event.type == pygame.KEYDOWN:
-            waiting = False
-
-    pygame.display.flip()
-
-    context.state = GameState.IDLE
-    render_all(context)
+    # stays up until a key is pressed, see AnyKeyModal
+    context.modal = AnyKeyModal()
 
 
 def draw_help(context):
@@ -327,8 +249,8 @@ def draw_help(context):
     Display help screen with game controls and instructions.
     
     This function renders a modal help screen showing all available
-    keyboard shortcuts and their functions. It pauses the game until
-    the user dismisses it with any keypress.
+    keyboard shortcuts and their functions. It stays up until the user
+    dismisses it with any keypress.
 
     Args:
         context (Context): Current game context containing display information
@@ -337,10 +259,11 @@ def draw_help(context):
         - Creates a modal dialog box centered on screen
         - Lists all keyboard shortcuts with descriptions
         - Uses theme colors for consistent appearance
-        - Blocks execution until any key is pressed
+        - Stays up as context.modal until any key is pressed; the main
+          loop keeps running underneath
         - Transitions game state to HELP during display
-        - Returns to IDLE state after dismissal
-        - Calls render_all() to refresh the display
+        - Returns to IDLE state after dismissal, and the next frame
+          redraws the game
         - Help text includes scoring, timing, and game control shortcuts
     """
 
@@ -426,17 +349,8 @@ def draw_help(context):
 
     pygame.display.flip()
 
-    # block for keypress
-    waiting = True
-    while waiting:
-        event = pygame.event.wait()
-        if event.type == pygame.KEYDOWN:
-            waiting = False
-
-    pygame.display.flip()
-
-    context.state = GameState.IDLE
-    render_all(context)
+    # stays up until a key is pressed, see AnyKeyModal
+    context.modal = AnyKeyModal()
 
 
 def draw_state(context):
@@ -496,7 +410,8 @@ def draw_clock(context):
         context (Context): Current game context containing clock and game state
 
     Note:
-        - Converts milliseconds to minutes:seconds format
+        - Converts milliseconds to minutes:seconds format, or seconds and
+          tenths in the last ten seconds when CLOCK_TENTHS is set
         - Centers the clock on screen
         - Uses large font (200pt) for visibility
         - Includes shadow effects for better readability
@@ -504,9 +419,6 @@ def draw_clock(context):
         - Calls draw_state() to show game state below clock
         - Positioned in the upper third of the screen
     """
-    minutes = math.floor(context.clock / 60000)
-    sec = int((context.clock - (minutes * 60000)) / 1000)
-
     draw_state(context)
 
     if config.CLOCK_ENABLED == False:
@@ -514,7 +426,7 @@ def draw_clock(context):
 
     # draw clock
     ptext.draw(
-        f"{minutes:d}:{sec:02d}",
+        format_clock(context.clock, config.CLOCK_TENTHS),
         centerx=context.screen_info.current_w / 2,
         centery=context.screen_info.current_h / 3 + 100,
         color=config.THEME_COLORS["clock_text"],
@@ -680,6 +592,11 @@ def draw_testmode(context):
     drawtext(
         context, "robo36", "Button Test ON", xpos, 400, (255, 255, 255), (0, 0, 0)
     )
+    # glitches rejected by the debounce filter, per player
+    glitches = " ".join(str(context.debounce.rejected(p)) for p in range(config.PLAYERS))
+    drawtext(
+        context, "robo36", "Glitches: " + glitches, xpos, 440, (255, 255, 255), (0, 0, 0)
+    )
 
 def render_all(context):
     """
@@ -710,34 +627,55 @@ def render_all(context):
     draw_gamestate(context)
 
     draw_particles(context)
-    # draw LED and debugging if config.PLATFORM is not rpi
+    # draw LED and debugging overlays (draw_leds checks DEBUG_LEDS)
     draw_testmode(context)
     draw_leds(context)
 
     pygame.display.flip()
+    if context.latency and context.state == GameState.BUZZIN:
+        context.latency.screen_shown(context.player_buzzed_in)
 
 
-def init_game(context):
+def load_logo() -> pygame.Surface:
+    """The logo, scaled by LOGO_RESIZE_FACTOR. Safe to call off the main thread."""
+    img = pygame.image.load(config.LOGO)
+    return pygame.transform.scale(img, (int(img.get_width() * config.LOGO_RESIZE_FACTOR), int(img.get_height() * config.LOGO_RESIZE_FACTOR)))
+
+
+def load_fonts(sizes):
     """
-    Initialize the game display, fonts, and basic game state.
-    
-    This function sets up the Pygame display surface based on configuration,
-    loads all required fonts, and prepares the game for rendering. It handles
-    different display modes (windowed, borderless, fullscreen) and platform-specific
-    initialization.
+    Open the game's fonts.
+
+    One call opens them all, one after another: FreeType, under pygame's
+    font module, must not open two fonts at once from different threads.
 
     Args:
-        context (Context): Game context to initialize with display and font information
+        sizes (List[int]): Sizes of TEXT_FONT to open in ptext's cache
+
+    Returns:
+        Dict[str, pygame.font.Font]: FONTS, by name
+    """
+    for size in sizes:
+        ptext.getfont(fontname=TEXT_FONT, fontsize=size)
+    return {
+        shortname: pygame.font.Font(os.path.join("fonts", filename), size)
+        for shortname, filename, size in FONTS
+    }
+
+
+def open_display(context):
+    """
+    Open the game window and clear it.
+
+    Args:
+        context (Context): Game context to set the screen and screen_info on
 
     Note:
         - Creates display surface based on DISPLAY_STYLE configuration
         - Supports multiple display modes: windowed, borderless, fullscreen
         - Can target specific display monitors using DISPLAY_ID
         - Hides the mouse cursor for cleaner game appearance
-        - Loads multiple font sizes for different UI elements
-        - Fonts are loaded from the fonts/ directory
-        - Clears the display after initialization
-        - Platform-specific working directory changes for Raspberry Pi
+        - Blocks every pygame event type but ALLOWED_EVENTS
     """
     # set display ID here via display = 1 if needed.
     context.screen = None
@@ -768,13 +706,84 @@ def init_game(context):
     # hide mouse
     pygame.mouse.set_visible(False)
 
+    # keep mouse motion, window and other unused events out of the queue
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(ALLOWED_EVENTS)
+
+    clear_display(context)
+
+
+def draw_loading(context):
+    """
+    Show a first frame while the game loads: the title, in pygame's own font.
+
+    Args:
+        context (Context): Game context with an open display
+    """
     clear_display(context)
+    text = pygame.font.Font(None, 90).render(config.TITLE, True, config.THEME_COLORS["title_text"])
+    context.screen.blit(text, text.get_rect(center=(context.screen_info.current_w / 2,
+                                                    context.screen_info.current_h / 2)))
+    pygame.display.flip()
+
+
+def load_assets(context, executor=None):
+    """
+    Load the fonts and images the game draws with, and open the text fonts
+    a frame uses so the first frame does not wait for them.
+
+    Call after open_display(), as the score band's font sizes depend on the
+    screen width.
+
+    Args:
+        context (Context): Game context to put the fonts and images in
+        executor (Executor): Load on this in the background; without one
+            everything is loaded before this returns
 
-    # load fonts
-    context.load_font("bebas40", "BebasKai-Regular.otf", 40)
-    context.load_font("robo24", "RobotoCondensed-Bold.ttf", 24)
-    context.load_font("robo36", "RobotoCondensed-Bold.ttf", 36)
-    context.load_font("robo50", "RobotoCondensed-Bold.ttf", 50)
-    context.load_font("robo90", "RobotoCondensed-Bold.ttf", 90)
-    context.load_font("robo250", "RobotoCondensed-Bold.ttf", 250)
+    Returns:
+        Callable[[], None]: Waits for the loads and puts the results in the
+        context; call it on the main thread before drawing the game
+    """
+    context.scoreboard.layout(context.screen_info.current_w, config.PLAYERS)
+    sizes = FRAME_FONT_SIZES + list(context.scoreboard.font_sizes())
+    if executor:
+        fonts = executor.submit(load_fonts, sizes)
+        logo = executor.submit(load_logo)
+    else:
+        fonts, logo = Future(), Future()
+        fonts.set_result(load_fonts(sizes))
+        logo.set_result(load_logo())
+
+    def done():
+        context.fonts.update(fonts.result())
+        # converting needs the display, which belongs to the main thread
+        context.images["logo"] = logo.result().convert_alpha()
+
+    return done
+
+
+def init_game(context):
+    """
+    Initialize the game display, fonts, and basic game state.
+    
+    This function sets up the Pygame display surface based on configuration,
+    loads all required fonts, and prepares the game for rendering. It handles
+    different display modes (windowed, borderless, fullscreen) and platform-specific
+    initialization.
+
+    Args:
+        context (Context): Game context to initialize with display and font information
+
+    Note:
+        - Starts the pygame modules the game uses with init_pygame()
+        - Opens the display with open_display()
+        - Loads multiple font sizes for different UI elements, and the logo,
+          with load_assets()
+        - Fonts are loaded from the fonts/ directory
+        - main() does the same in steps, drawing a first frame before the
+          fonts and images are loaded, see Startup.py
+    """
+    init_pygame()
+    open_display(context)
+    load_assets(context)()
 
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+"""
+Replay a recorded show.
+
+Feeds a log written while RECORD_FILE was set (see Recorder.py) back through
+the game headless, at real time or as fast as it will go. The game runs on a
+virtual clock that only moves when the loop sleeps, so frames fall at exact
+1/FPS steps, timers and the countdown run again from that clock, and each
+press and key is delivered on the first frame at or after the time it was
+recorded. The same log always replays to the same state trace, at any speed.
+
+    python replay.py shows/20240601-203000.jsonl
+    python replay.py show.jsonl --realtime
+    python replay.py show.jsonl --trace trace.txt --frames frames/ --every 30
+
+The trace has a line for every frame that changed the state, the seconds on
+the clock, the scores or who is buzzed in. A fast replay is also a benchmark
+built from a real show: it reports the wall time per frame.
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence
+
+# headless: no window, no audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# pylint: disable=wrong-import-position
+import pygame
+
+import game_config as config
+from Context import Context
+from GameState import GameState
+from Recorder import load_recording
+from backends import Backend, InputEvent
+from events import run_frame, start_timers
+from render import init_game
+
+# replayed at this frame rate if the show ran uncapped
+DEFAULT_FPS = 60
+
+
+class VirtualClock:
+    """Time that only passes when slept, optionally keeping pace with the wall clock."""
+
+    def __init__(self, realtime: bool = False) -> None:
+        self.ns: int = 0
+        self.realtime: bool = realtime
+        # wall clock time at virtual time 0
+        self.started: float = time.perf_counter()
+
+    def now_ns(self) -> int:
+        return self.ns
+
+    def sleep(self, seconds: float) -> None:
+        self.ns += int(seconds * 1e9)
+        if self.realtime:
+            # time spent running the frame counts towards the sleep
+            ahead = self.started + self.ns / 1e9 - time.perf_counter()
+            if ahead > 0:
+                time.sleep(ahead)
+
+
+class ReplayBackend(Backend):
+    """Hands back recorded backend input once the replay reaches its time."""
+
+    name = "replay"
+
+    def __init__(self, emulated_keys: Sequence[Sequence[int]], inputs: List[List[Any]]) -> None:
+        """
+        Args:
+            emulated_keys: Keys that stood in for buttons in the recorded show
+            inputs: The recording's "i" entries, in order
+        """
+        self.emulated_keys = [tuple(keys) for keys in emulated_keys]
+        self.inputs: Deque[List[Any]] = deque(inputs)
+
+    def poll(self, context) -> List[InputEvent]:
+        now_us = context.now_ns() // 1000
+        events = []
+        while self.inputs and self.inputs[0][1] <= now_us:
+            _, _, player, pressed, timestamp_us, arrival_us = self.inputs.popleft()
+            events.append(InputEvent(player, bool(pressed), timestamp_us, arrival_us * 1000))
+        return events
+
+
+@contextlib.contextmanager
+def recorded_settings(header: Dict[str, Any], state_file: str) -> Iterator[None]:
+    """Run with the recorded show's settings, putting ours back afterwards."""
+    settings = {
+        **header["settings"],
+        "FPS": header["settings"].get("FPS") or DEFAULT_FPS,
+        "STATE_FILE_NAME": state_file,
+        "DISPLAY_STYLE": "windowed",
+    }
+    saved = {name: getattr(config, name) for name in settings}
+    for name, value in settings.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def post_keys(keys: Deque[List[Any]], now_us: int) -> None:
+    """Queue the recorded key presses and window close that are due."""
+    while keys and keys[0][1] <= now_us:
+        entry = keys.popleft()
+        if entry[0] == "k":
+            _, _, key, mod, text = entry
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod, unicode=text))
+        else:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+
+def traced_state(context) -> str:
+    """The state a trace line records."""
+    scores = ",".join(str(score) for score in context.scores)
+    return f"{context.state.name} {context.game_clock.seconds_shown()} {scores} {context.player_buzzed_in}"
+
+
+def replay(path: str, realtime: bool = False, frames_dir: Optional[str] = None,
+           every: int = 1) -> Dict[str, Any]:
+    """
+    Replay a recording.
+
+    Args:
+        path: Recording written by Recorder
+        realtime: Keep pace with the wall clock instead of running flat out
+        frames_dir: Save every nth frame here as a PNG
+        every: n for frames_dir
+
+    Returns:
+        Dict[str, Any]: "trace" lines, "frames" run, "seconds" of show
+        replayed, "wall_seconds" taken, and the final "scores" and "state"
+
+    Note:
+        - Saves go to a temporary file; the real state file is not touched
+        - Particle and splash animations follow the wall clock, so saved
+          frames only match between runs in what the game shows
+    """
+    header, entries = load_recording(path)
+    keys = deque(entry for entry in entries if entry[0] in ("k", "q"))
+    end_us = entries[-1][1] if entries else 0
+
+    clock = VirtualClock(realtime)
+    trace: List[str] = []
+    frames = 0
+    with tempfile.TemporaryDirectory() as tmp, \
+         recorded_settings(header, os.path.join(tmp, "gamestate.json")):
+        random.seed(header["seed"])
+        context = Context(clock.now_ns, clock.sleep)
+        state = header["state"]
+        context.player_names = list(state["player_names"])
+        context.scores = list(state["scores"])
+        context.invert_display = state["invert_display"]
+        context.clock = state["clock_ms"]
+        context.state = GameState[state["state"]]
+        context.backend = ReplayBackend(header["emulated_keys"],
+                                        [entry for entry in entries if entry[0] == "i"])
+        init_game(context)
+        start_timers(context)
+
+        started = clock.started = time.perf_counter()
+        running = True
+        last = None
+        while running and clock.now_ns() // 1000 <= end_us:
+            now_us = clock.now_ns() // 1000
+            post_keys(keys, now_us)
+            try:
+                running = run_frame(context)
+            except SystemExit:
+                # the quit key
+                running = False
+            frames += 1
+
+            line = traced_state(context)
+            if line != last:
+                trace.append(f"{now_us} {line}")
+                last = line
+            if running and frames_dir and frames % every == 0:
+                pygame.image.save(context.screen, os.path.join(frames_dir, f"frame_{frames:06d}.png"))
+
+        context.state_store.close()
+        return {
+            "trace": trace,
+            "frames": frames,
+            "seconds": clock.now_ns() / 1e9,
+            "wall_seconds": time.perf_counter() - started,
+            "scores": list(context.scores),
+            "state": context.state,
+        }
+
+
+def main():
+    """Parse arguments, replay and report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("recording", help="log written with RECORD_FILE")
+    parser.add_argument("--realtime", action="store_true", help="replay at the speed it was recorded")
+    parser.add_argument("--trace", help="write the state trace to this file")
+    parser.add_argument("--frames", help="save frames to this directory as PNGs")
+    parser.add_argument("--every", type=int, default=1, help="save every nth frame (default: 1)")
+    args = parser.parse_args()
+
+    if args.frames:
+        os.makedirs(args.frames, exist_ok=True)
+    try:
+        result = replay(args.recording, args.realtime, args.frames, max(1, args.every))
+    except ValueError as e:
+        sys.exit(str(e))
+
+    if args.trace:
+        with open(args.trace, "w", encoding="utf-8") as file:
+            file.write("\n".join(result["trace"]) + "\n")
+
+    frames, wall = result["frames"], result["wall_seconds"]
+    print("Replayed %d frames, %.1f s of show, in %.2f s (%.1fx real time)"
+          % (frames, result["seconds"], wall, result["seconds"] / wall if wall else 0))
+    print("Mean frame: %.3f ms" % (wall * 1000 / frames if frames else 0))
+    print("Final state: %s, scores %s" % (result["state"].name, result["scores"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+"""
+Statistics from the match history.
+
+Reads the database the game writes while HISTORY_FILE is set (see
+History.py). It can be run during a show: reads do not wait for the game's
+writes.
+
+    python showstats.py leaderboard
+    python showstats.py reactions --limit 5
+    python showstats.py versus Alice Bob
+    python showstats.py export buzzes --out buzzes.csv
+"""
+
+import argparse
+import sqlite3
+import sys
+
+import game_config as config
+from History import EXPORTS, connect, export_csv, head_to_head, leaderboard, reaction_times
+
+
+def main():
+    """Run the query asked for and print it."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--db", default=config.HISTORY_FILE or "history.db",
+                        help="history database (default: HISTORY_FILE)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, text in (("leaderboard", "most wins, then points"), ("reactions", "fastest mean reaction time")):
+        command = commands.add_parser(name, help=text)
+        command.add_argument("--limit", type=int, default=10, help="players listed (default: 10)")
+    versus = commands.add_parser("versus", help="two players in the games they both played")
+    versus.add_argument("name")
+    versus.add_argument("other")
+    export = commands.add_parser("export", help="write a table as CSV")
+    export.add_argument("what", choices=sorted(EXPORTS))
+    export.add_argument("--out", help="CSV file (default: standard output)")
+    args = parser.parse_args()
+
+    try:
+        db = connect(args.db)
+        if args.command == "leaderboard":
+            print(f"{'':24} {'games':>6} {'wins':>6} {'points':>7} {'best':>6}")
+            for name, games, wins, points, best in leaderboard(db, args.limit):
+                print(f"{name:24} {games:6d} {wins:6d} {points:7d} {best:6d}")
+        elif args.command == "reactions":
+            print(f"{'':24} {'buzzes':>6} {'mean':>8}")
+            for name, buzzes, mean in reaction_times(db, args.limit):
+                print(f"{name:24} {buzzes:6d} {mean:6d}ms")
+        elif args.command == "versus":
+            more, fewer, tied = head_to_head(db, args.name, args.other)
+            print(f"{args.name} against {args.other}: {more} ahead, {fewer} behind, {tied} tied")
+        elif args.out:
+            with open(args.out, "w", newline="", encoding="utf-8") as out:
+                rows = export_csv(db, args.what, out)
+            print(f"Wrote {rows} rows to {args.out}")
+        else:
+            export_csv(db, args.what, sys.stdout)
+    except (OSError, sqlite3.Error) as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
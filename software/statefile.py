@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+"""
+Show, convert and benchmark state files.
+
+    python statefile.py show gamestate.json
+    python statefile.py convert gamestate.pickle gamestate.json
+    python statefile.py convert gamestate.json old.json --format 1
+    python statefile.py bench --players 12 --runs 5000
+
+show prints a state file in any format, pickles from older versions
+included. convert writes it in the current format, or with --format in an
+older one, to go back to an older version of the game. bench times loading
+and saving a state in the JSON format (StateFormat.py) against the pickle
+the game used to write, in memory and through the state file on disk.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import tempfile
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from GameState import GameState
+from StateFormat import FORMAT, StateFormatError, decode, encode, import_pickle, is_pickle
+from StateStore import StateStore
+
+
+def read_state(path: str) -> Dict[str, Any]:
+    """A state file in any format, in the current format."""
+    with open(path, "rb") as file:
+        data = file.read()
+    return import_pickle(data) if is_pickle(data) else decode(data)
+
+
+def sample_state(players: int) -> Dict[str, Any]:
+    """A state in the middle of a show."""
+    return {
+        "player_names": [f"Player {i+1} with a longer name" for i in range(players)],
+        "scores": [i * 7 - 3 for i in range(players)],
+        "invert_display": True,
+        "state": GameState.BUZZIN.value,
+        "clock_ms": 41234,
+        "player_buzzed_in": players - 1,
+        "saved_ms": 1_700_000_000_000,
+        "journal_seq": 1234,
+    }
+
+
+def time_us(function: Callable[[], Any], runs: int) -> float:
+    """Best of five mean times for function, in microseconds."""
+    return min(timeit.repeat(function, number=runs, repeat=5)) / runs * 1e6
+
+
+def bench(players: int, runs: int) -> List[Tuple[str, float, float]]:
+    """
+    Time pickle against the JSON format.
+
+    Returns:
+        List[Tuple[str, float, float]]: What was timed, then microseconds
+        per run with pickle and with JSON
+    """
+    state = sample_state(players)
+    pickled = pickle.dumps(state)
+    encoded = encode(state)
+    results = [
+        ("save in memory", time_us(lambda: pickle.dumps(state), runs), time_us(lambda: encode(state), runs)),
+        ("load in memory", time_us(lambda: pickle.loads(pickled), runs), time_us(lambda: decode(encoded), runs)),
+        ("load old pickle", time_us(lambda: pickle.loads(pickled), runs), time_us(lambda: import_pickle(pickled), runs)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, "gamestate.pickle")
+
+        def pickle_save():
+            # written the way StateStore writes, with pickle instead
+            with open(pickle_path + ".tmp", "wb") as file:
+                pickle.dump(state, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(pickle_path + ".tmp", pickle_path)
+
+        def pickle_load():
+            with open(pickle_path, "rb") as file:
+                return pickle.load(file)
+
+        store = StateStore(os.path.join(tmp, "gamestate.json"), generations=0)
+        saves = iter(range(sys.maxsize))
+
+        def store_save():
+            # a new score each time, so the write is not skipped as unchanged
+            store.write({**state, "journal_seq": next(saves)})
+
+        # each file is written once before it is read; disk runs are fewer,
+        # as each one syncs
+        disk_runs = max(1, runs // 50)
+        pickle_save()
+        store_save()
+        results.append(("save to disk", time_us(pickle_save, disk_runs), time_us(store_save, disk_runs)))
+        results.append(("load from disk", time_us(pickle_load, runs), time_us(store.load, runs)))
+    return results
+
+
+def main():
+    """Run the command asked for."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="print a state file")
+    show.add_argument("path")
+    convert = commands.add_parser("convert", help="write a state file in another format")
+    convert.add_argument("path")
+    convert.add_argument("out")
+    convert.add_argument("--format", type=int, default=FORMAT,
+                         help=f"format to write (default: {FORMAT}, the current one)")
+    timing = commands.add_parser("bench", help="time the JSON format against pickle")
+    timing.add_argument("--players", type=int, default=4, help="players in the state (default: 4)")
+    timing.add_argument("--runs", type=int, default=2000, help="runs per measurement (default: 2000)")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "show":
+            print(json.dumps(read_state(args.path), indent=4, ensure_ascii=False))
+        elif args.command == "convert":
+            data = encode(read_state(args.path), args.format)
+            with open(args.out, "wb") as file:
+                file.write(data)
+            print(f"Wrote {args.out} in format {args.format}")
+        else:
+            print(f"{'':16} {'pickle':>10} {'json':>10}")
+            for name, pickle_us, json_us in bench(args.players, args.runs):
+                print(f"{name:16} {pickle_us:8.1f}us {json_us:8.1f}us")
+    except (OSError, StateFormatError) as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -31,14 +31,15 @@ def setup_pygame():
 @pytest.fixture
 def temp_state_file() -> Generator[str, None, None]:
     """Create a temporary state file for testing."""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.pkl', delete=False) as f:
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
         temp_file = f.name
     
     yield temp_file
     
-    # Clean up
-    if os.path.exists(temp_file):
-        os.unlink(temp_file)
+    # Clean up, with any previous generations and journal the state store kept
+    for path in [temp_file, f"{temp_file}.journal"] + [f"{temp_file}.{n}" for n in range(1, 10)]:
+        if os.path.exists(path):
+            os.unlink(path)
 
 
 @pytest.fixture
@@ -0,0 +1,24 @@
+"""
+Integration test for the wireless buzzer simulator.
+
+Runs hundreds of virtual buzzers against the buzzer server on loopback.
+"""
+
+import asyncio
+
+from buzzersim import run_simulation
+
+
+def test_many_buzzers_with_loss():
+    """Test every edge gets through exactly once despite lost datagrams."""
+    result = asyncio.run(run_simulation(buzzers=200, rate_hz=2.0, seconds=1.0, loss=0.05, seed=7))
+
+    buzzer, server = result["buzzer"], result["server"]
+    assert buzzer["failed"] == 0
+    assert buzzer["resent"] > 0
+    assert server["devices"] == 200
+    assert server["repeats_passed"] == 0
+    # every acked press and release was passed on once, heartbeats are not edges
+    assert server["edges"] == buzzer["acked"] - 200
+    assert server["duplicates"] > 0
+    assert server["align_ms"]["p50"] < 5
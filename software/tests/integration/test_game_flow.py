@@ -103,7 +103,7 @@ class TestGameFlow:
         """Test state save and restore flow."""
         with patch('pygame.time.Clock'), \
              patch('pygame.sprite.Group'), \
-             patch('game_config.STATE_FILE_NAME', 'test_gamestate.pickle'):
+             patch('game_config.STATE_FILE_NAME', 'test_gamestate.json'):
             
             # Mock Sound class to avoid file loading
             mock_sound_instance = Mock()
@@ -116,8 +116,9 @@ class TestGameFlow:
             context.scores = [10, 20, 30, 40]
             context.invert_display = False
             
-            # Save state
+            # Save state, and wait for it to be written
             context.save()
+            context.state_store.close()
             
             # Create new context and restore
             new_context = Context()
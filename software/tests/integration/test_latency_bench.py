@@ -0,0 +1,64 @@
+"""
+Integration test for the buzz latency benchmark.
+
+Runs the real serial path against a pty-backed emulated board.
+"""
+
+import sys
+from unittest.mock import patch
+
+import pytest
+
+import game_config as config
+from benchmark import PressLatencyTracker, compare, run_benchmark
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs a pseudo-terminal")
+def test_benchmark_measures_every_stage():
+    """Test buzzes are followed from the serial bytes to the screen."""
+    with patch.object(config, 'FPS', config.FPS), \
+         patch.object(config, 'DISPLAY_STYLE', config.DISPLAY_STYLE), \
+         patch('builtins.print'):
+        latency = run_benchmark(presses=4, fps=0)
+
+    summary = latency.summary()
+    assert latency.completed == 4
+    for stage in ("parse", "state", "sound", "screen"):
+        assert summary[stage]["n"] == 4
+    assert summary["screen"]["p50"] >= summary["sound"]["p50"] >= summary["parse"]["p50"]
+    assert summary["screen/p%d" % config.PLAYERS]["n"] == 1
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs a pseudo-terminal")
+def test_benchmark_counts_wait_for_poll():
+    """Test the time a press waits for the next frame's poll is measured."""
+    with patch.object(config, 'FPS', config.FPS), \
+         patch.object(config, 'DISPLAY_STYLE', config.DISPLAY_STYLE), \
+         patch('builtins.print'):
+        latency = run_benchmark(presses=4, fps=20)
+
+    # presses land anywhere in a 50 ms frame and are read at the next one
+    assert latency.summary()["parse"]["p90"] > 1.0
+
+
+def test_trace_starts_when_sent():
+    """Test the benchmark's traces start when the board sent the press."""
+    latency = PressLatencyTracker()
+    latency.sent_ns[1] = 1_000
+    latency.begin(1, 9_000, parse_ns=9_500)
+    latency.mark(1, "state", 10_000)
+    latency.screen_shown(1, 12_000)
+
+    assert latency.histogram("parse").samples == [8_500]
+    assert latency.histogram("screen").samples == [11_000]
+
+
+def test_compare_flags_regressions():
+    """Test only gated stages beyond the tolerance count as slower."""
+    baseline = {"screen": {"p50": 10.0, "p90": 20.0}, "parse": {"p50": 0.1}}
+    summary = {"screen": {"p50": 11.0, "p90": 30.0}, "parse": {"p50": 5.0}}
+
+    regressions = compare(summary, baseline, 0.2)
+
+    assert len(regressions) == 1
+    assert "screen p90" in regressions[0]
@@ -0,0 +1,310 @@
+"""
+Integration tests against the PTY firmware emulator.
+
+These open the emulated board through pyserial like a real device, so the
+handshake, framing and ack round trips in hardware.py, backends.py and
+LedService.py run for real.
+"""
+
+import os
+import sys
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+import protocol
+from BoardEmulator import BoardEmulator
+from BuzzArbiter import MicrosUnwrapper
+from LedEffects import EffectEngine
+from PtyBoard import PtyBoard, load_trace, save_trace
+from backends import MultiSerialBackend, SerialBackend
+from hardware import open_serial, setup_serial
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="needs a pseudo-terminal")
+
+
+def make_context():
+    """Context with just what the serial path uses."""
+    context = Mock()
+    context.serial_port = None
+    context.serial_binary = False
+    context.led_service = None
+    context.frame_decoder = protocol.FrameDecoder()
+    context.serial_backlog = []
+    context.board_clock = MicrosUnwrapper()
+    context.effects = EffectEngine(4)
+    context.led_state = [False] * 4
+    return context
+
+
+def wait_for(func, timeout=3.0):
+    """Call func until it returns something truthy."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = func()
+        if result:
+            return result
+        time.sleep(0.002)
+    raise AssertionError("timed out")
+
+
+def read_lines(port, count, timeout=2.0):
+    """Read count lines from a real serial port."""
+    lines = []
+    deadline = time.monotonic() + timeout
+    while len(lines) < count and time.monotonic() < deadline:
+        line = port.readline()
+        if line:
+            lines.append(line.strip())
+    return lines
+
+
+@pytest.fixture
+def quiet():
+    with patch('builtins.print'):
+        yield
+
+
+@pytest.fixture
+def text_board():
+    board = PtyBoard(BoardEmulator(binary_capable=False), reset_ms=10).start()
+    yield board
+    board.stop()
+
+
+@pytest.fixture
+def binary_board():
+    board = PtyBoard(reset_ms=10).start()
+    yield board
+    board.stop()
+
+
+class TestHandshake:
+    """Test setup_serial against the emulated board."""
+
+    @patch('hardware.config.SERIAL_PROTOCOL', 'binary')
+    def test_setup_serial_binary(self, binary_board, quiet):
+        """Test the reset wait and binary negotiation over a real pty."""
+        context = make_context()
+
+        port = setup_serial(context, binary_board.device, timeout_s=2)
+
+        assert port
+        assert context.serial_binary is True
+        assert binary_board.opens == 1
+        port.write(protocol.encode_leds(0b1010))
+        frames = wait_for(lambda: context.frame_decoder.feed(port.read(port.in_waiting)))
+        assert frames[0].type == protocol.FRAME_ACK
+        assert binary_board.board.led_mask == 0b1010
+        port.close()
+
+    @patch('hardware.config.SERIAL_PROTOCOL', 'binary')
+    def test_setup_serial_text_firmware(self, text_board, quiet):
+        """Test LED n s and LED A s replies on the text protocol."""
+        context = make_context()
+        port = setup_serial(context, text_board.device, timeout_s=2)
+        assert context.serial_binary is False
+
+        port.write(b"LED 2 1\n")
+        port.write(b"LED A 1\n")
+        port.write(b"LED 9 1\n")
+        assert read_lines(port, 3) == [b"LED 0010000 OK", b"LED 1111000 OK", b"INVALID PIN"]
+        port.write(b"LED A 0\n")
+        assert read_lines(port, 1) == [b"LED 0000000 OK"]
+        assert text_board.board.led_mask == 0
+        port.close()
+
+    def test_board_silent_until_opened(self):
+        """Test nothing is sent before the host opens the port."""
+        board = PtyBoard(reset_ms=10).start()
+        try:
+            board.press(1)
+            time.sleep(0.05)
+            assert board.stats["sent"] == 0
+            assert not board.booted
+        finally:
+            board.stop()
+
+
+class TestScenarios:
+    """Test scripted input."""
+
+    def test_tap_reports_duration(self, text_board):
+        """Test SWITCH PRESSED and RELEASED with the time held."""
+        port = open_serial(text_board.device)
+        assert read_lines(port, 2) == [b"", b"RESET OK"]
+
+        text_board.tap(3, hold_ms=40)
+        lines = read_lines(port, 2)
+
+        assert lines[0].startswith(b"SWITCH 3 PRESSED ")
+        held = int(lines[1].split(b"(down ")[1].split()[0])
+        assert lines[1].startswith(b"SWITCH 3 RELEASED")
+        assert 35 <= held <= 200
+        port.close()
+
+    def test_script_keeps_order_and_timing(self, text_board):
+        """Test a scenario plays out in order at its scheduled times."""
+        port = open_serial(text_board.device)
+        wait_for(lambda: text_board.booted)
+        time.sleep(0.02)
+        port.reset_input_buffer()
+
+        text_board.script([(0, 2, True), (30, 1, True), (60, 2, False), (60, 1, False)])
+        lines = read_lines(port, 4)
+
+        assert [line.split()[1:3] for line in lines] == [
+            [b"2", b"PRESSED"], [b"1", b"PRESSED"], [b"2", b"RELEASED"], [b"1", b"RELEASED"],
+        ]
+        first, second = int(lines[0].split()[3]), int(lines[1].split()[3])
+        assert 25_000 <= second - first <= 200_000
+        port.close()
+
+    @patch('hardware.config.SERIAL_PROTOCOL', 'binary')
+    def test_burst_of_presses(self, binary_board, quiet):
+        """Test thousands of presses a second all reach the host intact."""
+        context = make_context()
+        port = setup_serial(context, binary_board.device, timeout_s=2)
+
+        binary_board.burst(2000, 5000)
+        presses = []
+        deadline = time.monotonic() + 5
+        while len(presses) < 2000 and time.monotonic() < deadline:
+            for frame in context.frame_decoder.feed(port.read(max(1, port.in_waiting))):
+                if frame.type == protocol.FRAME_PRESS:
+                    presses.append(frame)
+
+        assert len(presses) == 2000
+        assert {frame.channel for frame in presses} == {1, 2, 3, 4}
+        assert context.frame_decoder.bad_frames == 0
+        port.close()
+
+
+class TestFaults:
+    """Test injected latency, corruption and unplugging."""
+
+    @patch('hardware.config.SERIAL_PROTOCOL', 'text')
+    def test_latency(self, quiet):
+        """Test replies are held back by the injected latency."""
+        board = PtyBoard(BoardEmulator(binary_capable=False), reset_ms=10, latency_ms=40).start()
+        try:
+            context = make_context()
+            port = setup_serial(context, board.device, timeout_s=2)
+
+            started = time.monotonic()
+            port.write(b"LED 1 1\n")
+            assert read_lines(port, 1) == [b"LED 0001000 OK"]
+            assert time.monotonic() - started >= 0.035
+            port.close()
+        finally:
+            board.stop()
+
+    @patch('hardware.config.SERIAL_PROTOCOL', 'binary')
+    def test_corruption_is_rejected(self, binary_board, quiet):
+        """Test corrupted frames fail their checksum instead of becoming presses."""
+        context = make_context()
+        port = setup_serial(context, binary_board.device, timeout_s=2)
+        binary_board.corrupt_rate = 0.2
+        binary_board.random.seed(3)
+
+        binary_board.burst(200, 2000)
+        time.sleep(0.3)
+        frames = context.frame_decoder.feed(port.read(port.in_waiting))
+
+        assert binary_board.stats["corrupted"] > 0
+        assert context.frame_decoder.bad_frames > 0
+        assert sum(frame.type == protocol.FRAME_PRESS for frame in frames) < 200
+        port.close()
+
+    def test_record_and_replay(self, text_board, tmp_path):
+        """Test a recorded trace replays byte for byte with its timing."""
+        port = open_serial(text_board.device)
+        wait_for(lambda: text_board.booted)
+        time.sleep(0.02)
+        port.reset_input_buffer()
+
+        text_board.record()
+        text_board.script([(0, 1, True), (20, 1, False)])
+        original = read_lines(port, 2)
+        path = str(tmp_path / "trace.txt")
+        save_trace(path, text_board.recorded())
+
+        trace = load_trace(path)
+        assert trace[0][0] == 0
+        assert trace[1][0] >= 15
+        text_board.replay(trace)
+        assert read_lines(port, 2) == original
+        port.close()
+
+    @patch('hardware.config.SERIAL_PROTOCOL', 'binary')
+    def test_unplug_and_reconnect(self, tmp_path, quiet):
+        """Test the game drops a yanked board and picks it up when it returns."""
+        board = PtyBoard(reset_ms=10, link_path=str(tmp_path / "board")).start()
+        context = make_context()
+        context.led_service = Mock()
+        backend = SerialBackend(board.device)
+        try:
+            with patch('backends.config.SERIAL_HANDSHAKE_TIMEOUT_MS', 2000), \
+                 patch('backends.config.SERIAL_RESCAN_MS', 10), \
+                 patch('backends.LedService'):
+                backend.open(context)
+            context.led_service = Mock()
+
+            wait_for(lambda: backend.poll(context) is not None and context.serial_port)
+            board.press(2)
+            events = wait_for(lambda: backend.poll(context))
+            assert events[0].player == 1
+
+            board.unplug()
+            wait_for(lambda: backend.poll(context) == [] and context.serial_port is None)
+            assert not os.path.exists(board.device)
+
+            board.plug()
+            wait_for(lambda: backend.poll(context) is not None and context.serial_port)
+            assert backend.link.stats["connects"] == 2
+            assert backend.link.stats["recover_ms"] is not None
+            context.led_service.invalidate.assert_called()
+        finally:
+            backend.close(context)
+            board.stop()
+
+
+class TestSeveralBoards:
+    """Several emulated boards merged by MultiSerialBackend."""
+
+    @patch('hardware.config.SERIAL_PROTOCOL', 'binary')
+    @patch('backends.config.PLAYERS', 8)
+    def test_presses_aligned_across_boards(self, quiet):
+        """Test boards with unrelated clocks are aligned over the wire and merged in order."""
+        boards = [
+            PtyBoard(BoardEmulator(clock=lambda: time.monotonic_ns() // 1000 + offset), reset_ms=10).start()
+            for offset in (7_000_000, 400_000_000)
+        ]
+        backend = MultiSerialBackend(
+            [(boards[0].device, [1, 2, 3, 4]), (boards[1].device, [5, 6, 7, 8])]
+        )
+        context = Mock()
+        context.arbiter.pending.return_value = False
+        try:
+            with patch('backends.config.SERIAL_HANDSHAKE_TIMEOUT_MS', 2000):
+                backend.open(context)
+            wait_for(lambda: backend.poll(context) is not None
+                     and all(board.clock.synced for board in backend.boards))
+            for board in backend.boards:
+                assert board.clock.uncertainty_us < 5_000
+
+            pressed_us = time.monotonic_ns() // 1000
+            boards[1].press(3)
+            time.sleep(0.005)
+            boards[0].press(1)
+            events = []
+            wait_for(lambda: events.extend(backend.poll(context)) or len(events) >= 2)
+
+            assert [e.player for e in events] == [6, 0]
+            assert abs(events[0].timestamp_us - pressed_us) < 5_000
+            assert events[1].timestamp_us - events[0].timestamp_us >= 4_000
+        finally:
+            backend.close(context)
+            for board in boards:
+                board.stop()
@@ -0,0 +1,115 @@
+"""
+Integration test for recording and replaying a show.
+
+A recording is written through Recorder on a fake clock, then replayed
+headless through the real main loop.
+"""
+
+from unittest.mock import patch
+
+import pygame
+import pytest
+
+import game_config as config
+from Context import Context
+from GameState import GameState
+from Recorder import Recorder
+from backends import InputEvent, KeyboardBackend
+from replay import replay
+
+
+def key(k, mod=0):
+    return pygame.event.Event(pygame.KEYDOWN, key=k, mod=mod, unicode="")
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """
+    A short show: the clock is started, two timestamped presses arrive in
+    the wrong order, the winner gets a point, and a later keypad press is
+    followed by SHIFT+1 taking a point away.
+    """
+    now = [10_000_000_000]
+
+    def at(ms):
+        now[0] = 10_000_000_000 + ms * 1_000_000
+        return now[0]
+
+    path = str(tmp_path / "show.jsonl")
+    context = Context(lambda: now[0])
+    context.backend = KeyboardBackend()
+    with patch.object(config, 'MAX_CLOCK', 30000), patch.object(config, 'ARBITRATION_WINDOW_MS', 10):
+        context.clock = 30000
+        recorder = Recorder(path, context, seed=42)
+
+    at(100)
+    recorder.pygame_events([key(pygame.K_SPACE)])
+    # player 3 pressed first but player 2's press was read first
+    at(400)
+    recorder.inputs([InputEvent(1, True, 5_000_300, arrival_ns=now[0])])
+    at(401)
+    recorder.inputs([InputEvent(2, True, 5_000_100, arrival_ns=now[0])])
+    at(600)
+    recorder.pygame_events([key(pygame.K_3)])
+    at(700)
+    recorder.pygame_events([key(pygame.K_SPACE)])
+    at(900)
+    recorder.pygame_events([key(pygame.K_KP1)])
+    at(1000)
+    recorder.pygame_events([key(pygame.K_1, pygame.KMOD_LSHIFT)])
+    at(1200)
+    recorder.close()
+    return path
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    with patch('builtins.print'):
+        yield
+
+
+def test_replay_reaches_recorded_outcome(recording):
+    """Test the replay follows the show: arbitration, scoring and state changes."""
+    result = replay(recording)
+
+    assert result["scores"] == [-1, 0, 1, 0]
+    assert result["state"] == GameState.IDLE
+    states = [line.split()[1] for line in result["trace"]]
+    assert states[:4] == ["IDLE", "RUNNING", "BUZZIN", "IDLE"]
+    # player 3 buzzed in on the frame after the arbitration window closed
+    buzz = next(line for line in result["trace"] if line.split()[1] == "BUZZIN")
+    t_us, _, seconds, _, player = buzz.split()
+    assert player == "2"
+    assert 411_000 <= int(t_us) < 411_000 + 1_000_000 // config.FPS + 1
+    assert seconds == "30"
+    assert result["frames"] == pytest.approx(1.2 * config.FPS, abs=2)
+
+
+def test_replays_are_identical(recording):
+    """Test the same recording gives the same trace every time, at any speed."""
+    fast = replay(recording)
+    again = replay(recording)
+    realtime = replay(recording, realtime=True)
+
+    assert fast["trace"] == again["trace"] == realtime["trace"]
+    assert realtime["wall_seconds"] >= 1.0
+    assert fast["wall_seconds"] < realtime["wall_seconds"]
+
+
+def test_replay_leaves_settings_and_state_file(recording):
+    """Test the recorded settings are only in force during the replay."""
+    state_file = config.STATE_FILE_NAME
+    with patch.object(config, 'MAX_CLOCK', 60000):
+        replay(recording)
+        assert config.MAX_CLOCK == 60000
+    assert config.STATE_FILE_NAME == state_file
+
+
+def test_frame_dumps(recording, tmp_path):
+    """Test every nth frame is saved."""
+    frames = tmp_path / "frames"
+    frames.mkdir()
+
+    result = replay(recording, frames_dir=str(frames), every=20)
+
+    assert len(list(frames.glob("frame_*.png"))) == result["frames"] // 20
@@ -0,0 +1,265 @@
+"""
+Unit tests for AsyncRuntime.py module.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from AsyncRuntime import AsyncRuntime
+from Scheduler import Scheduler
+from StateFormat import StateFormatError
+
+
+@pytest.fixture
+def fast_config():
+    """Short periods so each task runs many times in a test."""
+    with patch('game_config.FPS', 200), \
+         patch('game_config.INPUT_POLL_MS', 1), \
+         patch('game_config.LED_UPDATE_MS', 5):
+        yield
+
+
+def make_context():
+    """A context with a real scheduler and a game clock that is paused."""
+    context = Mock()
+    context.scheduler = Scheduler()
+    context.game_clock.ms_to_next_second.return_value = None
+    return context
+
+
+def tick_every(ms, ticks):
+    """A start_timers that counts ticks of a repeating timer."""
+    return lambda context: context.scheduler.call_every(ms, ticks.append, 1)
+
+
+def frames_then_quit(frames):
+    """A handle_events that keeps running for some frames, then sees QUIT."""
+    results = [True] * frames + [False]
+    return Mock(side_effect=lambda context: results.pop(0))
+
+
+def slow_writer(seconds):
+    """A write_state that takes a while and records what it wrote."""
+    written = []
+
+    def write_state(snapshot):
+        time.sleep(seconds)
+        written.append(snapshot)
+    return write_state, written
+
+
+@pytest.mark.usefixtures("fast_config")
+class TestAsyncRuntime:
+    """Test the tasks and how they stop."""
+
+    def run(self, context, events, ticks):
+        runtime = AsyncRuntime(context)
+        with patch('AsyncRuntime.handle_events', events), \
+             patch('AsyncRuntime.render_frame') as render, \
+             patch('AsyncRuntime.handle_input') as handle_input, \
+             patch('AsyncRuntime.handle_arbitration'), \
+             patch('AsyncRuntime.advance_buzz_in'), \
+             patch('AsyncRuntime.start_timers', tick_every(20, ticks)), \
+             patch('AsyncRuntime.update_clock'), \
+             patch('AsyncRuntime.update_leds') as leds:
+            asyncio.run(runtime.run())
+        return runtime, render, handle_input, leds
+
+    def test_quit_stops_every_task(self):
+        """Test closing the window ends the run with all tasks having worked."""
+        context = make_context()
+        ticks = []
+        runtime, render, handle_input, leds = self.run(context, frames_then_quit(20), ticks)
+
+        assert render.call_count == 20
+        assert runtime.stats["frames"] == 20
+        # 20 frames at 200 FPS is 100 ms: polled far more often than drawn
+        assert handle_input.call_count > 20
+        assert len(ticks) >= 3
+        assert leds.call_count > 5
+        assert context.runtime is None
+
+    def test_uncapped_frames(self):
+        """Test FPS 0 runs frames as fast as they come, like the loop runtime."""
+        context = make_context()
+        ticks = []
+        with patch('game_config.FPS', 0):
+            runtime, render, handle_input, leds = self.run(context, frames_then_quit(50), ticks)
+
+        assert runtime.stats["frames"] == 50
+        assert runtime.stats["late_frames"] == 0
+        assert handle_input.called
+
+    def test_slow_frame_does_not_stall_input(self):
+        """Test presses are still polled while the frame task is drawing slowly."""
+        context = make_context()
+        polls_during_frame = []
+
+        async def slow_frame():
+            before = handle_input.call_count
+            await asyncio.sleep(0.05)
+            polls_during_frame.append(handle_input.call_count - before)
+
+        runtime = AsyncRuntime(context)
+        runtime.run_frames = slow_frame
+        with patch('AsyncRuntime.handle_input') as handle_input, \
+             patch('AsyncRuntime.handle_arbitration'), \
+             patch('AsyncRuntime.advance_buzz_in'), \
+             patch('AsyncRuntime.start_timers'), \
+             patch('AsyncRuntime.update_clock'), \
+             patch('AsyncRuntime.update_leds'):
+            asyncio.run(runtime.run())
+
+        assert polls_during_frame[0] > 5
+
+    def test_new_timer_wakes_timer_task(self):
+        """Test a timer added by another task runs on time, not at the next wake-up."""
+        context = make_context()
+        fired = []
+
+        async def add_timer_then_quit():
+            await asyncio.sleep(0.01)
+            added = time.monotonic()
+            context.scheduler.call_later(5, lambda: fired.append(time.monotonic() - added))
+            await asyncio.sleep(0.05)
+
+        runtime = AsyncRuntime(context)
+        runtime.run_frames = add_timer_then_quit
+        with patch('AsyncRuntime.handle_input'), \
+             patch('AsyncRuntime.handle_arbitration'), \
+             patch('AsyncRuntime.advance_buzz_in'), \
+             patch('AsyncRuntime.start_timers', tick_every(10_000, [])), \
+             patch('AsyncRuntime.update_clock'), \
+             patch('AsyncRuntime.update_leds'):
+            asyncio.run(runtime.run())
+
+        assert len(fired) == 1
+        assert 0.004 < fired[0] < 0.03
+        assert context.scheduler.on_change is None
+
+    def test_task_error_raised(self):
+        """Test an exception in a task stops the runtime and is raised."""
+        context = make_context()
+        with patch('AsyncRuntime.update_leds', side_effect=RuntimeError("board gone")), \
+             patch('AsyncRuntime.handle_events', Mock(return_value=True)), \
+             patch('AsyncRuntime.render_frame'), \
+             patch('AsyncRuntime.handle_input'), \
+             patch('AsyncRuntime.handle_arbitration'), \
+             patch('AsyncRuntime.advance_buzz_in'), \
+             patch('AsyncRuntime.start_timers'), \
+             patch('AsyncRuntime.update_clock'):
+            with pytest.raises(RuntimeError, match="board gone"):
+                asyncio.run(AsyncRuntime(context).run())
+        assert context.runtime is None
+
+
+@pytest.mark.usefixtures("fast_config")
+class TestPersistence:
+    """Test state is written off the loop thread."""
+
+    def saving_events(self, context, saves_at):
+        """A handle_events that calls context.save() on the given frames and quits after."""
+        frame = iter(range(1000))
+
+        def handle_events(ctx):
+            n = next(frame)
+            if n in saves_at:
+                context.runtime.request_save()
+            return n < max(saves_at) + 2
+        return handle_events
+
+    def run(self, context, handle_events):
+        runtime = AsyncRuntime(context)
+        with patch('AsyncRuntime.handle_events', side_effect=handle_events), \
+             patch('AsyncRuntime.render_frame'), \
+             patch('AsyncRuntime.handle_input'), \
+             patch('AsyncRuntime.handle_arbitration'), \
+             patch('AsyncRuntime.advance_buzz_in'), \
+             patch('AsyncRuntime.start_timers'), \
+             patch('AsyncRuntime.update_clock'), \
+             patch('AsyncRuntime.update_leds'):
+            asyncio.run(runtime.run())
+        return runtime
+
+    def test_writes_on_worker_thread(self):
+        """Test the snapshot is taken on the loop and written on another thread."""
+        context = make_context()
+        threads = []
+        context.write_state.side_effect = lambda snapshot: threads.append(threading.get_ident())
+
+        runtime = self.run(context, self.saving_events(context, {1}))
+
+        context.write_state.assert_called_once_with(context.snapshot.return_value)
+        assert threads[0] != threading.get_ident()
+        assert runtime.stats["saves"] == 1
+
+    def test_saves_during_write_combined(self):
+        """Test saves asked for while a write is under way make one more write."""
+        context = make_context()
+        write_state, written = slow_writer(0.05)
+        context.write_state.side_effect = write_state
+
+        # frames are 5 ms apart: saves on frames 2-5 land while the first write runs
+        runtime = self.run(context, self.saving_events(context, {1, 2, 3, 4, 5}))
+
+        assert len(written) == 2
+        assert runtime.stats["saves"] == 2
+
+    def test_pending_save_written_at_exit(self):
+        """Test a save asked for on the last frame is still written."""
+        context = make_context()
+        runtime = AsyncRuntime(context)
+
+        with patch('AsyncRuntime.handle_events', side_effect=lambda ctx: runtime.request_save()), \
+             patch('AsyncRuntime.render_frame'), \
+             patch('AsyncRuntime.handle_input'), \
+             patch('AsyncRuntime.handle_arbitration'), \
+             patch('AsyncRuntime.advance_buzz_in'), \
+             patch('AsyncRuntime.start_timers'), \
+             patch('AsyncRuntime.update_clock'), \
+             patch('AsyncRuntime.update_leds'):
+            # request_save() returns None, which the frame task reads as QUIT
+            asyncio.run(runtime.run())
+
+        context.write_state.assert_called_once()
+
+    def test_failed_write_reported(self):
+        """Test a disk error is counted and does not stop the game."""
+        context = make_context()
+        context.write_state.side_effect = OSError("disk full")
+
+        runtime = self.run(context, self.saving_events(context, {1}))
+
+        assert runtime.stats["save_errors"] == 1
+        assert runtime.stats["saves"] == 0
+
+    def test_bad_snapshot_reported(self):
+        """Test a snapshot the state format refuses is reported like a disk error."""
+        context = make_context()
+        context.write_state.side_effect = StateFormatError("scores: not a list")
+
+        runtime = self.run(context, self.saving_events(context, {1}))
+
+        assert runtime.stats["save_errors"] == 1
+
+    def test_bad_snapshot_at_exit_reported(self):
+        """Test the last save failing does not raise out of the runtime."""
+        context = make_context()
+        context.write_state.side_effect = StateFormatError("scores: not a list")
+        runtime = AsyncRuntime(context)
+
+        with patch('AsyncRuntime.handle_events', side_effect=lambda ctx: runtime.request_save()), \
+             patch('AsyncRuntime.render_frame'), \
+             patch('AsyncRuntime.handle_input'), \
+             patch('AsyncRuntime.handle_arbitration'), \
+             patch('AsyncRuntime.advance_buzz_in'), \
+             patch('AsyncRuntime.start_timers'), \
+             patch('AsyncRuntime.update_clock'), \
+             patch('AsyncRuntime.update_leds'):
+            asyncio.run(runtime.run())
+
+        assert runtime.stats["save_errors"] == 1
@@ -0,0 +1,629 @@
+"""
+Unit tests for backends.py module.
+"""
+
+import itertools
+import threading
+import time
+
+import pytest
+from unittest.mock import Mock, patch
+import pygame
+
+import protocol
+from backends import (
+    Backend,
+    GpioBackend,
+    InputEvent,
+    KeyboardBackend,
+    MultiSerialBackend,
+    NetworkBackend,
+    SerialBackend,
+    SYNC_PINGS,
+    SimulatedBackend,
+    create_backend,
+    open_backend,
+)
+from BuzzArbiter import MicrosUnwrapper
+from LedService import LedService
+from BuzzQueue import BuzzQueue
+from protocol import FrameDecoder
+from BoardEmulator import BoardEmulator
+from LedEffects import Effect, EffectEngine
+from NetBuzzer import Edge
+
+
+@pytest.fixture
+def serial_context():
+    """Context with a text protocol serial port."""
+    context = Mock()
+    context.serial_port = Mock()
+    context.serial_binary = False
+    context.led_service = None
+    context.frame_decoder = FrameDecoder()
+    context.serial_backlog = []
+    context.board_clock = MicrosUnwrapper()
+    context.led_state = [False] * 4
+    return context
+
+
+class TestBackend:
+    """Test the null and keyboard backends."""
+
+    def test_null_backend(self):
+        """Test the base backend has no input and keypad emulation only."""
+        backend = Backend()
+
+        assert backend.poll(Mock()) == []
+        assert backend.emulates(pygame.K_KP3) == 2
+        assert backend.emulates(pygame.K_c) is None
+        assert not backend.whole_frame(Mock())
+        assert not backend.runs_effects(Mock())
+
+    def test_keyboard_backend_emulates_pc_keys(self):
+        """Test Z,X,C,V stand in for the buttons in development mode."""
+        backend = KeyboardBackend()
+
+        assert backend.emulates(pygame.K_z) == 0
+        assert backend.emulates(pygame.K_v) == 3
+        assert backend.emulates(pygame.K_KP1) == 0
+        assert backend.emulates(pygame.K_a) is None
+
+    @pytest.mark.parametrize("platform,expected", [
+        ("rpi", GpioBackend),
+        ("pcserial", SerialBackend),
+        ("simulated", SimulatedBackend),
+        ("network", NetworkBackend),
+        ("pc", KeyboardBackend),
+    ])
+    def test_create_backend(self, platform, expected):
+        """Test PLATFORM selects the backend."""
+        with patch('backends.config.PLATFORM', platform):
+            assert isinstance(create_backend(), expected)
+
+    def test_create_backend_several_boards(self):
+        """Test SERIAL_BOARDS selects the multi-board backend with its mapping."""
+        boards = [{"device": "/dev/ttyUSB0", "players": [1, 2]}, {"device": "/dev/ttyUSB1", "players": [0, 3]}]
+        with patch('backends.config.PLATFORM', 'pcserial'), \
+             patch('backends.config.SERIAL_BOARDS', boards):
+            backend = create_backend()
+
+        assert isinstance(backend, MultiSerialBackend)
+        assert [(b.device, b.players) for b in backend.boards] == [
+            ("/dev/ttyUSB0", [0, 1]),
+            ("/dev/ttyUSB1", [-1, 2]),
+        ]
+
+    def test_open_backend_falls_back_to_keyboard(self):
+        """Test missing hardware leaves the game playable from the keyboard."""
+        context = Mock()
+
+        with patch('backends.config.PLATFORM', 'rpi'), \
+             patch('backends.GPIO', None), \
+             patch.dict('sys.modules', {'RPi': None, 'RPi.GPIO': None}), \
+             patch('builtins.print'):
+            backend = open_backend(context)
+
+        assert isinstance(backend, KeyboardBackend)
+        assert context.backend is backend
+
+
+class TestGpioBackend:
+    """Test the Raspberry Pi GPIO backend."""
+
+    @pytest.fixture
+    def gpio_context(self):
+        context = Mock()
+        context.led_state = [True, True, True, True]
+        context.buzz_queue = BuzzQueue()
+        return context
+
+    @patch('backends.config.PLAYER_REVERSE_MAP', {16: 0, 17: 1, 18: 2, 19: 3})
+    def test_button_event_queues_press(self, gpio_context):
+        """Test the GPIO callback queues a timestamped press."""
+        GpioBackend().button_event(gpio_context, 17)
+
+        buzzes = gpio_context.buzz_queue.drain()
+        assert [b.player for b in buzzes] == [1]
+        assert buzzes[0].captured_ns > 0
+
+    def test_poll_drains_buzz_queue(self, gpio_context):
+        """Test queued presses are timestamped with their capture time."""
+        gpio_context.buzz_queue.push(2, 5_000_000)
+        gpio_context.buzz_queue.push(0, 5_002_000)
+
+        events = GpioBackend().poll(gpio_context)
+
+        assert events == [
+            InputEvent(2, True, 5000, 5_000_000),
+            InputEvent(0, True, 5002, 5_002_000),
+        ]
+        assert len(gpio_context.buzz_queue) == 0
+
+    @patch('backends.config.INPUT_BACKEND', 'rpigpio')
+    @patch('backends.config.PLAYER_MAP', [16, 17, 18, 19])
+    @patch('backends.config.GPIO_LED_MAP', [20, 21, 22, 23])
+    def test_open(self, gpio_context):
+        """Test GPIO setup in RPi mode."""
+        backend = GpioBackend()
+
+        with patch('backends.GPIO') as mock_gpio:
+            assert backend.open(gpio_context) is True
+
+            # Check GPIO mode setup
+            mock_gpio.setmode.assert_called_once_with(mock_gpio.BCM)
+
+            # Check button and LED setup
+            assert mock_gpio.setup.call_count == 8  # 4 buttons + 4 LEDs
+            for pin in (16, 17, 18, 19):
+                mock_gpio.setup.assert_any_call(pin, mock_gpio.IN, pull_up_down=mock_gpio.PUD_UP)
+            for pin in (20, 21, 22, 23):
+                mock_gpio.setup.assert_any_call(pin, mock_gpio.OUT)
+
+            # Check event detection setup
+            assert mock_gpio.add_event_detect.call_count == 4
+            pin, edge, callback = mock_gpio.add_event_detect.call_args_list[0].args
+            assert (pin, edge) == (16, mock_gpio.FALLING)
+            assert callback.func == backend.button_event
+            assert callback.args == (gpio_context,)
+            assert mock_gpio.add_event_detect.call_args_list[0].kwargs == {"bouncetime": 50}
+
+            # Check warnings disabled and LEDs cleared
+            mock_gpio.setwarnings.assert_called_once_with(False)
+            mock_gpio.output.assert_any_call(20, False)
+            assert gpio_context.led_state == [False, False, False, False]
+
+    @patch('backends.config.INPUT_BACKEND', 'gpiod')
+    @patch('backends.config.PLAYER_REVERSE_MAP', {16: 0, 17: 1, 18: 2, 19: 3})
+    @patch('backends.config.GPIO_LED_MAP', [20, 21, 22, 23])
+    def test_open_gpiod(self, gpio_context):
+        """Test the gpiod backend reads the buttons and drives the LEDs without RPi.GPIO."""
+        backend = GpioBackend()
+        with patch('backends.GPIO', None), \
+             patch.dict('sys.modules', {'RPi': None, 'RPi.GPIO': None}), \
+             patch('backends.GpiodInput') as mock_reader, \
+             patch('backends.GpiodOutput') as mock_leds:
+            assert backend.open(gpio_context) is True
+
+            mock_reader.assert_called_once_with(
+                gpio_context, '/dev/gpiochip0', {16: 0, 17: 1, 18: 2, 19: 3}, 0
+            )
+            mock_reader.return_value.start.assert_called_once()
+            mock_leds.assert_called_once_with('/dev/gpiochip0', [20, 21, 22, 23])
+            mock_leds.return_value.open.assert_called_once()
+            mock_leds.return_value.set.assert_any_call(20, False)
+            assert gpio_context.led_state == [False, False, False, False]
+
+            backend.write_led(gpio_context, 2, True)
+            mock_leds.return_value.set.assert_called_with(22, True)
+
+            backend.close(gpio_context)
+            mock_reader.return_value.stop.assert_called_once()
+            mock_leds.return_value.release.assert_called_once()
+
+    @patch('backends.config.INPUT_BACKEND', 'gpiod')
+    @patch('backends.config.GPIO_LED_MAP', [20, 21, 22, 23])
+    def test_open_gpiod_unavailable(self, gpio_context):
+        """Test a missing gpiod package falls back rather than failing."""
+        with patch('backends.GPIO', None), \
+             patch('backends.GpiodOutput') as mock_leds, \
+             patch('builtins.print'):
+            mock_leds.return_value.open.side_effect = RuntimeError("no gpiod")
+            assert GpioBackend().open(gpio_context) is False
+
+
+class TestSerialBackend:
+    """Test the serial board backend."""
+
+    def test_poll_no_port(self, serial_context):
+        """Test nothing is read without a serial port."""
+        serial_context.serial_port = None
+
+        assert SerialBackend(None).poll(serial_context) == []
+
+    def test_poll_no_data(self, serial_context):
+        """Test nothing is read when no data is waiting."""
+        serial_context.serial_port.inWaiting.return_value = 0
+
+        assert SerialBackend(None).poll(serial_context) == []
+        serial_context.serial_port.readline.assert_not_called()
+
+    def test_text_press_without_timestamp(self, serial_context):
+        """Test older firmware presses have no timestamp."""
+        serial_context.serial_port.inWaiting.side_effect = [20, 20, 0]
+        serial_context.serial_port.readline.side_effect = [
+            b"SWITCH 2 PRESSED\r\n",
+            b"SWITCH 2 RELEASED\r\n",
+        ]
+
+        events = SerialBackend(None).poll(serial_context)
+
+        assert [(e.player, e.pressed, e.timestamp_us) for e in events] == [
+            (1, True, None),
+            (1, False, None),
+        ]
+
+    def test_text_timestamped_presses(self, serial_context):
+        """Test text presses carry the board's micros()."""
+        serial_context.serial_port.inWaiting.side_effect = [40, 20, 0]
+        serial_context.serial_port.readline.side_effect = [
+            b"SWITCH 2 PRESSED 1500\r\n",
+            b"SWITCH 1 PRESSED 1200\r\n",
+        ]
+
+        events = SerialBackend(None).poll(serial_context)
+
+        assert [(e.player, e.timestamp_us) for e in events] == [(1, 1500), (0, 1200)]
+
+    def test_text_led_ack_routed_to_service(self, serial_context):
+        """Test LED acks are handed to the LED service."""
+        serial_context.led_service = Mock()
+        serial_context.serial_port.inWaiting.side_effect = [40, 20, 0]
+        serial_context.serial_port.readline.side_effect = [
+            b"LED 0010000 OK\r\n",
+            b"INVALID PIN\r\n",
+        ]
+
+        assert SerialBackend(None).poll(serial_context) == []
+        assert serial_context.led_service.acked.call_args_list == [((True,),), ((False,),)]
+
+    def test_text_invalid_message_ignored(self, serial_context):
+        """Test unknown lines are skipped."""
+        serial_context.serial_port.inWaiting.side_effect = [20, 0]
+        serial_context.serial_port.readline.return_value = b"INVALID MESSAGE"
+
+        assert SerialBackend(None).poll(serial_context) == []
+
+    def test_text_corrupted_lines_dropped(self, serial_context):
+        """Test garbled lines and channels past PLAYERS are dropped, not raised."""
+        serial_context.serial_port.inWaiting.side_effect = [20, 20, 20, 20, 20, 0]
+        serial_context.serial_port.readline.side_effect = [
+            b"SWITCH 2\xffPRESSED 1500\r\n",
+            b"SWITCH 3 PRESSED 15x0\r\n",
+            b"SWITCH 9 PRESSED 1500\r\n",
+            b"SWITCH 0 RELEASED\r\n",
+            b"SWITCH 1 PRESSED 1200\r\n",
+        ]
+
+        events = SerialBackend(None).poll(serial_context)
+
+        assert [(e.player, e.timestamp_us) for e in events] == [(0, 1200)]
+
+    def test_debug_output(self, serial_context):
+        """Test serial debug output when DEBUG_SERIAL is True."""
+        serial_context.serial_port.inWaiting.side_effect = [20, 0]
+        serial_context.serial_port.readline.return_value = b"SWITCH 2 PRESSED"
+
+        with patch('backends.DEBUG_SERIAL', True), \
+             patch('builtins.print') as mock_print:
+            SerialBackend(None).poll(serial_context)
+
+            mock_print.assert_called()
+
+    def test_press_frames_including_backlog(self, serial_context):
+        """Test PRESS frames, including backlogged ones, are returned in order."""
+        serial_context.serial_binary = True
+        serial_context.serial_backlog = FrameDecoder().feed(protocol.encode_press(4, 900))
+        data = protocol.encode_release(4, 950) + protocol.encode_press(2, 1000)
+        serial_context.serial_port.inWaiting.return_value = len(data)
+        serial_context.serial_port.read.return_value = data
+
+        events = SerialBackend(None).poll(serial_context)
+
+        assert [(e.player, e.pressed, e.timestamp_us) for e in events] == [
+            (3, True, 900),
+            (3, False, 950),
+            (1, True, 1000),
+        ]
+        assert serial_context.serial_backlog == []
+
+    def test_frame_acks_routed_to_service(self, serial_context):
+        """Test binary ACK and NAK frames are handed to the LED service."""
+        serial_context.serial_binary = True
+        serial_context.led_service = Mock()
+        data = protocol.encode_frame(protocol.FRAME_ACK) + protocol.encode_frame(protocol.FRAME_NAK)
+        serial_context.serial_port.inWaiting.return_value = len(data)
+        serial_context.serial_port.read.return_value = data
+
+        assert SerialBackend(None).poll(serial_context) == []
+        assert serial_context.led_service.acked.call_args_list == [((True,),), ((False,),)]
+
+    def test_open_connects_in_background(self, serial_context):
+        """Test open returns at once and leaves the handshake to the link."""
+        backend = SerialBackend(None, ['0403:6001'])
+
+        with patch('backends.SerialLink') as mock_link, \
+             patch('backends.LedService') as mock_service, \
+             patch('builtins.print'):
+            assert backend.open(serial_context) is True
+
+        assert serial_context.serial_port is None
+        mock_link.return_value.start.assert_called_once()
+        assert mock_link.call_args.args[:2] == (None, ['0403:6001'])
+        mock_service.return_value.start.assert_called_once()
+
+    def test_poll_attaches_new_connection(self, serial_context):
+        """Test a connected board is taken over and sent the LED state again."""
+        board = BoardEmulator()
+        board.reset_input_buffer()
+        board.press(2, 700)
+        serial_context.serial_port = None
+        serial_context.effects = EffectEngine(4)
+        backend = SerialBackend(None)
+        backend.link = Mock()
+        backend.link.take.return_value = ('/dev/ttyUSB0', board, False)
+        backend.link.stats = {"connects": 1, "first_connect_ms": 12.0, "recover_ms": None}
+        serial_context.led_service = Mock()
+
+        with patch('builtins.print'):
+            events = backend.poll(serial_context)
+
+        assert serial_context.serial_port is board
+        serial_context.led_service.invalidate.assert_called_once()
+        assert [(e.player, e.timestamp_us) for e in events] == [(1, 700)]
+
+    def test_poll_attach_restarts_effect(self, serial_context):
+        """Test an effect that was running is sent to a reconnected board."""
+        board = BoardEmulator()
+        board.write(b"PROTO 1\n")
+        board.reset_input_buffer()
+        serial_context.serial_port = None
+        serial_context.effects = EffectEngine(4)
+        serial_context.effects.start(Effect.CHASE, period_ms=500)
+        serial_context.led_state = [False] * 4
+        backend = SerialBackend(None)
+        serial_context.backend = backend
+        backend.link = Mock()
+        backend.link.take.return_value = ('/dev/ttyUSB0', board, True)
+        backend.link.stats = {"connects": 2, "first_connect_ms": 12.0, "recover_ms": 800.0}
+
+        with patch('builtins.print'):
+            backend.poll(serial_context)
+
+        assert serial_context.effects_on_board is True
+        assert board.effects.effect == Effect.CHASE
+        assert board.effects.period_ms == 500
+
+    def test_poll_read_error_detaches(self, serial_context):
+        """Test a vanished board is dropped and looked for again."""
+        port = serial_context.serial_port
+        port.inWaiting.side_effect = OSError("device disconnected")
+        backend = SerialBackend(None)
+        backend.link = Mock()
+        backend.link.take.return_value = None
+        serial_context.led_service = Mock()
+
+        with patch('builtins.print'):
+            assert backend.poll(serial_context) == []
+
+        assert serial_context.serial_port is None
+        port.close.assert_called_once()
+        serial_context.led_service.invalidate.assert_called_once()
+        backend.link.lost.assert_called_once()
+
+
+def binary_board(offset_us, **kwargs):
+    """A binary protocol board emulator whose micros() is offset from the host's."""
+    board = BoardEmulator(clock=lambda: time.monotonic_ns() // 1000 + offset_us, **kwargs)
+    board.write(b"PROTO 1\n")
+    board.reset_input_buffer()
+    return board
+
+
+class TestMultiSerialBackend:
+    """Test several boards merged onto one clock."""
+
+    @pytest.fixture
+    def context(self):
+        """Game context with no arbitration in progress."""
+        context = Mock()
+        context.arbiter.pending.return_value = False
+        return context
+
+    @staticmethod
+    def connect(backend, *emulators):
+        """Hand each board of the backend its emulator, as its link would."""
+        for board, emulator in zip(backend.boards, emulators):
+            board.serial.link = Mock()
+            board.serial.link.take.side_effect = itertools.chain([(board.device, emulator, True)],
+                                                                 itertools.repeat(None))
+            board.serial.link.stats = {"connects": 1, "first_connect_ms": 5.0, "recover_ms": None}
+
+    @staticmethod
+    def align(backend, context, frames=20):
+        """Poll until every board's clock is aligned, one PING a frame."""
+        for _ in range(frames):
+            backend.poll(context)
+            if all(board.aligned for board in backend.boards):
+                return
+        raise AssertionError("boards never aligned")
+
+    @patch('backends.config.PLAYERS', 6)
+    def test_presses_merged_in_host_time(self, context):
+        """Test presses from boards with unrelated clocks come out in real order."""
+        board_a, board_b = binary_board(5_000_000), binary_board(123_456_789)
+        backend = MultiSerialBackend([("A", [1, 2, 0, 0]), ("B", [3, 4, 5, 6])])
+        self.connect(backend, board_a, board_b)
+        with patch('builtins.print'):
+            self.align(backend, context)
+        assert all(board.clock.stats["pongs"] == SYNC_PINGS for board in backend.boards)
+
+        now_us = time.monotonic_ns() // 1000
+        # board A is read first, but board B's press happened first
+        board_a.press(1, board_a.micros() - 1_000)
+        board_b.press(2, board_b.micros() - 2_000)
+        board_a.press(3, board_a.micros())  # channel without a player
+        events = backend.poll(context)
+
+        assert [(e.player, e.pressed) for e in events] == [(3, True), (0, True)]
+        assert abs(events[0].timestamp_us - (now_us - 2_000)) < 1_000
+        assert abs(events[1].timestamp_us - (now_us - 1_000)) < 1_000
+
+    def test_no_ping_while_arbitrating(self, context):
+        """Test boards are not pinged during arbitration and use arrival times."""
+        context.arbiter.pending.return_value = True
+        board_a = binary_board(5_000_000)
+        backend = MultiSerialBackend([("A", [1, 2, 3, 4])])
+        self.connect(backend, board_a)
+        with patch('builtins.print'):
+            backend.poll(context)
+
+        board_a.press(1)
+        events = backend.poll(context)
+
+        assert backend.boards[0].clock.stats["pings"] == 0
+        assert events[0].timestamp_us == events[0].arrival_ns // 1000
+
+    def test_firmware_without_ping(self, context):
+        """Test a board that rejects PING is not asked again."""
+        backend = MultiSerialBackend([("A", [1, 2, 3, 4])], ping_interval_ms=0)
+        self.connect(backend, binary_board(0, pings=False))
+        with patch('builtins.print') as mock_print:
+            backend.poll(context)
+            backend.poll(context)
+
+        assert backend.boards[0].clock.stats["pings"] == 1
+        assert not backend.boards[0].pings
+        mock_print.assert_any_call("Board A does not answer PING; using arrival times")
+
+    def test_reconnect_resyncs(self, context):
+        """Test a board that comes back is aligned again from scratch."""
+        backend = MultiSerialBackend([("A", [1, 2, 3, 4])])
+        first, second = binary_board(1_000_000), binary_board(9_000_000)
+        self.connect(backend, first)
+        board = backend.boards[0]
+        with patch('builtins.print'):
+            self.align(backend, context)
+            offset = board.clock.offset_us
+            board.serial.detach(board.view, OSError("unplugged"))
+            board.serial.link.take.side_effect = itertools.chain([("A", second, True)], itertools.repeat(None))
+            backend.poll(context)
+            assert not board.aligned
+            self.align(backend, context)
+
+        assert board.clock.synced
+        assert abs(board.clock.offset_us - offset - 8_000_000) < 1_000
+
+    def test_leds_split_across_boards(self, context):
+        """Test each board shows the LEDs of its own players."""
+        backend = MultiSerialBackend([("A", [1, 0, 2]), ("B", [4, 3])])
+        backend.write_leds(context, 0b1010)
+
+        assert backend.boards[0].view.led_state == [False, False, True]
+        assert backend.boards[1].view.led_state == [True, False]
+        assert backend.whole_frame(context)
+
+    def test_ping_does_not_block(self, context):
+        """Test a board that never answers costs the frame nothing and times out later."""
+        port = Mock()
+        port.inWaiting.return_value = 0
+        backend = MultiSerialBackend([("A", [1, 2, 3, 4])], ping_timeout_ms=20)
+        self.connect(backend, port)
+        board = backend.boards[0]
+
+        start = time.monotonic()
+        with patch('builtins.print'):
+            backend.poll(context)
+            backend.poll(context)
+        assert time.monotonic() - start < 0.015
+        assert board.clock.stats["pings"] == 1
+        port.write.assert_called_once()
+
+        time.sleep(0.025)
+        backend.poll(context)
+        assert board.clock.stats["timeouts"] == 1
+        assert board.clock.stats["pings"] == 2
+
+    def test_ping_shares_led_write_lock(self, context):
+        """Test a PING waits for the LED writer to finish writing to the port."""
+        port = Mock()
+        port.inWaiting.return_value = 0
+        backend = MultiSerialBackend([("A", [1, 2, 3, 4])])
+        self.connect(backend, port)
+        board = backend.boards[0]
+        board.view.led_service = LedService(board.view)
+
+        with board.view.led_service.write_lock:
+            with patch('builtins.print'):
+                pinger = threading.Thread(target=backend.poll, args=(context,))
+                pinger.start()
+                pinger.join(0.05)
+                assert pinger.is_alive()
+                port.write.assert_not_called()
+        pinger.join(1)
+        port.write.assert_called_once()
+
+
+class TestNetworkBackend:
+    """Test wireless buzzers."""
+
+    def test_create_with_player_map(self):
+        """Test NET_BUZZERS pairs become a zero based player map."""
+        with patch('backends.config.PLATFORM', 'network'), \
+             patch('backends.config.NET_BUZZERS', [[101, 1], [102, 3]]):
+            backend = create_backend()
+
+        assert backend.player_map == {101: 0, 102: 2}
+
+    def test_poll_turns_edges_into_events(self):
+        """Test received edges come out as timestamped input events."""
+        backend = NetworkBackend("127.0.0.1", 0)
+        backend.input = Mock()
+        backend.input.drain.return_value = [Edge(7, 1, 2, True, 5_000, 5_100_000)]
+
+        events = backend.poll(Mock())
+
+        assert [(e.player, e.pressed, e.timestamp_us, e.arrival_ns) for e in events] == [
+            (2, True, 5_000, 5_100_000)
+        ]
+
+    def test_open_fails_when_port_taken(self):
+        """Test a port that cannot be bound makes open() fail."""
+        with patch('backends.NetworkInput') as mock_input, patch('builtins.print'):
+            mock_input.return_value.start.side_effect = OSError("address in use")
+            assert NetworkBackend("0.0.0.0", 4210).open(Mock()) is False
+
+
+class TestSimulatedBackend:
+    """Test generated presses."""
+
+    def test_scripted_presses(self):
+        """Test scripted presses come out once their time has passed."""
+        backend = SimulatedBackend(script=[(10, 2, True), (12, 0, True), (50, 2, False)])
+        backend.open(Mock())
+        start = backend.started_ns
+
+        assert backend.poll(Mock(), start + 5_000_000) == []
+        events = backend.poll(Mock(), start + 20_000_000)
+        assert [(e.player, e.pressed) for e in events] == [(2, True), (0, True)]
+        assert events[1].timestamp_us - events[0].timestamp_us == 2000
+
+        events = backend.poll(Mock(), start + 60_000_000)
+        assert [(e.player, e.pressed) for e in events] == [(2, False)]
+        assert backend.poll(Mock(), start + 70_000_000) == []
+
+    def test_random_presses_at_rate(self):
+        """Test a high press rate produces the expected number of presses."""
+        backend = SimulatedBackend(rate_hz=5000, players=4, seed=1)
+        backend.open(Mock())
+        start = backend.started_ns
+
+        events = []
+        for ms in range(1, 101):
+            events.extend(backend.poll(Mock(), start + ms * 1_000_000))
+
+        assert len(events) == 500
+        assert {e.player for e in events} == {0, 1, 2, 3}
+        stamps = [e.timestamp_us for e in events]
+        assert stamps == sorted(stamps)
+
+    def test_same_seed_repeats(self):
+        """Test runs with the same seed press the same buttons."""
+        runs = []
+        for _ in range(2):
+            backend = SimulatedBackend(rate_hz=1000, seed=7)
+            backend.open(Mock())
+            runs.append([e.player for e in backend.poll(Mock(), backend.started_ns + 50_000_000)])
+
+        assert runs[0] == runs[1]
+        assert len(runs[0]) == 50
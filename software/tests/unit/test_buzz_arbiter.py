@@ -0,0 +1,98 @@
+"""
+Unit tests for BuzzArbiter module.
+"""
+
+from BuzzArbiter import BuzzArbiter, MicrosUnwrapper
+
+
+class TestBuzzArbiter:
+    """Test cases for BuzzArbiter."""
+
+    def test_poll_empty(self):
+        """Test polling with no presses returns nothing."""
+        arbiter = BuzzArbiter(10)
+        assert arbiter.poll(now_ns=10**9) is None
+        assert not arbiter.pending()
+
+    def test_window_still_open(self):
+        """Test no decision is made until the window elapses."""
+        arbiter = BuzzArbiter(10)
+        arbiter.submit(0, 5000, arrival_ns=0)
+
+        assert arbiter.poll(now_ns=9_999_999) is None
+        assert arbiter.pending()
+
+    def test_uncontested(self):
+        """Test a single press wins with no margin."""
+        arbiter = BuzzArbiter(10)
+        arbiter.submit(2, 5000, arrival_ns=0)
+
+        result = arbiter.poll(now_ns=10_000_000)
+
+        assert result.winner == 2
+        assert not result.contested
+        assert result.margin_us is None
+        assert not arbiter.pending()
+
+    def test_earliest_hardware_time_wins(self):
+        """Test the earliest timestamp wins even if it arrived later."""
+        arbiter = BuzzArbiter(10)
+        arbiter.submit(0, 5300, arrival_ns=0)
+        arbiter.submit(3, 5000, arrival_ns=1_000_000)
+        arbiter.submit(1, 7000, arrival_ns=2_000_000)
+
+        result = arbiter.poll(now_ns=20_000_000)
+
+        assert result.winner == 3
+        assert result.runner_up == 0
+        assert result.margin_us == 300
+        assert [p.player for p in result.presses] == [3, 0, 1]
+
+    def test_tie_goes_to_first_arrival(self):
+        """Test equal timestamps are broken by arrival order."""
+        arbiter = BuzzArbiter(10)
+        arbiter.submit(1, 5000, arrival_ns=0)
+        arbiter.submit(0, 5000, arrival_ns=1)
+
+        result = arbiter.decide()
+
+        assert result.winner == 1
+        assert result.margin_us == 0
+
+    def test_duplicate_player_ignored(self):
+        """Test only the first press per player counts."""
+        arbiter = BuzzArbiter(10)
+        arbiter.submit(0, 5000, arrival_ns=0)
+        arbiter.submit(0, 4000, arrival_ns=1)
+
+        result = arbiter.decide()
+
+        assert result.timestamp_us == 5000
+        assert len(result.presses) == 1
+
+    def test_reset(self):
+        """Test reset discards the open window."""
+        arbiter = BuzzArbiter(10)
+        arbiter.submit(0, 5000, arrival_ns=0)
+        arbiter.reset()
+
+        assert arbiter.poll(now_ns=10**9) is None
+
+
+class TestMicrosUnwrapper:
+    """Test cases for MicrosUnwrapper."""
+
+    def test_passthrough(self):
+        """Test values are unchanged before any wrap."""
+        clock = MicrosUnwrapper()
+        assert clock.unwrap(100) == 100
+        assert clock.unwrap(200) == 200
+
+    def test_wrap(self):
+        """Test a counter wrap keeps time moving forward."""
+        clock = MicrosUnwrapper()
+        before = clock.unwrap(MicrosUnwrapper.WRAP - 10)
+        after = clock.unwrap(5)
+
+        assert after > before
+        assert after - before == 15
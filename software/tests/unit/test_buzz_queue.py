@@ -0,0 +1,76 @@
+"""
+Unit tests for BuzzQueue module.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from BuzzQueue import BuzzQueue
+from Scheduler import Scheduler
+
+
+class TestBuzzQueue:
+    """Test cases for BuzzQueue."""
+
+    def test_drain_in_order(self):
+        """Test presses come out oldest first and the queue empties."""
+        queue = BuzzQueue()
+        queue.push(1, 100)
+        queue.push(3, 200)
+
+        drained = queue.drain()
+
+        assert [(b.player, b.captured_ns) for b in drained] == [(1, 100), (3, 200)]
+        assert len(queue) == 0
+        assert queue.drain() == []
+
+    def test_push_stamps_capture_time(self):
+        """Test presses are stamped when pushed."""
+        queue = BuzzQueue()
+        with patch('BuzzQueue.time.monotonic_ns', return_value=42):
+            queue.push(0)
+
+        assert queue.drain()[0].captured_ns == 42
+
+    def test_press_sets_wake(self):
+        """Test a press sets the wake event and draining clears it."""
+        wake = threading.Event()
+        queue = BuzzQueue(wake)
+        queue.push(0)
+        queue.push(1)
+        assert wake.is_set()
+
+        queue.drain()
+        assert not wake.is_set()
+        queue.push(2)
+        assert wake.is_set()
+
+    def test_press_wakes_scheduler(self):
+        """Test a press from another thread ends the scheduler's sleep early."""
+        scheduler = Scheduler()
+        queue = BuzzQueue(scheduler.woken)
+        timer = threading.Timer(0.02, queue.push, args=(3,))
+        timer.start()
+        start = time.monotonic()
+        scheduler.run_until(time.monotonic_ns() + 5_000_000_000)
+        timer.join()
+
+        assert time.monotonic() - start < 1
+        assert [buzz.player for buzz in queue.drain()] == [3]
+
+    def test_concurrent_producers(self):
+        """Test presses from several threads are all delivered."""
+        queue = BuzzQueue()
+
+        def producer(player):
+            for _ in range(1000):
+                queue.push(player)
+
+        threads = [threading.Thread(target=producer, args=(p,)) for p in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(queue.drain()) == 4000
@@ -0,0 +1,76 @@
+"""
+Unit tests for ClockSync.py module.
+"""
+
+from ClockSync import ClockSync
+
+
+def round_trip(clock, host_us, board_us, rtt_us):
+    """Record a round trip whose PONG was stamped halfway through."""
+    clock.add((host_us - rtt_us // 2) * 1000, board_us, (host_us + rtt_us // 2) * 1000)
+
+
+class TestClockSync:
+    """Test mapping board time onto host time."""
+
+    def test_not_synced_until_first_pong(self):
+        """Test a fresh clock reports itself unsynced."""
+        clock = ClockSync()
+        assert not clock.synced
+        assert clock.uncertainty_us is None
+
+    def test_offset_from_one_round_trip(self):
+        """Test a single round trip gives the offset."""
+        clock = ClockSync()
+        round_trip(clock, 1_000_000, 9_000_000, 400)
+
+        assert clock.synced
+        assert clock.to_host_us(9_000_500) == 1_000_500
+        assert clock.uncertainty_us == 200
+
+    def test_quickest_round_trip_wins(self):
+        """Test a delayed round trip does not drag the offset."""
+        clock = ClockSync()
+        round_trip(clock, 1_000_000, 9_000_000, 400)
+        # the PONG sat in a buffer: its stamp is early for the midpoint
+        round_trip(clock, 1_100_000, 9_095_000, 10_000)
+
+        assert clock.to_host_us(9_100_000) == 1_100_000
+        assert clock.stats["best_rtt_us"] == 400
+
+    def test_fits_skew(self):
+        """Test a board clock running fast is scaled back to host time."""
+        clock = ClockSync()
+        # board runs 500 ppm fast
+        for n in range(5):
+            host_us = 1_000_000 + n * 500_000
+            round_trip(clock, host_us, 7_000_000 + round((host_us - 1_000_000) * 1.0005), 300)
+
+        assert abs(clock.skew_ppm - 500) < 1
+        assert abs(clock.to_host_us(7_000_000 + 10_005_000) - 11_000_000) <= 1
+
+    def test_implausible_skew_ignored(self):
+        """Test a rate beyond max_skew_ppm falls back to the quickest offset."""
+        clock = ClockSync(max_skew_ppm=100)
+        round_trip(clock, 1_000_000, 5_000_000, 300)
+        round_trip(clock, 2_000_000, 6_010_000, 200)
+
+        assert clock.skew_ppm == 0
+        assert clock.to_host_us(6_010_000) == 2_000_000
+
+    def test_sequence_wraps(self):
+        """Test PING sequence numbers fit in a byte and are counted."""
+        clock = ClockSync()
+        clock.sequence = 0xFF
+
+        assert clock.next_sequence() == 0
+        assert clock.stats["pings"] == 1
+
+    def test_reset(self):
+        """Test reset forgets the alignment but keeps counters."""
+        clock = ClockSync()
+        round_trip(clock, 1_000_000, 9_000_000, 400)
+        clock.reset()
+
+        assert not clock.synced
+        assert clock.stats["pongs"] == 1
@@ -85,6 +85,24 @@ class TestContext:
             assert context.state == GameState.IDLE
             assert context.player_buzzed_in == -1
     
+    @patch('Context.Sound')
+    def test_clock_runs_with_state(self, mock_sound_class):
+        """Test the game clock runs only while the game is RUNNING."""
+        with patch('pygame.time.Clock'), \
+             patch('pygame.sprite.Group'), \
+             patch('game_config.CLOCK_ENABLED', True):
+            context = Context()
+            assert not context.game_clock.running
+
+            context.state = GameState.RUNNING
+            assert context.game_clock.running
+
+            context.state = GameState.BUZZIN
+            assert not context.game_clock.running
+
+            context.clock = 12345
+            assert context.clock == 12345
+
     @patch('Context.Sound')
     def test_save_and_restore(self, mock_sound_class, temp_state_file):
         """Test save and restore functionality."""
@@ -104,8 +122,9 @@ class TestContext:
             context.player_names = ["Alice", "Bob", "Charlie", "Diana"]
             context.invert_display = False
             
-            # Save state
+            # Save state, and wait for it to be written
             context.save()
+            assert context.state_store.flush(timeout=5)
             
             # Create new context and restore
             new_context = Context()
@@ -115,6 +134,106 @@ class TestContext:
             assert new_context.player_names == context.player_names
             assert new_context.invert_display == context.invert_display
     
+    @patch('Context.Sound')
+    def test_same_game_saved_once(self, mock_sound_class, temp_state_file):
+        """Test saving the same game twice writes the file once, keeping older generations."""
+        with patch('pygame.time.Clock'), \
+             patch('pygame.sprite.Group'), \
+             patch('game_config.STATE_FILE_NAME', temp_state_file):
+            context = Context()
+            context.scores = [3, 1, 0, 0]
+            with patch('Context.wall_ms', return_value=1_000):
+                context.save()
+                assert context.state_store.flush(timeout=5)
+            with patch('Context.wall_ms', return_value=2_000):
+                context.save()
+                assert context.state_store.flush(timeout=5)
+
+            assert context.state_store.stats["written"] == 1
+            assert context.state_store.stats["unchanged"] == 1
+
+    @patch('Context.Sound')
+    def test_save_under_runtime_deferred(self, mock_sound_class, temp_state_file):
+        """Test save() leaves the write to the asyncio runtime when one is running."""
+        with patch('pygame.time.Clock'), \
+             patch('pygame.sprite.Group'), \
+             patch('game_config.STATE_FILE_NAME', temp_state_file):
+            context = Context()
+            context.runtime = Mock()
+
+            with patch.object(context.state_store, 'save') as mock_save:
+                context.save()
+
+            context.runtime.request_save.assert_called_once()
+            mock_save.assert_not_called()
+
+    @patch('Context.Sound')
+    def test_restore_with_more_players(self, mock_sound_class, temp_state_file):
+        """Test a save from a four player show fills in the extra players."""
+        with patch('pygame.time.Clock'), \
+             patch('pygame.sprite.Group'), \
+             patch('game_config.STATE_FILE_NAME', temp_state_file):
+            context = Context()
+            context.scores = [1, 2, 3, 4]
+            context.player_names = ["A", "B", "C", "D"]
+            context.save()
+            context.state_store.flush(timeout=5)
+
+            with patch('game_config.PLAYERS', 6):
+                context.restore()
+
+            assert context.scores == [1, 2, 3, 4, 0, 0]
+            assert context.player_names == ["A", "B", "C", "D", "Player 5", "Player 6"]
+
+    @patch('Context.Sound')
+    def test_restore_from_journal(self, mock_sound_class, temp_state_file):
+        """Test changes made after the last snapshot come back from the journal."""
+        now = [0]
+        with patch('pygame.time.Clock'), \
+             patch('pygame.sprite.Group'), \
+             patch('game_config.STATE_FILE_NAME', temp_state_file), \
+             patch('game_config.CLOCK_ENABLED', True), \
+             patch('game_config.JOURNAL_SNAPSHOT_EVERY', 1000):
+            context = Context(lambda: now[0])
+            context.restore()
+            context.save()
+            context.state_store.flush(timeout=5)
+
+            # not saved again, only journaled
+            context.state = GameState.RUNNING
+            now[0] += 12_345_678_901
+            context.record("score", 1, 1)
+            context.record("name", 0, "Alice")
+            context.player_buzzed_in = 1
+            context.record("buzz", 1, context.clock)
+            context.state = GameState.BUZZIN
+            context.journal.close()
+
+            new_context = Context()
+            new_context.restore()
+
+            assert new_context.scores[:2] == [0, 1]
+            assert new_context.player_names[0] == "Alice"
+            assert new_context.clock == config.MAX_CLOCK - 12_345
+            # comes back stopped, for the MC to start
+            assert new_context.state == GameState.IDLE
+
+    @patch('Context.Sound')
+    def test_snapshot_every(self, mock_sound_class, temp_state_file):
+        """Test a snapshot is saved every JOURNAL_SNAPSHOT_EVERY changes."""
+        with patch('pygame.time.Clock'), \
+             patch('pygame.sprite.Group'), \
+             patch('game_config.STATE_FILE_NAME', temp_state_file), \
+             patch('game_config.JOURNAL_SNAPSHOT_EVERY', 3):
+            context = Context()
+            context.restore()
+            with patch.object(context.state_store, 'save') as mock_save:
+                for _ in range(7):
+                    context.record("score", 0, 1)
+
+            assert mock_save.call_count == 2
+            assert mock_save.call_args[0][0]["journal_seq"] == 6
+
     @patch('Context.Sound')
     def test_restore_nonexistent_file(self, mock_sound_class):
         """Test restore method with nonexistent file."""
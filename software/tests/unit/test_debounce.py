@@ -0,0 +1,105 @@
+"""
+Unit tests for Debounce.py module.
+"""
+
+from backends import InputEvent
+from Debounce import DebounceFilter
+
+
+def press(player, at_us):
+    return InputEvent(player, True, at_us, at_us * 1000)
+
+
+def release(player, at_us):
+    return InputEvent(player, False, at_us, at_us * 1000)
+
+
+class TestDebounceFilter:
+    """Test which edges pass the filter."""
+
+    def test_first_press_passes(self):
+        """Test the first edge is accepted straight away."""
+        debounce = DebounceFilter(4, 30, 10)
+        assert debounce.accept(press(0, 1_000))
+        assert debounce.stats()[0]["presses"] == 1
+
+    def test_bouncy_press(self):
+        """Test contact bounce after a press is dropped and the real release kept."""
+        debounce = DebounceFilter(4, 30, 10)
+        edges = [press(1, 0), release(1, 2_000), press(1, 3_000), release(1, 150_000)]
+
+        assert [debounce.accept(e) for e in edges] == [True, False, False, True]
+        counts = debounce.stats()[1]
+        assert counts["short"] == 1
+        assert counts["duplicate"] == 1
+        assert debounce.rejected(1) == 2
+
+    def test_bounce_after_release(self):
+        """Test a press inside the window after a release is dropped."""
+        debounce = DebounceFilter(4, 30, 10)
+        debounce.accept(press(0, 0))
+        debounce.accept(release(0, 100_000))
+
+        assert not debounce.accept(press(0, 110_000))
+        assert debounce.accept(press(0, 140_000))
+        assert debounce.stats()[0]["bounced"] == 1
+
+    def test_unpaired_release(self):
+        """Test a release without a press is dropped."""
+        debounce = DebounceFilter(4)
+        assert not debounce.accept(release(2, 5_000))
+        assert debounce.stats()[2]["unpaired"] == 1
+
+    def test_lost_release(self):
+        """Test a press long after an unreleased one is accepted."""
+        debounce = DebounceFilter(4, 30, 10)
+        debounce.accept(press(0, 0))
+
+        assert not debounce.accept(press(0, 20_000))
+        assert debounce.accept(press(0, 500_000))
+
+    def test_per_player_windows(self):
+        """Test each player gets their own window, and channels are independent."""
+        debounce = DebounceFilter(4, [30, 80])
+        assert debounce.window_us == [30_000, 80_000, 80_000, 80_000]
+        for player in (0, 1):
+            debounce.accept(press(player, 0))
+            debounce.accept(release(player, 20_000))
+
+        assert debounce.accept(press(0, 60_000))
+        assert not debounce.accept(press(1, 60_000))
+        assert debounce.accept(press(2, 60_000))
+
+    def test_disabled(self):
+        """Test zero windows accept every paired edge."""
+        debounce = DebounceFilter(4, 0, 0)
+        edges = [press(0, 0), release(0, 1), press(0, 2), release(0, 3)]
+        assert all(debounce.accept(e) for e in edges)
+
+    def test_release_without_timestamp(self):
+        """Test an unstamped release is placed on the press's timeline."""
+        debounce = DebounceFilter(4, 30, 10)
+        # board clock runs far ahead of the host clock
+        debounce.accept(InputEvent(0, True, 9_000_000, 1_000_000))
+
+        assert not debounce.accept(InputEvent(0, False, None, 1_000_000 + 5_000_000))
+        assert debounce.accept(InputEvent(0, False, None, 1_000_000 + 50_000_000))
+
+    def test_clock_reset(self):
+        """Test a source clock going backwards starts the channel over."""
+        debounce = DebounceFilter(4, 30, 10)
+        debounce.accept(press(0, 5_000_000))
+
+        assert debounce.accept(press(0, 1_000))
+        assert debounce.stats()[0]["presses"] == 2
+
+    def test_unknown_player_passes(self):
+        """Test events for channels the filter does not know are not touched."""
+        assert DebounceFilter(4).accept(press(7, 0))
+
+    def test_reset(self):
+        """Test reset clears state and counters."""
+        debounce = DebounceFilter(4)
+        debounce.accept(release(0, 0))
+        debounce.reset()
+        assert debounce.rejected(0) == 0
@@ -6,227 +6,272 @@ clock events, keyboard events, buzz-in handling, and the main event loop.
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import ANY, Mock, patch, MagicMock
 import pygame
 import sys
 
 from events import (
-    button_event,
-    handle_serial_input,
+    handle_input_event,
+    score_add,
+    score_subtract,
+    handle_input,
+    handle_arbitration,
     handle_clock_event,
+    update_clock,
     handle_keyboard_event,
     handle_buzz_in,
+    handle_events,
+    render_frame,
     event_loop
 )
 from GameState import GameState
+from GameClock import GameClock
+from Scheduler import Scheduler
+from KeyMap import KeyMap
 from Context import Context
+from LedEffects import Effect
+from Debounce import DebounceFilter
+from backends import Backend, InputEvent, KeyboardBackend
 
 
-class TestButtonEvent:
-    """Test button_event function for different platforms and modes."""
+class TestInputEvent:
+    """Test handle_input_event and handle_input functions."""
     
-    def test_button_event_serial_mode(self):
-        """Test button event in serial mode."""
+    def test_untimed_press_buzzes_in(self):
+        """Test a press without a timestamp takes effect immediately."""
         mock_context = Mock()
-        mock_context.serial_port = True
+        mock_context.state = GameState.RUNNING
+        mock_context.button_test = False
+        mock_context.player_buzzed_in = -1
         
-        with patch('events.config') as mock_config:
-            mock_config.PLATFORM = "pcserial"
-            
-            button_event(mock_context, 2)
-            
-            assert mock_context.player_buzzed_in == 1
-    
-    def test_button_event_gpio_mode(self):
-        """Test button event in GPIO mode."""
-        mock_context = Mock()
-        mock_context.serial_port = False
+        handle_input_event(mock_context, InputEvent(1))
         
-        with patch('events.config') as mock_config:
-            mock_config.PLAYER_REVERSE_MAP = {5: 2, 6: 3, 7: 0, 8: 1}
-            
-            button_event(mock_context, 5)
-            
-            assert mock_context.player_buzzed_in == 2
-
-
-class TestSerialInput:
-    """Test handle_serial_input function."""
+        assert mock_context.player_buzzed_in == 1
+        mock_context.arbiter.submit.assert_not_called()
     
-    def test_handle_serial_input_no_port(self):
-        """Test serial input handling when no port available."""
+    def test_timestamped_press_submitted_to_arbiter(self):
+        """Test timestamped presses are submitted to the arbiter."""
         mock_context = Mock()
-        mock_context.serial_port = None
+        mock_context.state = GameState.RUNNING
+        mock_context.button_test = False
         
-        # Should not raise any errors
-        handle_serial_input(mock_context)
+        handle_input_event(mock_context, InputEvent(1, True, 1500, 42))
+        
+        mock_context.arbiter.submit.assert_called_once_with(1, 1500, 42)
     
-    def test_handle_serial_input_no_data(self):
-        """Test serial input handling when no data available."""
+    def test_press_ignored_when_not_running(self):
+        """Test presses outside RUNNING are discarded."""
         mock_context = Mock()
-        mock_serial_port = Mock()
-        mock_serial_port.inWaiting.return_value = 0
-        mock_context.serial_port = mock_serial_port
+        mock_context.state = GameState.IDLE
+        mock_context.button_test = False
+        mock_context.player_buzzed_in = -1
         
-        handle_serial_input(mock_context)
+        handle_input_event(mock_context, InputEvent(1))
+        handle_input_event(mock_context, InputEvent(2, True, 100))
         
-        mock_serial_port.readline.assert_not_called()
+        assert mock_context.player_buzzed_in == -1
+        mock_context.arbiter.submit.assert_not_called()
     
-    def test_handle_serial_input_valid_switch_pressed(self):
-        """Test serial input handling with valid switch pressed message."""
+    def test_release_ignored(self):
+        """Test releases never buzz in."""
         mock_context = Mock()
-        mock_serial_port = Mock()
-        mock_serial_port.inWaiting.return_value = 20
-        mock_serial_port.readline.return_value = b"SWITCH 2 PRESSED"
-        mock_context.serial_port = mock_serial_port
         mock_context.state = GameState.RUNNING
+        mock_context.player_buzzed_in = -1
         
-        with patch('events.button_event') as mock_button_event, \
-             patch('pygame.event.Event') as mock_event_class, \
-             patch('pygame.event.post') as mock_post:
-            
-            mock_event = Mock()
-            mock_event_class.return_value = mock_event
-            
-            handle_serial_input(mock_context)
-            
-            mock_button_event.assert_called_once_with(mock_context, 2)
-            mock_event_class.assert_called_once_with(2)
-            mock_post.assert_called_once_with(mock_event)
+        handle_input_event(mock_context, InputEvent(1, False))
+        
+        assert mock_context.player_buzzed_in == -1
+        mock_context.sound.play.assert_not_called()
     
-    def test_serial_input_wrong_game_state(self):
-        """Test serial input handling when game state is not RUNNING."""
+    def test_button_test_plays_player_sound(self):
+        """Test button test mode plays the player's sound in any state."""
         mock_context = Mock()
-        mock_serial_port = Mock()
-        mock_serial_port.inWaiting.return_value = 20
-        mock_serial_port.readline.return_value = b"SWITCH 2 PRESSED"
-        mock_context.serial_port = mock_serial_port
         mock_context.state = GameState.IDLE
+        mock_context.button_test = True
+        mock_context.sound.test_sound.return_value = "THREE"
         
-        with patch('events.button_event') as mock_button_event:
-            handle_serial_input(mock_context)
-            
-            mock_button_event.assert_not_called()
+        handle_input_event(mock_context, InputEvent(2))
+        
+        mock_context.sound.test_sound.assert_called_once_with(2)
+        mock_context.sound.play.assert_called_once_with("THREE")
     
-    def test_serial_input_invalid_message_format(self):
-        """Test serial input handling with invalid message format."""
+    def test_handle_input_polls_backend(self):
+        """Test every event from the backend is handled."""
         mock_context = Mock()
-        mock_serial_port = Mock()
-        mock_serial_port.inWaiting.return_value = 20
-        mock_serial_port.readline.return_value = b"INVALID MESSAGE"
-        mock_context.serial_port = mock_serial_port
         mock_context.state = GameState.RUNNING
+        mock_context.button_test = False
+        mock_context.backend.poll.return_value = [
+            InputEvent(3, True, 900, 1),
+            InputEvent(3, False, 950, 2),
+            InputEvent(1, True, 1000, 3),
+        ]
+        
+        handle_input(mock_context)
+        
+        assert mock_context.arbiter.submit.call_args_list == [
+            ((3, 900, 1),),
+            ((1, 1000, 3),),
+        ]
+
+    def test_handle_input_drops_bounce(self):
+        """Test presses rejected by the debounce filter never reach the arbiter."""
+        mock_context = Mock()
+        mock_context.state = GameState.RUNNING
+        mock_context.button_test = False
+        mock_context.debounce = DebounceFilter(4, 30, 10)
+        mock_context.backend.poll.return_value = [
+            InputEvent(0, True, 1_000, 1),
+            InputEvent(0, False, 2_000, 2),
+            InputEvent(0, True, 3_000, 3),
+        ]
+
+        handle_input(mock_context)
+
+        mock_context.arbiter.submit.assert_called_once_with(0, 1_000, 1)
+
+
+class TestArbitration:
+    """Test handle_arbitration function."""
+    
+    def test_arbitration_pending(self):
+        """Test nothing happens while the window is open."""
+        mock_context = Mock()
+        mock_context.arbiter.poll.return_value = None
+        mock_context.player_buzzed_in = -1
         
-        with patch('events.button_event') as mock_button_event:
-            handle_serial_input(mock_context)
-            
-            mock_button_event.assert_not_called()
+        handle_arbitration(mock_context)
+        
+        assert mock_context.player_buzzed_in == -1
     
-    def test_serial_input_debug_output(self):
-        """Test serial input debug output when DEBUG_SERIAL is True."""
+    def test_arbitration_sets_winner(self):
+        """Test the arbitration winner becomes the buzzed in player."""
         mock_context = Mock()
-        mock_serial_port = Mock()
-        mock_serial_port.inWaiting.return_value = 20
-        mock_serial_port.readline.return_value = b"SWITCH 2 PRESSED"
-        mock_context.serial_port = mock_serial_port
         mock_context.state = GameState.RUNNING
+        mock_context.player_buzzed_in = -1
+        result = Mock()
+        result.winner = 2
+        mock_context.arbiter.poll.return_value = result
         
-        with patch('events.DEBUG_SERIAL', True), \
-             patch('events.button_event'), \
-             patch('pygame.event.Event'), \
-             patch('pygame.event.post'), \
-             patch('builtins.print') as mock_print:
+        with patch('pygame.event.post') as mock_post, \
+             patch('builtins.print'):
+            handle_arbitration(mock_context)
             
-            handle_serial_input(mock_context)
-            
-            # Debug output should be printed
-            mock_print.assert_called()
+            assert mock_context.player_buzzed_in == 2
+            assert mock_context.last_arbitration == result
+            # advance_buzz_in() takes it from here; no event is posted
+            mock_post.assert_not_called()
+    
+    def test_arbitration_ignored_when_not_running(self):
+        """Test a result is dropped if the game stopped meanwhile."""
+        mock_context = Mock()
+        mock_context.state = GameState.IDLE
+        mock_context.player_buzzed_in = -1
+        mock_context.arbiter.poll.return_value = Mock(winner=1)
+        
+        handle_arbitration(mock_context)
+        
+        assert mock_context.player_buzzed_in == -1
+
+
+def running_clock(remaining_ms):
+    """A running GameClock with remaining_ms left, and a way to move time on."""
+    now = [0]
+    clock = GameClock(remaining_ms, now_ns=lambda: now[0])
+    clock.start()
+
+    def advance(ms):
+        now[0] += ms * 1_000_000
+    return clock, advance
 
 
 class TestClockEvent:
-    """Test handle_clock_event function."""
+    """Test update_clock and handle_clock_event functions."""
     
     def test_clock_event_running_state_clock_enabled(self):
-        """Test clock event in RUNNING state with clock enabled."""
+        """Test the shown second follows the measured time, not the ticks."""
         mock_context = Mock()
-        mock_context.clock = 60000  # 1 minute
+        mock_context.game_clock, advance = running_clock(60000)  # 1 minute
         mock_context.state = GameState.RUNNING
         mock_context.prev_sec = 60
         
-        with patch('events.config') as mock_config:
-            mock_config.CLOCK_ENABLED = True
-            mock_config.CLOCK_STEP = 1000  # 1 second
-            
-            handle_clock_event(mock_context)
-            
-            assert mock_context.clock == 59000  # Reduced by CLOCK_STEP
-            assert mock_context.prev_sec == 59
+        advance(1000)
+        update_clock(mock_context)
+        assert mock_context.prev_sec == 59
+
+        # a late tick still sees exactly the time that passed
+        advance(2500)
+        update_clock(mock_context)
+        assert mock_context.prev_sec == 57
+        assert mock_context.game_clock.remaining_ms == 56500
     
     def test_clock_event_warning_beep(self):
-        """Test clock event triggers warning beep at 4 seconds or less."""
+        """Test a beep as each of the last 4 seconds begins, not before."""
         mock_context = Mock()
-        mock_context.clock = 3000  # 3 seconds
+        mock_context.game_clock, advance = running_clock(4001)
         mock_context.state = GameState.RUNNING
-        mock_context.prev_sec = 4
-        
-        with patch('events.config') as mock_config:
-            mock_config.CLOCK_ENABLED = True
-            mock_config.CLOCK_STEP = 1000
-            
-            handle_clock_event(mock_context)
-            
-            mock_context.sound.play.assert_called_once_with("BEEP")
+        mock_context.prev_sec = 5
+
+        update_clock(mock_context)
+        mock_context.sound.play.assert_not_called()
+
+        advance(1)
+        update_clock(mock_context)
+        mock_context.sound.play.assert_called_once_with("BEEP")
     
     def test_clock_event_timeout(self):
         """Test clock event handles timeout when clock reaches zero."""
         mock_context = Mock()
-        mock_context.clock = 1000  # 1 second
+        mock_context.game_clock, advance = running_clock(1000)  # 1 second
         mock_context.state = GameState.RUNNING
         mock_context.prev_sec = 1
         
-        with patch('events.config') as mock_config, \
-             patch('events.set_all_leds') as mock_set_leds:
-            mock_config.CLOCK_ENABLED = True
-            mock_config.CLOCK_STEP = 1000
-            
+        with patch('events.set_all_leds') as mock_set_leds:
+            advance(1200)
             handle_clock_event(mock_context)
             
-            assert mock_context.clock == 0
+            assert mock_context.game_clock.remaining_ms == 0
             assert mock_context.state == GameState.TIMEUP
             mock_context.sound.play.assert_called_with("TIMESUP")
             mock_set_leds.assert_called_once_with(mock_context, True)
+
+    def test_paused_clock_ignored(self):
+        """Test nothing happens while the clock is paused."""
+        mock_context = Mock()
+        mock_context.game_clock = GameClock(0)
+        mock_context.state = GameState.TIMEUP
+        mock_context.prev_sec = 1
+
+        update_clock(mock_context)
+
+        assert mock_context.prev_sec == 1
+        mock_context.sound.play.assert_not_called()
     
-    def test_clock_event_idle_state_led_cycling(self):
-        """Test clock event in IDLE state cycles through LEDs."""
+    def test_clock_event_idle_state_starts_chase(self):
+        """Test clock event in IDLE state starts the walking light."""
         mock_context = Mock()
         mock_context.state = GameState.IDLE
-        mock_context.led_attract_cycle = 2
-        mock_context.clock = 0  # Set clock to 0 to avoid the clock > 0 check
+        mock_context.effects.active = False
+        mock_context.game_clock = GameClock(60000)
         
         with patch('events.config') as mock_config, \
-             patch('events.set_led') as mock_set_led:
-            mock_config.PLAYERS = 4
+             patch('events.start_effect') as mock_start_effect:
+            mock_config.ATTRACT_PERIOD_MS = 500
             
             handle_clock_event(mock_context)
             
-            mock_set_led.assert_called_once_with(mock_context, 2, True, True)
-            assert mock_context.led_attract_cycle == 3
+            mock_start_effect.assert_called_once_with(mock_context, Effect.CHASE, period_ms=500)
     
-    def test_clock_event_idle_state_led_wrap_around(self):
-        """Test clock event LED cycling wraps around after last player."""
+    def test_clock_event_idle_state_chase_running(self):
+        """Test clock event leaves a running walking light alone."""
         mock_context = Mock()
         mock_context.state = GameState.IDLE
-        mock_context.led_attract_cycle = 3  # Last player (0-indexed)
-        mock_context.clock = 0  # Set clock to 0 to avoid the clock > 0 check
+        mock_context.effects.active = True
+        mock_context.game_clock = GameClock(60000)
         
-        with patch('events.config') as mock_config, \
-             patch('events.set_led') as mock_set_led:
-            mock_config.PLAYERS = 4
-            
+        with patch('events.start_effect') as mock_start_effect:
             handle_clock_event(mock_context)
             
-            mock_set_led.assert_called_once_with(mock_context, 3, True, True)
-            assert mock_context.led_attract_cycle == 0  # Wrapped around
+            mock_start_effect.assert_not_called()
 
 
 class TestKeyboardEvent:
@@ -235,16 +280,14 @@ class TestKeyboardEvent:
     def test_keyboard_event_buzzin_state_exit(self):
         """Test any keypress exits BUZZIN state."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         mock_context.state = GameState.BUZZIN
         
         # Use a different key that doesn't have special handling
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_a
         
-        with patch('events.set_all_leds') as mock_set_leds, \
-             patch('pygame.key.get_mods') as mock_get_mods:
-            mock_get_mods.return_value = 0  # No shift modifier
-            
+        with patch('events.set_all_leds') as mock_set_leds:
             handle_keyboard_event(mock_context, mock_event)
             
             assert mock_context.state == GameState.IDLE
@@ -252,18 +295,16 @@ class TestKeyboardEvent:
     def test_keyboard_event_shift_escape_exit(self):
         """Test shift+escape provides clean exit."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         
-        mock_event = Mock()
+        mock_event = Mock(mod=pygame.KMOD_SHIFT)
         mock_event.key = pygame.K_ESCAPE
         
-        with patch('pygame.key.get_mods') as mock_get_mods, \
-             patch('pygame.display.quit') as mock_display_quit, \
+        with patch('pygame.display.quit') as mock_display_quit, \
              patch('pygame.quit') as mock_pygame_quit, \
              patch('sys.exit') as mock_sys_exit, \
              patch('builtins.print') as mock_print:
             
-            mock_get_mods.return_value = pygame.KMOD_SHIFT
-            
             handle_keyboard_event(mock_context, mock_event)
             
             mock_print.assert_called_with("\n\nClean Exit: exiting at user request...")
@@ -274,73 +315,137 @@ class TestKeyboardEvent:
     def test_keyboard_event_score_add_points(self):
         """Test number keys 1-4 add points to respective players."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         mock_context.scores = [0, 0, 0, 0]
         
         # Test key 1
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_1
         
         with patch('events.config') as mock_config:
             handle_keyboard_event(mock_context, mock_event)
             
             assert mock_context.scores[0] == 1
-            mock_context.save.assert_called_once()
+            mock_context.record.assert_called_once_with("score", 0, 1)
+            mock_context.save.assert_not_called()
     
     def test_keyboard_event_score_subtract_points(self):
         """Test Q,W,E,R keys subtract points from respective players."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         mock_context.scores = [10, 10, 10, 10]
         
         # Test key Q
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_q
         
         with patch('events.config') as mock_config:
             handle_keyboard_event(mock_context, mock_event)
             
             assert mock_context.scores[0] == 9
-            mock_context.save.assert_called_once()
+            mock_context.record.assert_called_once_with("score", 0, -1)
     
+    def test_keyboard_event_scores_past_four_players(self):
+        """Test number keys reach players past four, and shift takes a point away."""
+        mock_context = Mock()
+        mock_context.backend = Backend()
+        mock_context.scores = [0] * 12
+
+        with patch('events.config'):
+            handle_keyboard_event(mock_context, Mock(mod=0, key=pygame.K_EQUALS))
+            handle_keyboard_event(mock_context, Mock(mod=pygame.KMOD_SHIFT, key=pygame.K_8))
+
+        assert mock_context.scores[11] == 1
+        assert mock_context.scores[7] == -1
+
+    def test_keyboard_event_score_key_beyond_players(self):
+        """Test scoring keys for players that are not in the game do nothing."""
+        mock_context = Mock()
+        mock_context.backend = Backend()
+        mock_context.scores = [0, 0, 0, 0]
+
+        with patch('events.config'):
+            handle_keyboard_event(mock_context, Mock(mod=0, key=pygame.K_9))
+
+        assert mock_context.scores == [0, 0, 0, 0]
+        mock_context.record.assert_not_called()
+
+    def test_score_player_zero_ignored(self):
+        """Test a binding to player 0 scores nobody, rather than the last player."""
+        mock_context = Mock()
+        mock_context.scores = [0, 0, 0, 0]
+
+        score_add(mock_context, "0")
+        score_subtract(mock_context, "-1")
+
+        assert mock_context.scores == [0, 0, 0, 0]
+        mock_context.record.assert_not_called()
+
+    def test_keyboard_event_rebound_key(self):
+        """Test keys do what the keymap binds them to."""
+        mock_context = Mock()
+        mock_context.backend = Backend()
+        mock_context.clock = 10000
+
+        with patch('events.KEYMAP', KeyMap({"F5": "clock_add 30"})):
+            handle_keyboard_event(mock_context, Mock(mod=0, key=pygame.K_F5))
+            handle_keyboard_event(mock_context, Mock(mod=0, key=pygame.K_p))
+
+        assert mock_context.clock == 40000
+
+    def test_keyboard_event_stall_report(self):
+        """Test F12 prints the watchdog's stall counts."""
+        mock_context = Mock()
+        mock_context.backend = Backend()
+        mock_context.watchdog.report.return_value = "Stalls: save 1 (longest 1200 ms)"
+
+        with patch('builtins.print') as mock_print:
+            handle_keyboard_event(mock_context, Mock(mod=0, key=pygame.K_F12))
+
+        mock_print.assert_called_once_with("Stalls: save 1 (longest 1200 ms)")
+
     def test_keyboard_event_keypad_emulation(self):
         """Test keypad keys simulate player buttons in development mode."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         mock_context.state = GameState.RUNNING
         
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_KP2
         
-        with patch('events.config') as mock_config, \
-             patch('events.button_event') as mock_button_event:
-            mock_config.PLATFORM = "pcserial"
-            mock_config.PLAYER_MAP = {0: 1, 1: 2, 2: 3, 3: 4}
-            
+        with patch('events.handle_input_event') as mock_input_event:
             handle_keyboard_event(mock_context, mock_event)
             
-            mock_button_event.assert_called_once_with(mock_context, 2)
+            mock_input_event.assert_called_once_with(mock_context, InputEvent(1, arrival_ns=ANY))
     
     def test_keyboard_event_pc_mode_emulation(self):
         """Test Z,X,C,V keys simulate player buttons in PC mode."""
         mock_context = Mock()
+        mock_context.backend = KeyboardBackend()
         mock_context.state = GameState.RUNNING
         
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_x
         
-        with patch('events.config') as mock_config, \
-             patch('events.button_event') as mock_button_event:
-            mock_config.PLATFORM = "pc"
-            mock_config.PLAYER_MAP = {0: 1, 1: 2, 2: 3, 3: 4}
+        with patch('events.handle_input_event') as mock_input_event:
+            handle_keyboard_event(mock_context, mock_event)
             
+            mock_input_event.assert_called_once_with(mock_context, InputEvent(1, arrival_ns=ANY))
+        
+        # other backends only emulate with the keypad
+        mock_context.backend = Backend()
+        with patch('events.handle_input_event') as mock_input_event:
             handle_keyboard_event(mock_context, mock_event)
             
-            mock_button_event.assert_called_once_with(mock_context, 2)
+            mock_input_event.assert_not_called()
     
     def test_keyboard_event_sound_effects(self):
         """Test B and T keys play sound effects."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         
         # Test B key
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_b
         
         handle_keyboard_event(mock_context, mock_event)
@@ -358,10 +463,11 @@ class TestKeyboardEvent:
     def test_keyboard_event_clock_changes(self):
         """Test P and L keys adjust clock time."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         mock_context.clock = 60000  # 1 minute
         
         # Test P key (add 5 seconds)
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_p
         
         handle_keyboard_event(mock_context, mock_event)
@@ -378,9 +484,10 @@ class TestKeyboardEvent:
     def test_keyboard_event_clock_minimum_zero(self):
         """Test L key doesn't reduce clock below zero."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         mock_context.clock = 2000  # 2 seconds
         
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_l
         
         handle_keyboard_event(mock_context, mock_event)
@@ -390,14 +497,12 @@ class TestKeyboardEvent:
     def test_keyboard_event_shift_a_reset_all(self):
         """Test shift+A resets entire game."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         
-        mock_event = Mock()
+        mock_event = Mock(mod=pygame.KMOD_SHIFT)
         mock_event.key = pygame.K_a
         
-        with patch('pygame.key.get_mods') as mock_get_mods, \
-             patch('events.draw_clock') as mock_draw_clock:
-            mock_get_mods.return_value = pygame.KMOD_SHIFT
-            
+        with patch('events.draw_clock') as mock_draw_clock:
             handle_keyboard_event(mock_context, mock_event)
             
             mock_context.reset_game.assert_called_once()
@@ -407,14 +512,12 @@ class TestKeyboardEvent:
     def test_keyboard_event_shift_z_reset_clock(self):
         """Test shift+Z resets clock only."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         
-        mock_event = Mock()
+        mock_event = Mock(mod=pygame.KMOD_SHIFT)
         mock_event.key = pygame.K_z
         
-        with patch('pygame.key.get_mods') as mock_get_mods, \
-             patch('events.draw_clock') as mock_draw_clock:
-            mock_get_mods.return_value = pygame.KMOD_SHIFT
-            
+        with patch('events.draw_clock') as mock_draw_clock:
             handle_keyboard_event(mock_context, mock_event)
             
             mock_context.reset_clock.assert_called_once()
@@ -423,8 +526,9 @@ class TestKeyboardEvent:
     def test_keyboard_event_help_screen(self):
         """Test H key shows help screen."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_h
         
         with patch('events.draw_help') as mock_draw_help:
@@ -435,9 +539,10 @@ class TestKeyboardEvent:
     def test_keyboard_event_display_inversion(self):
         """Test I key toggles display inversion."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         mock_context.invert_display = False
         
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_i
         
         handle_keyboard_event(mock_context, mock_event)
@@ -452,8 +557,9 @@ class TestKeyboardEvent:
     def test_keyboard_event_name_editor(self):
         """Test N key opens name editor."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_n
         
         with patch('events.NameEditor') as mock_name_editor_class:
@@ -463,14 +569,15 @@ class TestKeyboardEvent:
             handle_keyboard_event(mock_context, mock_event)
             
             mock_name_editor_class.assert_called_once_with(mock_context)
-            mock_editor.run.assert_called_once()
+            mock_editor.open.assert_called_once()
     
     def test_keyboard_event_splash_screen_idle(self):
         """Test S key shows splash screen when in IDLE state."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         mock_context.state = GameState.IDLE
         
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_s
         
         with patch('events.draw_splash') as mock_draw_splash:
@@ -481,9 +588,10 @@ class TestKeyboardEvent:
     def test_keyboard_event_splash_screen_wrong_state(self):
         """Test S key doesn't show splash screen when not in IDLE state."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         mock_context.state = GameState.RUNNING
         
-        mock_event = Mock()
+        mock_event = Mock(mod=0)
         mock_event.key = pygame.K_s
         
         with patch('events.draw_splash') as mock_draw_splash:
@@ -494,11 +602,12 @@ class TestKeyboardEvent:
     def test_keyboard_event_space_transitions(self):
         """Test space bar controls game state transitions."""
         mock_context = Mock()
+        mock_context.backend = Backend()
         
         with patch('events.set_all_leds') as mock_set_leds:
             # Test BUZZIN to RUNNING transition
             mock_context.state = GameState.BUZZIN
-            mock_event = Mock()
+            mock_event = Mock(mod=0)
             mock_event.key = pygame.K_SPACE
             
             handle_keyboard_event(mock_context, mock_event)
@@ -561,6 +670,7 @@ class TestBuzzIn:
         mock_context.player_buzzed_in = 2
         mock_context.screen_info = Mock()
         mock_context.screen_info.current_w = 1920
+        mock_context.sound.player_sound.return_value = "PLAYER3"
         
         with patch('events.config') as mock_config, \
              patch('events.set_led') as mock_set_led, \
@@ -569,6 +679,7 @@ class TestBuzzIn:
             
             handle_buzz_in(mock_context)
             
+            mock_context.sound.player_sound.assert_called_once_with(2)
             mock_context.sound.play.assert_called_with("PLAYER3")
     
     def test_handle_buzz_in_generic_sound_when_disabled(self):
@@ -620,6 +731,55 @@ class TestBuzzIn:
             )
 
 
+class TestAnswerTimer:
+    """Test the answer timer started by a buzz-in."""
+
+    def buzz_in(self, answer_ms):
+        """A context with player 2 buzzed in, a real scheduler and a fake clock."""
+        now = [0]
+        mock_context = Mock()
+        mock_context.player_buzzed_in = 2
+        mock_context.scheduler = Scheduler(now_ns=lambda: now[0])
+        mock_context.answer_timer = None
+        mock_context.backend = Backend()
+        mock_context.screen_info.current_w = 1920
+
+        with patch('events.set_led'), \
+             patch('events.spawn_exploding_particles'), \
+             patch('game_config.ANSWER_TIME_MS', answer_ms):
+            handle_buzz_in(mock_context)
+        mock_context.sound.reset_mock()
+
+        def advance(ms):
+            now[0] += ms * 1_000_000
+            mock_context.scheduler.run_due()
+        return mock_context, advance
+
+    def test_time_up_sounds(self):
+        """Test TIMESUP plays when the player runs out of time to answer."""
+        mock_context, advance = self.buzz_in(5000)
+
+        advance(4999)
+        mock_context.sound.play.assert_not_called()
+        advance(1)
+        mock_context.sound.play.assert_called_once_with("TIMESUP")
+
+    def test_key_cancels(self):
+        """Test the MC moving on cancels the answer timer."""
+        mock_context, advance = self.buzz_in(5000)
+
+        handle_keyboard_event(mock_context, Mock(mod=0, key=pygame.K_a))
+        advance(5000)
+
+        mock_context.sound.play.assert_not_called()
+
+    def test_off_by_default(self):
+        """Test no timer is started with ANSWER_TIME_MS at 0."""
+        mock_context, advance = self.buzz_in(0)
+
+        assert len(mock_context.scheduler) == 0
+
+
 class TestEventLoop:
     """Test event_loop function."""
     
@@ -733,6 +893,51 @@ class TestEventLoop:
             mock_handle_buzz.assert_called_once_with(mock_context)
             assert mock_context.state == GameState.BUZZIN
     
+    def test_event_loop_buzz_in_without_events(self):
+        """Test a buzz-in is handled even when no pygame event is pending."""
+        mock_context = Mock()
+        mock_context.player_buzzed_in = 1
+        mock_context.state = GameState.RUNNING
+        mock_context.modal = None
+        mock_context.game_clock = GameClock(60000)
+        mock_context.scheduler = Scheduler()
+        mock_context.frame_due_ns = 0
+        quit_event = Mock()
+        quit_event.type = pygame.QUIT
+        
+        with patch('pygame.time.set_timer'), \
+             patch('pygame.event.get', side_effect=[[], [quit_event]]), \
+             patch('events.handle_input'), \
+             patch('events.handle_arbitration'), \
+             patch('events.update_effects'), \
+             patch('events.render_all'), \
+             patch('events.handle_buzz_in') as mock_handle_buzz, \
+             patch('builtins.print'):
+            event_loop(mock_context)
+            
+            mock_handle_buzz.assert_called_once_with(mock_context)
+            assert mock_context.state == GameState.BUZZIN
+    
+    def test_modal_gets_events_until_closed(self):
+        """Test a modal takes the keyboard and the game is drawn again once it closes."""
+        mock_context = Mock()
+        mock_context.modal.handle.side_effect = [True, False]
+        key_event = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+
+        with patch('pygame.event.get', return_value=[key_event]), \
+             patch('events.handle_keyboard_event') as mock_handle_keyboard, \
+             patch('events.render_all') as mock_render:
+            assert handle_events(mock_context)
+            render_frame(mock_context)
+            mock_render.assert_not_called()
+
+            assert handle_events(mock_context)
+            assert mock_context.modal is None
+            render_frame(mock_context)
+
+            mock_handle_keyboard.assert_not_called()
+            mock_render.assert_called_once_with(mock_context)
+
     def test_event_loop_rendering_and_fps_logic(self):
         """Test event loop rendering and FPS logic."""
         mock_context = Mock()
@@ -0,0 +1,106 @@
+"""
+Unit tests for GameClock.py module.
+"""
+
+from GameClock import GameClock, format_clock
+
+
+class FakeTime:
+    """A monotonic clock moved on by hand."""
+
+    def __init__(self):
+        self.ns = 5_000_000_000
+
+    def __call__(self):
+        return self.ns
+
+    def advance(self, ms):
+        self.ns += int(ms * 1_000_000)
+
+
+class TestGameClock:
+    """Test measuring the countdown."""
+
+    def test_counts_down_only_while_running(self):
+        """Test time passes off the clock only between start and pause."""
+        now = FakeTime()
+        clock = GameClock(60000, now_ns=now)
+        now.advance(5000)
+        assert clock.remaining_ms == 60000
+
+        clock.start()
+        now.advance(1234)
+        assert clock.remaining_ms == 58766
+
+    def test_pause_keeps_partial_second(self):
+        """Test pausing mid-second keeps exactly the time left."""
+        now = FakeTime()
+        clock = GameClock(60000, now_ns=now)
+        clock.start()
+        now.advance(700.5)
+        clock.pause()
+        now.advance(10_000)
+
+        assert clock.remaining_ns() == 59_299_500_000
+        clock.start()
+        now.advance(299.5)
+        assert clock.remaining_ms == 59000
+
+    def test_never_below_zero(self):
+        """Test the clock stops at zero however late it is read."""
+        now = FakeTime()
+        clock = GameClock(1000, now_ns=now)
+        clock.start()
+        now.advance(5000)
+
+        assert clock.remaining_ms == 0
+        assert clock.seconds_shown() == 0
+        assert clock.ms_to_next_second() is None
+
+    def test_set_while_running(self):
+        """Test adding time counts down from the new value."""
+        now = FakeTime()
+        clock = GameClock(10000, now_ns=now)
+        clock.start()
+        now.advance(3000)
+        clock.set(clock.remaining_ms + 5000)
+        now.advance(1000)
+
+        assert clock.remaining_ms == 11000
+
+    def test_second_boundaries(self):
+        """Test the shown second rounds up and the next change is timed exactly."""
+        now = FakeTime()
+        clock = GameClock(4000, now_ns=now)
+        assert clock.ms_to_next_second() is None
+
+        clock.start()
+        now.advance(0.5)
+        assert clock.seconds_shown() == 4
+        assert clock.ms_to_next_second() == 1000
+
+        now.advance(250)
+        assert clock.ms_to_next_second() == 750
+        now.advance(750)
+        assert clock.seconds_shown() == 3
+
+
+class TestFormatClock:
+    """Test the countdown display."""
+
+    def test_minutes_and_seconds(self):
+        """Test m:ss, rounded up so 0:00 means time is up."""
+        assert format_clock(60000) == "1:00"
+        assert format_clock(59001) == "1:00"
+        assert format_clock(59000) == "0:59"
+        assert format_clock(1) == "0:01"
+        assert format_clock(0) == "0:00"
+
+    def test_tenths_in_last_ten_seconds(self):
+        """Test tenths are shown below ten seconds only when asked for."""
+        assert format_clock(10000, tenths=True) == "0:10"
+        assert format_clock(9901, tenths=True) == "0:10"
+        assert format_clock(9900, tenths=True) == "9.9"
+        assert format_clock(1, tenths=True) == "0.1"
+        assert format_clock(0, tenths=True) == "0:00"
+        assert format_clock(9900) == "0:10"
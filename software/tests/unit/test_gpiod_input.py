@@ -0,0 +1,130 @@
+"""
+Unit tests for GpiodInput module, against a mocked GPIO chip.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+import GpiodInput as gpiod_input
+from GpiodInput import GpiodInput, GpiodOutput
+from BuzzQueue import BuzzQueue
+
+
+def edge(line, timestamp_ns):
+    """An edge event as read from a line request."""
+    return SimpleNamespace(line_offset=line, timestamp_ns=timestamp_ns)
+
+
+class FakeRequest:
+    """A line request that returns scripted batches of edge events."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.released = False
+
+    def wait_edge_events(self, timeout):
+        return bool(self.batches)
+
+    def read_edge_events(self):
+        return self.batches.pop(0)
+
+    def release(self):
+        self.released = True
+
+
+class TestGpiodInput:
+    """Test cases for GpiodInput."""
+
+    @pytest.fixture
+    def context(self):
+        """A context with a real buzz queue."""
+        context = Mock()
+        context.buzz_queue = BuzzQueue()
+        return context
+
+    @pytest.fixture
+    def fake_gpiod(self):
+        """Stand-in for the gpiod package."""
+        module = Mock()
+        line = SimpleNamespace(
+            Bias=SimpleNamespace(PULL_UP="pull-up"),
+            Direction=SimpleNamespace(INPUT="input", OUTPUT="output"),
+            Edge=SimpleNamespace(FALLING="falling"),
+            Value=SimpleNamespace(ACTIVE="active", INACTIVE="inactive"),
+        )
+        with patch.object(gpiod_input, 'gpiod', module, create=True), \
+             patch.object(gpiod_input, 'GPIOD_AVAILABLE', True), \
+             patch.object(gpiod_input, 'Bias', line.Bias, create=True), \
+             patch.object(gpiod_input, 'Direction', line.Direction, create=True), \
+             patch.object(gpiod_input, 'Edge', line.Edge, create=True), \
+             patch.object(gpiod_input, 'Value', line.Value, create=True):
+            yield module
+
+    def test_open_requests_all_lines_at_once(self, context, fake_gpiod):
+        """Test every player line is requested in one bulk request."""
+        reader = GpiodInput(context, "/dev/gpiochip0", {16: 0, 17: 1, 18: 2, 19: 3})
+
+        reader.open()
+
+        fake_gpiod.request_lines.assert_called_once()
+        args, kwargs = fake_gpiod.request_lines.call_args
+        assert args == ("/dev/gpiochip0",)
+        assert list(kwargs["config"]) == [(16, 17, 18, 19)]
+        settings = fake_gpiod.LineSettings.call_args.kwargs
+        assert settings["edge_detection"] == "falling"
+        assert settings["bias"] == "pull-up"
+
+    def test_batch_queued_with_kernel_timestamps(self, context):
+        """Test a batch of edges becomes presses stamped by the kernel."""
+        reader = GpiodInput(context, "/dev/gpiochip0", {16: 0, 17: 1})
+        reader.request = FakeRequest([[edge(17, 1_000_500), edge(16, 1_000_900), edge(5, 1)]])
+
+        assert reader.poll() == 2
+
+        buzzes = context.buzz_queue.drain()
+        assert [(b.player, b.captured_ns) for b in buzzes] == [(1, 1_000_500), (0, 1_000_900)]
+        assert reader.poll() == 0
+
+    def test_thread_reads_until_stopped(self, context, fake_gpiod):
+        """Test the reader thread drains events and releases the lines."""
+        request = FakeRequest([[edge(16, 10)], [edge(17, 20)]])
+        fake_gpiod.request_lines.return_value = request
+        reader = GpiodInput(context, "/dev/gpiochip0", {16: 0, 17: 1})
+
+        reader.start()
+        try:
+            for _ in range(1000):
+                if reader.events == 2:
+                    break
+                reader.thread.join(0.001)
+        finally:
+            reader.stop()
+
+        assert reader.events == 2
+        assert request.released
+
+    def test_missing_package(self, context):
+        """Test a clear error when gpiod is not installed."""
+        with patch.object(gpiod_input, 'GPIOD_AVAILABLE', False):
+            with pytest.raises(RuntimeError):
+                GpiodInput(context, "/dev/gpiochip0", {}).open()
+
+    def test_leds_requested_as_outputs(self, fake_gpiod):
+        """Test the LED lines are requested at once, off, and set through the request."""
+        leds = GpiodOutput("/dev/gpiochip0", [20, 21, 22, 23])
+        leds.open()
+
+        args, kwargs = fake_gpiod.request_lines.call_args
+        assert args == ("/dev/gpiochip0",)
+        assert list(kwargs["config"]) == [(20, 21, 22, 23)]
+        assert fake_gpiod.LineSettings.call_args.kwargs == {"direction": "output", "output_value": "inactive"}
+
+        request = fake_gpiod.request_lines.return_value
+        leds.set(21, True)
+        request.set_value.assert_called_once_with(21, "active")
+
+        leds.release()
+        request.release.assert_called_once()
+        assert leds.request is None
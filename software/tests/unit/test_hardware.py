@@ -2,13 +2,22 @@
 Unit tests for hardware.py module.
 """
 
+import time
+
 import pytest
 from unittest.mock import Mock, patch
+import protocol
 from hardware import (
-    serial_send, button_event, set_led, set_all_leds, 
-    setup_serial, setup_gpio
+    serial_send_frame, set_led, set_all_leds,
+    setup_serial, start_effect, update_effects, find_serial_devices
 )
+from backends import GpioBackend, SerialBackend
 from Context import Context
+from protocol import FrameDecoder
+from BoardEmulator import BoardEmulator
+from LedEffects import Effect, EffectEngine
+from LedService import LedService
+from BuzzQueue import BuzzQueue
 
 
 class TestHardware:
@@ -19,8 +28,16 @@ class TestHardware:
         """Create a mock context for testing."""
         context = Mock(spec=Context)
         context.serial_port = Mock()
+        context.serial_binary = False
+        context.frame_decoder = FrameDecoder()
+        context.serial_backlog = []
+        context.led_service = None
         context.led_state = [False, False, False, False]
+        context.effects = EffectEngine(4)
+        context.effects_on_board = False
+        context.buzz_queue = BuzzQueue()
         context.player_buzzed_in = -1
+        context.backend = SerialBackend(None)
         return context
     
     @pytest.fixture
@@ -36,77 +53,58 @@ class TestHardware:
         mock_port.reset_output_buffer.return_value = None
         return mock_port
     
-    @patch('hardware.config.PLATFORM', 'pcserial')
-    def test_serial_send_success(self, mock_context, mock_serial_port):
-        """Test successful serial send."""
-        mock_context.serial_port = mock_serial_port
-        
-        result = serial_send(mock_context, b"TEST")
-        
-        assert result is True
-        mock_context.serial_port.write.assert_called_once_with(b"TEST")
-        mock_context.serial_port.flush.assert_called_once()
-        mock_context.serial_port.readline.assert_called_once()
-    
-    @patch('hardware.config.PLATFORM', 'pc')
-    def test_serial_send_wrong_platform(self, mock_context):
-        """Test serial send with wrong platform."""
-        result = serial_send(mock_context, b"TEST")
-        assert result is False
-    
-    @patch('hardware.config.PLATFORM', 'pcserial')
-    def test_button_event_serial_mode(self, mock_context):
-        """Test button event in serial mode."""
-        button_event(mock_context, 2)
-        assert mock_context.player_buzzed_in == 1  # channel - 1
-    
-    @patch('hardware.config.PLATFORM', 'rpi')
-    @patch('hardware.config.PLAYER_REVERSE_MAP', {16: 0, 17: 1, 18: 2, 19: 3})
-    def test_button_event_gpio_mode(self, mock_context):
-        """Test button event in GPIO mode."""
-        button_event(mock_context, 17)
-        assert mock_context.player_buzzed_in == 1
-    
-    @patch('hardware.config.PLATFORM', 'rpi')
     def test_set_led_rpi_mode(self, mock_context):
         """Test setting LED in RPi mode."""
         mock_context.led_state = [False, False, False, False]
+        mock_context.backend = GpioBackend()
         
-        with patch('hardware.config.GPIO_LED_MAP', [20, 21, 22, 23]):
+        with patch('backends.config.GPIO_LED_MAP', [20, 21, 22, 23]):
             # Mock the GPIO module to avoid import errors
-            with patch('hardware.GPIO', create=True) as mock_gpio:
+            with patch('backends.GPIO') as mock_gpio:
                 set_led(mock_context, 1, True)
                 mock_gpio.output.assert_called_once_with(21, True)
         
         assert mock_context.led_state[1] is True
     
-    @patch('hardware.config.PLATFORM', 'pcserial')
     def test_set_led_serial_mode(self, mock_context, mock_serial_port):
-        """Test setting LED in serial mode."""
+        """Test a text board is only written by the LED service, never from the main loop."""
         mock_context.serial_port = mock_serial_port
         mock_context.led_state = [False, False, False, False]
         
         set_led(mock_context, 2, True)
         
         assert mock_context.led_state[2] is True
-        mock_context.serial_port.write.assert_called_once_with(b"LED 3 1\n")
+        mock_context.serial_port.write.assert_not_called()
+        mock_context.serial_port.readline.assert_not_called()
     
-    @patch('hardware.config.PLATFORM', 'pcserial')
-    def test_set_led_exclusive(self, mock_context, mock_serial_port):
+    def test_set_led_exclusive(self, mock_context):
         """Test setting LED with exclusive mode."""
-        mock_context.serial_port = mock_serial_port
+        mock_context.backend = GpioBackend()
         mock_context.led_state = [True, True, True, True]
         
-        with patch('hardware.set_all_leds') as mock_set_all:
+        with patch('hardware.set_all_leds') as mock_set_all, patch('backends.GPIO'):
             set_led(mock_context, 1, True, exclusive=True)
             
             mock_set_all.assert_called_once_with(mock_context, False)
             assert mock_context.led_state[1] is True
     
-    @patch('hardware.config.PLATFORM', 'pcserial')
-    def test_set_all_leds(self, mock_context, mock_serial_port):
-        """Test setting all LEDs."""
+    def test_set_led_with_led_service(self, mock_context, mock_serial_port):
+        """Test LED changes are left to the LED service to send."""
         mock_context.serial_port = mock_serial_port
+        mock_context.led_service = Mock()
+        mock_context.led_state = [True, False, True, False]
+        
+        set_led(mock_context, 1, True, exclusive=True)
+        assert mock_context.led_state == [False, True, False, False]
+        
+        set_all_leds(mock_context, True)
+        assert mock_context.led_state == [True, True, True, True]
+        
+        mock_serial_port.write.assert_not_called()
+    
+    def test_set_all_leds(self, mock_context):
+        """Test setting all LEDs."""
+        mock_context.backend = GpioBackend()
         mock_context.led_state = [False, False, False, False]
         
         with patch('hardware.set_led') as mock_set_led:
@@ -120,7 +118,6 @@ class TestHardware:
             mock_set_led.assert_any_call(mock_context, 2, True, False)
             mock_set_led.assert_any_call(mock_context, 3, True, False)
     
-    @patch('hardware.config.PLATFORM', 'pcserial')
     @patch('hardware.config.SERIAL_DEVICE', '/dev/test')
     @patch('hardware.os.path.exists')
     def test_setup_serial_success(self, mock_exists, mock_context):
@@ -130,7 +127,7 @@ class TestHardware:
         with patch('hardware.serial.Serial') as mock_serial_class:
             mock_serial_instance = Mock()
             mock_serial_instance.isOpen.return_value = True
-            mock_serial_instance.readline.side_effect = [b"WAIT\r\n", b"RESET OK\r\n"]
+            mock_serial_instance.readline.side_effect = [b"WAIT\r\n", b"RESET OK\r\n", b"ERROR\r\n"]
             mock_serial_class.return_value = mock_serial_instance
             
             result = setup_serial(mock_context, '/dev/test')
@@ -140,70 +137,156 @@ class TestHardware:
             mock_serial_instance.reset_input_buffer.assert_called_once()
             mock_serial_instance.reset_output_buffer.assert_called_once()
     
-    @patch('hardware.config.PLATFORM', 'pcserial')
     @patch('hardware.config.SERIAL_DEVICE', '/dev/test')
     @patch('hardware.os.path.exists')
     def test_setup_serial_device_not_found(self, mock_exists, mock_context):
         """Test serial setup with device not found."""
         mock_exists.return_value = False
         
-        with patch('hardware.config') as mock_config:
-            result = setup_serial(mock_context, '/dev/test')
-            
-            assert result is False
-            mock_config.PLATFORM = 'pc'  # Should fall back to PC mode
-    
-    @patch('hardware.config.PLATFORM', 'pc')
-    def test_setup_serial_wrong_platform(self, mock_context):
-        """Test serial setup with wrong platform."""
         result = setup_serial(mock_context, '/dev/test')
+        
         assert result is False
     
-    @patch('hardware.config.PLATFORM', 'rpi')
-    @patch('hardware.config.PLAYER_MAP', [16, 17, 18, 19])
-    @patch('hardware.config.GPIO_LED_MAP', [20, 21, 22, 23])
-    def test_setup_gpio_rpi_mode(self, mock_context):
-        """Test GPIO setup in RPi mode."""
-        # Mock the GPIO module to avoid import errors
-        with patch('hardware.GPIO', create=True) as mock_gpio:
-            setup_gpio(mock_context)
-            
-            # Check GPIO mode setup
-            mock_gpio.setmode.assert_called_once_with(mock_gpio.BCM)
-            
-            # Check button setup
-            assert mock_gpio.setup.call_count == 8  # 4 buttons + 4 LEDs
-            mock_gpio.setup.assert_any_call(16, mock_gpio.IN, pull_up_down=mock_gpio.PUD_UP)
-            mock_gpio.setup.assert_any_call(17, mock_gpio.IN, pull_up_down=mock_gpio.PUD_UP)
-            mock_gpio.setup.assert_any_call(18, mock_gpio.IN, pull_up_down=mock_gpio.PUD_UP)
-            mock_gpio.setup.assert_any_call(19, mock_gpio.IN, pull_up_down=mock_gpio.PUD_UP)
-            
-            # Check LED setup
-            mock_gpio.setup.assert_any_call(20, mock_gpio.OUT)
-            mock_gpio.setup.assert_any_call(21, mock_gpio.OUT)
-            mock_gpio.setup.assert_any_call(22, mock_gpio.OUT)
-            mock_gpio.setup.assert_any_call(23, mock_gpio.OUT)
+    @patch('hardware.config.SERIAL_PROTOCOL', 'binary')
+    @patch('hardware.config.PLAYERS', 4)
+    @patch('hardware.os.path.exists', return_value=True)
+    def test_setup_serial_negotiates_binary(self, mock_exists, mock_context):
+        """Test the binary protocol is negotiated and used for LEDs."""
+        board = BoardEmulator()
+        
+        with patch('hardware.serial.Serial', return_value=board):
+            setup_serial(mock_context, '/dev/test')
+        
+        assert mock_context.serial_binary is True
+        assert board.binary
+        
+        set_led(mock_context, 2, True, exclusive=True)
+        assert board.led_mask == 0b0100
+        assert mock_context.led_state == [False, False, True, False]
+        
+        set_all_leds(mock_context, True)
+        assert board.led_mask == 0b1111
+        assert mock_context.led_state == [True, True, True, True]
+    
+    @patch('hardware.config.SERIAL_PROTOCOL', 'binary')
+    @patch('hardware.os.path.exists', return_value=True)
+    def test_setup_serial_falls_back_to_text(self, mock_exists, mock_context):
+        """Test older firmware keeps the text protocol."""
+        board = BoardEmulator(binary_capable=False)
+        
+        with patch('hardware.serial.Serial', return_value=board):
+            setup_serial(mock_context, '/dev/test')
+        
+        assert mock_context.serial_binary is False
+        
+        mock_context.led_service = LedService(mock_context)
+        mock_context.led_service.start()
+        try:
+            set_led(mock_context, 0, True)
+            mock_context.backend.flush(mock_context)
+            deadline = time.monotonic() + 2
+            while not board.led_state(1) and time.monotonic() < deadline:
+                time.sleep(0.001)
+        finally:
+            mock_context.led_service.stop()
+        assert board.led_state(1)
+    
+    def test_serial_send_frame_keeps_events(self, mock_context):
+        """Test presses arriving before an ack are kept for later."""
+        board = BoardEmulator()
+        board.reset_input_buffer()
+        board.write(b"PROTO 1\n")
+        board.reset_input_buffer()
+        board.press(3, 5000)
+        mock_context.serial_port = board
+        
+        serial_send_frame(mock_context, protocol.encode_leds(1))
+        
+        assert len(mock_context.serial_backlog) == 1
+        assert mock_context.serial_backlog[0].channel == 3
+    
+    def test_serial_send_frame_gives_up(self, mock_context):
+        """Test a lost ack gives up after SERIAL_READ_TIMEOUT_MS instead of hanging."""
+        mock_context.serial_port.read.return_value = b""
+
+        with patch('hardware.config.SERIAL_READ_TIMEOUT_MS', 20):
+            assert serial_send_frame(mock_context, protocol.encode_leds(1)) is False
+        assert mock_context.serial_port.read.called
+
+    def test_start_effect_runs_on_binary_board(self, mock_context):
+        """Test a binary board is sent one command and animates by itself."""
+        board = BoardEmulator()
+        board.write(b"PROTO 1\n")
+        board.reset_input_buffer()
+        mock_context.serial_port = board
+        mock_context.serial_binary = True
+        
+        start_effect(mock_context, Effect.SOLO, player=2)
+        
+        assert mock_context.effects_on_board is True
+        assert board.effects.effect == Effect.SOLO
+        assert board.led_state(3)
+        assert mock_context.led_state == [False, False, True, False]
+        
+        set_led(mock_context, 0, True, exclusive=True)
+        
+        assert not mock_context.effects.active
+        assert not board.effects.active
+        assert board.led_mask == 0b0001
+    
+    def test_effect_driven_from_host_in_text_mode(self, mock_context, mock_serial_port):
+        """Test the host animates effects for boards on the text protocol."""
+        mock_context.serial_port = mock_serial_port
+        mock_context.led_service = Mock()
+        
+        start_effect(mock_context, Effect.ALL)
+        
+        assert mock_context.effects_on_board is False
+        assert mock_context.led_state == [True, True, True, True]
+        mock_context.led_service.start_effect.assert_not_called()
+        
+        update_effects(mock_context)
+        mock_serial_port.write.assert_not_called()
+    
+    def test_effect_with_led_service(self, mock_context):
+        """Test the LED service sends the effect and stops diffing LEDs."""
+        mock_context.serial_port = BoardEmulator()
+        mock_context.serial_binary = True
+        mock_context.led_service = Mock()
+        
+        start_effect(mock_context, Effect.BLINK, player=-1, period_ms=400)
+        mock_context.led_service.start_effect.assert_called_once_with(
+            protocol.encode_effect(Effect.BLINK.value, 0, 400)
+        )
+        
+        set_all_leds(mock_context, False)
+        mock_context.led_service.stop_effect.assert_called_once()
+    
+    @patch('hardware.os.path.exists', return_value=True)
+    def test_setup_serial_board_silent(self, mock_exists, mock_context):
+        """Test serial setup gives up if the board never resets."""
+        with patch('hardware.serial.Serial') as mock_serial_class:
+            mock_serial_class.return_value.readline.return_value = b""
             
-            # Check event detection setup
-            assert mock_gpio.add_event_detect.call_count == 4
-            mock_gpio.add_event_detect.assert_any_call(16, mock_gpio.FALLING, button_event, bouncetime=50)
+            result = setup_serial(mock_context, '/dev/test', timeout_s=0.01)
             
-            # Check warnings disabled
-            mock_gpio.setwarnings.assert_called_once_with(False)
-    
-    @patch('hardware.config.PLATFORM', 'pc')
-    def test_setup_gpio_wrong_platform(self, mock_context):
-        """Test GPIO setup with wrong platform."""
-        setup_gpio(mock_context)
-        # Should not call any GPIO functions since GPIO is not imported on PC platform
-    
-    @patch('hardware.config.PLATFORM', 'rpi')
-    @patch('hardware.config.PLAYER_MAP', [16, 17, 18, 19])
-    @patch('hardware.config.GPIO_LED_MAP', [20, 21, 22, 23])
-    def test_setup_gpio_calls_set_all_leds(self, mock_context):
-        """Test that GPIO setup calls set_all_leds."""
-        with patch('hardware.set_all_leds') as mock_set_all, \
-             patch('hardware.GPIO', create=True):
-            setup_gpio(mock_context)
-            # Should call set_all_leds
-            mock_set_all.assert_called_once_with(mock_context)
+            assert result is False
+            mock_serial_class.return_value.close.assert_called_once()
+    
+    def test_find_serial_devices_by_vid_pid(self):
+        """Test discovery only returns ports of known USB serial chips."""
+        ports = [
+            Mock(device='/dev/ttyUSB1', vid=0x1a86, pid=0x7523),
+            Mock(device='/dev/ttyACM0', vid=0x2341, pid=0x0043),
+            Mock(device='/dev/ttyS0', vid=None, pid=None),
+            Mock(device='/dev/ttyUSB0', vid=0x0403, pid=0x6001),
+        ]
+        
+        with patch('hardware.list_ports.comports', return_value=ports):
+            assert find_serial_devices(['0403:6001', '1a86:7523']) == ['/dev/ttyUSB0', '/dev/ttyUSB1']
+            assert find_serial_devices([]) == ['/dev/ttyACM0', '/dev/ttyUSB0', '/dev/ttyUSB1']
+    
+    def test_setup_serial_no_device(self, mock_context):
+        """Test serial setup without a device configured."""
+        result = setup_serial(mock_context, None)
+        assert result is False
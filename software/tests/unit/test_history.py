@@ -0,0 +1,201 @@
+"""
+Unit tests for History.py module.
+"""
+
+import io
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from BuzzArbiter import ArbitrationResult, Press
+from Context import Context
+from GameState import GameState
+from History import History, connect, export_csv, head_to_head, leaderboard, reaction_times, start_history
+
+
+@pytest.fixture
+def context():
+    context = Mock()
+    context.now = 0
+    context.now_ns = lambda: context.now
+    context.player_names = ["Alice", "Bob", "Carol"]
+    context.scores = [0, 0, 0]
+    context.clock = 60000
+    context.last_arbitration = None
+    return context
+
+
+@pytest.fixture
+def history(tmp_path, context):
+    history = History(str(tmp_path / "history.db"), context).start()
+    yield history
+    history.close()
+
+
+def play_game(history, context, scores, buzzes=()):
+    """One round: the clock starts, players buzz in after (player, ms), time runs out."""
+    history.state_changed(GameState.RUNNING)
+    for player, after_ms in buzzes:
+        context.now += after_ms * 1_000_000
+        history.buzz(player)
+        history.state_changed(GameState.RUNNING)
+    context.scores = list(scores)
+    history.state_changed(GameState.TIMEUP)
+    history.end_game()
+
+
+class TestRecording:
+    """Test rounds, games and buzz-ins are written."""
+
+    def test_game(self, history, context):
+        """Test a game's rounds, scores and buzz-ins end up in the database."""
+        play_game(history, context, [3, 1, 0], buzzes=[(0, 1500), (1, 800)])
+        history.flush()
+
+        db = connect(history.path)
+        assert db.execute("SELECT rounds FROM games").fetchall() == [(1,)]
+        assert db.execute("SELECT seat, score, won FROM game_players ORDER BY seat").fetchall() == \
+            [(0, 3, 1), (1, 1, 0), (2, 0, 0)]
+        assert db.execute("SELECT seat, reaction_ms, clock_ms FROM buzzes ORDER BY id").fetchall() == \
+            [(0, 1500, 60000), (1, 800, 60000)]
+        assert db.execute("SELECT COUNT(*) FROM round_scores").fetchone() == (3,)
+
+    def test_reaction_to_arbitrated_press(self, history, context):
+        """Test the reaction time runs to the winning press, not the end of the window."""
+        history.state_changed(GameState.RUNNING)
+        context.now = 900_000_000
+        context.last_arbitration = ArbitrationResult(
+            winner=1, timestamp_us=0, runner_up=0, margin_us=3000,
+            presses=[Press(1, 0, 700_000_000), Press(0, 3000, 703_000_000)],
+        )
+        history.buzz(1)
+        history.flush()
+
+        db = connect(history.path)
+        assert db.execute("SELECT reaction_ms FROM buzzes").fetchone() == (700,)
+
+    def test_empty_game_not_recorded(self, history, context):
+        """Test SHIFT-A with nothing played records nothing."""
+        history.end_game()
+        history.flush()
+        assert connect(history.path).execute("SELECT COUNT(*) FROM games").fetchone() == (0,)
+
+    def test_writes_batched(self, history, context):
+        """Test what is queued together is written in one transaction."""
+        play_game(history, context, [1, 2, 3])
+        history.flush()
+        assert history.stats["commits"] <= 2
+        assert history.stats["statements"] > 10
+
+    def test_wal(self, history):
+        """Test the database is in WAL mode, so reads do not wait for writes."""
+        assert connect(history.path).execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+    def test_ids_carry_on(self, history, context, tmp_path):
+        """Test a restarted game numbers games after those already recorded."""
+        play_game(history, context, [1, 0, 0])
+        history.close()
+
+        again = History(history.path, context)
+        assert again.next_game == 2
+        assert again.next_round == 2
+
+
+class TestQueries:
+    """Test the statistics read back."""
+
+    @pytest.fixture
+    def played(self, history, context):
+        play_game(history, context, [5, 2, 0], buzzes=[(0, 1000), (1, 400)])
+        play_game(history, context, [1, 4, 4], buzzes=[(1, 600), (0, 2000)])
+        play_game(history, context, [3, 1, 3])
+        history.flush()
+        return connect(history.path)
+
+    def test_leaderboard(self, played):
+        """Test players are ranked by wins, then points."""
+        assert leaderboard(played) == [
+            ("Alice", 3, 2, 9, 5),
+            ("Carol", 3, 2, 7, 4),
+            ("Bob", 3, 1, 7, 4),
+        ]
+        assert leaderboard(played, 1) == [("Alice", 3, 2, 9, 5)]
+
+    def test_reaction_times(self, played):
+        """Test players are ranked by mean reaction time."""
+        assert reaction_times(played) == [("Bob", 2, 500), ("Alice", 2, 1500)]
+
+    def test_head_to_head(self, played):
+        """Test games two players both played are compared."""
+        assert head_to_head(played, "Alice", "Bob") == (2, 1, 0)
+        assert head_to_head(played, "Alice", "Carol") == (1, 1, 1)
+        assert head_to_head(played, "Alice", "Nobody") == (0, 0, 0)
+
+    def test_export_streamed(self, played):
+        """Test a table is written as CSV with a header."""
+        out = io.StringIO()
+        assert export_csv(played, "games", out) == 9
+        lines = out.getvalue().splitlines()
+        assert lines[0] == "game,started_ms,ended_ms,rounds,seat,name,score,won"
+        assert lines[1].split(",")[4:] == ["1", "Alice", "5", "1"]
+
+    def test_indexed(self, played):
+        """Test the queries read through indexes, so they stay fast as games pile up."""
+        plan = " ".join(row[3] for row in played.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM player_stats ORDER BY wins DESC, points DESC LIMIT 10"))
+        assert "player_stats_rank" in plan
+
+        plan = " ".join(row[3] for row in played.execute(
+            "EXPLAIN QUERY PLAN SELECT a.score FROM game_players a JOIN game_players b "
+            "ON b.game_id = a.game_id WHERE a.player_id = 1 AND b.player_id = 2"))
+        assert "game_players_player" in plan
+        assert "SCAN" not in plan
+
+    def test_thousands_of_games(self, history, context):
+        """Test the statistics still come back in milliseconds after thousands of games."""
+        names = [f"Player {i}" for i in range(300)]
+        for game in range(3000):
+            context.player_names = [names[(game * 7 + seat) % len(names)] for seat in range(3)]
+            play_game(history, context, [game % 5, game % 3, game % 7], buzzes=[(game % 3, 300 + game % 900)])
+        history.flush()
+        db = connect(history.path)
+        assert db.execute("SELECT COUNT(*) FROM games").fetchone() == (3000,)
+
+        for query in (lambda: leaderboard(db), lambda: reaction_times(db),
+                      lambda: head_to_head(db, "Player 0", "Player 1")):
+            start = time.perf_counter()
+            query()
+            assert time.perf_counter() - start < 0.05
+
+
+class TestContext:
+    """Test the game tells the history what happens."""
+
+    @patch('Context.Sound')
+    def test_game_ends_before_scores_cleared(self, mock_sound_class, tmp_path):
+        """Test SHIFT-A records the scores it is about to clear."""
+        with patch('pygame.time.Clock'), \
+             patch('pygame.sprite.Group'), \
+             patch('game_config.CLOCK_ENABLED', True), \
+             patch('game_config.HISTORY_FILE', str(tmp_path / "history.db")):
+            context = Context()
+            history = start_history(context)
+            try:
+                context.state = GameState.RUNNING
+                context.scores[1] = 4
+                context.reset_game()
+                history.flush()
+            finally:
+                history.close()
+
+        db = connect(str(tmp_path / "history.db"))
+        assert db.execute("SELECT seat FROM game_players WHERE won = 1").fetchall() == [(1,)]
+        assert db.execute("SELECT COUNT(*) FROM rounds WHERE ended_ms IS NOT NULL").fetchone() == (1,)
+
+    def test_off(self):
+        """Test an empty HISTORY_FILE keeps no history."""
+        context = Mock(history=None)
+        with patch('game_config.HISTORY_FILE', ''):
+            assert start_history(context) is None
+        assert context.history is None
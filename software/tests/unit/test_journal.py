@@ -0,0 +1,246 @@
+"""
+Unit tests for Journal.py module.
+"""
+
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from GameState import GameState
+from Journal import MAGIC, Journal, Record, decode, encode, parse, rebuild
+
+
+class FakeWallClock:
+    def __init__(self):
+        self.ms = 1_700_000_000_000
+
+    def __call__(self):
+        return self.ms
+
+
+@pytest.fixture
+def wall():
+    return FakeWallClock()
+
+
+@pytest.fixture
+def journal(tmp_path, wall):
+    journal = Journal(str(tmp_path / "gamestate.json.journal"), keep=2, now_ms=wall)
+    yield journal
+    journal.close()
+
+
+def snapshot(**changes):
+    return {"player_names": ["A", "B"], "scores": [0, 0], "invert_display": True, **changes}
+
+
+class TestRecords:
+    """Test the record layout."""
+
+    def test_round_trip(self):
+        """Test each kind decodes to what was encoded."""
+        for kind, args in [("score", (1, -1)), ("name", (0, "Zoë")), ("invert", (False,)),
+                           ("state", (2, 41234, 1)), ("clock", (59000,)), ("buzz", (3, 1500)),
+                           ("reset", ())]:
+            data = encode(7, 123, kind, args)
+            assert decode(data[6:]) == Record(7, 123, kind, args)
+
+    def test_compact(self):
+        """Test a score change is a small record."""
+        assert len(encode(1, 0, "score", (0, 1))) == 22
+
+    def test_parse_stops_at_damage(self):
+        """Test a flipped bit ends the records there."""
+        good = encode(1, 0, "score", (0, 1))
+        bad = bytearray(encode(2, 0, "score", (0, 1)))
+        bad[-1] ^= 1
+        records, used = parse(good + bytes(bad) + encode(3, 0, "score", (0, 1)))
+
+        assert [record.seq for record, _ in records] == [1]
+        assert used == len(good)
+
+    def test_parse_stops_at_cut_short(self):
+        """Test a record cut off partway is not read."""
+        data = encode(1, 0, "score", (0, 1)) + encode(2, 0, "name", (1, "Bob"))[:-2]
+        records, used = parse(data)
+        assert len(records) == 1
+
+
+class TestRebuild:
+    """Test records are applied to a snapshot."""
+
+    def test_changes_applied(self):
+        """Test scores, names, invert and resets are replayed in order."""
+        records = [
+            Record(1, 0, "score", (0, 1)),
+            Record(2, 0, "score", (1, 1)),
+            Record(3, 0, "reset", ()),
+            Record(4, 0, "score", (1, -1)),
+            Record(5, 0, "name", (0, "Alice")),
+            Record(6, 0, "invert", (False,)),
+        ]
+        state = rebuild(snapshot(scores=[5, 5]), records)
+
+        assert state["scores"] == [0, -1]
+        assert state["player_names"] == ["Alice", "B"]
+        assert state["invert_display"] is False
+        assert state["journal_seq"] == 6
+
+    def test_snapshot_not_changed(self):
+        """Test the snapshot passed in is left alone."""
+        saved = snapshot()
+        rebuild(saved, [Record(1, 0, "score", (0, 1))])
+        assert saved["scores"] == [0, 0]
+
+    def test_stopped_clock_exact(self):
+        """Test a stopped clock comes back to the millisecond."""
+        records = [
+            Record(1, 1000, "state", (GameState.RUNNING.value, 60000, -1)),
+            Record(2, 13345, "buzz", (2, 47655)),
+            Record(3, 13345, "state", (GameState.BUZZIN.value, 47655, 2)),
+        ]
+        state = rebuild(snapshot(), records)
+
+        assert state["clock_ms"] == 47655
+        assert state["state"] == GameState.BUZZIN.value
+        assert state["player_buzzed_in"] == 2
+
+    def test_running_clock_to_last_record(self):
+        """Test a running clock has the time up to the last record taken off."""
+        records = [
+            Record(1, 1000, "state", (GameState.RUNNING.value, 60000, -1)),
+            Record(2, 2000, "clock", (59000,)),
+            Record(3, 2500, "score", (0, 1)),
+        ]
+        assert rebuild(snapshot(), records)["clock_ms"] == 58500
+
+    def test_running_clock_from_snapshot(self):
+        """Test a snapshot of a running clock counts from when it was saved."""
+        saved = snapshot(state=GameState.RUNNING.value, clock_ms=30000, saved_ms=5000)
+        assert rebuild(saved, [Record(9, 6250, "score", (1, 1))])["clock_ms"] == 28750
+
+    def test_wall_clock_set_back(self):
+        """Test a wall clock that went backwards takes no time off."""
+        records = [
+            Record(1, 9000, "state", (GameState.RUNNING.value, 60000, -1)),
+            Record(2, 1000, "score", (0, 1)),
+        ]
+        assert rebuild(snapshot(), records)["clock_ms"] == 60000
+
+
+class TestJournal:
+    """Test appending, recovery and compaction."""
+
+    def test_not_appended_before_read(self, journal):
+        """Test nothing is written before the end of the journal is known."""
+        assert journal.append("score", 0, 1) is None
+        assert not os.path.exists(journal.path)
+
+    def test_append_and_read_back(self, journal, wall):
+        """Test records come back in order with their times."""
+        journal.read()
+        journal.append("score", 0, 1)
+        wall.ms += 500
+        journal.append("name", 1, "Bob")
+        journal.close()
+
+        again = Journal(journal.path)
+        records = again.read()
+        assert [(r.seq, r.kind, r.args) for r in records] == [(1, "score", (0, 1)), (2, "name", (1, "Bob"))]
+        assert records[1].wall_ms - records[0].wall_ms == 500
+        assert again.append("score", 1, 1) == 3
+        again.close()
+
+    def test_read_after_snapshot(self, journal):
+        """Test records the snapshot already has are skipped."""
+        journal.read()
+        for _ in range(5):
+            journal.append("score", 0, 1)
+        journal.close()
+
+        records = Journal(journal.path).read(after=3)
+        assert [r.seq for r in records] == [4, 5]
+
+    def test_torn_end_dropped(self, journal):
+        """Test a record cut short by a power cut is dropped and appends carry on."""
+        journal.read()
+        journal.append("score", 0, 1)
+        journal.append("score", 0, 1)
+        journal.close()
+        with open(journal.path, "r+b") as file:
+            file.truncate(os.path.getsize(journal.path) - 3)
+
+        again = Journal(journal.path)
+        with patch('builtins.print') as mock_print:
+            assert [r.seq for r in again.read()] == [1]
+        assert "dropped 19 damaged bytes" in mock_print.call_args[0][0]
+
+        assert again.append("score", 1, 1) == 2
+        again.close()
+        assert [(r.seq, r.args) for r in Journal(journal.path).read()] == [(1, (0, 1)), (2, (1, 1))]
+
+    def test_not_a_journal(self, journal):
+        """Test a file that is not a journal is moved aside."""
+        with open(journal.path, "wb") as file:
+            file.write(b"not a journal")
+
+        with patch('builtins.print'):
+            assert journal.read() == []
+        assert os.path.exists(journal.path + ".damaged")
+        journal.append("score", 0, 1)
+        journal.close()
+        assert open(journal.path, "rb").read().startswith(MAGIC)
+
+    def test_compacted_to_oldest_snapshot_kept(self, journal):
+        """Test compaction keeps what the oldest kept snapshot needs."""
+        journal.read()
+        for _ in range(3):
+            journal.append("score", 0, 1)
+        journal.compact(2)
+        # the snapshot restored from, seq 0, is still the oldest kept
+        assert [r.seq for r in Journal(journal.path).read()] == [1, 2, 3]
+
+        journal.append("score", 0, 1)
+        journal.compact(4)
+        assert [r.seq for r in Journal(journal.path).read()] == [3, 4]
+        assert journal.stats["compactions"] == 1
+
+        # appends go on to the compacted file
+        journal.append("score", 1, 1)
+        journal.close()
+        assert [r.seq for r in Journal(journal.path).read()] == [3, 4, 5]
+
+    def test_append_not_blocked_by_compaction_sync(self, journal):
+        """Test appends carry on while a compaction waits for the disk, and end up in the compacted file."""
+        journal.read()
+        for _ in range(3):
+            journal.append("score", 0, 1)
+        journal.compact(2)
+
+        syncing = threading.Event()
+        synced = threading.Event()
+        real_fsync = os.fsync
+
+        def slow_fsync(fd):
+            syncing.set()
+            assert synced.wait(2)
+            real_fsync(fd)
+
+        with patch('Journal.os.fsync', side_effect=slow_fsync):
+            compaction = threading.Thread(target=journal.compact, args=(3,))
+            compaction.start()
+            assert syncing.wait(2)
+            appender = threading.Thread(target=journal.append, args=("score", 1, 1))
+            appender.start()
+            appender.join(1)
+            appending = appender.is_alive()
+            synced.set()
+            compaction.join(2)
+
+        assert not appending
+        assert journal.stats["compactions"] == 1
+        journal.append("score", 1, 1)
+        journal.close()
+        assert [r.seq for r in Journal(journal.path).read()] == [3, 4, 5]
@@ -0,0 +1,113 @@
+"""
+Unit tests for KeyMap.py module and the help screen built from it.
+"""
+
+import pygame
+import pytest
+
+from helpinfo import build_help
+from KeyMap import DEFAULT_KEYMAP, KeyMap, key_label, parse_key
+
+
+class TestParseKey:
+    """Test reading key specs."""
+
+    def test_characters_and_names(self):
+        """Test single characters and pygame key names."""
+        assert parse_key("H") == (pygame.K_h, 0)
+        assert parse_key("=") == (pygame.K_EQUALS, 0)
+        assert parse_key("SPACE") == (pygame.K_SPACE, 0)
+        assert parse_key("kp_enter") == (pygame.K_KP_ENTER, 0)
+
+    def test_modifiers(self):
+        """Test modifiers combine into one mask."""
+        assert parse_key("SHIFT+ESCAPE") == (pygame.K_ESCAPE, pygame.KMOD_SHIFT)
+        assert parse_key("ctrl+alt+F1") == (pygame.K_F1, pygame.KMOD_CTRL | pygame.KMOD_ALT)
+
+    def test_unknown(self):
+        """Test a key or modifier that does not exist is an error."""
+        with pytest.raises(ValueError):
+            parse_key("NOSUCHKEY")
+        with pytest.raises(ValueError):
+            parse_key("HYPER+A")
+
+    def test_label(self):
+        """Test help screen labels."""
+        assert key_label("SHIFT+ESCAPE") == "SHIFT-ESC"
+        assert key_label("q") == "Q"
+
+
+class TestKeyMap:
+    """Test looking up bindings."""
+
+    def test_modifiers_pick_binding(self):
+        """Test a key does different things with and without shift held."""
+        keymap = KeyMap(DEFAULT_KEYMAP)
+
+        assert keymap.lookup(pygame.K_1).action == "score_add"
+        assert keymap.lookup(pygame.K_1, pygame.KMOD_RSHIFT).action == "score_subtract"
+        assert keymap.lookup(pygame.K_a) is None
+        assert keymap.lookup(pygame.K_a, pygame.KMOD_LSHIFT).action == "reset_game"
+
+    def test_unmodified_binding_answers_with_modifiers(self):
+        """Test a plain binding still works with shift or caps lock held."""
+        keymap = KeyMap(DEFAULT_KEYMAP)
+
+        binding = keymap.lookup(pygame.K_p, pygame.KMOD_SHIFT | pygame.KMOD_CAPS)
+        assert (binding.action, binding.arg) == ("clock_add", "5")
+
+    def test_settings_override(self):
+        """Test settings rebind, add and unbind keys on top of the defaults."""
+        keymap = KeyMap.from_settings({"shift+a": "none", "F5": "start_stop", "p": "clock_add 30"})
+
+        assert keymap.lookup(pygame.K_a, pygame.KMOD_SHIFT) is None
+        assert keymap.lookup(pygame.K_F5).action == "start_stop"
+        assert keymap.lookup(pygame.K_p).arg == "30"
+        # replaced in place, so the help screen keeps its order
+        assert [b.spec for b in keymap].index("P") == list(DEFAULT_KEYMAP).index("P")
+
+    def test_settings_bad_key_skipped(self, capsys):
+        """Test a key in settings that cannot be parsed is warned about and the rest still bound."""
+        keymap = KeyMap.from_settings({"HYPER+A": "start_stop", "F5": "start_stop"})
+
+        assert keymap.lookup(pygame.K_F5).action == "start_stop"
+        assert "HYPER+A" not in [b.spec for b in keymap]
+        assert "unknown modifier 'HYPER'" in capsys.readouterr().out
+
+    def test_unknown_actions(self):
+        """Test bindings to actions the game does not have are reported."""
+        keymap = KeyMap({"F1": "start_stop", "F2": "self_destruct"})
+
+        assert keymap.unknown_actions({"start_stop"}) == ["F2"]
+
+
+class TestHelp:
+    """Test the help screen built from the bindings."""
+
+    def test_same_action_shares_line(self):
+        """Test keys with the same action are listed together."""
+        lines = build_help(KeyMap(DEFAULT_KEYMAP), 4)
+
+        assert {"key": "H or SHIFT-/", "text": "HELP"} in lines
+        assert {"key": "SHIFT-1 or Q", "text": "-1 point Player 1"} in lines
+        assert {"key": "L", "text": "Clock: -5 seconds"} in lines
+
+    def test_only_players_in_game(self):
+        """Test scoring keys for players not in the game are left out."""
+        lines = build_help(KeyMap(DEFAULT_KEYMAP), 2)
+
+        assert not any("Player 3" in line["text"] for line in lines)
+
+    def test_ranges_past_four_players(self):
+        """Test scoring keys collapse into ranges for bigger shows."""
+        lines = build_help(KeyMap(DEFAULT_KEYMAP), 12)
+
+        assert {"key": "1 to =", "text": "+1 point Player 1-12"} in lines
+        assert {"key": "Q to R", "text": "-1 point Player 1-4"} in lines
+
+    def test_rebound_key_shown(self):
+        """Test the help screen follows the settings."""
+        lines = build_help(KeyMap.from_settings({"SPACE": "none", "F5": "start_stop"}), 4)
+
+        assert {"key": "F5", "text": "Stop/Start clock"} in lines
+        assert not any(line["key"] == "SPACE" for line in lines)
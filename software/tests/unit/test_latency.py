@@ -0,0 +1,91 @@
+"""
+Unit tests for Latency.py module.
+"""
+
+from Latency import ALL_PLAYERS, Histogram, LatencyTracker
+
+
+class TestHistogram:
+    """Test percentiles and buckets."""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles."""
+        hist = Histogram()
+        for value in range(1, 101):
+            hist.add(value)
+
+        assert hist.percentile(50) == 50
+        assert hist.percentile(90) == 90
+        assert hist.percentile(99) == 99
+        assert hist.percentile(100) == 100
+        assert hist.percentile(0) == 1
+
+    def test_empty(self):
+        """Test an empty histogram has no percentiles."""
+        assert Histogram().percentile(50) is None
+
+    def test_buckets(self):
+        """Test samples are counted per power-of-two microseconds."""
+        hist = Histogram()
+        for value_ns in (500, 1_000, 1_500, 3_000_000):
+            hist.add(value_ns)
+
+        assert hist.buckets() == {1: 2, 2: 1, 4096: 1}
+
+
+class TestLatencyTracker:
+    """Test following buzzes through the stages."""
+
+    def test_complete_trace(self):
+        """Test each stage is recorded relative to the raw input."""
+        tracker = LatencyTracker()
+
+        tracker.begin(1, 1_000_000, parse_ns=1_200_000)
+        tracker.mark(1, "state", 5_000_000)
+        tracker.mark(1, "sound", 5_100_000)
+        tracker.screen_shown(1, 21_000_000)
+
+        assert tracker.completed == 1
+        assert tracker.histogram("parse").samples == [200_000]
+        assert tracker.histogram("state", 1).samples == [4_000_000]
+        assert tracker.histogram("sound", ALL_PLAYERS).samples == [4_100_000]
+        assert tracker.histogram("screen", 1).samples == [20_000_000]
+        assert tracker.pending == {}
+
+    def test_screen_without_buzz_ignored(self):
+        """Test frames before the state change do not complete a trace."""
+        tracker = LatencyTracker()
+        tracker.begin(0, 0)
+
+        tracker.screen_shown(0, 1_000)
+        tracker.screen_shown(2, 1_000)
+
+        assert tracker.completed == 0
+
+    def test_first_mark_wins(self):
+        """Test only the first frame showing the banner is counted."""
+        tracker = LatencyTracker()
+        tracker.begin(0, 0, 0)
+        tracker.mark(0, "state", 10)
+        tracker.mark(0, "state", 20)
+        tracker.screen_shown(0, 30)
+        tracker.screen_shown(0, 40)
+
+        assert tracker.histogram("state").samples == [10]
+        assert tracker.histogram("screen").samples == [30]
+
+    def test_summary_and_report(self):
+        """Test summaries are in milliseconds, per player and overall."""
+        tracker = LatencyTracker()
+        for player, screen_ms in ((0, 10), (1, 20), (0, 30)):
+            tracker.begin(player, 0, 0)
+            tracker.mark(player, "state", 1_000_000)
+            tracker.mark(player, "sound", 2_000_000)
+            tracker.screen_shown(player, screen_ms * 1_000_000)
+
+        summary = tracker.summary((50, 100))
+
+        assert summary["screen"] == {"n": 3, "p50": 20.0, "p100": 30.0}
+        assert summary["screen/p1"]["n"] == 2
+        assert list(summary)[:2] == ["parse", "parse/p1"]
+        assert "input->screen/p2" in tracker.report()
@@ -0,0 +1,82 @@
+"""
+Unit tests for LedEffects module.
+"""
+
+from LedEffects import Effect, EffectEngine
+
+
+class TestEffectEngine:
+    """Test cases for EffectEngine."""
+
+    def test_idle_engine_is_dark(self):
+        """Test no LEDs are lit without an effect."""
+        engine = EffectEngine(4)
+
+        assert not engine.active
+        assert engine.mask(1000) == 0
+
+    def test_chase_walks_and_wraps(self):
+        """Test CHASE lights one LED per period and wraps around."""
+        engine = EffectEngine(4)
+        engine.start(Effect.CHASE, period_ms=100, started_ms=0)
+
+        assert [engine.mask(t) for t in (0, 99, 100, 250, 399, 400)] == [
+            0b0001, 0b0001, 0b0010, 0b0100, 0b1000, 0b0001
+        ]
+
+    def test_chase_without_leds(self):
+        """Test CHASE with no LEDs lights nothing instead of failing."""
+        engine = EffectEngine(0)
+        engine.start(Effect.CHASE, period_ms=100, started_ms=0)
+
+        assert engine.mask(250) == 0
+
+    def test_blink_one_player(self):
+        """Test BLINK toggles only the chosen LED every half period."""
+        engine = EffectEngine(4)
+        engine.start(Effect.BLINK, player=1, period_ms=200, started_ms=1000)
+
+        assert engine.leds(1000) == [False, True, False, False]
+        assert engine.mask(1100) == 0
+        assert engine.mask(1200) == 0b0010
+
+    def test_blink_all(self):
+        """Test BLINK with no player blinks every LED."""
+        engine = EffectEngine(4)
+        engine.start(Effect.BLINK, period_ms=200, started_ms=0)
+
+        assert engine.mask(50) == 0b1111
+        assert engine.mask(150) == 0
+
+    def test_solo_and_all(self):
+        """Test SOLO and ALL are steady."""
+        engine = EffectEngine(4)
+
+        engine.start(Effect.SOLO, player=3, started_ms=0)
+        assert engine.mask(12345) == 0b1000
+
+        engine.start(Effect.ALL, started_ms=0)
+        assert engine.mask(12345) == 0b1111
+
+    def test_fade_level(self):
+        """Test FADE ramps up and back down once per period."""
+        engine = EffectEngine(4)
+        engine.start(Effect.FADE, period_ms=1000, started_ms=0)
+
+        assert engine.level(0) == 0
+        assert engine.level(250) == 127
+        assert engine.level(500) == 255
+        assert engine.level(750) == 127
+        assert engine.mask(500) == 0b1111
+        assert engine.mask(100) == 0
+
+    def test_stop_and_minimum_period(self):
+        """Test stopping clears the effect and tiny periods are clamped."""
+        engine = EffectEngine(4)
+        engine.start(Effect.BLINK, period_ms=1, started_ms=0)
+
+        assert engine.period_ms == EffectEngine.MIN_PERIOD_MS
+
+        engine.stop()
+        assert not engine.active
+        assert engine.level(0) == 255
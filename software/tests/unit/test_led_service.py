@@ -0,0 +1,168 @@
+"""
+Unit tests for LedService module.
+"""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+import serial
+
+import protocol
+from BoardEmulator import BoardEmulator
+from LedService import LedService
+
+
+def wait_for(predicate, timeout=2.0):
+    """Poll until predicate() is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.001)
+    return False
+
+
+class TestLedService:
+    """Test cases for LedService."""
+
+    @pytest.fixture
+    def board(self):
+        """A text mode board emulator with the reset banner consumed."""
+        board = BoardEmulator()
+        board.reset_input_buffer()
+        return board
+
+    @pytest.fixture
+    def context(self, board):
+        """A context wired to the board emulator."""
+        context = Mock()
+        context.serial_port = board
+        context.serial_binary = False
+        context.led_state = [False, False, False, False]
+        return context
+
+    def test_text_commands_minimal(self, context):
+        """Test text updates only touch LEDs that changed."""
+        service = LedService(context)
+
+        assert service.commands(0b0101, 0b0001) == [b"LED 3 1\n"]
+        assert service.commands(0b1111, 0b0001) == [b"LED A 1\n"]
+        assert service.commands(0, None) == [b"LED A 0\n"]
+        assert service.commands(0b0010, None) == [b"LED A 0\n", b"LED 2 1\n"]
+
+    def test_binary_single_frame(self, context):
+        """Test binary mode always sends one frame."""
+        context.serial_binary = True
+        service = LedService(context)
+
+        assert service.commands(0b0110, 0) == [protocol.encode_leds(0b0110)]
+
+    def test_flush_sends_in_background(self, context, board):
+        """Test a flush reaches the board without blocking on the ack."""
+        service = LedService(context)
+        service.start()
+        try:
+            context.led_state[1] = True
+            service.flush()
+
+            assert wait_for(lambda: service.last_sent == 0b0010)
+            assert board.led_state(2)
+            assert service.stats["sent"] == 2
+            assert len(service.in_flight) == 2
+
+            service.acked(True)
+            service.acked(True)
+            assert service.stats["acked"] == 2
+            assert not service.in_flight
+        finally:
+            service.stop()
+
+    def test_in_flight_limit_per_command(self, context):
+        """Test a text update of several commands sends no more than max_in_flight unacked."""
+        service = LedService(context, ack_timeout_ms=5000, max_in_flight=1)
+        service.start()
+        try:
+            # unknown start: "LED A 0", then LEDs 1 and 3 on
+            context.led_state[0] = context.led_state[2] = True
+            service.flush()
+
+            assert wait_for(lambda: service.stats["sent"] == 1)
+            time.sleep(0.05)
+            assert service.stats["sent"] == 1
+
+            service.acked(True)
+            assert wait_for(lambda: service.stats["sent"] == 2)
+            service.acked(True)
+            assert wait_for(lambda: service.last_sent == 0b0101)
+            assert service.stats["sent"] == 3
+        finally:
+            service.stop()
+
+    def test_unchanged_state_not_resent(self, context):
+        """Test flushing the same state twice queues one update."""
+        service = LedService(context)
+
+        service.flush()
+        service.flush()
+
+        assert service.stats["requested"] == 1
+
+    def test_coalesce_pending(self, context):
+        """Test a newer state replaces one the writer has not sent yet."""
+        service = LedService(context)
+
+        context.led_state[0] = True
+        service.flush()
+        context.led_state[0] = False
+        context.led_state[3] = True
+        service.flush()
+
+        assert service.stats["coalesced"] == 1
+        assert service.pending == 0b1000
+
+    def test_ack_timeout_counts_failure(self, context):
+        """Test commands without an ack are counted as failed."""
+        service = LedService(context, ack_timeout_ms=0)
+        service.in_flight.append(time.monotonic_ns() - 1)
+
+        service.flush()
+
+        assert service.stats["failed"] == 1
+        assert not service.in_flight
+
+    def test_write_error_counts_failure(self, context):
+        """Test a failed write is counted and the state resent later."""
+        context.serial_port = Mock()
+        context.serial_port.write.side_effect = serial.SerialTimeoutException()
+        service = LedService(context)
+        service.start()
+        try:
+            context.led_state[0] = True
+            service.flush()
+
+            assert wait_for(lambda: service.stats["failed"] == 1)
+            assert wait_for(lambda: service.requested is None)
+        finally:
+            service.stop()
+
+    def test_effect_suspends_flush(self, context, board):
+        """Test the writer sends an effect and flush stays quiet until it stops."""
+        context.serial_binary = True
+        board.write(b"PROTO 1\n")
+        board.reset_input_buffer()
+        service = LedService(context)
+        service.start()
+        try:
+            service.start_effect(protocol.encode_effect(4, 0, 1000))
+            assert wait_for(lambda: board.effects.active)
+
+            context.led_state[0] = True
+            service.flush()
+            assert service.pending is None
+
+            service.stop_effect()
+            service.flush()
+            assert wait_for(lambda: board.led_mask == 0b0001)
+        finally:
+            service.stop()
@@ -0,0 +1,30 @@
+"""
+Unit tests for Modal.py module.
+"""
+
+from unittest.mock import Mock
+
+import pygame
+
+from GameState import GameState
+from Modal import AnyKeyModal
+
+
+class TestAnyKeyModal:
+    """Test the help and splash screens."""
+
+    def test_stays_open_without_a_key(self):
+        """Test other events leave the screen up."""
+        context = Mock()
+        context.state = GameState.HELP
+
+        assert AnyKeyModal().handle(context, [pygame.event.Event(pygame.MOUSEMOTION)])
+        assert context.state == GameState.HELP
+
+    def test_any_key_closes(self):
+        """Test a key press closes the screen and returns to idle."""
+        context = Mock()
+        context.state = GameState.HELP
+
+        assert not AnyKeyModal().handle(context, [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a)])
+        assert context.state == GameState.IDLE
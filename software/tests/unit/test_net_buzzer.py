@@ -0,0 +1,187 @@
+"""
+Unit tests for NetBuzzer.py module.
+"""
+
+import socket
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from NetBuzzer import (
+    PACKET_HELLO,
+    PACKET_PRESS,
+    PACKET_RELEASE,
+    BuzzerServer,
+    DeviceClock,
+    NetworkInput,
+    decode_ack,
+    decode_packet,
+    encode_ack,
+    encode_packet,
+)
+
+ADDR = ("192.168.1.50", 4210)
+
+
+def make_server(players=4, player_map=None):
+    """A server with a mock transport."""
+    server = BuzzerServer(players, player_map)
+    server.connection_made(Mock())
+    return server
+
+
+class TestPackets:
+    """Test datagram encoding."""
+
+    def test_round_trip(self):
+        """Test a packet decodes to what was encoded."""
+        data = encode_packet(PACKET_PRESS, 301, 70000, 2**40, 2**40 + 5)
+        packet = decode_packet(data)
+
+        assert packet.type == PACKET_PRESS
+        assert (packet.device, packet.sequence) == (301, 70000 & 0xFFFF)
+        assert (packet.edge_us, packet.sent_us) == (2**40, 2**40 + 5)
+
+    def test_rejects_garbage(self):
+        """Test wrong sizes, magic and types are not packets."""
+        data = encode_packet(PACKET_PRESS, 1, 1, 0, 0)
+        assert decode_packet(data[:-1]) is None
+        assert decode_packet(b"XX" + data[2:]) is None
+        assert decode_packet(data[:3] + b"\x7f" + data[4:]) is None
+
+    def test_ack(self):
+        """Test acks decode and are not mistaken for packets."""
+        data = encode_ack(7, 9, 123456)
+        assert decode_ack(data) == (7, 9, 123456)
+        assert decode_packet(data) is None
+
+
+class TestDeviceClock:
+    """Test one-way clock estimation."""
+
+    def test_quickest_datagram_sets_offset(self):
+        """Test the smallest delay is taken as the offset and the rest as jitter."""
+        clock = DeviceClock()
+        clock.add(1_000, 501_200)
+        clock.add(2_000, 502_500)
+        clock.add(3_000, 504_000)
+
+        assert clock.offset_us == 500_200
+        assert clock.to_host_us(10_000) == 510_200
+        assert clock.jitter_us == (0 + 300 + 800) // 3
+
+
+class TestBuzzerServer:
+    """Test datagram handling."""
+
+    def test_press_acked_and_queued(self):
+        """Test a press is acked and queued on the host clock."""
+        server = make_server()
+        server.datagram_received(encode_packet(PACKET_PRESS, 2, 1, 9_000_000, 9_000_100), ADDR)
+
+        data, addr = server.transport.sendto.call_args.args
+        assert addr == ADDR
+        assert decode_ack(data)[:2] == (2, 1)
+        edge = server.drain()[0]
+        assert (edge.player, edge.pressed, edge.sequence) == (1, True, 1)
+        # sent 100 us after the edge
+        assert edge.timestamp_us == edge.arrival_ns // 1000 - 100
+
+    def test_repeat_acked_but_dropped(self):
+        """Test a resend whose ack was lost is acked again but not passed on."""
+        server = make_server()
+        now_us = time.monotonic_ns() // 1000
+        server.datagram_received(encode_packet(PACKET_PRESS, 1, 5, now_us, now_us + 10), ADDR)
+        server.datagram_received(encode_packet(PACKET_PRESS, 1, 5, now_us, now_us + 40), ADDR)
+
+        assert server.transport.sendto.call_count == 2
+        assert len(server.drain()) == 1
+        assert server.devices[1].stats["duplicates"] == 1
+
+    def test_lost_sequence_numbers(self):
+        """Test gaps count as lost until the missing packet turns up."""
+        server = make_server()
+        for sequence in (1, 4, 3):
+            server.handle(decode_packet(encode_packet(PACKET_RELEASE, 1, sequence, 0, 0)), ADDR, 5_000_000)
+
+        assert server.devices[1].stats["lost"] == 1
+
+    def test_heartbeat_syncs_without_edge(self):
+        """Test a HELLO updates the clock and sequence but queues nothing."""
+        server = make_server()
+        server.handle(decode_packet(encode_packet(PACKET_HELLO, 3, 1, 0, 100)), ADDR, 5_000_000)
+        server.handle(decode_packet(encode_packet(PACKET_PRESS, 3, 2, 150, 160)), ADDR, 5_000_100)
+
+        # arrivals 4900 and 4840 us after sending: the quicker one counts
+        assert server.devices[3].clock.offset_us == 4_840
+        assert server.devices[3].stats["lost"] == 0
+        assert [edge.sequence for edge in server.drain()] == [2]
+
+    def test_reboot_starts_over(self):
+        """Test a buzzer whose clock went back is resynced and its sequence reset."""
+        server = make_server()
+        server.handle(decode_packet(encode_packet(PACKET_PRESS, 1, 1, 50_000_000, 50_000_000)),
+                      ADDR, 1_000_000_000)
+        # rebooted: clock and sequence numbers start again
+        edge = server.handle(decode_packet(encode_packet(PACKET_PRESS, 1, 1, 1_000, 1_000)),
+                             ADDR, 1_010_000_000)
+
+        assert edge is not None
+        assert server.devices[1].stats["restarts"] == 1
+        assert edge.timestamp_us == 1_010_000
+
+    def test_player_map(self):
+        """Test mapped devices play as their player and others are ignored."""
+        server = make_server(player_map={101: 2})
+        server.handle(decode_packet(encode_packet(PACKET_PRESS, 101, 1, 0, 0)), ADDR, 1_000)
+        server.handle(decode_packet(encode_packet(PACKET_PRESS, 102, 1, 0, 0)), ADDR, 1_000)
+
+        assert [edge.player for edge in server.drain()] == [2]
+        assert server.stats["unmapped"] == 1
+
+    def test_default_players_wrap(self):
+        """Test without a map device n is player n, wrapping past the last one."""
+        server = make_server(players=4)
+        assert [server.player_for(device) for device in (1, 4, 5)] == [0, 3, 0]
+
+    def test_malformed_ignored(self):
+        """Test datagrams that are not buzzer packets get no ack."""
+        server = make_server()
+        server.datagram_received(b"hello", ADDR)
+
+        server.transport.sendto.assert_not_called()
+        assert server.stats["malformed"] == 1
+
+
+class TestNetworkInput:
+    """Test the server on its own event loop."""
+
+    def test_press_over_loopback(self):
+        """Test a datagram sent over loopback is acked and drained."""
+        net = NetworkInput("127.0.0.1", 0, 4)
+        net.start()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.settimeout(2)
+            sock.sendto(encode_packet(PACKET_PRESS, 2, 1, 1_000, 1_000), net.address)
+            assert decode_ack(sock.recv(64))[:2] == (2, 1)
+
+            deadline = time.monotonic() + 2
+            edges = []
+            while not edges and time.monotonic() < deadline:
+                edges = net.drain()
+            assert edges[0].player == 1
+        finally:
+            sock.close()
+            net.stop()
+
+    def test_port_in_use(self):
+        """Test a port that cannot be bound raises from start()."""
+        first = NetworkInput("127.0.0.1", 0, 4)
+        first.start()
+        try:
+            with pytest.raises(OSError):
+                NetworkInput("127.0.0.1", first.address[1], 4).start()
+        finally:
+            first.stop()
@@ -0,0 +1,192 @@
+"""
+Unit tests for the binary serial protocol and the board emulator.
+"""
+
+import protocol
+from protocol import FrameDecoder
+from BoardEmulator import BoardEmulator
+from LedEffects import Effect
+
+
+class TestProtocol:
+    """Test cases for frame encoding and decoding."""
+
+    def test_frame_size(self):
+        """Test every frame is the fixed size."""
+        assert len(protocol.encode_leds(0x05)) == protocol.FRAME_SIZE
+        assert len(protocol.encode_press(3, 123456)) == protocol.FRAME_SIZE
+
+    def test_crc_known_value(self):
+        """Test CRC-8 matches the standard check value."""
+        assert protocol.crc8(b"123456789") == 0xF4
+
+    def test_round_trip_press(self):
+        """Test a press frame decodes to the same channel and time."""
+        frames = FrameDecoder().feed(protocol.encode_press(3, 0xDEADBEEF))
+
+        assert len(frames) == 1
+        assert frames[0].type == protocol.FRAME_PRESS
+        assert frames[0].channel == 3
+        assert frames[0].timestamp_us == 0xDEADBEEF
+
+    def test_split_feed(self):
+        """Test frames split across reads are reassembled."""
+        data = protocol.encode_leds(0x0A) + protocol.encode_ack(protocol.FRAME_LEDS, 0x0A)
+        decoder = FrameDecoder()
+
+        frames = []
+        for i in range(len(data)):
+            frames.extend(decoder.feed(data[i:i + 1]))
+
+        assert [f.type for f in frames] == [protocol.FRAME_LEDS, protocol.FRAME_ACK]
+        assert frames[0].led_mask == 0x0A
+        assert frames[1].led_mask == 0x0A
+
+    def test_sixteen_bit_led_mask(self):
+        """Test LED masks past eight players survive a LEDS and ACK round trip."""
+        data = protocol.encode_leds(0x0A05) + protocol.encode_ack(protocol.FRAME_LEDS, 0x0800)
+        frames = FrameDecoder().feed(data)
+
+        assert frames[0].led_mask == 0x0A05
+        assert frames[1].led_mask == 0x0800
+
+    def test_resync_after_garbage_and_corruption(self):
+        """Test the decoder skips noise and corrupt frames."""
+        bad = bytearray(protocol.encode_press(1, 100))
+        bad[4] ^= 0xFF
+        data = b"\x00junk" + bytes(bad) + protocol.encode_press(2, 200)
+        decoder = FrameDecoder()
+
+        frames = decoder.feed(data)
+
+        assert len(frames) == 1
+        assert frames[0].channel == 2
+        assert decoder.bad_frames >= 1
+
+    def test_round_trip_effect(self):
+        """Test an effect frame decodes to the same effect, channel and period."""
+        frames = FrameDecoder().feed(protocol.encode_effect(2, 3, 750))
+
+        assert frames[0].type == protocol.FRAME_EFFECT
+        assert frames[0].effect == (2, 3, 750)
+
+    def test_mask_conversion(self):
+        """Test LED list and bitmask conversions."""
+        assert protocol.leds_to_mask([True, False, True, False]) == 0b0101
+        assert protocol.mask_to_leds(0b0101, 4) == [True, False, True, False]
+
+
+class TestBoardEmulator:
+    """Test cases for the firmware emulator."""
+
+    def test_reset_banner(self):
+        """Test the emulator announces a reset like the firmware."""
+        board = BoardEmulator()
+        lines = [board.readline(), board.readline()]
+        assert lines == [b"\r\n", b"RESET OK\r\n"]
+
+    def test_text_led_command(self):
+        """Test text LED commands reply with the port dump."""
+        board = BoardEmulator()
+        board.reset_input_buffer()
+
+        board.write(b"LED 2 1\n")
+
+        assert board.readline() == b"LED 0010000 OK\r\n"
+        assert board.led_state(2)
+
+    def test_text_switch_lines(self):
+        """Test presses and releases in text mode."""
+        board = BoardEmulator()
+        board.reset_input_buffer()
+
+        board.press(1, 1000)
+        board.release(1, 413000)
+
+        assert board.readline() == b"SWITCH 1 PRESSED 1000\r\n"
+        assert board.readline() == b"SWITCH 1 RELEASED (down 412 mS)\r\n"
+
+    def test_negotiation_and_binary_leds(self):
+        """Test switching to binary and setting LEDs with one frame."""
+        board = BoardEmulator()
+        board.reset_input_buffer()
+
+        board.write(b"PROTO 1\n")
+        assert board.readline() == b"PROTO 1 OK\r\n"
+
+        board.write(protocol.encode_leds(0b1001))
+        frames = FrameDecoder().feed(board.read(64))
+
+        assert frames[0].type == protocol.FRAME_ACK
+        assert frames[0].led_mask == 0b1001
+        assert board.led_state(1) and board.led_state(4)
+
+    def test_old_firmware_rejects_proto(self):
+        """Test firmware without binary support answers ERROR."""
+        board = BoardEmulator(binary_capable=False)
+        board.reset_input_buffer()
+
+        board.write(b"PROTO 1\n")
+
+        assert board.readline() == b"ERROR\r\n"
+        assert not board.binary
+
+    def test_binary_effect_runs_on_board(self):
+        """Test an effect frame is acked and animated by the board clock."""
+        now = [0]
+        board = BoardEmulator(clock=lambda: now[0])
+        board.write(b"PROTO 1\n")
+        board.reset_input_buffer()
+
+        board.write(protocol.encode_effect(Effect.CHASE.value, 0, 100))
+        frames = FrameDecoder().feed(board.read(64))
+
+        assert frames[0].type == protocol.FRAME_ACK
+        assert frames[0].led_mask == 0b0001
+        now[0] = 250_000
+        assert board.led_state(3)
+
+        board.write(protocol.encode_effect(9, 0, 100))
+        assert FrameDecoder().feed(board.read(64))[0].type == protocol.FRAME_NAK
+
+    def test_text_effect_commands(self):
+        """Test text effect commands and that LED commands stop them."""
+        board = BoardEmulator()
+        board.reset_input_buffer()
+
+        board.write(b"SOLO 2\n")
+        assert board.readline() == b"SOLO OK\r\n"
+        assert board.led_mask == 0b0010
+
+        board.write(b"BLINK 7 500\n")
+        assert board.readline() == b"INVALID PIN\r\n"
+
+        board.write(b"LED 4 1\n")
+        board.readline()
+        assert not board.effects.active
+        assert board.led_mask == 0b1010
+
+    def test_ping_answered_with_board_time(self):
+        """Test a PING comes back as a PONG with its sequence and micros()."""
+        board = BoardEmulator(clock=lambda: 4_000_000_123)
+        board.write(b"PROTO 1\n")
+        board.reset_input_buffer()
+
+        board.write(protocol.encode_ping(0x1FE))
+        frames = FrameDecoder().feed(board.read(64))
+
+        assert frames[0].type == protocol.FRAME_PONG
+        assert frames[0].channel == 0xFE
+        assert frames[0].timestamp_us == 4_000_000_123 & 0xFFFFFFFF
+
+    def test_old_firmware_rejects_ping(self):
+        """Test binary firmware from before PING answers with a NAK naming it."""
+        board = BoardEmulator(pings=False)
+        board.write(b"PROTO 1\n")
+        board.reset_input_buffer()
+
+        board.write(protocol.encode_ping(1))
+        frame = FrameDecoder().feed(board.read(64))[0]
+
+        assert frame.type == protocol.FRAME_NAK
+        assert frame.channel == protocol.FRAME_PING
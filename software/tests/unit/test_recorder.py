@@ -0,0 +1,154 @@
+"""
+Unit tests for Recorder.py module.
+"""
+
+import json
+import random
+from unittest.mock import Mock, patch
+
+import pygame
+import pytest
+
+from GameState import GameState
+from Recorder import Recorder, load_recording, start_recording
+from backends import InputEvent, KeyboardBackend
+
+
+def make_context(now):
+    """A context on a clock read from now[0]."""
+    context = Mock()
+    context.now_ns = lambda: now[0]
+    context.backend = KeyboardBackend()
+    context.snapshot.return_value = {"player_names": ["A", "B"], "scores": [3, 1], "invert_display": True}
+    context.clock = 45000
+    context.state = GameState.IDLE
+    return context
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+class TestRecorder:
+    """Test what is written to the log."""
+
+    def test_header(self, tmp_path):
+        """Test the header has the seed, the backend's keys and the starting state."""
+        path = tmp_path / "show.jsonl"
+        recorder = Recorder(str(path), make_context([5_000_000]), seed=1234)
+        recorder.close()
+
+        header = read_lines(path)[0]
+        assert header["seed"] == 1234
+        assert header["platform"] == "keyboard"
+        assert header["emulated_keys"][1][0] == pygame.K_z
+        assert header["settings"]["PLAYERS"] >= 1
+        assert header["state"] == {
+            "player_names": ["A", "B"], "scores": [3, 1], "invert_display": True,
+            "clock_ms": 45000, "state": "IDLE",
+        }
+
+    def test_seeds_random(self, tmp_path):
+        """Test the random module is seeded, so particles can be drawn again."""
+        recorder = Recorder(str(tmp_path / "show.jsonl"), make_context([0]), seed=99)
+        drawn = random.random()
+        recorder.close()
+
+        random.seed(99)
+        assert random.random() == drawn
+
+    def test_entries_timed_from_start(self, tmp_path):
+        """Test inputs, keys and the close are stamped in microseconds since the start."""
+        now = [1_000_000_000]
+        path = tmp_path / "show.jsonl"
+        recorder = Recorder(str(path), make_context(now))
+
+        now[0] += 2_500_000
+        recorder.inputs([InputEvent(1, True, 777, arrival_ns=now[0] - 1_000_000)])
+        recorder.inputs([])
+        now[0] += 1_000_000
+        recorder.pygame_events([
+            pygame.event.Event(pygame.KEYDOWN, key=pygame.K_1, mod=pygame.KMOD_LSHIFT, unicode="!"),
+            pygame.event.Event(pygame.USEREVENT),
+            pygame.event.Event(pygame.QUIT),
+        ])
+        now[0] += 1_000
+        recorder.close()
+
+        assert read_lines(path)[1:] == [
+            ["i", 2500, 1, 1, 777, 1500],
+            ["k", 3500, pygame.K_1, pygame.KMOD_LSHIFT, "!"],
+            ["q", 3500],
+            ["x", 3501],
+        ]
+        assert recorder.entries == 3
+
+    def test_close_twice(self, tmp_path):
+        """Test closing again, as the exit handler does, writes nothing more."""
+        path = tmp_path / "show.jsonl"
+        recorder = Recorder(str(path), make_context([0]))
+        recorder.close()
+        recorder.close()
+        recorder.inputs([InputEvent(0)])
+
+        assert len(read_lines(path)) == 2
+
+
+class TestStartRecording:
+    """Test RECORD_FILE."""
+
+    def test_off_by_default(self):
+        """Test nothing is recorded without RECORD_FILE."""
+        context = make_context([0])
+        context.recorder = None
+        with patch('game_config.RECORD_FILE', ''):
+            assert start_recording(context) is None
+        assert context.recorder is None
+
+    def test_file_name_from_strftime(self, tmp_path):
+        """Test strftime() codes in RECORD_FILE are filled in."""
+        context = make_context([0])
+        with patch('game_config.RECORD_FILE', str(tmp_path / "show-%Y.jsonl")), \
+             patch('builtins.print'):
+            recorder = start_recording(context)
+        recorder.close()
+
+        assert context.recorder is recorder
+        assert len(list(tmp_path.glob("show-2*.jsonl"))) == 1
+
+
+class TestLoadRecording:
+    """Test reading a log back."""
+
+    def test_round_trip(self, tmp_path):
+        """Test the header and entries come back as written."""
+        path = tmp_path / "show.jsonl"
+        recorder = Recorder(str(path), make_context([0]), seed=5)
+        recorder.inputs([InputEvent(0, arrival_ns=0)])
+        recorder.close()
+
+        header, entries = load_recording(str(path))
+
+        assert header["seed"] == 5
+        assert entries == [["i", 0, 0, 1, None, 0], ["x", 0]]
+
+    def test_cut_off_last_line_dropped(self, tmp_path):
+        """Test a recording the game stopped writing partway through still loads."""
+        path = tmp_path / "show.jsonl"
+        path.write_text('{"format":1,"seed":1}\n["k",5,32,0," "]\n["i",9,0,', encoding="utf-8")
+
+        _, entries = load_recording(str(path))
+
+        assert entries == [["k", 5, 32, 0, " "]]
+
+    def test_not_a_recording(self, tmp_path):
+        """Test other files and damaged recordings are refused."""
+        path = tmp_path / "show.jsonl"
+        path.write_text('["k",5,32,0," "]\n', encoding="utf-8")
+        with pytest.raises(ValueError, match="not a format 1 recording"):
+            load_recording(str(path))
+
+        path.write_text('{"format":1,"seed":1}\n["k",5,\n["x",9]\n', encoding="utf-8")
+        with pytest.raises(ValueError, match="line 2"):
+            load_recording(str(path))
@@ -0,0 +1,162 @@
+"""
+Unit tests for Scheduler.py module.
+"""
+
+import pytest
+
+from Scheduler import Scheduler
+
+
+class FakeTime:
+    """A monotonic clock moved on by hand, or by sleeping."""
+
+    def __init__(self):
+        self.ns = 1_000_000_000
+        self.sleeps = []
+
+    def __call__(self):
+        return self.ns
+
+    def advance(self, ms):
+        self.ns += int(ms * 1_000_000)
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds * 1000, 3))
+        self.ns += int(seconds * 1e9)
+
+
+@pytest.fixture
+def now():
+    return FakeTime()
+
+
+@pytest.fixture
+def scheduler(now):
+    return Scheduler(now_ns=now)
+
+
+class TestScheduler:
+    """Test one-shot and repeating timers."""
+
+    def test_one_shot_runs_once_when_due(self, now, scheduler):
+        """Test a one-shot timer runs once, only after its delay."""
+        fired = []
+        scheduler.call_later(50, fired.append, "a")
+
+        now.advance(49)
+        assert scheduler.run_due() == 0
+        now.advance(1)
+        assert scheduler.run_due() == 1
+        now.advance(100)
+        assert scheduler.run_due() == 0
+        assert fired == ["a"]
+        assert len(scheduler) == 0
+
+    def test_due_in_order(self, now, scheduler):
+        """Test timers due together run earliest first."""
+        fired = []
+        scheduler.call_later(30, fired.append, 3)
+        scheduler.call_later(10, fired.append, 1)
+        scheduler.call_later(20, fired.append, 2)
+
+        now.advance(30)
+        scheduler.run_due()
+        assert fired == [1, 2, 3]
+
+    def test_repeating_does_not_drift(self, now, scheduler):
+        """Test a late run does not push the following ones back."""
+        fired = []
+        scheduler.call_every(100, lambda: fired.append(now.ns))
+
+        now.advance(130)
+        scheduler.run_due()
+        assert scheduler.next_due_ms() == 70
+
+    def test_missed_periods_run_once(self, now, scheduler):
+        """Test a loop that was busy for several periods runs the timer once."""
+        fired = []
+        scheduler.call_every(10, fired.append, 1)
+
+        now.advance(55)
+        assert scheduler.run_due() == 1
+        assert scheduler.next_due_ms() == 5
+
+    def test_cancel_and_reschedule(self, now, scheduler):
+        """Test a cancelled timer does not run and a rescheduled one runs at its new time."""
+        fired = []
+        cancelled = scheduler.call_later(10, fired.append, "cancelled")
+        moved = scheduler.call_later(10, fired.append, "moved")
+        scheduler.cancel(cancelled)
+        scheduler.reschedule(moved, 40)
+
+        now.advance(10)
+        assert scheduler.run_due() == 0
+        assert scheduler.next_due_ms() == 30
+        now.advance(30)
+        scheduler.run_due()
+        assert fired == ["moved"]
+
+    def test_callback_cancels_later_timer(self, now, scheduler):
+        """Test a timer cancelled by one that ran just before it in the same batch is skipped."""
+        fired = []
+        second = scheduler.call_later(2, fired.append, "second")
+        scheduler.call_later(1, lambda: scheduler.cancel(second))
+
+        now.advance(5)
+        assert scheduler.run_due() == 1
+        assert fired == []
+
+    def test_rearming_does_not_loop(self, now, scheduler):
+        """Test a timer that re-arms itself at once runs on the next call, not forever."""
+        fired = []
+
+        def again():
+            fired.append(1)
+            scheduler.call_later(0, again)
+        scheduler.call_later(0, again)
+
+        assert scheduler.run_due() == 1
+        assert scheduler.run_due() == 1
+
+    def test_run_until_sleeps_to_each_timer(self, now, scheduler):
+        """Test run_until wakes exactly when each timer is due and returns at the deadline."""
+        fired = []
+        scheduler.call_later(5, fired.append, 1)
+        scheduler.call_every(8, fired.append, 2)
+
+        ran = scheduler.run_until(now.ns + 20_000_000, sleep=now.sleep)
+
+        assert ran == 3
+        assert fired == [1, 2, 2]
+        assert now.sleeps == [5, 3, 8, 4]
+
+    def test_run_until_returns_when_woken(self, now, scheduler):
+        """Test run_until stops sleeping once woken is set, and leaves it set."""
+        fired = []
+        scheduler.call_later(5, fired.append, 1)
+        scheduler.call_later(15, fired.append, 2)
+
+        def sleep(seconds):
+            now.sleep(seconds)
+            scheduler.woken.set()
+
+        scheduler.run_until(now.ns + 20_000_000, sleep=sleep)
+
+        assert fired == [1]
+        assert now.sleeps == [5]
+        assert scheduler.woken.is_set()
+
+    def test_on_change_only_for_sooner_timer(self, scheduler):
+        """Test a sleeper is told only when a timer is due before the current first one."""
+        changes = []
+        scheduler.on_change = lambda: changes.append(1)
+        scheduler.call_later(50, print)
+        scheduler.call_later(80, print)
+        scheduler.call_later(20, print)
+
+        assert len(changes) == 2
+
+    def test_period_must_be_positive(self, scheduler):
+        """Test a zero period is rejected."""
+        with pytest.raises(ValueError):
+            scheduler.call_every(0, print)
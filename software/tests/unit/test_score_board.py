@@ -0,0 +1,83 @@
+"""
+Unit tests for ScoreBoard.py module.
+"""
+
+from unittest.mock import Mock, patch
+
+import pygame
+
+from ScoreBoard import BAND_HEIGHT, ScoreBoard, grid
+
+
+def make_context(players, width=1920, height=1080):
+    context = Mock()
+    context.screen = pygame.Surface((width, height))
+    context.screen_info = Mock(current_w=width, current_h=height)
+    context.player_names = [f"Player {i + 1}" for i in range(players)]
+    context.scores = [0] * players
+    context.player_buzzed_in = -1
+    context.invert_display = True
+    return context
+
+
+class TestGrid:
+    """Test rows and columns for a player count."""
+
+    def test_grid(self):
+        """Test players fill one row up to the limit, then spread evenly."""
+        assert grid(4, 6) == (1, 4)
+        assert grid(6, 6) == (1, 6)
+        assert grid(8, 6) == (2, 4)
+        assert grid(12, 6) == (2, 6)
+
+
+class TestScoreBoard:
+    """Test layout and redrawing."""
+
+    def test_four_player_layout(self):
+        """Test four players keep the full size quarter screen tiles."""
+        board = ScoreBoard()
+        with patch('ScoreBoard.config.SCORE_COLUMNS', 6):
+            board.layout(1920, 4)
+
+        assert [tile.width for tile in board.tiles] == [480] * 4
+        assert all(tile.height == BAND_HEIGHT for tile in board.tiles)
+        assert board.scale == 1.0
+
+    def test_twelve_player_layout(self):
+        """Test twelve players get two rows of smaller tiles."""
+        board = ScoreBoard()
+        with patch('ScoreBoard.config.SCORE_COLUMNS', 6):
+            board.layout(1920, 12)
+
+        assert board.tiles[5].right == 1920
+        assert board.tiles[6].topleft == (0, BAND_HEIGHT // 2)
+        assert board.scale == 0.5
+
+    def test_only_changed_tiles_redraw(self):
+        """Test a frame with one new score redraws one tile."""
+        context = make_context(12)
+        board = ScoreBoard()
+        with patch('ScoreBoard.config.PLAYERS', 12):
+            board.draw(context)
+            assert board.redraws == 12
+
+            board.draw(context)
+            assert board.redraws == 12
+
+            context.scores[7] += 1
+            board.draw(context)
+            assert board.redraws == 13
+
+    def test_band_position(self):
+        """Test the band is drawn at the top, or at the bottom when not inverted."""
+        context = make_context(4)
+        board = ScoreBoard()
+        with patch('ScoreBoard.config.PLAYERS', 4):
+            board.draw(context)
+            context.screen.fill((0, 0, 0))
+            context.invert_display = False
+            board.draw(context)
+
+        assert context.screen.get_at((10, 10)) == (0, 0, 0, 255)
+        assert context.screen.get_at((10, 1070)) != (0, 0, 0, 255)
@@ -0,0 +1,139 @@
+"""
+Unit tests for SerialLink.py module.
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from BoardEmulator import BoardEmulator
+from SerialLink import SerialLink
+
+
+class SilentPort:
+    """A port where nothing ever answers."""
+
+    def __init__(self):
+        self.closed = False
+
+    def readline(self):
+        time.sleep(0.001)
+        return b""
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    with patch('builtins.print'):
+        yield
+
+
+class TestSerialLink:
+    """Test discovery, handshake and reconnection."""
+
+    @patch('hardware.config.SERIAL_PROTOCOL', 'binary')
+    def test_connect_handshakes(self):
+        """Test a board that resets is handed over with its protocol."""
+        board = BoardEmulator()
+        link = SerialLink('/dev/test')
+
+        with patch('SerialLink.open_serial', return_value=board):
+            assert link.connect('/dev/test') is True
+
+        assert link.take() == ('/dev/test', board, True)
+        assert link.take() is None
+        assert link.connected
+        assert link.stats["connects"] == 1
+
+    @patch('hardware.config.SERIAL_PROTOCOL', 'binary')
+    def test_connect_text_firmware(self):
+        """Test firmware without binary support is connected on text."""
+        board = BoardEmulator(binary_capable=False)
+        link = SerialLink('/dev/test')
+
+        with patch('SerialLink.open_serial', return_value=board):
+            link.connect('/dev/test')
+
+        assert link.take()[2] is False
+
+    def test_connect_times_out(self):
+        """Test a silent port is closed after the handshake timeout."""
+        port = SilentPort()
+        link = SerialLink('/dev/test', handshake_timeout_ms=30)
+
+        started = time.monotonic()
+        with patch('SerialLink.open_serial', return_value=port):
+            assert link.connect('/dev/test') is False
+
+        assert time.monotonic() - started < 1
+        assert port.closed
+        assert link.take() is None
+        assert link.stats["failed"] == 1
+
+    def test_connect_open_fails(self):
+        """Test a port that cannot be opened is skipped."""
+        link = SerialLink('/dev/test')
+
+        with patch('SerialLink.open_serial', side_effect=OSError("busy")):
+            assert link.connect('/dev/test') is False
+
+    def test_candidates(self):
+        """Test a configured device is only tried if it exists."""
+        assert SerialLink('/dev/does-not-exist').candidates() == []
+
+        with patch('SerialLink.find_serial_devices', return_value=['/dev/ttyUSB0']) as mock_find:
+            assert SerialLink(None, ['1a86:7523']).candidates() == ['/dev/ttyUSB0']
+            mock_find.assert_called_once_with(['1a86:7523'])
+
+    def test_reconnects_after_loss(self):
+        """Test the board is picked up again once it reappears."""
+        boards = [BoardEmulator(), BoardEmulator()]
+        plugged = [True]
+        link = SerialLink(None, rescan_ms=5)
+
+        with patch.object(link, 'candidates', side_effect=lambda: ['/dev/ttyUSB0'] if plugged[0] else []), \
+             patch('SerialLink.open_serial', side_effect=boards):
+            link.start()
+            try:
+                ready = wait_for(link.take)
+                assert ready[1] is boards[0]
+                assert link.stats["first_connect_ms"] is not None
+
+                # yank the cable, then plug it back in
+                plugged[0] = False
+                link.lost()
+                time.sleep(0.02)
+                assert link.take() is None
+                plugged[0] = True
+
+                ready = wait_for(link.take)
+                assert ready[1] is boards[1]
+                assert link.stats["connects"] == 2
+                assert link.stats["recover_ms"] >= 20
+            finally:
+                link.stop()
+
+    def test_stop_closes_untaken_connection(self):
+        """Test a connection nobody took is not leaked."""
+        board = BoardEmulator()
+        link = SerialLink('/dev/test')
+        with patch('SerialLink.open_serial', return_value=board):
+            link.connect('/dev/test')
+
+        link.stop()
+
+        assert not board.is_open
+
+
+def wait_for(func, timeout=2.0):
+    """Call func until it returns something truthy."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = func()
+        if result:
+            return result
+        time.sleep(0.001)
+    raise AssertionError("timed out")
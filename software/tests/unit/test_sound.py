@@ -0,0 +1,61 @@
+"""
+Unit tests for Sound.py module.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from Sound import Sound
+
+
+def make_sound(*names):
+    """Sound with the named sounds loaded, skipping the mixer."""
+    sound = Sound.__new__(Sound)
+    sound.sounds = {name: object() for name in names}
+    sound.pending = {}
+    return sound
+
+
+class TestPlayerSounds:
+    """Test which sound each player gets."""
+
+    def test_player_sound_wraps(self):
+        """Test players past the last PLAYERn sound reuse them in turn."""
+        sound = make_sound("PLAYER1", "PLAYER2", "PLAYER3", "PLAYER4")
+
+        assert sound.player_sound(0) == "PLAYER1"
+        assert sound.player_sound(3) == "PLAYER4"
+        assert sound.player_sound(4) == "PLAYER1"
+        assert sound.player_sound(11) == "PLAYER4"
+
+    def test_test_sound(self):
+        """Test button test speaks the number where there is a recording."""
+        sound = make_sound("PLAYER1", "PLAYER2", "ONE", "TWO")
+
+        assert sound.test_sound(1) == "TWO"
+        assert sound.test_sound(2) == "PLAYER1"
+        assert sound.test_sound(20) == "PLAYER1"
+
+
+class TestLoading:
+    """Test sounds load on an executor."""
+
+    @patch('Sound.pygame.mixer')
+    def test_background(self, mock_mixer):
+        """Test sounds decode in the background and are waited for when needed."""
+        with ThreadPoolExecutor(2) as executor:
+            sound = Sound(executor)
+            assert set(sound.pending) >= {"BEEP", "BUZZ", "TIMESUP", "PLAYER1", "INVALID"}
+
+            assert sound.player_sound(0) == "PLAYER1"
+            assert not sound.pending
+            sound.play("BUZZ")
+            sound.sounds["BUZZ"].play.assert_called_once()
+
+    @patch('Sound.pygame.mixer')
+    def test_no_executor(self, mock_mixer):
+        """Test sounds are decoded straight away without an executor."""
+        sound = Sound()
+        assert not sound.pending
+        assert "BEEP" in sound.sounds
+        sound.sounds["BEEP"].set_volume.assert_called_with(0.5)
@@ -0,0 +1,111 @@
+"""
+Unit tests for Startup.py module.
+"""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+import ptext
+
+from Context import Context
+from render import FONTS, FRAME_FONT_SIZES, TEXT_FONT, draw_loading, load_assets, open_display
+from Startup import Startup, init_pygame
+
+
+class FakeTime:
+    """A perf_counter that moves only when told to."""
+
+    def __init__(self):
+        self.s = 100.0
+
+    def __call__(self):
+        return self.s
+
+
+class TestStartup:
+    """Test the phases and loads are timed."""
+
+    def test_phases(self):
+        """Test each phase is timed, after the imports before it."""
+        now = FakeTime()
+        startup = Startup(0, started=99.75, now=now)
+        with startup.phase("display"):
+            now.s += 0.040
+        startup.first_frame()
+        with startup.phase("restore"):
+            now.s += 0.010
+        startup.shutdown()
+
+        assert [name for name, _ in startup.phases] == ["imports", "display", "restore"]
+        assert [round(ms) for _, ms in startup.phases] == [250, 40, 10]
+        assert round(startup.first_frame_ms) == 290
+        assert round(startup.ready_ms) == 300
+        assert startup.report()[0] == "Startup took 300ms, first frame at 290ms"
+
+    def test_phase_timed_on_error(self):
+        """Test a phase that fails is still timed."""
+        startup = Startup(0)
+        with pytest.raises(OSError):
+            with startup.phase("backend"):
+                raise OSError("no board")
+        assert startup.phases[0][0] == "backend"
+
+    def test_loads_in_background(self):
+        """Test loads run on the pool and are added up by function."""
+        main = threading.current_thread()
+        threads = []
+
+        def load_sound(n):
+            threads.append(threading.current_thread())
+            return n * 2
+
+        startup = Startup(2)
+        futures = [startup.submit(load_sound, n) for n in range(5)]
+        assert [future.result() for future in futures] == [0, 2, 4, 6, 8]
+        startup.shutdown()
+
+        assert main not in threads
+        assert startup.loads["load_sound"][0] == 5
+        assert any("load_sound" in line and "(5 loaded)" in line for line in startup.report())
+
+    def test_no_workers(self):
+        """Test with no workers a load runs when it is submitted."""
+        startup = Startup(0)
+        future = startup.submit(threading.current_thread)
+        assert future.done()
+        assert future.result() is threading.current_thread()
+
+        failed = startup.submit(int, "not a number")
+        with pytest.raises(ValueError):
+            failed.result()
+        assert startup.loads["int"][0] == 1
+
+
+class TestProgressiveStartup:
+    """Test the game draws a first frame, then loads what it draws with."""
+
+    @patch('Context.Sound')
+    def test_first_frame_then_assets(self, mock_sound_class):
+        """Test the loading frame needs no assets, and load_assets brings them all."""
+        with patch('game_config.DISPLAY_STYLE', 'windowed'):
+            init_pygame()
+            context = Context()
+            startup = Startup(2)
+            open_display(context)
+            draw_loading(context)
+            assert context.fonts == {}
+
+            loaded = load_assets(context, startup)
+            loaded()
+            startup.shutdown()
+
+        assert set(context.fonts) == {name for name, _, _ in FONTS}
+        assert "logo" in context.images
+        assert startup.loads["load_fonts"][0] == 1
+        assert startup.loads["load_logo"][0] == 1
+
+        # a frame's text is drawn without opening a font
+        with patch('ptext.pygame.font.Font', side_effect=AssertionError("font opened")):
+            for size in FRAME_FONT_SIZES + list(context.scoreboard.font_sizes()):
+                ptext.draw("0:59", (0, 0), fontname=TEXT_FONT, fontsize=size, surf=context.screen)
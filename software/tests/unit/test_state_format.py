@@ -0,0 +1,167 @@
+"""
+Unit tests for StateFormat.py module.
+"""
+
+import json
+import os
+import pickle
+
+import pytest
+
+import game_config as config
+from GameState import GameState
+from StateFormat import (
+    FORMAT,
+    StateFormatError,
+    decode,
+    encode,
+    fit_players,
+    import_pickle,
+    is_pickle,
+    migrate,
+    validate,
+)
+
+
+def state(**changes):
+    return {
+        "player_names": ["Alice", "Bob"],
+        "scores": [3, -1],
+        "invert_display": False,
+        "state": GameState.BUZZIN.value,
+        "clock_ms": 41234,
+        "player_buzzed_in": 1,
+        "saved_ms": 1_700_000_000_000,
+        "journal_seq": 12,
+        **changes,
+    }
+
+
+class TestEncodeDecode:
+    """Test the JSON state file."""
+
+    def test_round_trip(self):
+        """Test a snapshot comes back as it was saved."""
+        data = encode(state(player_names=["Zoë", "Bob"]))
+        assert data.startswith(b'{"format":%d,' % FORMAT)
+        assert b"\n" not in data and b" " not in data
+        assert decode(data) == state(player_names=["Zoë", "Bob"])
+
+    def test_extra_keys_not_saved(self):
+        """Test only what the format has is written."""
+        assert "debug" not in json.loads(encode(state(debug=True)))
+
+    @pytest.mark.parametrize("data", [
+        b"",
+        b"\x00\x01garbage",
+        b"[1, 2]",
+        b'{"scores": [1]}',
+        b'{"format": 0, "scores": []}',
+    ])
+    def test_not_a_state_file(self, data):
+        """Test anything else is refused."""
+        with pytest.raises(StateFormatError):
+            decode(data)
+
+    @pytest.mark.parametrize("changes", [
+        {"scores": [1, "2"]},
+        {"scores": [1, True]},
+        {"player_names": ["Alice"]},
+        {"invert_display": 1},
+        {"state": 42},
+        {"clock_ms": -5},
+    ])
+    def test_schema_checked(self, changes):
+        """Test a bad value is refused on save and on load."""
+        with pytest.raises(StateFormatError):
+            encode(state(**changes))
+        with pytest.raises(StateFormatError):
+            decode(json.dumps({"format": FORMAT, **state(**changes)}).encode())
+
+    def test_newer_format_read_if_compatible(self):
+        """Test a file from a newer version loads if it has all this one needs."""
+        data = json.dumps({"format": FORMAT + 1, **state(), "teams": [0, 1]}).encode()
+        assert decode(data) == state()
+
+        with pytest.raises(StateFormatError):
+            decode(json.dumps({"format": FORMAT + 1, "names": []}).encode())
+
+
+class TestMigrations:
+    """Test moving between formats."""
+
+    def test_format_1_upgraded(self):
+        """Test a format 1 file loads with a stopped, full clock."""
+        data = b'{"format":1,"player_names":["A","B"],"scores":[1,2],"invert_display":true}'
+        restored = decode(data)
+
+        assert restored["scores"] == [1, 2]
+        assert restored["state"] == GameState.IDLE.value
+        assert restored["clock_ms"] == config.MAX_CLOCK
+        assert restored["journal_seq"] == 0
+
+    def test_downgrade(self):
+        """Test a snapshot can be written for an older version and read back."""
+        data = encode(state(), 1)
+        assert json.loads(data) == {"format": 1, "player_names": ["Alice", "Bob"],
+                                    "scores": [3, -1], "invert_display": False}
+        assert decode(data)["scores"] == [3, -1]
+
+    def test_no_way(self):
+        """Test formats with no migration between them are refused."""
+        with pytest.raises(StateFormatError):
+            migrate(state(), FORMAT, 0)
+
+
+class TestImportPickle:
+    """Test state files from before the JSON format."""
+
+    def test_old_pickle(self):
+        """Test the pickle the game used to write is imported."""
+        data = pickle.dumps({"player_names": ["A", "B"], "scores": [5, 6], "invert_display": True})
+        assert is_pickle(data)
+
+        restored = import_pickle(data)
+        validate(restored)
+        assert restored["scores"] == [5, 6]
+
+    def test_code_not_run(self, tmp_path):
+        """Test a pickle that would call a function is refused without calling it."""
+        marker = tmp_path / "ran"
+
+        class Exploit:
+            def __reduce__(self):
+                return (os.mkdir, (str(marker),))
+
+        with pytest.raises(StateFormatError):
+            import_pickle(pickle.dumps({"player_names": [], "scores": [], "invert_display": Exploit()}))
+        assert not marker.exists()
+
+    def test_not_state(self):
+        """Test a pickle of something else is refused."""
+        with pytest.raises(StateFormatError):
+            import_pickle(pickle.dumps([1, 2, 3]))
+
+
+class TestFitPlayers:
+    """Test a save is fitted to PLAYERS."""
+
+    def test_more_players(self):
+        """Test new players are added with no points."""
+        fitted, changed = fit_players(state(), 4)
+        assert changed
+        assert fitted["player_names"] == ["Alice", "Bob", "Player 3", "Player 4"]
+        assert fitted["scores"] == [3, -1, 0, 0]
+
+    def test_fewer_players(self):
+        """Test players past PLAYERS are dropped, along with a buzz-in of theirs."""
+        fitted, changed = fit_players(state(), 1)
+        assert changed
+        assert fitted["scores"] == [3]
+        assert fitted["player_buzzed_in"] == -1
+
+    def test_same(self):
+        """Test a save for PLAYERS is left alone."""
+        fitted, changed = fit_players(state(), 2)
+        assert not changed
+        assert fitted == state()
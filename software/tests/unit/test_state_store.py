@@ -0,0 +1,189 @@
+"""
+Unit tests for StateStore.py module.
+"""
+
+import os
+import pickle
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from StateFormat import decode
+from StateStore import StateStore
+
+
+def state(score):
+    return {"player_names": ["A", "B"], "scores": [score, 0], "invert_display": True,
+            "state": 0, "clock_ms": 60000, "player_buzzed_in": -1, "saved_ms": 0, "journal_seq": 0}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / "gamestate.json"), generations=2, delay_ms=50)
+    yield store
+    store.close()
+
+
+def read(path):
+    with open(path, "rb") as file:
+        return decode(file.read())
+
+
+class TestWrite:
+    """Test the file is replaced atomically and generations are kept."""
+
+    def test_generations(self, store, tmp_path):
+        """Test each write pushes the older files back, dropping the oldest."""
+        for score in range(1, 5):
+            store.write(state(score))
+
+        assert read(store.path)["scores"][0] == 4
+        assert read(store.path + ".1")["scores"][0] == 3
+        assert read(store.path + ".2")["scores"][0] == 2
+        assert sorted(os.listdir(tmp_path)) == ["gamestate.json", "gamestate.json.1", "gamestate.json.2"]
+
+    def test_failed_write_keeps_old_file(self, store):
+        """Test a write that fails partway leaves the state file alone."""
+        store.write(state(1))
+        with patch('os.fsync', side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                store.write(state(2))
+
+        assert read(store.path)["scores"][0] == 1
+        assert not os.path.exists(store.path + ".1")
+
+    def test_unchanged_not_written(self, store):
+        """Test saving what is already on disk does not rotate the generations."""
+        store.write(state(1))
+        store.write(state(1))
+
+        assert store.stats["written"] == 1
+        assert store.stats["unchanged"] == 1
+        assert not os.path.exists(store.path + ".1")
+
+    def test_save_time_not_a_change(self, store):
+        """Test a snapshot that only differs in when it was taken is not written."""
+        store.write(state(1))
+        store.write({**state(1), "saved_ms": 1000})
+        store.write({**state(1), "journal_seq": 5})
+
+        assert store.stats["written"] == 2
+        assert store.stats["unchanged"] == 1
+
+
+class TestLoad:
+    """Test restoring from the newest file that loads."""
+
+    def test_newest(self, store):
+        """Test the current file is used when it loads."""
+        store.write(state(1))
+        store.write(state(2))
+
+        assert store.load()["scores"][0] == 2
+
+    def test_damaged_falls_back(self, store):
+        """Test a truncated state file falls back to the previous generation."""
+        store.write(state(1))
+        store.write(state(2))
+        with open(store.path, "r+b") as file:
+            file.truncate(10)
+
+        with patch('builtins.print') as mock_print:
+            assert store.load()["scores"][0] == 1
+        assert "could not read" in mock_print.call_args[0][0]
+
+    def test_not_a_state_file(self, store):
+        """Test a file that unpickles to something else is skipped."""
+        with open(store.path, "wb") as file:
+            pickle.dump([1, 2, 3], file)
+
+        with patch('builtins.print'):
+            assert store.load() is None
+
+    def test_no_file(self, store):
+        """Test a first run has nothing to restore."""
+        assert store.load() is None
+
+
+class TestWriteBehind:
+    """Test saves are written off the calling thread and combined."""
+
+    def test_written_on_other_thread(self, store):
+        """Test save() returns at once and the writer thread does the write."""
+        threads = []
+        write = store.write
+        store.write = lambda snapshot: threads.append(threading.get_ident()) or write(snapshot)
+
+        store.save(state(1))
+        assert threads == []
+        assert store.flush(timeout=5)
+
+        assert threads and threads[0] != threading.get_ident()
+        assert read(store.path)["scores"][0] == 1
+
+    def test_burst_combined(self, store):
+        """Test a burst of saves within the delay is one write of the newest."""
+        for score in range(10):
+            store.save(state(score))
+        assert store.flush(timeout=5)
+
+        assert store.stats["written"] == 1
+        assert store.stats["coalesced"] == 9
+        assert read(store.path)["scores"][0] == 9
+
+    def test_pending_written_on_close(self, tmp_path):
+        """Test a save still waiting out the delay is written at exit."""
+        store = StateStore(str(tmp_path / "gamestate.json"), delay_ms=10_000)
+        store.save(state(7))
+        store.close()
+
+        assert read(store.path)["scores"][0] == 7
+
+    def test_failed_write_reported(self, store):
+        """Test a disk error is counted and the writer carries on."""
+        with patch('os.fsync', side_effect=OSError("disk full")), \
+             patch('builtins.print') as mock_print:
+            store.save(state(1))
+            assert store.flush(timeout=5)
+
+        assert store.stats["failed"] == 1
+        mock_print.assert_called_once_with("Could not save game state: disk full")
+
+        store.save(state(2))
+        assert store.flush(timeout=5)
+        assert read(store.path)["scores"][0] == 2
+
+
+class TestImport:
+    """Test state files from before the JSON format are imported once."""
+
+    def test_pickle_imported(self, store):
+        """Test a pickled state file is loaded and written again as JSON."""
+        with open(store.path, "wb") as file:
+            pickle.dump({"player_names": ["A", "B"], "scores": [4, 2], "invert_display": False}, file)
+
+        with patch('builtins.print') as mock_print:
+            assert store.load()["scores"] == [4, 2]
+        assert "Imported game state" in mock_print.call_args[0][0]
+
+        assert read(store.path)["scores"] == [4, 2]
+        # the pickle is kept as the previous generation
+        with open(store.path + ".1", "rb") as file:
+            assert file.read(1) == b"\x80"
+
+    def test_legacy_file(self, tmp_path):
+        """Test the old state file is imported when there is no new one."""
+        legacy = tmp_path / "gamestate.pickle"
+        with open(legacy, "wb") as file:
+            pickle.dump({"player_names": ["A"], "scores": [9], "invert_display": True}, file)
+        store = StateStore(str(tmp_path / "gamestate.json"), legacy=str(legacy))
+
+        with patch('builtins.print'):
+            assert store.load()["scores"] == [9]
+        assert read(store.path)["scores"] == [9]
+        assert legacy.exists()
+
+        # from then on the new file is used
+        store.write({**read(store.path), "scores": [10]})
+        assert store.load()["scores"] == [10]
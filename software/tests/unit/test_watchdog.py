@@ -0,0 +1,134 @@
+"""
+Unit tests for Watchdog.py module.
+"""
+
+import time
+import traceback
+from unittest.mock import Mock, patch
+
+import pygame
+import pytest
+
+from GameState import GameState
+from Watchdog import Watchdog, start_watchdog, stall_cause
+from backends import InputEvent
+
+
+def frames(*names):
+    """A stack, outermost first, of (file, function) pairs."""
+    return [traceback.FrameSummary(f"/game/{file}", 1, function) for file, function in names]
+
+
+@pytest.fixture
+def watchdog(tmp_path):
+    context = Mock()
+    context.state = GameState.RUNNING
+    dog = Watchdog(context, 50, str(tmp_path / "stalls.log"))
+    yield dog
+    dog.stop()
+
+
+def write_state_slowly():
+    """Stands in for a save stuck on a slow disk."""
+    time.sleep(0.15)
+
+
+class TestStallCause:
+    """Test stalls are put down to the innermost frame we know."""
+
+    def test_innermost_match_wins(self):
+        """Test a serial write under render code counts as serial."""
+        stack = frames(("main.py", "main"), ("render.py", "render_all"),
+                       ("hardware.py", "set_led"), ("serialposix.py", "write"))
+        assert stall_cause(stack) == "serial"
+
+    def test_function_must_match(self):
+        """Test Context entries only match the functions listed."""
+        assert stall_cause(frames(("events.py", "score_add"), ("Context.py", "write_state"))) == "save"
+        assert stall_cause(frames(("events.py", "run_frame"), ("Context.py", "reset_game"))) == "other"
+
+    def test_unknown(self):
+        """Test a stack with nothing we know is "other"."""
+        assert stall_cause(frames(("main.py", "main"), ("events.py", "run_frame"))) == "other"
+
+
+class TestWatchdog:
+    """Test stalls are caught, logged and counted."""
+
+    def test_no_stall_while_beating(self, watchdog):
+        """Test a loop that keeps beating is left alone."""
+        watchdog.start()
+        for _ in range(10):
+            watchdog.beat()
+            time.sleep(0.01)
+
+        assert watchdog.stats() == {"longest_ms": 0}
+        assert watchdog.report() == "No stalls"
+
+    def test_stall_logged_with_stack(self, watchdog, tmp_path):
+        """Test a stalled frame is logged once, with the stack, state and recent input."""
+        watchdog.saw([InputEvent(1), InputEvent(1, pressed=False)])
+        watchdog.saw([pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, mod=0)])
+        watchdog.start()
+        watchdog.beat()
+        write_state_slowly()
+        watchdog.beat()
+        watchdog.stop()
+
+        log = (tmp_path / "stalls.log").read_text()
+        assert log.count("STALL no frame") == 1
+        assert "state RUNNING" in log
+        assert "press player 2" in log and "release player 2" in log and "key space" in log
+        assert "write_state_slowly" in log
+        assert "STALL ended after" in log
+        assert watchdog.stats()["other"] == 1
+        assert watchdog.stats()["longest_ms"] >= 150
+
+    def test_counted_by_cause(self, watchdog):
+        """Test each stall is counted under the cause read from the stack."""
+        watchdog.last_beat_ns = time.monotonic_ns() - 100_000_000
+        stack = frames(("events.py", "run_frame"), ("Sound.py", "play"))
+        with patch('traceback.extract_stack', return_value=traceback.StackSummary.from_list(stack)):
+            assert watchdog.check() == "sound"
+            # the same stall is only reported once
+            assert watchdog.check() is None
+            watchdog.beat()
+            watchdog.last_beat_ns -= 100_000_000
+            assert watchdog.check() == "sound"
+
+        assert watchdog.stats()["sound"] == 2
+        assert watchdog.report().startswith("Stalls: sound 2")
+
+    def test_log_rotated(self, tmp_path):
+        """Test the log is rotated rather than growing without end."""
+        dog = Watchdog(Mock(state=GameState.IDLE), 10, str(tmp_path / "stalls.log"), log_bytes=500, log_count=2)
+        for _ in range(6):
+            dog.last_beat_ns = time.monotonic_ns() - 20_000_000
+            dog.check()
+            dog.beat()
+        dog.stop()
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["stalls.log", "stalls.log.1", "stalls.log.2"]
+
+
+class TestStartWatchdog:
+    """Test WATCHDOG_STALL_MS."""
+
+    def test_off(self):
+        """Test 0 turns the watchdog off."""
+        context = Mock(watchdog=None)
+        with patch('game_config.WATCHDOG_STALL_MS', 0):
+            assert start_watchdog(context) is None
+        assert context.watchdog is None
+
+    def test_on(self, tmp_path):
+        """Test the watchdog is started and set on the context."""
+        context = Mock()
+        with patch('game_config.WATCHDOG_STALL_MS', 500), \
+             patch('game_config.WATCHDOG_LOG', str(tmp_path / "stalls.log")):
+            dog = start_watchdog(context)
+        try:
+            assert context.watchdog is dog
+            assert dog.thread.is_alive()
+        finally:
+            dog.stop()